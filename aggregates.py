@@ -0,0 +1,187 @@
+import json
+import os
+from datetime import date
+from typing import Dict, Any, Optional
+from models import Produkt, ProduktTable
+
+class AgregatySpizarni:
+    """
+    Bieżące agregaty aktywnych produktów aktualizowane przy każdym zapisie.
+    
+    Dodanie, zużycie i usunięcie produktu zmieniają kilka liczników w O(1),
+    więc statystyki i powiadomienia nie wymagają przeglądania spiżarni.
+    Wartości są liczone w groszach (liczby całkowite), aby wielokrotne
+    dodawanie i odejmowanie nie kumulowało błędów zaokrągleń.
+    
+    Atrybuty:
+        liczba_w_kategoriach (Dict[str, int]): Liczba produktów w każdej kategorii
+        grosze_w_kategoriach (Dict[str, int]): Wartość produktów w każdej kategorii (w groszach)
+        liczba_w_dniach (Dict[int, int]): Liczba produktów wg dnia ważności (dni od 1970-01-01)
+        grosze_w_dniach (Dict[int, int]): Wartość produktów wg dnia ważności (w groszach)
+    """
+    
+    def __init__(self):
+        """
+        Inicjalizuje puste agregaty.
+        """
+        self.liczba_w_kategoriach: Dict[str, int] = {}
+        self.grosze_w_kategoriach: Dict[str, int] = {}
+        self.liczba_w_dniach: Dict[int, int] = {}
+        self.grosze_w_dniach: Dict[int, int] = {}
+    
+    @staticmethod
+    def _zmien(licznik: Dict[Any, int], klucz: Any, zmiana: int) -> None:
+        wartosc = licznik.get(klucz, 0) + zmiana
+        if wartosc:
+            licznik[klucz] = wartosc
+        else:
+            licznik.pop(klucz, None)
+    
+    def _zmien_wiersz(self, kategoria: str, dzien: int, cena: Optional[float], znak: int) -> None:
+        grosze = round(cena * 100) if cena is not None and cena == cena else 0
+        self._zmien(self.liczba_w_kategoriach, kategoria, znak)
+        self._zmien(self.grosze_w_kategoriach, kategoria, znak * grosze)
+        self._zmien(self.liczba_w_dniach, dzien, znak)
+        self._zmien(self.grosze_w_dniach, dzien, znak * grosze)
+    
+    def dodaj(self, produkt: Produkt) -> None:
+        """
+        Uwzględnia produkt w agregatach (pomija produkty zużyte).
+        
+        Args:
+            produkt: Dodany produkt
+        """
+        if not produkt.zuzyty:
+            self._zmien_wiersz(produkt.kategoria, ProduktTable.dzien(produkt.data_waznosci.date()),
+                               produkt.cena, 1)
+    
+    def odejmij(self, produkt: Produkt) -> None:
+        """
+        Usuwa z agregatów produkt, który przestał być aktywny.
+        
+        Args:
+            produkt: Usunięty lub zużyty produkt (w stanie sprzed zmiany)
+        """
+        if not produkt.zuzyty:
+            self._zmien_wiersz(produkt.kategoria, ProduktTable.dzien(produkt.data_waznosci.date()),
+                               produkt.cena, -1)
+    
+    @classmethod
+    def z_tabeli(cls, tabela: ProduktTable) -> 'AgregatySpizarni':
+        """
+        Oblicza agregaty od zera na podstawie tabeli produktów.
+        
+        Args:
+            tabela: Tabela wszystkich produktów
+        
+        Returns:
+            AgregatySpizarni: Nowe agregaty
+        """
+        agregaty = cls()
+        for kod, dzien, cena, zuzyty in zip(tabela.kategoria, tabela.data_waznosci,
+                                            tabela.cena, tabela.zuzyty):
+            if not zuzyty:
+                agregaty._zmien_wiersz(tabela.kategorie[kod], dzien, cena, 1)
+        return agregaty
+    
+    @property
+    def liczba_produktow(self) -> int:
+        return sum(self.liczba_w_kategoriach.values())
+    
+    @property
+    def wartosc_calkowita(self) -> float:
+        return sum(self.grosze_w_kategoriach.values()) / 100
+    
+    def liczba_do_dnia(self, do_dnia: date) -> int:
+        """
+        Zlicza aktywne produkty z datą ważności nie późniejszą niż podany dzień.
+        
+        Args:
+            do_dnia: Ostatni dzień (włącznie)
+        
+        Returns:
+            int: Liczba produktów
+        """
+        granica = ProduktTable.dzien(do_dnia)
+        return sum(liczba for dzien, liczba in self.liczba_w_dniach.items() if dzien <= granica)
+    
+    def __eq__(self, inne: object) -> bool:
+        if not isinstance(inne, AgregatySpizarni):
+            return NotImplemented
+        return self.to_dict() == inne.to_dict()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Konwertuje agregaty do słownika (daty ważności jako ISO).
+        
+        Returns:
+            Dict[str, Any]: Słownik reprezentujący agregaty
+        """
+        return {
+            'liczba_w_kategoriach': dict(sorted(self.liczba_w_kategoriach.items())),
+            'grosze_w_kategoriach': dict(sorted(self.grosze_w_kategoriach.items())),
+            'liczba_w_dniach': {ProduktTable.data_z_dnia(d).isoformat(): n
+                                for d, n in sorted(self.liczba_w_dniach.items())},
+            'grosze_w_dniach': {ProduktTable.data_z_dnia(d).isoformat(): n
+                                for d, n in sorted(self.grosze_w_dniach.items())}
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AgregatySpizarni':
+        """
+        Tworzy agregaty ze słownika.
+        
+        Args:
+            data: Słownik zapisany przez to_dict
+        
+        Returns:
+            AgregatySpizarni: Odtworzone agregaty
+        """
+        agregaty = cls()
+        agregaty.liczba_w_kategoriach = dict(data['liczba_w_kategoriach'])
+        agregaty.grosze_w_kategoriach = dict(data['grosze_w_kategoriach'])
+        agregaty.liczba_w_dniach = {_dzien(d): n for d, n in data['liczba_w_dniach'].items()}
+        agregaty.grosze_w_dniach = {_dzien(d): n for d, n in data['grosze_w_dniach'].items()}
+        return agregaty
+
+
+
+def _dzien(iso: str) -> int:
+    return ProduktTable.dzien(date.fromisoformat(iso))
+
+
+def zapisz_agregaty(sciezka: str, agregaty: AgregatySpizarni, sygnatura: Any) -> None:
+    """
+    Zapisuje agregaty wraz z sygnaturą danych, których dotyczą.
+    
+    Args:
+        sciezka: Ścieżka do pliku agregatów
+        agregaty: Agregaty do zapisania
+        sygnatura: Trwała sygnatura danych backendu
+    """
+    sciezka_tymczasowa = sciezka + ".tmp"
+    with open(sciezka_tymczasowa, 'w', encoding='utf-8') as f:
+        json.dump({'sygnatura': sygnatura, 'agregaty': agregaty.to_dict()}, f, ensure_ascii=False)
+    os.replace(sciezka_tymczasowa, sciezka)
+
+
+def wczytaj_agregaty(sciezka: str, sygnatura: Any) -> Optional[AgregatySpizarni]:
+    """
+    Wczytuje agregaty, jeśli zostały zapisane dla danych o podanej sygnaturze.
+    
+    Args:
+        sciezka: Ścieżka do pliku agregatów
+        sygnatura: Bieżąca trwała sygnatura danych backendu
+    
+    Returns:
+        Optional[AgregatySpizarni]: Agregaty lub None, jeśli pliku nie ma albo jest nieaktualny
+    """
+    try:
+        with open(sciezka, 'r', encoding='utf-8') as f:
+            dane = json.load(f)
+        # JSON zamienia krotki na listy - porównaj w tej samej postaci
+        if dane['sygnatura'] != json.loads(json.dumps(sygnatura)):
+            return None
+        return AgregatySpizarni.from_dict(dane['agregaty'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
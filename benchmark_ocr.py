@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Porównanie przygotowania obrazu przed OCR: pełna klatka vs wycięty i przeskalowany paragon.
+
+Dla każdego paragonu (obrazy i strony PDF) w podanym katalogu mierzy liczbę
+pikseli przekazywanych do EasyOCR, czas przygotowania obrazu i czas readtext.
+Z opcją --kaskada porównuje pełny OCR z kaskadą (ocr.kaskada): czas, poziom,
+który dał wynik, i zgodność rozpoznanych linii.
+
+Użycie:
+    python benchmark_ocr.py [--katalog paragony] [--bez-ocr | --kaskada]
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from config import KONFIGURACJA
+from ocr_processor import (JEZYKI_OCR, ROZSZERZENIA_PARAGONOW, StatystykiOCR, StronaPdf, przygotuj_obraz,
+                           rozpoznaj_kaskadowo)
+
+WARIANTY = [("pełna klatka", False), ("wycięty paragon", True)]
+
+
+def znajdz_paragony(katalog: str) -> list:
+    """
+    Zwraca źródła obrazów (pliki i strony PDF) ze wszystkich podkatalogów.
+    """
+    zrodla = []
+    for rozszerzenie in ROZSZERZENIA_PARAGONOW:
+        for sciezka in sorted(glob.glob(os.path.join(katalog, "**", rozszerzenie), recursive=True)):
+            if sciezka.lower().endswith(".pdf"):
+                from pdf2image import pdfinfo_from_path
+                zrodla.extend(StronaPdf.dokument(sciezka, pdfinfo_from_path(sciezka)["Pages"],
+                                                 KONFIGURACJA["ocr"]["dpi_pdf"]))
+            else:
+                zrodla.append(sciezka)
+    return zrodla
+
+
+def zmierz(zrodlo, geometria: bool, reader) -> dict:
+    """
+    Mierzy przygotowanie obrazu (i OCR, jeśli podano czytnik) dla jednego wariantu.
+    """
+    start = time.perf_counter()
+    obraz = przygotuj_obraz(zrodlo, geometria=geometria)
+    czas_przygotowania = time.perf_counter() - start
+    if obraz is None:
+        return {}
+    wynik = {"piksele": obraz.size, "przygotowanie": czas_przygotowania, "ocr": None, "linie": None}
+    if reader is not None:
+        start = time.perf_counter()
+        wyniki = reader.readtext(obraz)
+        wynik["ocr"] = time.perf_counter() - start
+        wynik["linie"] = sum(1 for _, _, pewnosc in wyniki if pewnosc > 0.3)
+    return wynik
+
+
+def porownaj_kaskade(zrodla: list, reader) -> None:
+    """
+    Porównuje pełny OCR z kaskadą dla każdego paragonu i podsumowuje średni koszt.
+    """
+    from tabulate import tabulate
+    wiersze = []
+    czas_pelny = czas_kaskady = 0.0
+    statystyki = StatystykiOCR()
+    for zrodlo in zrodla:
+        obraz = przygotuj_obraz(zrodlo)
+        if obraz is None:
+            continue
+        start = time.perf_counter()
+        pelne = reader.readtext(obraz, batch_size=KONFIGURACJA["ocr"]["rozmiar_wsadu"])
+        czas = time.perf_counter() - start
+        
+        statystyki_paragonu = StatystykiOCR()
+        start = time.perf_counter()
+        kaskada = rozpoznaj_kaskadowo(reader, [obraz], 1, KONFIGURACJA["ocr"]["rozmiar_wsadu"],
+                                      statystyki_paragonu)[0] or []
+        czas_k = time.perf_counter() - start
+        statystyki.polacz(statystyki_paragonu.obrazy, statystyki_paragonu.czas)
+        czas_pelny += czas
+        czas_kaskady += czas_k
+        
+        linie_pelne = {tekst.strip() for _, tekst, pewnosc in pelne if pewnosc > 0.3}
+        linie_kaskady = {tekst.strip() for _, tekst, pewnosc in kaskada if pewnosc > 0.3}
+        zgodnosc = len(linie_pelne & linie_kaskady) / max(1, len(linie_pelne))
+        wiersze.append([os.path.basename(str(zrodlo)), f"{czas * 1000:.0f}", f"{czas_k * 1000:.0f}",
+                        ", ".join(statystyki_paragonu.obrazy), f"{zgodnosc:.0%}"])
+    print(tabulate(wiersze, headers=["Paragon", "Pełny OCR (ms)", "Kaskada (ms)", "Poziom", "Zgodne linie"],
+                   tablefmt="github"))
+    if wiersze:
+        print(f"\nŚredni czas OCR paragonu: {czas_pelny / len(wiersze):.2f} s → {czas_kaskady / len(wiersze):.2f} s")
+        print(f"Poziomy kaskady - {statystyki}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark przygotowania obrazów paragonów do OCR")
+    parser.add_argument("--katalog", default="paragony", help="katalog z paragonami (przeszukiwany rekurencyjnie)")
+    parser.add_argument("--bez-ocr", action="store_true", help="mierz tylko przygotowanie obrazu")
+    parser.add_argument("--kaskada", action="store_true", help="porównaj pełny OCR z kaskadą (ocr.kaskada)")
+    argumenty = parser.parse_args()
+    
+    zrodla = znajdz_paragony(argumenty.katalog)
+    if not zrodla:
+        print(f"Brak paragonów w {argumenty.katalog}")
+        return
+    
+    reader = None
+    if not argumenty.bez_ocr:
+        import easyocr
+        reader = easyocr.Reader(JEZYKI_OCR, gpu=KONFIGURACJA["ocr"]["gpu"])
+        # Rozgrzewka - pierwsze wywołanie obejmuje inicjalizację modeli
+        reader.readtext(przygotuj_obraz(zrodla[0], geometria=True))
+        if argumenty.kaskada:
+            porownaj_kaskade(zrodla, reader)
+            return
+    
+    from tabulate import tabulate
+    wiersze = []
+    sumy = {nazwa: {"piksele": 0, "przygotowanie": 0.0, "ocr": 0.0} for nazwa, _ in WARIANTY}
+    for zrodlo in zrodla:
+        for nazwa, geometria in WARIANTY:
+            wynik = zmierz(zrodlo, geometria, reader)
+            if not wynik:
+                continue
+            for klucz in sumy[nazwa]:
+                sumy[nazwa][klucz] += wynik[klucz] or 0
+            wiersze.append([os.path.basename(str(zrodlo)), nazwa, f"{wynik['piksele'] / 1e6:.2f}",
+                            f"{wynik['przygotowanie'] * 1000:.0f}",
+                            "-" if wynik["ocr"] is None else f"{wynik['ocr'] * 1000:.0f}",
+                            "-" if wynik["linie"] is None else wynik["linie"]])
+    print(tabulate(wiersze, headers=["Paragon", "Wariant", "Mpx do OCR", "Przygotowanie (ms)",
+                                     "OCR (ms)", "Linie tekstu"], tablefmt="github"))
+    
+    przed, po = sumy[WARIANTY[0][0]], sumy[WARIANTY[1][0]]
+    print(f"\nŁącznie pikseli do OCR: {przed['piksele'] / 1e6:.1f} Mpx → {po['piksele'] / 1e6:.1f} Mpx")
+    print(f"Łączny czas przygotowania: {przed['przygotowanie']:.2f} s → {po['przygotowanie']:.2f} s")
+    if reader is not None and po["ocr"]:
+        print(f"Łączny czas OCR: {przed['ocr']:.2f} s → {po['ocr']:.2f} s "
+              f"(przyspieszenie {przed['ocr'] / po['ocr']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
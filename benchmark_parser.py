@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Porównanie wyodrębniania produktów: reguły (receipt_parser) vs model językowy.
+
+Dla każdego paragonu (obrazy i strony PDF) w podanym katalogu odczytuje wyniki
+OCR (z pamięci podręcznej, jeśli są), a następnie mierzy czas i wynik parsera
+regułowego, ścieżki hybrydowej (reguły, AI tylko przy wątpliwościach) i samego
+AI. Trafność liczona jest względem pliku wzorcowego <paragon>.json (lista
+{"nazwa", "cena"}) leżącego obok paragonu, a bez niego - względem wyniku AI.
+Pozycja jest trafiona, gdy zgadza się cena (±0,01 zł) i nazwa jest podobna.
+AI otrzymuje tylko wiersze pozycji (tekst_pozycji); --pelny-tekst wysyła cały
+tekst paragonu, aby porównać czas odpowiedzi i trafność przy dłuższym prompcie.
+
+Użycie:
+    python benchmark_parser.py [--katalog paragony] [--bez-ai] [--pelny-tekst]
+"""
+
+import argparse
+import difflib
+import json
+import os
+import time
+
+from benchmark_ocr import znajdz_paragony
+from config import KONFIGURACJA
+from llm_integration import parsuj_paragon_ai
+from ocr_processor import (JEZYKI_OCR, StatystykiOCR, StronaPdf, odczytaj_wyniki_ocr, pamiec_ocr_z_konfiguracji,
+                           tekst_z_wynikow, wyodrebnij_produkty)
+from receipt_parser import parsuj_paragon_regulami, tekst_pozycji, wiersze_z_wynikow
+
+
+def wczytaj_wzorzec(zrodlo) -> list:
+    """
+    Zwraca produkty wzorcowe paragonu lub None, jeśli nie ma pliku wzorcowego.
+    """
+    sciezka = (zrodlo.sciezka if isinstance(zrodlo, StronaPdf) else str(zrodlo)) + ".json"
+    if not os.path.exists(sciezka):
+        return None
+    with open(sciezka, encoding="utf-8") as f:
+        wzorzec = json.load(f)
+    # PDF: lista produktów dla każdej strony
+    if isinstance(zrodlo, StronaPdf) and wzorzec and isinstance(wzorzec[0], list):
+        return wzorzec[zrodlo.numer - 1] if zrodlo.numer <= len(wzorzec) else None
+    return wzorzec
+
+
+def trafione(produkty: list, wzorzec: list) -> int:
+    """
+    Zlicza produkty zgodne z wzorcem (każda pozycja wzorca może być trafiona raz).
+    """
+    pozostale = list(wzorzec)
+    liczba = 0
+    for produkt in produkty:
+        for oczekiwany in pozostale:
+            podobienstwo = difflib.SequenceMatcher(None, str(produkt.get("nazwa", "")).lower(),
+                                                   str(oczekiwany["nazwa"]).lower()).ratio()
+            if abs(float(produkt.get("cena") or 0) - float(oczekiwany["cena"])) <= 0.01 and podobienstwo >= 0.6:
+                pozostale.remove(oczekiwany)
+                liczba += 1
+                break
+    return liczba
+
+
+def f1(produkty: list, wzorzec: list) -> float:
+    if not produkty or not wzorzec:
+        return float(produkty == wzorzec)
+    liczba = trafione(produkty, wzorzec)
+    return 2 * liczba / (len(produkty) + len(wzorzec))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark parsowania paragonów: reguły vs AI")
+    parser.add_argument("--katalog", default="paragony", help="katalog z paragonami (przeszukiwany rekurencyjnie)")
+    parser.add_argument("--bez-ai", action="store_true", help="mierz tylko parser regułowy (wymaga wzorców)")
+    parser.add_argument("--pelny-tekst", action="store_true", help="wysyłaj do AI cały tekst paragonu")
+    argumenty = parser.parse_args()
+    
+    zrodla = znajdz_paragony(argumenty.katalog)
+    if not zrodla:
+        print(f"Brak paragonów w {argumenty.katalog}")
+        return
+    
+    czytnik = []
+    
+    def pobierz_czytnik():
+        if not czytnik:
+            import easyocr
+            czytnik.append(easyocr.Reader(JEZYKI_OCR, gpu=KONFIGURACJA["ocr"]["gpu"]))
+        return czytnik[0]
+    
+    from tabulate import tabulate
+    pamiec = pamiec_ocr_z_konfiguracji()
+    statystyki = StatystykiOCR()
+    wiersze = []
+    czasy = {"reguły": 0.0, "hybryda": 0.0, "AI": 0.0}
+    oceny = {"reguły": [], "hybryda": [], "AI": []}
+    pewne = 0
+    znaki = {"cały tekst": 0, "pozycje": 0}
+    for zrodlo in zrodla:
+        wyniki = odczytaj_wyniki_ocr(zrodlo, pobierz_czytnik, pamiec)
+        tekst = None if wyniki is None else tekst_z_wynikow(wyniki, zrodlo)
+        if not tekst:
+            continue
+        wzorzec = wczytaj_wzorzec(zrodlo)
+        pozycje = tekst_pozycji(tekst)
+        znaki["cały tekst"] += len(tekst)
+        znaki["pozycje"] += len(pozycje)
+        
+        start = time.perf_counter()
+        reguly = parsuj_paragon_regulami(wiersze_z_wynikow(wyniki), KONFIGURACJA["parsowanie"]["tolerancja_sumy"])
+        czas_regul = time.perf_counter() - start
+        czasy["reguły"] += czas_regul
+        pewne += reguly.pewny
+        
+        hybryda = ai = None
+        czas_hybrydy = czas_ai = None
+        if not argumenty.bez_ai:
+            statystyki_paragonu = StatystykiOCR()
+            start = time.perf_counter()
+            hybryda = wyodrebnij_produkty(tekst, wyniki, statystyki_paragonu) or []
+            czas_hybrydy = time.perf_counter() - start
+            statystyki.polacz(statystyki_paragonu.obrazy, statystyki_paragonu.czas)
+            start = time.perf_counter()
+            ai = parsuj_paragon_ai(tekst if argumenty.pelny_tekst else pozycje, KONFIGURACJA["llm"]) or []
+            czas_ai = time.perf_counter() - start
+            czasy["hybryda"] += czas_hybrydy
+            czasy["AI"] += czas_ai
+        
+        # Bez wzorca punktem odniesienia jest wynik AI
+        odniesienie = wzorzec if wzorzec is not None else ai
+        wiersz = [os.path.basename(str(zrodlo)), f"{czas_regul * 1000:.1f}", "tak" if reguly.pewny else "nie",
+                  len(reguly.produkty)]
+        if odniesienie is not None:
+            for nazwa, produkty in (("reguły", reguly.produkty), ("hybryda", hybryda), ("AI", ai)):
+                if produkty is not None and (nazwa != "AI" or wzorzec is not None):
+                    oceny[nazwa].append(f1(produkty, odniesienie))
+            wiersz.append(f"{f1(reguly.produkty, odniesienie):.0%}")
+        else:
+            wiersz.append("-")
+        if not argumenty.bez_ai:
+            wiersz += [", ".join(statystyki_paragonu.obrazy), f"{czas_hybrydy:.2f}", f"{czas_ai:.2f}", len(ai),
+                       "-" if wzorzec is None else f"{f1(hybryda, wzorzec):.0%} / {f1(ai, wzorzec):.0%}"]
+        wiersze.append(wiersz)
+    
+    naglowki = ["Paragon", "Reguły (ms)", "Pewny", "Pozycje", "F1 reguł"]
+    if not argumenty.bez_ai:
+        naglowki += ["Ścieżka", "Hybryda (s)", "AI (s)", "Pozycje AI", "F1 hybryda / AI"]
+    print(tabulate(wiersze, headers=naglowki, tablefmt="github"))
+    if not wiersze:
+        return
+    
+    liczba = len(wiersze)
+    print(f"\nPewny wynik reguł: {pewne}/{liczba} paragonów ({pewne / liczba:.0%})")
+    print(f"Tekst dla AI: średnio {znaki['cały tekst'] / liczba:.0f} → {znaki['pozycje'] / liczba:.0f} znaków "
+          f"(wiersze pozycji)")
+    for nazwa, czas in czasy.items():
+        if nazwa != "reguły" and argumenty.bez_ai:
+            continue
+        srednia = f"{sum(oceny[nazwa]) / len(oceny[nazwa]):.0%}" if oceny[nazwa] else "-"
+        print(f"{nazwa}: średnio {czas / liczba:.3f} s/paragon, F1 {srednia}")
+    if statystyki.obrazy:
+        print(f"Ścieżki hybrydy - {statystyki}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+import math
+import struct
+import sys
+from array import array
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional
+from models import Produkt, ProduktTable
+
+# Zwarty, kolumnowy format migawki spiżarni.
+#
+# Plik zaczyna się nagłówkiem (magia, wersja, liczba produktów, liczba kolumn),
+# po którym następuje spis kolumn (nazwa, przesunięcie, długość) i same kolumny.
+# Każda kolumna to tablica o stałej szerokości elementu (little-endian):
+#
+#   id, nazwa, id_paragonu  - odwołania do tablicy napisów (uint32)
+#   kategoria               - kod kategorii (uint16) z tablicy kategorii
+#   data_waznosci           - dni od 1970-01-01 (int32)
+#   cena                    - float64, NaN gdy brak ceny
+#   data_dodania            - mikrosekundy od 1970-01-01 (int64)
+#   data_zuzycia            - jak data_dodania, BRAK_DATY gdy nie ustawiono
+#   zuzyty                  - uint8
+#
+# Napisy są internowane: każda unikalna wartość trafia do tablicy napisów
+# (przesunięcia + blok UTF-8) tylko raz. Kolumny i napisy są dekodowane
+# dopiero przy pierwszym użyciu, więc zliczanie kategorii czy wyszukiwanie
+# wygasających produktów nie dotyka nazw ani dat dodania.
+
+MAGIA = b"SPZB"
+WERSJA = 1
+BRAK_NAPISU = 0xFFFFFFFF
+BRAK_DATY = -(2 ** 63)
+
+_EPOKA = datetime(1970, 1, 1)
+_EPOKA_DNI = date(1970, 1, 1).toordinal()
+_MIKROSEKUNDA = timedelta(microseconds=1)
+
+_NAGLOWEK = struct.Struct("<4sHII")
+_OPIS_KOLUMNY = struct.Struct("<16sQQ")
+
+_TYPY_KOLUMN = {
+    "id": "I",
+    "nazwa": "I",
+    "kategoria": "H",
+    "data_waznosci": "i",
+    "cena": "d",
+    "data_dodania": "q",
+    "zuzyty": "B",
+    "id_paragonu": "I",
+    "data_zuzycia": "q",
+    "kategorie": "I",
+    "przesuniecia": "I",
+}
+
+
+def czy_migawka_binarna(surowe: bytes) -> bool:
+    """
+    Sprawdza, czy dane są migawką w formacie binarnym.
+    
+    Args:
+        surowe: Zawartość pliku migawki
+    
+    Returns:
+        bool: True jeśli dane zaczynają się nagłówkiem formatu binarnego
+    """
+    return surowe[:len(MAGIA)] == MAGIA
+
+
+def _na_dni(wartosc: str) -> int:
+    return datetime.fromisoformat(wartosc).date().toordinal() - _EPOKA_DNI
+
+
+def _na_mikrosekundy(wartosc: Optional[str]) -> int:
+    if not wartosc:
+        return BRAK_DATY
+    return (datetime.fromisoformat(wartosc) - _EPOKA) // _MIKROSEKUNDA
+
+
+def _z_mikrosekund(wartosc: int) -> Optional[datetime]:
+    if wartosc == BRAK_DATY:
+        return None
+    return _EPOKA + timedelta(microseconds=wartosc)
+
+
+def _little_endian(tablica: array) -> array:
+    if sys.byteorder == "big":
+        tablica.byteswap()
+    return tablica
+
+
+def zakoduj_migawke(dane: List[Dict[str, Any]]) -> bytes:
+    """
+    Koduje listę słowników produktów (Produkt.to_dict) do formatu binarnego.
+    
+    Data ważności jest zapisywana z dokładnością do dnia.
+    
+    Args:
+        dane: Lista słowników produktów
+    
+    Returns:
+        bytes: Zawartość pliku migawki
+    """
+    napisy: Dict[str, int] = {}
+    kategorie: Dict[str, int] = {}
+    
+    def napis(wartosc: Optional[str]) -> int:
+        if wartosc is None:
+            return BRAK_NAPISU
+        return napisy.setdefault(wartosc, len(napisy))
+    
+    def kategoria(wartosc: str) -> int:
+        return kategorie.setdefault(wartosc, len(kategorie))
+    
+    kolumny = {nazwa: array(typ) for nazwa, typ in _TYPY_KOLUMN.items()}
+    for rekord in dane:
+        kolumny["id"].append(napis(rekord["id"]))
+        kolumny["nazwa"].append(napis(rekord["nazwa"]))
+        kolumny["kategoria"].append(kategoria(rekord["kategoria"]))
+        kolumny["data_waznosci"].append(_na_dni(rekord["data_waznosci"]))
+        kolumny["cena"].append(math.nan if rekord.get("cena") is None else float(rekord["cena"]))
+        kolumny["data_dodania"].append(_na_mikrosekundy(rekord["data_dodania"]))
+        kolumny["zuzyty"].append(1 if rekord.get("zuzyty") else 0)
+        kolumny["id_paragonu"].append(napis(rekord.get("id_paragonu")))
+        kolumny["data_zuzycia"].append(_na_mikrosekundy(rekord.get("data_zuzycia")))
+    
+    kolumny["kategorie"].extend(napis(k) for k in kategorie)
+    blok_napisow = bytearray()
+    for wartosc in napisy:
+        kolumny["przesuniecia"].append(len(blok_napisow))
+        blok_napisow += wartosc.encode("utf-8")
+    kolumny["przesuniecia"].append(len(blok_napisow))
+    
+    czesci = [(nazwa, _little_endian(tablica).tobytes()) for nazwa, tablica in kolumny.items()]
+    czesci.append(("napisy", bytes(blok_napisow)))
+    
+    przesuniecie = _NAGLOWEK.size + _OPIS_KOLUMNY.size * len(czesci)
+    spis = bytearray()
+    for nazwa, surowe in czesci:
+        spis += _OPIS_KOLUMNY.pack(nazwa.encode("ascii"), przesuniecie, len(surowe))
+        przesuniecie += len(surowe)
+    
+    naglowek = _NAGLOWEK.pack(MAGIA, WERSJA, len(dane), len(czesci))
+    return naglowek + bytes(spis) + b"".join(surowe for _, surowe in czesci)
+
+
+class MigawkaBinarna:
+    """
+    Leniwy odczyt migawki w formacie binarnym.
+    
+    Przy otwarciu czytany jest tylko nagłówek i spis kolumn. Kolumny
+    i napisy są dekodowane przy pierwszym użyciu i zapamiętywane.
+    """
+    
+    def __init__(self, surowe: bytes):
+        """
+        Otwiera migawkę binarną.
+        
+        Args:
+            surowe: Zawartość pliku migawki
+        
+        Raises:
+            ValueError: Jeśli dane nie są migawką w obsługiwanej wersji
+        """
+        magia, wersja, liczba, liczba_kolumn = _NAGLOWEK.unpack_from(surowe)
+        if magia != MAGIA or wersja != WERSJA:
+            raise ValueError("Nieobsługiwany format migawki binarnej")
+        self._dane = memoryview(surowe)
+        self._liczba = liczba
+        self._spis: Dict[str, tuple] = {}
+        for i in range(liczba_kolumn):
+            nazwa, przesuniecie, dlugosc = _OPIS_KOLUMNY.unpack_from(
+                surowe, _NAGLOWEK.size + i * _OPIS_KOLUMNY.size)
+            self._spis[nazwa.rstrip(b"\0").decode("ascii")] = (przesuniecie, dlugosc)
+        self._kolumny: Dict[str, array] = {}
+        self._napisy: Dict[int, str] = {}
+        self._kategorie: Optional[List[str]] = None
+    
+    def __len__(self) -> int:
+        return self._liczba
+    
+    def kolumna(self, nazwa: str) -> array:
+        """
+        Zwraca zdekodowaną kolumnę o podanej nazwie.
+        
+        Args:
+            nazwa: Nazwa kolumny (np. "data_waznosci")
+        
+        Returns:
+            array: Wartości kolumny dla kolejnych produktów
+        """
+        if nazwa not in self._kolumny:
+            przesuniecie, dlugosc = self._spis[nazwa]
+            tablica = array(_TYPY_KOLUMN[nazwa])
+            tablica.frombytes(self._dane[przesuniecie:przesuniecie + dlugosc])
+            self._kolumny[nazwa] = _little_endian(tablica)
+        return self._kolumny[nazwa]
+    
+    def napis(self, numer: int) -> Optional[str]:
+        """
+        Zwraca napis z tablicy napisów.
+        
+        Args:
+            numer: Numer napisu (BRAK_NAPISU oznacza brak wartości)
+        
+        Returns:
+            Optional[str]: Napis lub None
+        """
+        if numer == BRAK_NAPISU:
+            return None
+        if numer not in self._napisy:
+            przesuniecia = self.kolumna("przesuniecia")
+            poczatek_bloku = self._spis["napisy"][0]
+            surowe = self._dane[poczatek_bloku + przesuniecia[numer]:poczatek_bloku + przesuniecia[numer + 1]]
+            self._napisy[numer] = bytes(surowe).decode("utf-8")
+        return self._napisy[numer]
+    
+    def kategorie(self) -> List[str]:
+        """
+        Zwraca tablicę kategorii indeksowaną kodem kategorii.
+        
+        Returns:
+            List[str]: Nazwy kategorii
+        """
+        if self._kategorie is None:
+            self._kategorie = [self.napis(n) for n in self.kolumna("kategorie")]
+        return self._kategorie
+    
+    def produkt(self, i: int) -> Produkt:
+        """
+        Dekoduje produkt o podanej pozycji.
+        
+        Args:
+            i: Pozycja produktu w migawce
+        
+        Returns:
+            Produkt: Zdekodowany produkt
+        """
+        return Produkt(
+            id=self.napis(self.kolumna("id")[i]),
+            nazwa=self.napis(self.kolumna("nazwa")[i]),
+            kategoria=self.kategorie()[self.kolumna("kategoria")[i]],
+            data_waznosci=datetime.fromordinal(self.kolumna("data_waznosci")[i] + _EPOKA_DNI),
+            cena=None if math.isnan(self.kolumna("cena")[i]) else self.kolumna("cena")[i],
+            data_dodania=_z_mikrosekund(self.kolumna("data_dodania")[i]),
+            zuzyty=bool(self.kolumna("zuzyty")[i]),
+            id_paragonu=self.napis(self.kolumna("id_paragonu")[i]),
+            data_zuzycia=_z_mikrosekund(self.kolumna("data_zuzycia")[i])
+        )
+    
+    def produkty(self, pozycje: Optional[List[int]] = None) -> List[Produkt]:
+        """
+        Dekoduje produkty z podanych pozycji (domyślnie wszystkie).
+        
+        Args:
+            pozycje: Opcjonalna lista pozycji produktów
+        
+        Returns:
+            List[Produkt]: Lista zdekodowanych produktów
+        """
+        if pozycje is None:
+            pozycje = range(self._liczba)
+        return [self.produkt(i) for i in pozycje]
+    
+    def tabela(self) -> ProduktTable:
+        """
+        Buduje tabelę kolumnową bez tworzenia obiektów Produkt.
+        
+        Returns:
+            ProduktTable: Tabela produktów z migawki
+        """
+        return ProduktTable.z_kolumn(
+            [self.napis(n) for n in self.kolumna("id")],
+            [self.napis(n) for n in self.kolumna("nazwa")],
+            self.kategorie(),
+            self.kolumna("kategoria"),
+            self.kolumna("data_waznosci"),
+            self.kolumna("cena"),
+            self.kolumna("zuzyty")
+        )
+    
+    def slowniki(self) -> List[Dict[str, Any]]:
+        """
+        Zwraca produkty jako słowniki w formacie Produkt.to_dict.
+        
+        Returns:
+            List[Dict[str, Any]]: Lista słowników produktów
+        """
+        return [p.to_dict() for p in self.produkty()]
+    
+    def pozycje_wygasajacych(self, do_dnia: date) -> List[int]:
+        """
+        Wyszukuje niezużyte produkty z datą ważności nie późniejszą niż podany dzień.
+        
+        Args:
+            do_dnia: Ostatni dzień (włącznie)
+        
+        Returns:
+            List[int]: Pozycje produktów posortowane według daty ważności
+        """
+        granica = do_dnia.toordinal() - _EPOKA_DNI
+        waznosci = self.kolumna("data_waznosci")
+        zuzyte = self.kolumna("zuzyty")
+        pozycje = [i for i in range(self._liczba) if not zuzyte[i] and waznosci[i] <= granica]
+        return sorted(pozycje, key=waznosci.__getitem__)
+    
+    def policz_kategorie(self) -> Dict[str, int]:
+        """
+        Zlicza niezużyte produkty w poszczególnych kategoriach.
+        
+        Returns:
+            Dict[str, int]: Liczba produktów dla każdej kategorii
+        """
+        liczniki: Dict[int, int] = {}
+        zuzyte = self.kolumna("zuzyty")
+        for i, kod in enumerate(self.kolumna("kategoria")):
+            if not zuzyte[i]:
+                liczniki[kod] = liczniki.get(kod, 0) + 1
+        kategorie = self.kategorie()
+        return {kategorie[kod]: liczba for kod, liczba in liczniki.items()}
+    
+    def wartosc_aktywnych(self) -> float:
+        """
+        Sumuje ceny niezużytych produktów (zaokrąglone do groszy, jak w ProduktTable).
+        
+        Returns:
+            float: Łączna wartość aktywnych produktów
+        """
+        zuzyte = self.kolumna("zuzyty")
+        return sum(round(cena * 100) for i, cena in enumerate(self.kolumna("cena"))
+                   if not zuzyte[i] and not math.isnan(cena)) / 100
@@ -20,10 +20,47 @@ DEFAULT_CONFIG = {
         "max_tokens": 1024,
         "temperatura": 0.1,
         "auto_categorize": True,
-        "auto_expiry_date": True
+        "auto_expiry_date": True,
+        "keep_alive": "30m"
     },
     "ocr": {
-        "gpu": False
+        "gpu": False,
+        "rozgrzewaj_w_tle": True,
+        "liczba_procesow": 1,
+        "watki_na_proces": 1,
+        "pamiec_podreczna_mb": 200,
+        "dpi_pdf": 300,
+        "wykrywanie_paragonu": True,
+        "wysokosc_znakow_px": 24,
+        "obrazy_na_wsad": 4,
+        "rozmiar_wsadu": 16,
+        "kaskada": {
+            "wlaczona": False,
+            "skala_szybka": 0.5,
+            "plotno_szybkie": 1280,
+            "prog_pewnosci": 0.6,
+            "maks_udzial_niepewnych": 0.4
+        }
+    },
+    "parsowanie": {
+        "reguly": True,
+        "tolerancja_sumy": 0.02
+    },
+    "potok": {
+        "rozmiar_kolejki": 2,
+        "watki_ai": 1,
+        "watki_zapisu": 1
+    },
+    "duplikaty": {
+        "wykrywaj": True,
+        "maks_roznica_bitow": 24,
+        "tolerancja_proporcji": 0.15
+    },
+    "demon": {
+        "inotify": True,
+        "interwal_skanowania_s": 2.0,
+        "czas_stabilizacji_s": 1.0,
+        "maks_opoznienie_s": 10.0
     },
     "paths": {
         "paragony_nowe": "paragony/nowe/",
@@ -32,7 +69,10 @@ DEFAULT_CONFIG = {
         "dane_json_folder": "data/",
         "produkty_json_file": "data/produkty.json",
         "config_json_file": "data/config.json",
-        "archiwum_json": "data/archive/"
+        "archiwum_json": "data/archive/",
+        "ocr_cache": "data/ocr_cache/",
+        "paragony_duplikaty": "paragony/duplikaty/",
+        "indeks_paragonow": "data/odciski_paragonow.jsonl"
     },
     "interface": {
         "language": "pl",
@@ -42,9 +82,38 @@ DEFAULT_CONFIG = {
     "notifications": {
         "expiry_warning_days_critical": 3,
         "expiry_warning_days_warning": 7
+    },
+    "storage": {
+        "tryb": "dziennik",
+        "kompaktuj_po_wpisach": 1000,
+        "format_migawki": "json",
+        "archiwizacja": {
+            "wlaczona": True,
+            "przeterminowane_po_dniach": 30
+        }
     }
 }
 
+def _uzupelnij_domyslne(konfiguracja: Dict[str, Any], domyslna: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Uzupełnia brakujące klucze konfiguracji wartościami domyślnymi.
+    
+    Pozwala starszym plikom config.json działać z nowymi sekcjami konfiguracji.
+    
+    Args:
+        konfiguracja: Wczytana konfiguracja
+        domyslna: Konfiguracja domyślna
+        
+    Returns:
+        Dict[str, Any]: Uzupełniona konfiguracja
+    """
+    for klucz, wartosc in domyslna.items():
+        if klucz not in konfiguracja:
+            konfiguracja[klucz] = json.loads(json.dumps(wartosc))
+        elif isinstance(wartosc, dict) and isinstance(konfiguracja[klucz], dict):
+            _uzupelnij_domyslne(konfiguracja[klucz], wartosc)
+    return konfiguracja
+
 def wczytaj_konfiguracje() -> Dict[str, Any]:
     """
     Wczytuje konfigurację z pliku JSON lub tworzy domyślną.
@@ -57,7 +126,7 @@ def wczytaj_konfiguracje() -> Dict[str, Any]:
     if os.path.exists(config_path):
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                return _uzupelnij_domyslne(json.load(f), DEFAULT_CONFIG)
         except Exception as e:
             print(f"Błąd podczas wczytywania konfiguracji: {e}")
             print("Używam domyślnej konfiguracji.")
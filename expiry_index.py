@@ -0,0 +1,308 @@
+import json
+import os
+from bisect import bisect_right, insort
+from datetime import date
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from models import Produkt, ProduktTable
+
+class IndeksWaznosci:
+    """
+    Indeks aktywnych produktów pogrupowanych w kubełki według dnia ważności.
+    
+    Posortowana lista dni i kubełki identyfikatorów pozwalają pobrać produkty
+    wygasające do danego dnia w czasie proporcjonalnym do liczby wyników
+    (plus wyszukiwanie binarne po dniach) oraz przeglądać wszystkie aktywne
+    produkty w kolejności dat ważności bez sortowania.
+    """
+    
+    def __init__(self):
+        """
+        Inicjalizuje pusty indeks.
+        """
+        self._dzien_produktu: Dict[str, int] = {}
+        # Słownik jako uporządkowany zbiór - zachowuje kolejność dodania w kubełku
+        self._kubelki: Dict[int, Dict[str, None]] = {}
+        self._dni: List[int] = []
+    
+    def __len__(self) -> int:
+        return len(self._dzien_produktu)
+    
+    def __eq__(self, inny: object) -> bool:
+        if not isinstance(inny, IndeksWaznosci):
+            return NotImplemented
+        return self._dzien_produktu == inny._dzien_produktu
+    
+    def dodaj_wpis(self, id_produktu: str, dzien: int) -> None:
+        """
+        Dodaje produkt do kubełka podanego dnia (przenosi go, jeśli już był w indeksie).
+        
+        Args:
+            id_produktu: Identyfikator produktu
+            dzien: Dzień ważności jako liczba dni od 1970-01-01
+        """
+        self.usun(id_produktu)
+        if dzien not in self._kubelki:
+            self._kubelki[dzien] = {}
+            insort(self._dni, dzien)
+        self._kubelki[dzien][id_produktu] = None
+        self._dzien_produktu[id_produktu] = dzien
+    
+    def dodaj(self, produkt: Produkt) -> None:
+        """
+        Dodaje produkt do indeksu (produkty zużyte są pomijane).
+        
+        Args:
+            produkt: Dodawany produkt
+        """
+        if produkt.zuzyty:
+            self.usun(produkt.id)
+        else:
+            self.dodaj_wpis(produkt.id, ProduktTable.dzien(produkt.data_waznosci.date()))
+    
+    def usun(self, id_produktu: str) -> None:
+        """
+        Usuwa produkt z indeksu, jeśli w nim jest.
+        
+        Args:
+            id_produktu: Identyfikator produktu
+        """
+        dzien = self._dzien_produktu.pop(id_produktu, None)
+        if dzien is None:
+            return
+        kubelek = self._kubelki[dzien]
+        del kubelek[id_produktu]
+        if not kubelek:
+            del self._kubelki[dzien]
+            self._dni.pop(bisect_right(self._dni, dzien) - 1)
+    
+    def do_dnia(self, do_dnia: date) -> List[str]:
+        """
+        Zwraca identyfikatory produktów ważnych najdłużej do podanego dnia.
+        
+        Args:
+            do_dnia: Ostatni dzień (włącznie)
+        
+        Returns:
+            List[str]: Identyfikatory w kolejności dat ważności
+        """
+        koniec = bisect_right(self._dni, ProduktTable.dzien(do_dnia))
+        return [id_produktu for dzien in self._dni[:koniec] for id_produktu in self._kubelki[dzien]]
+    
+    def iteruj(self) -> Iterator[str]:
+        """
+        Przegląda identyfikatory wszystkich produktów w kolejności dat ważności.
+        
+        Yields:
+            str: Identyfikatory produktów
+        """
+        for dzien in self._dni:
+            yield from self._kubelki[dzien]
+    
+    @classmethod
+    def z_tabeli(cls, tabela: ProduktTable) -> 'IndeksWaznosci':
+        """
+        Buduje indeks od zera na podstawie tabeli produktów.
+        
+        Args:
+            tabela: Tabela wszystkich produktów
+        
+        Returns:
+            IndeksWaznosci: Nowy indeks
+        """
+        indeks = cls()
+        for i in tabela.pozycje_aktywnych():
+            indeks.dodaj_wpis(tabela.id[i], tabela.data_waznosci[i])
+        return indeks
+    
+    def to_dict(self) -> Dict[str, List[str]]:
+        """
+        Konwertuje indeks do słownika dzień (ISO) → identyfikatory.
+        
+        Returns:
+            Dict[str, List[str]]: Kubełki indeksu
+        """
+        return {ProduktTable.data_z_dnia(dzien).isoformat(): list(self._kubelki[dzien])
+                for dzien in self._dni}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[str]]) -> 'IndeksWaznosci':
+        """
+        Tworzy indeks ze słownika zapisanego przez to_dict.
+        
+        Args:
+            data: Kubełki indeksu
+        
+        Returns:
+            IndeksWaznosci: Odtworzony indeks
+        """
+        indeks = cls()
+        for iso, id_produktow in data.items():
+            for id_produktu in id_produktow:
+                indeks.dodaj_wpis(id_produktu, ProduktTable.dzien(date.fromisoformat(iso)))
+        return indeks
+
+
+BLOK_ODCZYTU = 4096
+
+
+class PlikIndeksuWaznosci:
+    """
+    Trwały zapis indeksu ważności: pełny stan i dopisywane po nim zmiany.
+    
+    Pierwsza linia pliku zawiera cały indeks, kolejne - zmiany wprowadzone
+    przez kolejne zapisy. Każda linia zawiera sygnaturę danych po zmianie,
+    a linie zmian - także swój numer; pełny stan kończy pusta zmiana o
+    numerze 0, więc ostatnia linia jest zawsze krótka.
+    Indeks jest ważny tylko wtedy, gdy sygnatura ostatniej linii odpowiada
+    bieżącym danym; w przeciwnym razie należy go zbudować od nowa.
+    """
+    
+    def __init__(self, sciezka: str, kompaktuj_po_wpisach: int = 1000):
+        """
+        Inicjalizuje plik indeksu.
+        
+        Args:
+            sciezka: Ścieżka do pliku indeksu
+            kompaktuj_po_wpisach: Liczba dopisanych zmian wyzwalająca zapis pełnego stanu
+        """
+        self.sciezka = sciezka
+        self.kompaktuj_po_wpisach = kompaktuj_po_wpisach
+        self._wpisy = 0
+    
+    @staticmethod
+    def _sygnatura_json(sygnatura: Any) -> Any:
+        # JSON zamienia krotki na listy - porównuj w tej samej postaci
+        return json.loads(json.dumps(sygnatura))
+    
+    def wczytaj(self, sygnatura: Any) -> Optional[IndeksWaznosci]:
+        """
+        Wczytuje indeks, jeśli odpowiada danym o podanej sygnaturze.
+        
+        Args:
+            sygnatura: Bieżąca trwała sygnatura danych backendu
+        
+        Returns:
+            Optional[IndeksWaznosci]: Indeks lub None, jeśli go nie ma albo jest nieaktualny
+        """
+        try:
+            with open(self.sciezka, 'r', encoding='utf-8') as f:
+                linie = f.read().splitlines()
+            stan = json.loads(linie[0])
+            indeks = IndeksWaznosci.from_dict(stan['indeks'])
+            ostatnia_sygnatura = stan['sygnatura']
+            self._wpisy = 0
+            for linia in linie[1:]:
+                try:
+                    wpis = json.loads(linia)
+                except ValueError:
+                    # Niedokończony zapis - sygnatura nie będzie się zgadzać
+                    break
+                for id_produktu in wpis['usun']:
+                    indeks.usun(id_produktu)
+                for id_produktu, dzien in wpis['dodaj']:
+                    indeks.dodaj_wpis(id_produktu, dzien)
+                ostatnia_sygnatura = wpis['sygnatura']
+                self._wpisy = wpis.get('numer', self._wpisy + 1)
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return None
+        if ostatnia_sygnatura != self._sygnatura_json(sygnatura):
+            return None
+        return indeks
+    
+    def ostatni_wpis(self) -> Optional[Tuple[Any, int]]:
+        """
+        Odczytuje sygnaturę i numer ostatniej linii bez wczytywania indeksu.
+        
+        Czytany jest tylko koniec pliku, więc czas nie zależy od liczby
+        produktów - wystarcza to do dopisania zmiany bez wczytywania indeksu.
+        
+        Returns:
+            Optional[Tuple[Any, int]]: Sygnatura danych i liczba dopisanych zmian
+                lub None, jeśli pliku nie ma albo ostatnia linia jest uszkodzona
+        """
+        try:
+            with open(self.sciezka, 'rb') as f:
+                koniec = f.seek(0, os.SEEK_END)
+                poczatek, ogon, blok = koniec, b"", BLOK_ODCZYTU
+                # Cofaj się, aż w odczycie znajdzie się początek ostatniej linii
+                while poczatek > 0 and b"\n" not in ogon.rstrip(b"\n"):
+                    poczatek = max(0, poczatek - blok)
+                    f.seek(poczatek)
+                    ogon = f.read(koniec - poczatek)
+                    blok *= 2
+            if not ogon.endswith(b"\n"):
+                return None  # niedokończony zapis
+            wpis = json.loads(ogon.rstrip(b"\n").rsplit(b"\n", 1)[-1].decode('utf-8'))
+            return wpis['sygnatura'], wpis['numer']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def uniewaznij(self) -> None:
+        """
+        Usuwa plik indeksu - zostanie zbudowany od nowa przy następnym użyciu.
+        """
+        try:
+            os.remove(self.sciezka)
+        except FileNotFoundError:
+            pass
+        self._wpisy = 0
+    
+    def dopisz_bez_indeksu(self, dodane: List[Tuple[str, int]], usuniete: List[str],
+                           sygnatura_przed: Any, sygnatura: Any) -> None:
+        """
+        Dopisuje zmianę, gdy indeks nie jest wczytany do pamięci.
+        
+        Zmiana jest dopisywana tylko do pliku odpowiadającego danym sprzed
+        zapisu (sprawdzana jest jedynie ostatnia linia). Plik nieaktualny lub
+        wymagający zapisu pełnego stanu jest usuwany.
+        
+        Args:
+            dodane: Pary (identyfikator, dzień ważności) dodanych produktów
+            usuniete: Identyfikatory usuniętych produktów
+            sygnatura_przed: Trwała sygnatura danych sprzed zmiany
+            sygnatura: Trwała sygnatura danych po zmianie
+        """
+        ostatni = self.ostatni_wpis()
+        if ostatni is None or ostatni[0] != self._sygnatura_json(sygnatura_przed):
+            self.uniewaznij()
+            return
+        self._wpisy = ostatni[1]
+        self.dopisz(None, dodane, usuniete, sygnatura)
+    
+    def zapisz(self, indeks: IndeksWaznosci, sygnatura: Any) -> None:
+        """
+        Zapisuje pełny stan indeksu, zastępując dotychczasowy plik.
+        
+        Args:
+            indeks: Indeks do zapisania
+            sygnatura: Trwała sygnatura danych, których dotyczy
+        """
+        sciezka_tymczasowa = self.sciezka + ".tmp"
+        with open(sciezka_tymczasowa, 'w', encoding='utf-8') as f:
+            json.dump({'sygnatura': sygnatura, 'indeks': indeks.to_dict()}, f, ensure_ascii=False)
+            f.write("\n" + json.dumps({'dodaj': [], 'usun': [], 'sygnatura': sygnatura, 'numer': 0}) + "\n")
+        os.replace(sciezka_tymczasowa, self.sciezka)
+        self._wpisy = 0
+    
+    def dopisz(self, indeks: Optional[IndeksWaznosci], dodane: List[Tuple[str, int]],
+               usuniete: List[str], sygnatura: Any) -> None:
+        """
+        Dopisuje zmianę indeksu; po wielu zmianach zapisuje pełny stan.
+        
+        Args:
+            indeks: Indeks po zmianie (None - indeks nie jest wczytany; zamiast
+                zapisu pełnego stanu plik jest wtedy usuwany)
+            dodane: Pary (identyfikator, dzień ważności) dodanych produktów
+            usuniete: Identyfikatory usuniętych produktów
+            sygnatura: Trwała sygnatura danych po zmianie
+        """
+        if self._wpisy + 1 >= self.kompaktuj_po_wpisach or not os.path.exists(self.sciezka):
+            if indeks is None:
+                self.uniewaznij()
+            else:
+                self.zapisz(indeks, sygnatura)
+            return
+        with open(self.sciezka, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'dodaj': dodane, 'usun': usuniete, 'sygnatura': sygnatura,
+                                'numer': self._wpisy + 1}, ensure_ascii=False) + "\n")
+        self._wpisy += 1
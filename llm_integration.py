@@ -1,6 +1,6 @@
-import requests
 import json
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from config import KONFIGURACJA
 
@@ -11,17 +11,51 @@ class OllamaClient:
     def __init__(self, model: Optional[str] = None, base_url: Optional[str] = None):
         self.model = model or OLLAMA_MODEL
         self.base_url = base_url or OLLAMA_URL
+        self._watki = threading.local()
+
+    @property
+    def sesja(self):
+        # Jedna sesja HTTP na wątek - kolejne zapytania używają tego samego połączenia (keep-alive),
+        # a wątki AI potoku paragonów nie współdzielą sesji (requests.Session nie jest bezpieczna wątkowo)
+        sesja = getattr(self._watki, 'sesja', None)
+        if sesja is None:
+            import requests
+            sesja = self._watki.sesja = requests.Session()
+        return sesja
+
+    def rozgrzej(self) -> bool:
+        """
+        Wczytuje model w Ollama bez generowania odpowiedzi, aby pierwszy paragon nie czekał na model.
+        
+        Returns:
+            bool: True jeśli model jest gotowy, False w przeciwnym razie
+        """
+        import requests
+        try:
+            response = self.sesja.post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model, "keep_alive": KONFIGURACJA["llm"].get("keep_alive", "30m")},
+                timeout=KONFIGURACJA["llm"].get("timeout_seconds", 60)
+            )
+            return response.status_code == 200
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Nie udało się wczytać modelu LLM: {e}")
+            return False
 
     def zapytaj_llm(self, prompt: str, system_prompt: str = "", max_tokens: int = 1024, temperatura: float = 0.1) -> str:
         # Łączy system prompt i user prompt zgodnie z template Bielika
         full_prompt = f"""<s><|start_header_id|>system<|end_header_id|>\n{system_prompt}<|eot_id|><|start_header_id|>user<|end_header_id|>\n{prompt}<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n"""
+        # requests ładuje się przy pierwszym zapytaniu, a nie przy starcie aplikacji
+        import requests
         try:
-            response = requests.post(
+            response = self.sesja.post(
                 f"{self.base_url}/api/generate",
                 json={
                     "model": self.model,
                     "prompt": full_prompt,
                     "stream": False,
+                    # Model pozostaje w pamięci Ollama między paragonami
+                    "keep_alive": KONFIGURACJA["llm"].get("keep_alive", "30m"),
                     "options": {
                         "temperature": temperatura,
                         "num_predict": max_tokens
@@ -39,6 +73,27 @@ class OllamaClient:
             return f"Błąd połączenia z LLM Ollama: {e}"
 
 
+_klienci: Dict[Tuple[Optional[str], Optional[str]], OllamaClient] = {}
+_blokada_klientow = threading.Lock()
+
+
+def klient_llm(konfiguracja: Dict[str, Any]) -> OllamaClient:
+    """
+    Zwraca współdzielonego klienta Ollama dla modelu i adresu z konfiguracji.
+    
+    Args:
+        konfiguracja: Konfiguracja LLM (model, base_url)
+    
+    Returns:
+        OllamaClient: Klient wspólny dla kolejnych zapytań (z osobną sesją HTTP w każdym wątku)
+    """
+    klucz = (konfiguracja.get('model'), konfiguracja.get('base_url'))
+    with _blokada_klientow:
+        if klucz not in _klienci:
+            _klienci[klucz] = OllamaClient(model=klucz[0], base_url=klucz[1])
+        return _klienci[klucz]
+
+
 def parsuj_paragon_ai(tekst: str, konfiguracja: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
     system_prompt = """Jesteś asystentem do analizy paragonów. Twoim zadaniem jest wyodrębnienie produktów z tekstu paragonu.
     Zwróć TYLKO listę produktów w formacie JSON, bez żadnych dodatkowych wyjaśnień czy komentarzy.
@@ -65,7 +120,7 @@ def parsuj_paragon_ai(tekst: str, konfiguracja: Dict[str, Any]) -> Optional[List
     Tekst paragonu:
     {tekst}"""
 
-    llm = OllamaClient(model=konfiguracja.get('model'), base_url=konfiguracja.get('base_url'))
+    llm = klient_llm(konfiguracja)
     odpowiedz = llm.zapytaj_llm(prompt, system_prompt, max_tokens=konfiguracja.get('max_tokens', 1024), temperatura=konfiguracja.get('temperatura', 0.1))
     
     try:
@@ -97,7 +152,7 @@ def parsuj_paragon_ai(tekst: str, konfiguracja: Dict[str, Any]) -> Optional[List
 def sugeruj_kategorie(nazwa_produktu: str, konfiguracja_llm: Dict[str, Any]) -> str:
     system_prompt = "Jesteś ekspertem w kategoryzacji produktów spożywczych i artykułów gospodarstwa domowego. Twoim zadaniem jest przypisanie produktu do jednej z predefiniowanych kategorii."
     prompt = f"""Przypisz poniższy produkt do jednej z następujących kategorii:\n{nazwa_produktu}\n\nDostępne kategorie:\nnabiał, mięso, warzywa, owoce, pieczywo, przyprawy, napoje, słodycze, inne\n\nZwróć tylko nazwę kategorii, bez żadnych dodatkowych wyjaśnień."""
-    llm = OllamaClient(model=konfiguracja_llm.get('model'), base_url=konfiguracja_llm.get('base_url'))
+    llm = klient_llm(konfiguracja_llm)
     odpowiedz = llm.zapytaj_llm(prompt, system_prompt, max_tokens=50, temperatura=0.1)
     if odpowiedz and not odpowiedz.startswith("Błąd"):
         return odpowiedz.strip().split("\n")[0]
@@ -106,7 +161,7 @@ def sugeruj_kategorie(nazwa_produktu: str, konfiguracja_llm: Dict[str, Any]) ->
 def sugeruj_date_waznosci(nazwa_produktu: str, kategoria: str, konfiguracja_llm: Dict[str, Any]) -> datetime:
     system_prompt = "Jesteś ekspertem w zakresie przechowywania żywności i artykułów gospodarstwa domowego. Twoim zadaniem jest oszacowanie typowego okresu przydatności do spożycia dla produktów."
     prompt = f"""Oszacuj typowy okres przydatności do spożycia dla poniższego produktu:\nNazwa: {nazwa_produktu}\nKategoria: {kategoria}\n\nZwróć tylko liczbę dni przydatności do spożycia, bez żadnych dodatkowych wyjaśnień."""
-    llm = OllamaClient(model=konfiguracja_llm.get('model'), base_url=konfiguracja_llm.get('base_url'))
+    llm = klient_llm(konfiguracja_llm)
     odpowiedz = llm.zapytaj_llm(prompt, system_prompt, max_tokens=50, temperatura=0.1)
     try:
         if odpowiedz and not odpowiedz.startswith("Błąd"):
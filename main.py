@@ -1,16 +1,16 @@
-from typing import List, Dict, Any
+import time
+_CZAS_STARTU = time.perf_counter()
+
+from typing import List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import os
-import glob
-import json
-import shutil
-import cv2
-import numpy as np
-from pdf2image import convert_from_path
+import argparse
 
 from models import Produkt
-from config import KONFIGURACJA
+from config import KONFIGURACJA, zapisz_konfiguracje
 from storage_manager import StorageManager
+from storage_backends import migruj_json_do_sqlite
+from pantry_stats import oblicz_statystyki_z_agregatow
 from product_management import ProductManager
 from ocr_processor import ParagonProcessor
 from llm_integration import OllamaClient
@@ -25,21 +25,48 @@ class AsystentZakupow:
         """
         Inicjalizuje główne komponenty aplikacji.
         """
+        self.czasy_uruchomienia: List[Tuple[str, float]] = [("importy", time.perf_counter() - _CZAS_STARTU)]
+        
+        start = time.perf_counter()
         self.storage_manager = StorageManager()
         self.product_manager = ProductManager(self.storage_manager)
-        self.paragon_processor = ParagonProcessor()
+        # Czytnik OCR powstaje dopiero przy pierwszym paragonie (lub w tle po starcie)
+        self.paragon_processor = ParagonProcessor(self.storage_manager)
         self.llm_client = OllamaClient()
         self.ui = UIDisplay()
+        self.czasy_uruchomienia.append(("inicjalizacja komponentów", time.perf_counter() - start))
     
-    def uruchom(self) -> None:
+    def uruchom(self, pokaz_czasy: bool = False) -> None:
         """
         Uruchamia główną pętlę aplikacji.
+        
+        Args:
+            pokaz_czasy: Czy wyświetlić raport czasów uruchomienia po pierwszym menu
         """
+        # Przenieś zużyte i dawno przeterminowane produkty do archiwum
+        start = time.perf_counter()
+        przeniesione = self.storage_manager.archiwizuj()
+        if przeniesione:
+            print(f"📦 Przeniesiono do archiwum: {przeniesione} produktów")
+        self.czasy_uruchomienia.append(("archiwizacja", time.perf_counter() - start))
+        
         # Sprawdź produkty wygasające przy starcie
+        start = time.perf_counter()
         self._sprawdz_wygasajace_produkty()
+        self.czasy_uruchomienia.append(("sprawdzenie terminów", time.perf_counter() - start))
         
+        self.czasy_uruchomienia.append(("do pierwszego menu (łącznie)", time.perf_counter() - _CZAS_STARTU))
+        if pokaz_czasy:
+            self._pokaz_czasy_uruchomienia()
+        
+        pierwsze_menu = True
         while True:
             self.ui.wyswietl_menu()
+            if pierwsze_menu:
+                pierwsze_menu = False
+                # Modele OCR ładują się, gdy użytkownik wybiera opcję z menu
+                if KONFIGURACJA["ocr"]["rozgrzewaj_w_tle"]:
+                    self.paragon_processor.rozgrzej_w_tle()
             wybor = self.ui.pobierz_wybor_menu()
             
             if wybor == "1":
@@ -59,27 +86,41 @@ class AsystentZakupow:
             elif wybor == "8":
                 self.ui.wyswietl_komunikat("🚧 Funkcja w trakcie rozwoju!", "ostrzezenie")
             elif wybor == "9":
+                if pokaz_czasy:
+                    self._pokaz_czasy_uruchomienia()
                 self.ui.wyswietl_komunikat("👋 Do widzenia!", "sukces")
                 break
     
+    def _pokaz_czasy_uruchomienia(self) -> None:
+        """
+        Wyświetla czasy poszczególnych etapów uruchomienia i stan czytnika OCR.
+        """
+        print("\n⏱️  CZASY URUCHOMIENIA:")
+        for etap, czas in self.czasy_uruchomienia:
+            print(f"   • {etap}: {czas * 1000:.0f} ms")
+        czas_ocr = self.paragon_processor.czas_inicjalizacji_ocr
+        if czas_ocr is not None:
+            print(f"   • inicjalizacja OCR: {czas_ocr * 1000:.0f} ms")
+        else:
+            print("   • inicjalizacja OCR: jeszcze nie wykonana")
+    
     def _sprawdz_wygasajace_produkty(self) -> None:
         """
         Sprawdza produkty wygasające dzisiaj i jutro przy starcie aplikacji.
         """
-        produkty = self.storage_manager.wczytaj_produkty()
-        niezuzyty = [p for p in produkty if not p.zuzyty]
-        
         dzisiaj = datetime.now().date()
-        jutro = dzisiaj + timedelta(days=1)
+        
+        # Agregaty odpowiadają bez wczytywania spiżarni, gdy nic nie wygasa
+        if not self.storage_manager.agregaty().liczba_do_dnia(dzisiaj + timedelta(days=1)):
+            return
         
         wygasaja_dzisiaj = []
         wygasaja_jutro = []
         
-        for produkt in niezuzyty:
-            data_produktu = produkt.data_waznosci.date()
-            if data_produktu <= dzisiaj:
+        for produkt in self.storage_manager.wczytaj_wygasajace(1):
+            if produkt.data_waznosci.date() <= dzisiaj:
                 wygasaja_dzisiaj.append(produkt)
-            elif data_produktu == jutro:
+            else:
                 wygasaja_jutro.append(produkt)
         
         if wygasaja_dzisiaj or wygasaja_jutro:
@@ -113,108 +154,9 @@ class AsystentZakupow:
         Obsługuje przetwarzanie paragonów z obrazów.
         """
         print("\n🔄 Rozpoczynam przetwarzanie paragonów...")
-        
-        # Znajdź wszystkie pliki obrazów w folderze paragony/nowe
-        pliki = []
-        for rozszerzenie in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.pdf']:
-            pliki.extend(glob.glob(f"paragony/nowe/*{rozszerzenie}"))
-        
-        if not pliki:
-            print("❌ Nie znaleziono żadnych paragonów do przetworzenia!")
-            return
-        
-        print(f"📸 Znaleziono {len(pliki)} paragonów do przetworzenia\n")
-        
-        przetworzone = 0
-        bledy = 0
-        
-        for i, plik in enumerate(pliki, 1):
-            print(f"\n🔍 Przetwarzam: {os.path.basename(plik)} ({i}/{len(pliki)})")
-            
-            try:
-                # Konwertuj PDF do obrazu jeśli to PDF
-                if plik.lower().endswith('.pdf'):
-                    print("📄 Konwertuję PDF do obrazu...")
-                    try:
-                        # Konwertuj PDF do obrazu
-                        obrazy = convert_from_path(plik)
-                        if not obrazy:
-                            print(f"❌ Nie udało się przekonwertować PDF '{plik}'")
-                            bledy += 1
-                            continue
-                        
-                        # Zapisz pierwszy obraz tymczasowo
-                        temp_image = "temp_image.png"
-                        obrazy[0].save(temp_image, "PNG")
-                        
-                        # Wczytaj obraz przez OpenCV
-                        obraz = cv2.imread(temp_image)
-                        
-                        # Usuń tymczasowy plik
-                        os.remove(temp_image)
-                        
-                        if obraz is None:
-                            print(f"❌ Nie udało się wczytać przekonwertowanego obrazu")
-                            bledy += 1
-                            continue
-                        
-                    except Exception as e:
-                        print(f"❌ Błąd podczas konwersji PDF '{plik}': {str(e)}")
-                        bledy += 1
-                        continue
-                else:
-                    obraz = cv2.imread(plik)
-                    if obraz is None:
-                        print(f"❌ Nie udało się odczytać obrazu '{plik}'")
-                        bledy += 1
-                        continue
-                
-                # Rozpoznaj tekst
-                print("🔍 Rozpoznaję tekst...")
-                tekst = self.paragon_processor.rozpoznaj_tekst(obraz)
-                if not tekst:
-                    print("❌ Nie udało się rozpoznać tekstu!")
-                    bledy += 1
-                    continue
-                
-                print("✅ Tekst rozpoznany, parsowanie przez AI...")
-                # Parsuj tekst przez AI
-                produkty = self.paragon_processor.parsuj_paragon_ai(tekst, KONFIGURACJA["llm"])
-                if not produkty:
-                    print("❌ AI nie znalazło produktów")
-                    bledy += 1
-                    continue
-                
-                # Zapisz przetworzone produkty
-                nazwa_pliku = os.path.splitext(os.path.basename(plik))[0]
-                sciezka_wyjsciowa = f"paragony/przetworzone/{nazwa_pliku}.json"
-                
-                # Upewnij się, że folder istnieje
-                os.makedirs("paragony/przetworzone", exist_ok=True)
-                
-                with open(sciezka_wyjsciowa, 'w', encoding='utf-8') as f:
-                    json.dump(produkty, f, ensure_ascii=False, indent=2)
-                
-                print(f"✅ Zapisano {len(produkty)} produktów do {sciezka_wyjsciowa}")
-                przetworzone += 1
-                
-                # Przenieś przetworzony plik do archiwum
-                archiwum = f"paragony/archiwum/{os.path.basename(plik)}"
-                os.makedirs("paragony/archiwum", exist_ok=True)
-                shutil.move(plik, archiwum)
-                print(f"📦 Przeniesiono do archiwum: {archiwum}")
-                
-            except Exception as e:
-                print(f"❌ Błąd podczas przetwarzania '{plik}': {str(e)}")
-                bledy += 1
-                continue
-        
-        print("\n📊 PODSUMOWANIE:")
-        print(f"✅ Przetworzono: {przetworzone}")
-        print(f"❌ Błędy: {bledy}")
-        
+        _, bledy = self.paragon_processor.przetworz_wszystkie_paragony()
         if bledy > 0:
-            print(f"\n⚠️ ⚠️ Wystąpiło {bledy} błędów podczas przetwarzania!")
+            print(f"\n⚠️ Wystąpiło {bledy} błędów podczas przetwarzania!")
     
     def _importuj_paragony(self) -> None:
         """
@@ -229,12 +171,10 @@ class AsystentZakupow:
         """
         Obsługuje przeglądanie zawartości spiżarni.
         """
-        produkty = self.storage_manager.wczytaj_produkty()
-        produkty_aktywne = [p for p in produkty if not p.zuzyty]
+        # Aktywne produkty posortowane według daty ważności
+        produkty_aktywne = self.storage_manager.wczytaj_aktywne_produkty()
         
         if produkty_aktywne:
-            # Sortuj według daty ważności
-            produkty_aktywne.sort(key=lambda x: x.data_waznosci)
             self.ui.wyswietl_produkty(produkty_aktywne)
         else:
             self.ui.wyswietl_komunikat("📦 Spiżarnia jest pusta!", "info")
@@ -255,16 +195,14 @@ class AsystentZakupow:
             self.ui.wyswietl_komunikat("⚠️ LLM jest wyłączone. Włącz go w konfiguracji aby używać sugestii przepisów.", "ostrzezenie")
             return
         
-        produkty = self.storage_manager.wczytaj_produkty()
-        produkty_aktywne = [p for p in produkty if not p.zuzyty]
+        produkty_aktywne = self.storage_manager.wczytaj_aktywne_produkty()
         
         if not produkty_aktywne:
             self.ui.wyswietl_komunikat("❌ Brak produktów do sugestii przepisów!", "ostrzezenie")
             return
         
         # Produkty bliskie terminu (priorytet)
-        bliskie_terminu = [p for p in produkty_aktywne 
-                          if (p.data_waznosci - datetime.now()).days <= 3]
+        bliskie_terminu = self.storage_manager.wczytaj_wygasajace(3)
         
         # Wybierz max 8 produktów dla lepszej wydajności LLM
         skladniki = [p.nazwa for p in produkty_aktywne[:8]]
@@ -348,58 +286,73 @@ Koncentrujesz się na wykorzystaniu składników, które mogą się zepsuć oraz
         """
         Wyświetla statystyki spiżarni.
         """
-        produkty = self.storage_manager.wczytaj_produkty()
-        produkty_aktywne = [p for p in produkty if not p.zuzyty]
-        
-        if not produkty_aktywne:
-            self.ui.wyswietl_komunikat("📦 Spiżarnia jest pusta!", "info")
-            return
-        
-        # Statystyki podstawowe
-        liczba_produktow = len(produkty_aktywne)
-        wartosc_calkowita = sum(p.cena for p in produkty_aktywne if p.cena)
-        
-        # Statystyki kategorii
-        kategorie = {}
-        for p in produkty_aktywne:
-            kategorie[p.kategoria] = kategorie.get(p.kategoria, 0) + 1
-        
-        # Produkty wygasające
-        dzisiaj = datetime.now().date()
-        wygasaja_wkrotce = [p for p in produkty_aktywne 
-                           if (p.data_waznosci.date() - dzisiaj).days <= 3]
-        
-        print("\n" + "=" * 50)
-        print("📊 STATYSTYKI SPIŻARNI")
-        print("=" * 50)
-        
-        print(f"\n📦 Liczba produktów: {liczba_produktow}")
-        if wartosc_calkowita > 0:
-            print(f"💰 Wartość całkowita: {wartosc_calkowita:.2f} zł")
-        
-        print("\n📑 Produkty według kategorii:")
-        for kat, liczba in sorted(kategorie.items()):
-            print(f"   • {kat}: {liczba}")
-        
-        if wygasaja_wkrotce:
-            print("\n⚠️ Produkty wygasające w ciągu 3 dni:")
-            for p in wygasaja_wkrotce:
-                dni_do_wygasniecia = (p.data_waznosci.date() - dzisiaj).days
-                print(f"   • {p.nazwa} ({p.kategoria}) - {dni_do_wygasniecia} dni")
-        
-        print("=" * 50)
+        statystyki = oblicz_statystyki_z_agregatow(self.storage_manager.agregaty())
+        wygasajace = None
+        if statystyki.liczba_produktow:
+            wygasajace = self.storage_manager.wczytaj_wygasajace(
+                KONFIGURACJA["notifications"]["expiry_warning_days_critical"])
+        self.ui.wyswietl_statystyki(statystyki, wygasajace)
+
+def _migruj_do_sqlite() -> None:
+    """
+    Przenosi produkty z pliku JSON do bazy SQLite i przełącza tryb przechowywania.
+    """
+    sciezka_json = KONFIGURACJA["paths"]["produkty_json_file"]
+    sciezka_bazy = os.path.splitext(sciezka_json)[0] + ".db"
+    try:
+        liczba = migruj_json_do_sqlite(sciezka_json, sciezka_bazy)
+    except Exception as e:
+        print(f"❌ Błąd podczas migracji do SQLite: {e}")
+        return
+    
+    KONFIGURACJA["storage"]["tryb"] = "sqlite"
+    zapisz_konfiguracje(KONFIGURACJA)
+    print(f"✅ Przeniesiono {liczba} produktów do {sciezka_bazy}")
+    print("🔄 Tryb przechowywania ustawiony na 'sqlite'")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Asystent Zakupów i Spiżarni v2")
+    parser.add_argument("--migruj-do-sqlite", action="store_true",
+                        help="przenieś produkty z produkty.json do bazy SQLite i zakończ")
+    parser.add_argument("--weryfikuj-agregaty", action="store_true",
+                        help="sprawdź zapisane statystyki z danymi, popraw je w razie rozbieżności i zakończ")
+    parser.add_argument("--eksportuj-json", metavar="PLIK",
+                        help="zapisz wszystkie produkty do pliku JSON i zakończ")
+    parser.add_argument("--czasy-uruchomienia", action="store_true",
+                        help="wyświetl czasy etapów uruchomienia (również przy wyjściu)")
+    parser.add_argument("--demon", action="store_true",
+                        help="obserwuj folder nowych paragonów i przetwarzaj je na bieżąco (bez menu)")
+    argumenty = parser.parse_args()
+    
     # Upewnij się, że wszystkie wymagane katalogi istnieją
     for sciezka in [
         KONFIGURACJA["paths"]["paragony_nowe"],
         KONFIGURACJA["paths"]["paragony_przetworzone"],
         KONFIGURACJA["paths"]["paragony_bledy"],
+        KONFIGURACJA["paths"]["paragony_duplikaty"],
         KONFIGURACJA["paths"]["dane_json_folder"],
         KONFIGURACJA["paths"]["archiwum_json"]
     ]:
         os.makedirs(sciezka, exist_ok=True)
     
+    if argumenty.migruj_do_sqlite:
+        _migruj_do_sqlite()
+        raise SystemExit(0)
+    if argumenty.weryfikuj_agregaty:
+        if StorageManager().weryfikuj_agregaty():
+            print("✅ Agregaty są zgodne z danymi")
+        else:
+            print("🔧 Agregaty były rozbieżne z danymi - przeliczono je od nowa")
+        raise SystemExit(0)
+    if argumenty.eksportuj_json:
+        if StorageManager().eksportuj_json(argumenty.eksportuj_json):
+            print(f"✅ Wyeksportowano produkty do {argumenty.eksportuj_json}")
+        raise SystemExit(0)
+    if argumenty.demon:
+        from receipt_watcher import ObserwatorParagonow
+        ObserwatorParagonow(ParagonProcessor(StorageManager())).uruchom()
+        raise SystemExit(0)
+    
     # Uruchom aplikację
     app = AsystentZakupow()
-    app.uruchom() 
\ No newline at end of file
+    app.uruchom(pokaz_czasy=argumenty.czasy_uruchomienia) 
\ No newline at end of file
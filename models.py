@@ -1,5 +1,7 @@
-from datetime import datetime
-from typing import Optional
+import uuid
+from array import array
+from datetime import date, datetime
+from typing import Optional, List, Dict, Iterable
 
 class Produkt:
     """
@@ -13,8 +15,14 @@ class Produkt:
         data_dodania (datetime): Data dodania produktu do spiżarni
         zuzyty (bool): Status wskazujący, czy produkt został zużyty
         id_paragonu (str, opcjonalnie): Identyfikator paragonu, z którego pochodzi produkt
+        id (str): Stały, unikalny identyfikator produktu
+        data_zuzycia (datetime, opcjonalnie): Data oznaczenia produktu jako zużytego
     """
     
+    # Bez __dict__ na każdy obiekt - duże spiżarnie zajmują mniej pamięci
+    __slots__ = ('nazwa', 'kategoria', 'data_waznosci', 'cena', 'data_dodania',
+                 'zuzyty', 'id_paragonu', 'id', 'data_zuzycia')
+    
     def __init__(self, 
                  nazwa: str,
                  kategoria: str,
@@ -22,7 +30,9 @@ class Produkt:
                  cena: Optional[float] = None,
                  data_dodania: Optional[datetime] = None,
                  zuzyty: bool = False,
-                 id_paragonu: Optional[str] = None):
+                 id_paragonu: Optional[str] = None,
+                 id: Optional[str] = None,
+                 data_zuzycia: Optional[datetime] = None):
         """
         Inicjalizuje nowy obiekt Produkt.
         
@@ -34,6 +44,8 @@ class Produkt:
             data_dodania: Data dodania produktu do spiżarni (opcjonalnie, domyślnie teraz)
             zuzyty: Status zużycia produktu (domyślnie False)
             id_paragonu: Identyfikator paragonu (opcjonalnie)
+            id: Identyfikator produktu (opcjonalnie, domyślnie nowy UUID)
+            data_zuzycia: Data zużycia produktu (opcjonalnie)
         """
         self.nazwa = nazwa
         self.kategoria = kategoria
@@ -42,6 +54,8 @@ class Produkt:
         self.data_dodania = data_dodania or datetime.now()
         self.zuzyty = zuzyty
         self.id_paragonu = id_paragonu
+        self.id = id or uuid.uuid4().hex
+        self.data_zuzycia = data_zuzycia
     
     def to_dict(self) -> dict:
         """
@@ -51,13 +65,15 @@ class Produkt:
             dict: Słownik reprezentujący produkt
         """
         return {
+            'id': self.id,
             'nazwa': self.nazwa,
             'kategoria': self.kategoria,
             'data_waznosci': self.data_waznosci.isoformat(),
             'cena': self.cena,
             'data_dodania': self.data_dodania.isoformat(),
             'zuzyty': self.zuzyty,
-            'id_paragonu': self.id_paragonu
+            'id_paragonu': self.id_paragonu,
+            'data_zuzycia': self.data_zuzycia.isoformat() if self.data_zuzycia else None
         }
     
     @classmethod
@@ -67,7 +83,7 @@ class Produkt:
         
         Args:
             data: Słownik zawierający dane produktu
-            
+        
         Returns:
             Produkt: Nowy obiekt Produkt
         """
@@ -78,7 +94,9 @@ class Produkt:
             cena=data.get('cena'),
             data_dodania=datetime.fromisoformat(data['data_dodania']),
             zuzyty=data.get('zuzyty', False),
-            id_paragonu=data.get('id_paragonu')
+            id_paragonu=data.get('id_paragonu'),
+            id=data.get('id'),
+            data_zuzycia=datetime.fromisoformat(data['data_zuzycia']) if data.get('data_zuzycia') else None
         )
     
     def __str__(self) -> str:
@@ -90,4 +108,226 @@ class Produkt:
         """
         return (f"{self.nazwa} ({self.kategoria}) - "
                 f"Wazność do: {self.data_waznosci.strftime('%Y-%m-%d')}"
-                f"{f' - Cena: {self.cena:.2f} zł' if self.cena else ''}") 
\ No newline at end of file
+                f"{f' - Cena: {self.cena:.2f} zł' if self.cena else ''}")
+
+
+_EPOKA_DNI = date(1970, 1, 1).toordinal()
+_numpy_modul = None
+
+
+def numpy_lub_none():
+    """
+    Zwraca moduł NumPy lub None, jeśli nie jest zainstalowany.
+    
+    Import jest wykonywany przy pierwszym użyciu, aby nie spowalniać
+    startu aplikacji.
+    """
+    global _numpy_modul
+    if _numpy_modul is None:
+        try:
+            import numpy
+            _numpy_modul = numpy
+        except ImportError:
+            _numpy_modul = False
+    return _numpy_modul or None
+
+
+class ProduktTable:
+    """
+    Kolumnowa reprezentacja spiżarni do szybkich zapytań i statystyk.
+    
+    Każda kolumna to zwarta tablica (array): data ważności jako liczba dni
+    od 1970-01-01 (int32), cena jako float32 (NaN gdy brak), kategoria jako
+    kod (uint16) z listy kategorii, status zużycia jako uint8. Nazwy i id są
+    trzymane jako listy napisów. Tabela jest migawką do odczytu - pozycje
+    odpowiadają kolejności produktów, z których ją zbudowano.
+    
+    Filtry korzystają z NumPy (bez kopiowania kolumn), a gdy NumPy nie jest
+    zainstalowany - z pętli po tablicach.
+    """
+    
+    __slots__ = ('id', 'nazwa', 'kategorie', 'kategoria', 'data_waznosci', 'cena',
+                 'zuzyty', '_kody_kategorii')
+    
+    def __init__(self):
+        """
+        Inicjalizuje pustą tabelę produktów.
+        """
+        self.id: List[str] = []
+        self.nazwa: List[str] = []
+        self.kategorie: List[str] = []
+        self.kategoria = array('H')
+        self.data_waznosci = array('i')
+        self.cena = array('f')
+        self.zuzyty = array('B')
+        self._kody_kategorii: Dict[str, int] = {}
+    
+    @classmethod
+    def z_produktow(cls, produkty: Iterable[Produkt]) -> 'ProduktTable':
+        """
+        Buduje tabelę z obiektów Produkt.
+        
+        Args:
+            produkty: Produkty w kolejności, którą mają mieć pozycje tabeli
+        
+        Returns:
+            ProduktTable: Nowa tabela produktów
+        """
+        tabela = cls()
+        for produkt in produkty:
+            tabela.dodaj(produkt.id, produkt.nazwa, produkt.kategoria,
+                         produkt.data_waznosci.toordinal() - _EPOKA_DNI, produkt.cena, produkt.zuzyty)
+        return tabela
+    
+    @classmethod
+    def z_kolumn(cls, id_produktow: List[str], nazwy: List[str], kategorie: List[str],
+                 kody_kategorii: array, dni_waznosci: array, ceny: array, zuzyte: array) -> 'ProduktTable':
+        """
+        Buduje tabelę z gotowych kolumn (np. odczytanych z migawki binarnej).
+        
+        Args:
+            id_produktow: Identyfikatory produktów
+            nazwy: Nazwy produktów
+            kategorie: Nazwy kategorii indeksowane kodem
+            kody_kategorii: Kody kategorii produktów
+            dni_waznosci: Daty ważności jako liczby dni od 1970-01-01
+            ceny: Ceny produktów (NaN gdy brak)
+            zuzyte: Statusy zużycia (0/1)
+            
+        Returns:
+            ProduktTable: Nowa tabela produktów
+        """
+        tabela = cls()
+        tabela.id = list(id_produktow)
+        tabela.nazwa = list(nazwy)
+        tabela.kategorie = list(kategorie)
+        tabela._kody_kategorii = {k: kod for kod, k in enumerate(tabela.kategorie)}
+        tabela.kategoria = array('H', kody_kategorii)
+        tabela.data_waznosci = array('i', dni_waznosci)
+        tabela.cena = array('f', ceny)
+        tabela.zuzyty = array('B', zuzyte)
+        return tabela
+    
+    def dodaj(self, id_produktu: str, nazwa: str, kategoria: str, dzien_waznosci: int,
+              cena: Optional[float], zuzyty: bool) -> None:
+        """
+        Dopisuje wiersz do tabeli.
+        
+        Args:
+            id_produktu: Identyfikator produktu
+            nazwa: Nazwa produktu
+            kategoria: Kategoria produktu
+            dzien_waznosci: Data ważności jako liczba dni od 1970-01-01
+            cena: Cena produktu (opcjonalnie)
+            zuzyty: Status zużycia produktu
+        """
+        if kategoria not in self._kody_kategorii:
+            self._kody_kategorii[kategoria] = len(self.kategorie)
+            self.kategorie.append(kategoria)
+        self.id.append(id_produktu)
+        self.nazwa.append(nazwa)
+        self.kategoria.append(self._kody_kategorii[kategoria])
+        self.data_waznosci.append(dzien_waznosci)
+        self.cena.append(float('nan') if cena is None else cena)
+        self.zuzyty.append(1 if zuzyty else 0)
+    
+    def __len__(self) -> int:
+        return len(self.id)
+    
+    @staticmethod
+    def dzien(dzien: date) -> int:
+        """
+        Zamienia datę na liczbę dni od 1970-01-01 (jednostkę kolumny data_waznosci).
+        
+        Args:
+            dzien: Data do zamiany
+        
+        Returns:
+            int: Liczba dni od 1970-01-01
+        """
+        return dzien.toordinal() - _EPOKA_DNI
+    
+    @staticmethod
+    def data_z_dnia(dzien: int) -> date:
+        """
+        Zamienia liczbę dni od 1970-01-01 z powrotem na datę.
+        
+        Args:
+            dzien: Liczba dni od 1970-01-01
+            
+        Returns:
+            date: Odpowiadająca data
+        """
+        return date.fromordinal(dzien + _EPOKA_DNI)
+    
+    def pozycje_aktywnych(self) -> List[int]:
+        """
+        Zwraca pozycje niezużytych produktów posortowane według daty ważności.
+        
+        Returns:
+            List[int]: Pozycje produktów w tabeli
+        """
+        return self.pozycje_wygasajacych(None)
+    
+    def pozycje_wygasajacych(self, do_dnia: Optional[date]) -> List[int]:
+        """
+        Zwraca pozycje niezużytych produktów ważnych najdłużej do podanego dnia.
+        
+        Args:
+            do_dnia: Ostatni dzień (włącznie) lub None, aby nie ograniczać daty
+        
+        Returns:
+            List[int]: Pozycje produktów posortowane według daty ważności
+        """
+        np = numpy_lub_none()
+        if np is not None and len(self):
+            waznosci = np.frombuffer(self.data_waznosci, dtype=np.int32)
+            maska = np.frombuffer(self.zuzyty, dtype=np.uint8) == 0
+            if do_dnia is not None:
+                maska &= waznosci <= self.dzien(do_dnia)
+            pozycje = np.flatnonzero(maska)
+            return pozycje[np.argsort(waznosci[pozycje], kind='stable')].tolist()
+        
+        granica = self.dzien(do_dnia) if do_dnia is not None else None
+        pozycje = [i for i, zuzyty in enumerate(self.zuzyty)
+                   if not zuzyty and (granica is None or self.data_waznosci[i] <= granica)]
+        return sorted(pozycje, key=self.data_waznosci.__getitem__)
+    
+    def policz_kategorie(self) -> Dict[str, int]:
+        """
+        Zlicza niezużyte produkty w poszczególnych kategoriach.
+        
+        Returns:
+            Dict[str, int]: Liczba produktów dla każdej kategorii
+        """
+        np = numpy_lub_none()
+        if np is not None and len(self):
+            kody = np.frombuffer(self.kategoria, dtype=np.uint16)
+            aktywne = np.frombuffer(self.zuzyty, dtype=np.uint8) == 0
+            liczby = np.bincount(kody[aktywne], minlength=len(self.kategorie))
+            return {self.kategorie[kod]: int(liczba) for kod, liczba in enumerate(liczby) if liczba}
+        
+        liczniki: Dict[int, int] = {}
+        for kod, zuzyty in zip(self.kategoria, self.zuzyty):
+            if not zuzyty:
+                liczniki[kod] = liczniki.get(kod, 0) + 1
+        return {self.kategorie[kod]: liczba for kod, liczba in sorted(liczniki.items())}
+    
+    def wartosc_aktywnych(self) -> float:
+        """
+        Sumuje ceny niezużytych produktów.
+        
+        Każda cena jest zaokrąglana do groszy przed sumowaniem, tak jak
+        w AgregatySpizarni, więc wynik nie zależy od liczby produktów.
+        
+        Returns:
+            float: Łączna wartość aktywnych produktów
+        """
+        np = numpy_lub_none()
+        if np is not None and len(self):
+            ceny = np.frombuffer(self.cena, dtype=np.float32).astype(np.float64)
+            ceny = ceny[(np.frombuffer(self.zuzyty, dtype=np.uint8) == 0) & ~np.isnan(ceny)]
+            return int(np.rint(ceny * 100).astype(np.int64).sum()) / 100
+        return sum(round(cena * 100) for cena, zuzyty in zip(self.cena, self.zuzyty)
+                   if not zuzyty and cena == cena) / 100
+
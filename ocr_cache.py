@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# Pojedynczy wynik readtext: narożniki ramki [[x, y], ...], tekst i pewność
+WynikOCR = Tuple[List[List[float]], str, float]
+
+
+def normalizuj_wyniki(wyniki: List[Any]) -> List[WynikOCR]:
+    """
+    Zamienia wyniki easyocr readtext (z typami numpy) na zwykłe typy Pythona.
+    
+    Args:
+        wyniki: Lista krotek (ramka, tekst, pewność) zwrócona przez readtext
+    
+    Returns:
+        List[WynikOCR]: Wyniki gotowe do zapisu w JSON
+    """
+    return [([[float(x), float(y)] for x, y in ramka], str(tekst), float(pewnosc))
+            for ramka, tekst, pewnosc in wyniki]
+
+
+class PamiecOCR:
+    """
+    Dyskowa pamięć podręczna wyników OCR adresowana zawartością obrazu.
+    
+    Kluczem jest skrót SHA-256 bajtów pliku i parametrów przygotowania
+    obrazu oraz OCR, więc ten sam paragon przeniesiony z powrotem do
+    folderu nowych (np. po błędzie AI) nie jest rozpoznawany ponownie,
+    a zmiana parametrów automatycznie unieważnia stare wyniki. Zapisywane
+    są surowe wyniki readtext (ramki, tekst, pewność), aby zmiana progu
+    pewności lub promptu nie wymagała ponownego OCR.
+    
+    Łączny rozmiar plików jest ograniczony; po przekroczeniu limitu usuwane
+    są najdawniej używane wpisy (czas modyfikacji pliku jest odświeżany
+    przy każdym trafieniu).
+    """
+    
+    def __init__(self, katalog: str, max_bajtow: int):
+        """
+        Inicjalizuje pamięć podręczną OCR.
+        
+        Args:
+            katalog: Katalog z plikami wyników
+            max_bajtow: Maksymalny łączny rozmiar plików wyników
+        """
+        self.katalog = katalog
+        self.max_bajtow = max_bajtow
+    
+    @staticmethod
+    def klucz(dane_obrazu: bytes, parametry: Dict[str, Any]) -> str:
+        """
+        Wylicza klucz wpisu dla zawartości obrazu i parametrów OCR.
+        
+        Args:
+            dane_obrazu: Bajty pliku obrazu
+            parametry: Parametry przygotowania obrazu i rozpoznawania
+        
+        Returns:
+            str: Skrót SHA-256 w postaci szesnastkowej
+        """
+        skrot = hashlib.sha256(dane_obrazu)
+        skrot.update(json.dumps(parametry, sort_keys=True).encode('utf-8'))
+        return skrot.hexdigest()
+    
+    def _sciezka(self, klucz: str) -> str:
+        return os.path.join(self.katalog, f"{klucz}.json")
+    
+    def pobierz(self, klucz: str) -> Optional[List[WynikOCR]]:
+        """
+        Zwraca zapisane wyniki OCR i oznacza wpis jako ostatnio użyty.
+        
+        Args:
+            klucz: Klucz wpisu
+        
+        Returns:
+            Optional[List[WynikOCR]]: Wyniki lub None, jeśli wpisu nie ma albo jest uszkodzony
+        """
+        sciezka = self._sciezka(klucz)
+        try:
+            with open(sciezka, 'r', encoding='utf-8') as f:
+                wyniki = [(ramka, tekst, pewnosc) for ramka, tekst, pewnosc in json.load(f)]
+            os.utime(sciezka)
+            return wyniki
+        except (OSError, ValueError, TypeError):
+            return None
+    
+    def zapisz(self, klucz: str, wyniki: List[WynikOCR]) -> None:
+        """
+        Zapisuje wyniki OCR i w razie potrzeby usuwa najdawniej używane wpisy.
+        
+        Args:
+            klucz: Klucz wpisu
+            wyniki: Znormalizowane wyniki readtext
+        """
+        os.makedirs(self.katalog, exist_ok=True)
+        sciezka = self._sciezka(klucz)
+        # Zapis przez plik tymczasowy - równoległe procesy OCR nie zobaczą połowy pliku
+        sciezka_tymczasowa = f"{sciezka}.{os.getpid()}.tmp"
+        with open(sciezka_tymczasowa, 'w', encoding='utf-8') as f:
+            json.dump(wyniki, f, ensure_ascii=False)
+        os.replace(sciezka_tymczasowa, sciezka)
+        self._przytnij()
+    
+    def _przytnij(self) -> None:
+        """
+        Usuwa najdawniej używane wpisy, dopóki łączny rozmiar przekracza limit.
+        """
+        wpisy = []
+        for wpis in os.scandir(self.katalog):
+            if wpis.name.endswith(".json"):
+                try:
+                    stat = wpis.stat()
+                except OSError:
+                    continue
+                wpisy.append((stat.st_mtime, stat.st_size, wpis.path))
+        rozmiar = sum(wielkosc for _, wielkosc, _ in wpisy)
+        for _, wielkosc, sciezka in sorted(wpisy):
+            if rozmiar <= self.max_bajtow:
+                break
+            try:
+                os.remove(sciezka)
+            except OSError:
+                continue
+            rozmiar -= wielkosc
@@ -1,229 +1,1504 @@
-import easyocr
-import cv2
-import numpy as np
 import os
 import shutil
 import json
 import glob
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List, Tuple
+from typing import Any, Optional, List, Tuple, Dict, Callable, Iterator, Union, TYPE_CHECKING
 from config import KONFIGURACJA
 from llm_integration import parsuj_paragon_ai
 from storage_manager import StorageManager
-import tempfile
-from pdf2image import convert_from_path
+from receipt_pipeline import PotokParagonow
+from ocr_cache import PamiecOCR, WynikOCR, normalizuj_wyniki
+from receipt_dedup import IndeksOdciskow, OdciskParagonu
+from receipt_parser import (parsuj_paragon_regulami, produkty_poprawne, suma_zgodna, tekst_pozycji,
+                            wiersze_z_wynikow)
+
+# cv2, numpy i pdf2image są importowane dopiero tam, gdzie przetwarzany jest obraz
+if TYPE_CHECKING:
+    import numpy as np
+
+ROZSZERZENIA_PARAGONOW = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff', '*.pdf', '*.PDF']
+
+JEZYKI_OCR = ['pl', 'en']
+
+# Obrazy rozpoznawane razem mogą różnić się wymiarami najwyżej o 15% (dopełnienie tłem)
+TOLERANCJA_ROZMIARU_WSADU = 0.15
+
+# Odcisk do wykrywania duplikatów nie potrzebuje pełnej rozdzielczości
+DPI_ODCISKU = 100
+
+# Poziomy, na których OCR może dać wynik (raportowane w StatystykiOCR)
+POZIOM_PAMIEC = "pamięć"
+POZIOM_SZYBKI = "szybki"
+POZIOM_FRAGMENTY = "szybki+fragmenty"
+POZIOM_PELNY = "pełny"
+
+# Sposoby wyodrębnienia produktów z paragonu (raportowane w statystykach parsowania)
+PARSOWANIE_REGULY = "reguły"
+PARSOWANIE_REGULY_AI = "reguły+AI"
+PARSOWANIE_AI = "AI"
+
+# Wynik przetworzenia paragonu (WynikParagonu.status)
+STATUS_PRZETWORZONY = "przetworzony"
+STATUS_DUPLIKAT = "duplikat"
+STATUS_BLAD = "błąd"
+
+
+def parametry_ocr() -> Dict[str, Any]:
+    """
+    Zwraca parametry wpływające na wynik OCR - zmiana któregokolwiek unieważnia pamięć podręczną.
+    
+    Returns:
+        Dict[str, Any]: Języki i opis przygotowania obrazu
+    """
+    parametry = {
+        'jezyki': JEZYKI_OCR,
+        'przygotowanie': 'szarosc+clahe(2.0,8x8)+wyostrzenie(1.0)+otsu',
+    }
+    if KONFIGURACJA["ocr"]["wykrywanie_paragonu"]:
+        parametry['geometria'] = f"kontur+prostowanie+znaki({KONFIGURACJA['ocr']['wysokosc_znakow_px']}px)"
+    if KONFIGURACJA["ocr"]["kaskada"]["wlaczona"]:
+        # Kaskada może zostawić wyniki szybkiego przebiegu - inne niż pełny OCR
+        parametry['kaskada'] = dict(KONFIGURACJA["ocr"]["kaskada"])
+    return parametry
+
+
+class StatystykiOCR:
+    """
+    Liczba obrazów i czas OCR według poziomu, który dał wynik.
+    
+    Pozwala dobrać ustawienia kaskady (ocr.kaskada): im więcej obrazów
+    kończy się na szybkim przebiegu, tym niższy średni koszt paragonu.
+    Czas szybkiego przebiegu wykonanego wsadem jest dzielony po równo
+    między obrazy wsadu.
+    
+    Atrybuty:
+        obrazy (Dict[str, int]): Liczba obrazów na poziom
+        czas (Dict[str, float]): Łączny czas OCR obrazów na poziom (w sekundach)
+    """
+    
+    def __init__(self):
+        self.obrazy: Dict[str, int] = {}
+        self.czas: Dict[str, float] = {}
+        self._blokada = threading.Lock()
+    
+    def dodaj(self, poziom: str, czas: float = 0.0, liczba: int = 1) -> None:
+        """
+        Dolicza obrazy rozpoznane na danym poziomie.
+        
+        Args:
+            poziom: Poziom, który dał wynik (POZIOM_*)
+            czas: Czas OCR tych obrazów w sekundach
+            liczba: Liczba obrazów
+        """
+        with self._blokada:
+            self.obrazy[poziom] = self.obrazy.get(poziom, 0) + liczba
+            self.czas[poziom] = self.czas.get(poziom, 0.0) + czas
+    
+    def polacz(self, obrazy: Dict[str, int], czas: Dict[str, float]) -> None:
+        """
+        Dolicza statystyki zebrane w innym procesie.
+        
+        Args:
+            obrazy: Liczba obrazów na poziom
+            czas: Łączny czas na poziom
+        """
+        for poziom, liczba in obrazy.items():
+            self.dodaj(poziom, czas.get(poziom, 0.0), liczba)
+    
+    def __str__(self) -> str:
+        return ", ".join(f"{poziom}: {liczba} ({self.czas.get(poziom, 0.0) / liczba:.2f} s/obraz)"
+                         for poziom, liczba in sorted(self.obrazy.items()))
+
+
+class StronaPdf:
+    """
+    Pojedyncza strona pliku PDF rasteryzowana dopiero w chwili rozpoznawania.
+    
+    Zadanie niesie tylko ścieżkę i numer strony, więc w pamięci jest
+    najwyżej tyle obrazów stron, ile jest jednocześnie rozpoznawanych,
+    a do procesów roboczych puli OCR nie są przesyłane całe obrazy.
+    PDF przekazany jako bajty (dane) jest rasteryzowany z pamięci.
+    
+    Atrybuty:
+        sciezka (str): Ścieżka do pliku PDF (dla PDF w pamięci - jego nazwa)
+        numer (int): Numer strony (od 1)
+        dpi (int): Rozdzielczość rasteryzacji
+        dane (Optional[bytes]): Zawartość PDF w pamięci; None - PDF jest czytany z pliku
+        skrot (Optional[str]): Skrót SHA-256 całego PDF (wspólny dla jego stron)
+    """
+    
+    __slots__ = ('sciezka', 'numer', 'dpi', 'dane', 'skrot')
+    
+    def __init__(self, sciezka: str, numer: int, dpi: int, dane: Optional[bytes] = None,
+                 skrot: Optional[str] = None):
+        self.sciezka = sciezka
+        self.numer = numer
+        self.dpi = dpi
+        self.dane = dane
+        self.skrot = skrot
+    
+    @classmethod
+    def dokument(cls, sciezka: str, liczba_stron: int, dpi: int,
+                 dane: Optional[bytes] = None) -> List['StronaPdf']:
+        """
+        Tworzy wszystkie strony PDF ze wspólnym skrótem dokumentu.
+        
+        Plik jest czytany i haszowany raz, a nie osobno dla klucza
+        pamięci podręcznej OCR każdej strony.
+        
+        Args:
+            sciezka: Ścieżka do pliku PDF (dla PDF w pamięci - jego nazwa)
+            liczba_stron: Liczba stron dokumentu
+            dpi: Rozdzielczość rasteryzacji
+            dane: Zawartość PDF w pamięci (opcjonalnie)
+        
+        Returns:
+            List[StronaPdf]: Strony od pierwszej do ostatniej
+        """
+        pierwsza = cls(sciezka, 1, dpi, dane)
+        skrot = pierwsza.skrot_dokumentu()
+        return [pierwsza] + [cls(sciezka, numer, dpi, dane, skrot) for numer in range(2, liczba_stron + 1)]
+    
+    def skrot_dokumentu(self) -> str:
+        """
+        Zwraca skrót SHA-256 całego PDF, licząc go przy pierwszym użyciu.
+        
+        Returns:
+            str: Skrót w postaci szesnastkowej
+        """
+        if self.skrot is None:
+            if self.dane is not None:
+                self.skrot = hashlib.sha256(self.dane).hexdigest()
+            else:
+                skrot = hashlib.sha256()
+                with open(self.sciezka, 'rb') as f:
+                    for blok in iter(lambda: f.read(1024 * 1024), b""):
+                        skrot.update(blok)
+                self.skrot = skrot.hexdigest()
+        return self.skrot
+    
+    def __str__(self) -> str:
+        return f"{self.sciezka} (strona {self.numer})"
+    
+    def rasteryzuj(self) -> 'np.ndarray':
+        """
+        Rasteryzuje stronę bezpośrednio do tablicy w skali szarości (bez pliku pośredniego).
+        
+        Returns:
+            np.ndarray: Obraz strony
+        """
+        import numpy as np
+        if self.dane is not None:
+            from pdf2image import convert_from_bytes
+            strony = convert_from_bytes(self.dane, dpi=self.dpi, first_page=self.numer,
+                                        last_page=self.numer, grayscale=True)
+        else:
+            from pdf2image import convert_from_path
+            strony = convert_from_path(self.sciezka, dpi=self.dpi, first_page=self.numer,
+                                       last_page=self.numer, grayscale=True)
+        return np.asarray(strony[0])
+
+
+# Źródło obrazu paragonu: ścieżka do pliku, zakodowany plik obrazu w pamięci (JPEG, PNG...),
+# strona PDF lub zdekodowany obraz (skala szarości albo BGR)
+ZrodloObrazu = Union[str, bytes, StronaPdf, 'np.ndarray']
+
+
+def opis_zrodla(zrodlo: ZrodloObrazu) -> str:
+    """
+    Zwraca krótki opis źródła obrazu do komunikatów (bez zawartości obrazu w pamięci).
+    
+    Args:
+        zrodlo: Źródło obrazu
+    
+    Returns:
+        str: Ścieżka, strona PDF lub rozmiar obrazu w pamięci
+    """
+    if isinstance(zrodlo, (str, StronaPdf)):
+        return str(zrodlo)
+    if isinstance(zrodlo, bytes):
+        return f"obraz w pamięci ({len(zrodlo)} B)"
+    return f"obraz w pamięci ({zrodlo.shape[1]}x{zrodlo.shape[0]})"
+
+
+def _dekoduj(dane: bytes, tryb: int) -> Optional['np.ndarray']:
+    import cv2
+    import numpy as np
+    return cv2.imdecode(np.frombuffer(dane, np.uint8), tryb)
+
+
+def wczytaj_obraz(zrodlo: ZrodloObrazu) -> Optional['np.ndarray']:
+    """
+    Zwraca obraz paragonu jako tablicę, wczytując plik lub rasteryzując stronę PDF.
+    
+    Args:
+        zrodlo: Ścieżka do pliku, strona PDF lub obraz w pamięci
+        
+    Returns:
+        Optional['np.ndarray']: Obraz lub None, jeśli pliku nie można wczytać
+    """
+    if isinstance(zrodlo, StronaPdf):
+        return zrodlo.rasteryzuj()
+    if isinstance(zrodlo, str):
+        import cv2
+        return cv2.imread(zrodlo)
+    if isinstance(zrodlo, bytes):
+        import cv2
+        return _dekoduj(zrodlo, cv2.IMREAD_COLOR)
+    return zrodlo
+
+
+def przygotuj_obraz(zrodlo: ZrodloObrazu, geometria: Optional[bool] = None) -> Optional['np.ndarray']:
+    """
+    Przygotowuje obraz paragonu do OCR.
+    
+    Args:
+        zrodlo: Ścieżka do pliku obrazu, strona PDF lub obraz w pamięci
+        geometria: Czy wyciąć, wyprostować i przeskalować paragon przed poprawą kontrastu
+            (domyślnie według ocr.wykrywanie_paragonu)
+        
+    Returns:
+        Optional['np.ndarray']: Przygotowany obraz lub None w przypadku błędu
+    """
+    try:
+        import cv2
+        img = wczytaj_obraz(zrodlo)
+        if img is None:
+            print(f"❌ Nie można wczytać obrazu: {opis_zrodla(zrodlo)}")
+            return None
+        
+        # Konwersja do skali szarości (strony PDF są rasteryzowane od razu w skali szarości)
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        
+        # Wycięcie paragonu z tła, wyprostowanie i skalowanie do wysokości znaków
+        if KONFIGURACJA["ocr"]["wykrywanie_paragonu"] if geometria is None else geometria:
+            from receipt_preprocessing import przygotuj_geometrie
+            gray = przygotuj_geometrie(gray, KONFIGURACJA["ocr"]["wysokosc_znakow_px"])
+        
+        # Poprawa kontrastu (CLAHE)
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        enhanced_contrast = clahe.apply(gray)
+        
+        # Rozmazanie gaussowskie + wyostrzenie
+        blurred = cv2.GaussianBlur(enhanced_contrast, (0,0), 1.0)
+        sharpened = cv2.addWeighted(enhanced_contrast, 1.5, blurred, -0.5, 0)
+        
+        # Binaryzacja Otsu
+        _, binary_img = cv2.threshold(sharpened, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        
+        return binary_img
+        
+    except Exception as e:
+        print(f"❌ Błąd podczas przygotowywania obrazu '{opis_zrodla(zrodlo)}': {e}")
+        return None
+
+
+def odcisk_zrodla(zrodlo: ZrodloObrazu) -> Optional[OdciskParagonu]:
+    """
+    Wylicza odcisk paragonu do wykrywania duplikatów z obrazu w niskiej rozdzielczości.
+    
+    Pliki JPEG są dekodowane od razu w skali szarości i pomniejszone
+    czterokrotnie, a strony PDF rasteryzowane z DPI_ODCISKU, więc odcisk
+    kosztuje ułamek pełnego wczytania obrazu.
+    
+    Args:
+        zrodlo: Ścieżka do pliku, strona PDF lub obraz w pamięci
+        
+    Returns:
+        Optional[OdciskParagonu]: Odcisk lub None, jeśli obrazu nie można wczytać
+    """
+    import cv2
+    from receipt_dedup import odcisk_obrazu
+    if isinstance(zrodlo, StronaPdf):
+        szary = StronaPdf(zrodlo.sciezka, zrodlo.numer, DPI_ODCISKU, zrodlo.dane).rasteryzuj()
+    elif isinstance(zrodlo, str):
+        szary = cv2.imread(zrodlo, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    elif isinstance(zrodlo, bytes):
+        szary = _dekoduj(zrodlo, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    else:
+        szary = cv2.cvtColor(zrodlo, cv2.COLOR_BGR2GRAY) if zrodlo.ndim == 3 else zrodlo
+    if szary is None:
+        return None
+    # Strona PDF to sam paragon - wycinanie z tła dotyczy tylko zdjęć
+    return odcisk_obrazu(szary, wykrywaj_paragon=not isinstance(zrodlo, StronaPdf))
+
+
+def _klucz_pamieci(zrodlo: ZrodloObrazu) -> str:
+    """
+    Wylicza klucz pamięci podręcznej OCR dla źródła obrazu.
+    
+    Strony PDF są identyfikowane skrótem pliku PDF (liczonym raz dla
+    dokumentu), numerem strony i rozdzielczością, więc trafienie nie
+    wymaga nawet rasteryzacji.
+    Plik obrazu przekazany jako bajty ma ten sam klucz co ten plik na dysku.
+    
+    Args:
+        zrodlo: Ścieżka do pliku, strona PDF lub obraz w pamięci
+        
+    Returns:
+        str: Klucz wpisu
+    """
+    if isinstance(zrodlo, StronaPdf):
+        return PamiecOCR.klucz(zrodlo.skrot_dokumentu().encode('ascii'),
+                               dict(parametry_ocr(), strona_pdf=zrodlo.numer, dpi=zrodlo.dpi))
+    if isinstance(zrodlo, str):
+        with open(zrodlo, 'rb') as f:
+            return PamiecOCR.klucz(f.read(), parametry_ocr())
+    if isinstance(zrodlo, bytes):
+        return PamiecOCR.klucz(zrodlo, parametry_ocr())
+    return PamiecOCR.klucz(zrodlo.tobytes(), dict(parametry_ocr(), ksztalt=list(zrodlo.shape),
+                                                   typ=str(zrodlo.dtype)))
+
+
+def grupuj_wedlug_rozmiaru(rozmiary: List[Tuple[int, int]], maks_grupa: int,
+                           tolerancja: float = TOLERANCJA_ROZMIARU_WSADU) -> List[List[int]]:
+    """
+    Dzieli obrazy na grupy o podobnym rozmiarze do wspólnego rozpoznawania.
+    
+    Obrazy w grupie są dopełniane do rozmiaru największego z nich, więc
+    wymiary w grupie mogą różnić się najwyżej o podaną tolerancję - inaczej
+    czytnik przetwarzałby głównie puste tło.
+    
+    Args:
+        rozmiary: Wysokość i szerokość każdego obrazu
+        maks_grupa: Maksymalna liczba obrazów w grupie
+        tolerancja: Dopuszczalna względna różnica wysokości i szerokości w grupie
+    
+    Returns:
+        List[List[int]]: Indeksy obrazów w kolejnych grupach
+    """
+    grupy: List[List[int]] = []
+    szerokosci: List[Tuple[int, int]] = []  # najmniejsza i największa szerokość w grupie
+    for indeks in sorted(range(len(rozmiary)), key=lambda i: tuple(rozmiary[i])):
+        wysokosc, szerokosc = rozmiary[indeks]
+        for numer, grupa in enumerate(grupy):
+            min_szer, maks_szer = min(szerokosci[numer][0], szerokosc), max(szerokosci[numer][1], szerokosc)
+            # Obrazy są posortowane według wysokości - pierwszy w grupie jest najniższy
+            if (len(grupa) < maks_grupa
+                    and wysokosc <= rozmiary[grupa[0]][0] * (1 + tolerancja)
+                    and maks_szer <= min_szer * (1 + tolerancja)):
+                grupa.append(indeks)
+                szerokosci[numer] = (min_szer, maks_szer)
+                break
+        else:
+            grupy.append([indeks])
+            szerokosci.append((szerokosc, szerokosc))
+    return grupy
+
+
+def _dopelnij(obraz: 'np.ndarray', wysokosc: int, szerokosc: int) -> 'np.ndarray':
+    """
+    Dopełnia obraz białym tłem z prawej i z dołu - współrzędne ramek tekstu się nie zmieniają.
+    """
+    import numpy as np
+    dopelniony = np.full((wysokosc, szerokosc) + obraz.shape[2:], 255, dtype=obraz.dtype)
+    dopelniony[:obraz.shape[0], :obraz.shape[1]] = obraz
+    return dopelniony
+
+
+def rozpoznaj_obrazy_wsadowo(czytnik: Any, obrazy: List['np.ndarray'], obrazy_na_wsad: int,
+                             rozmiar_wsadu: int, **opcje: Any) -> List[Optional[List[WynikOCR]]]:
+    """
+    Rozpoznaje przygotowane obrazy wsadowym API EasyOCR (readtext_batched).
+    
+    readtext_batched wymaga obrazów jednakowego rozmiaru, dlatego obrazy są
+    grupowane według podobnego rozmiaru i dopełniane w grupie do wspólnego.
+    Dzięki temu wykrywanie tekstu przetwarza kilka stron naraz, a
+    rozpoznawanie wycinków tekstu - po rozmiar_wsadu w jednym przebiegu sieci.
+    
+    Args:
+        czytnik: Czytnik easyocr.Reader
+        obrazy: Przygotowane obrazy (wynik przygotuj_obraz)
+        obrazy_na_wsad: Maksymalna liczba obrazów w jednym wywołaniu czytnika
+        rozmiar_wsadu: Liczba wycinków tekstu rozpoznawanych w jednym przebiegu (batch_size)
+        **opcje: Dodatkowe parametry readtext (np. canvas_size)
+    
+    Returns:
+        List[Optional[List[WynikOCR]]]: Wyniki dla każdego obrazu w kolejności wejściowej
+            (None dla obrazów z grupy, której nie udało się rozpoznać)
+    """
+    if len(obrazy) == 1 or obrazy_na_wsad <= 1:
+        grupy = [[indeks] for indeks in range(len(obrazy))]
+    else:
+        grupy = grupuj_wedlug_rozmiaru([obraz.shape[:2] for obraz in obrazy], obrazy_na_wsad)
+    
+    wyniki: List[Optional[List[WynikOCR]]] = [None] * len(obrazy)
+    for grupa in grupy:
+        try:
+            if len(grupa) == 1:
+                surowe = [czytnik.readtext(obrazy[grupa[0]], batch_size=rozmiar_wsadu, **opcje)]
+            else:
+                wysokosc = max(obrazy[i].shape[0] for i in grupa)
+                szerokosc = max(obrazy[i].shape[1] for i in grupa)
+                surowe = czytnik.readtext_batched([_dopelnij(obrazy[i], wysokosc, szerokosc) for i in grupa],
+                                                  batch_size=rozmiar_wsadu, **opcje)
+            for indeks, wynik in zip(grupa, surowe):
+                wyniki[indeks] = normalizuj_wyniki(wynik)
+        except Exception as e:
+            print(f"❌ Błąd OCR wsadu {len(grupa)} obrazów: {e}")
+    return wyniki
+
+
+def _pomniejsz_obraz(obraz: 'np.ndarray', skala: float) -> 'np.ndarray':
+    import cv2
+    return cv2.resize(obraz, None, fx=skala, fy=skala, interpolation=cv2.INTER_AREA)
+
+
+def _przeskaluj_wyniki(wyniki: List[WynikOCR], skala: float) -> List[WynikOCR]:
+    return [([[x * skala, y * skala] for x, y in ramka], tekst, pewnosc) for ramka, tekst, pewnosc in wyniki]
+
+
+def _rozpoznaj_fragmenty(czytnik: Any, obraz: 'np.ndarray', ramki: List[List[List[float]]],
+                         rozmiar_wsadu: int) -> List[Optional[WynikOCR]]:
+    """
+    Rozpoznaje ponownie tylko wskazane fragmenty obrazu - bez wykrywania tekstu.
+    
+    Args:
+        czytnik: Czytnik easyocr.Reader
+        obraz: Obraz w pełnej rozdzielczości (skala szarości)
+        ramki: Ramki fragmentów we współrzędnych obrazu
+        rozmiar_wsadu: Liczba fragmentów rozpoznawanych w jednym przebiegu
+    
+    Returns:
+        List[Optional[WynikOCR]]: Wynik dla każdej ramki (None, jeśli czytnik go nie zwrócił)
+    """
+    wysokosc, szerokosc = obraz.shape[:2]
+    prostokaty = []
+    for ramka in ramki:
+        xs = [x for x, _ in ramka]
+        ys = [y for _, y in ramka]
+        # Margines: szybki przebieg mógł uciąć ogonki i krańce znaków
+        margines = 0.15 * (max(ys) - min(ys)) + 2
+        prostokaty.append([int(max(0, min(xs) - margines)), int(min(szerokosc, max(xs) + margines)),
+                           int(max(0, min(ys) - margines)), int(min(wysokosc, max(ys) + margines))])
+    surowe = normalizuj_wyniki(czytnik.recognize(obraz, horizontal_list=prostokaty, free_list=[],
+                                                 batch_size=rozmiar_wsadu))
+    
+    # recognize porządkuje fragmenty po swojemu - dopasowanie po lewym górnym narożniku
+    wyniki: List[Optional[WynikOCR]] = [None] * len(ramki)
+    for wynik in surowe:
+        x, y = wynik[0][0]
+        najblizszy = min(range(len(prostokaty)),
+                         key=lambda k: abs(prostokaty[k][0] - x) + abs(prostokaty[k][2] - y))
+        if wyniki[najblizszy] is None:
+            wyniki[najblizszy] = wynik
+    return wyniki
+
+
+def rozpoznaj_kaskadowo(czytnik: Any, obrazy: List['np.ndarray'], obrazy_na_wsad: int, rozmiar_wsadu: int,
+                        statystyki: Optional[StatystykiOCR] = None) -> List[Optional[List[WynikOCR]]]:
+    """
+    Rozpoznaje obrazy kaskadą: szybki przebieg, a pełny tylko tam, gdzie pewność jest za niska.
+    
+    1. Wszystkie obrazy są rozpoznawane pomniejszone (ocr.kaskada.skala_szybka)
+       i z mniejszym płótnem wykrywania (ocr.kaskada.plotno_szybkie).
+    2. Linie z pewnością poniżej ocr.kaskada.prog_pewnosci są rozpoznawane
+       ponownie w pełnej rozdzielczości - tylko ich fragmenty, bez wykrywania.
+    3. Gdy niepewnych linii jest więcej niż ocr.kaskada.maks_udzial_niepewnych
+       (albo szybki przebieg nic nie znalazł), cały obraz przechodzi pełny OCR.
+    
+    Args:
+        czytnik: Czytnik easyocr.Reader
+        obrazy: Przygotowane obrazy w pełnej rozdzielczości
+        obrazy_na_wsad: Maksymalna liczba obrazów w jednym wywołaniu czytnika
+        rozmiar_wsadu: Liczba wycinków tekstu rozpoznawanych w jednym przebiegu
+        statystyki: Statystyki, do których doliczany jest poziom i czas każdego obrazu
+    
+    Returns:
+        List[Optional[List[WynikOCR]]]: Wyniki we współrzędnych pełnego obrazu
+            (None dla obrazów, których nie udało się rozpoznać)
+    """
+    ustawienia = KONFIGURACJA["ocr"]["kaskada"]
+    skala = ustawienia["skala_szybka"]
+    prog = ustawienia["prog_pewnosci"]
+    
+    start = time.perf_counter()
+    szybkie = rozpoznaj_obrazy_wsadowo(czytnik, [_pomniejsz_obraz(obraz, skala) for obraz in obrazy],
+                                       obrazy_na_wsad, rozmiar_wsadu, canvas_size=ustawienia["plotno_szybkie"])
+    czas_szybki = (time.perf_counter() - start) / len(obrazy)
+    
+    wyniki: List[Optional[List[WynikOCR]]] = []
+    for obraz, szybki in zip(obrazy, szybkie):
+        start = time.perf_counter()
+        wynik = None if szybki is None else _przeskaluj_wyniki(szybki, 1 / skala)
+        niepewne = [] if wynik is None else [i for i, (_, _, pewnosc) in enumerate(wynik) if pewnosc < prog]
+        try:
+            if not wynik or len(niepewne) > ustawienia["maks_udzial_niepewnych"] * len(wynik):
+                poziom = POZIOM_PELNY
+                wynik = normalizuj_wyniki(czytnik.readtext(obraz, batch_size=rozmiar_wsadu))
+            elif niepewne:
+                poziom = POZIOM_FRAGMENTY
+                poprawione = _rozpoznaj_fragmenty(czytnik, obraz, [wynik[i][0] for i in niepewne], rozmiar_wsadu)
+                for i, poprawiony in zip(niepewne, poprawione):
+                    if poprawiony is not None and poprawiony[2] > wynik[i][2]:
+                        wynik[i] = (wynik[i][0], poprawiony[1], poprawiony[2])
+            else:
+                poziom = POZIOM_SZYBKI
+        except Exception as e:
+            print(f"❌ Błąd pełnego OCR w kaskadzie: {e}")
+            wynik, poziom = None, POZIOM_PELNY
+        if statystyki is not None:
+            statystyki.dodaj(poziom, czas_szybki + time.perf_counter() - start)
+        wyniki.append(wynik)
+    return wyniki
+
+
+def odczytaj_wyniki_ocr_wsadowo(zrodla: List[ZrodloObrazu], pobierz_czytnik: Callable[[], Any],
+                                pamiec: Optional[PamiecOCR] = None,
+                                statystyki: Optional[StatystykiOCR] = None) -> List[Optional[List[WynikOCR]]]:
+    """
+    Zwraca surowe wyniki OCR wielu obrazów - z pamięci podręcznej lub rozpoznane razem.
+    
+    Obrazy znalezione w pamięci podręcznej nie są wczytywane ani
+    przygotowywane; pozostałe trafiają do czytnika wsadami
+    (ocr.obrazy_na_wsad, ocr.rozmiar_wsadu), a przy włączonej kaskadzie
+    (ocr.kaskada.wlaczona) - najpierw do szybkiego przebiegu. Czytnik
+    EasyOCR jest tworzony dopiero wtedy, gdy któregoś obrazu nie ma
+    w pamięci podręcznej.
+    
+    Args:
+        zrodla: Ścieżki do plików obrazów, strony PDF lub obrazy w pamięci
+        pobierz_czytnik: Funkcja zwracająca czytnik easyocr.Reader
+        pamiec: Pamięć podręczna wyników OCR (opcjonalnie)
+        statystyki: Statystyki poziomów OCR (opcjonalnie)
+    
+    Returns:
+        List[Optional[List[WynikOCR]]]: Wyniki readtext w kolejności źródeł
+            (None dla obrazów, których nie udało się rozpoznać)
+    """
+    wyniki: List[Optional[List[WynikOCR]]] = [None] * len(zrodla)
+    do_rozpoznania = []  # (indeks, klucz pamięci, przygotowany obraz)
+    for indeks, zrodlo in enumerate(zrodla):
+        try:
+            klucz = None
+            if pamiec is not None:
+                klucz = _klucz_pamieci(zrodlo)
+                wyniki[indeks] = pamiec.pobierz(klucz)
+                if wyniki[indeks] is not None:
+                    if statystyki is not None:
+                        statystyki.dodaj(POZIOM_PAMIEC)
+                    continue
+            
+            przygotowany_obraz = przygotuj_obraz(zrodlo)
+            if przygotowany_obraz is not None:
+                do_rozpoznania.append((indeks, klucz, przygotowany_obraz))
+        except Exception as e:
+            print(f"❌ Błąd OCR dla '{opis_zrodla(zrodlo)}': {e}")
+    if not do_rozpoznania:
+        return wyniki
+    
+    try:
+        # OCR z EasyOCR
+        obrazy = [obraz for _, _, obraz in do_rozpoznania]
+        if KONFIGURACJA["ocr"]["kaskada"]["wlaczona"]:
+            rozpoznane = rozpoznaj_kaskadowo(pobierz_czytnik(), obrazy, KONFIGURACJA["ocr"]["obrazy_na_wsad"],
+                                             KONFIGURACJA["ocr"]["rozmiar_wsadu"], statystyki)
+        else:
+            start = time.perf_counter()
+            rozpoznane = rozpoznaj_obrazy_wsadowo(pobierz_czytnik(), obrazy, KONFIGURACJA["ocr"]["obrazy_na_wsad"],
+                                                  KONFIGURACJA["ocr"]["rozmiar_wsadu"])
+            if statystyki is not None:
+                statystyki.dodaj(POZIOM_PELNY, time.perf_counter() - start, len(obrazy))
+        for (indeks, klucz, _), wynik in zip(do_rozpoznania, rozpoznane):
+            wyniki[indeks] = wynik
+            if wynik is not None and klucz is not None:
+                pamiec.zapisz(klucz, wynik)
+    except Exception as e:
+        print(f"❌ Błąd OCR: {e}")
+    return wyniki
+
+
+def odczytaj_wyniki_ocr(zrodlo: ZrodloObrazu, pobierz_czytnik: Callable[[], Any],
+                        pamiec: Optional[PamiecOCR] = None,
+                        statystyki: Optional[StatystykiOCR] = None) -> Optional[List[WynikOCR]]:
+    """
+    Zwraca surowe wyniki OCR obrazu - z pamięci podręcznej lub rozpoznane czytnikiem.
+    
+    Przy trafieniu w pamięci podręcznej obraz nie jest wczytywany ani
+    przygotowywany, a czytnik EasyOCR w ogóle nie jest tworzony.
+    
+    Args:
+        zrodlo: Ścieżka do pliku obrazu, strona PDF lub obraz w pamięci
+        pobierz_czytnik: Funkcja zwracająca czytnik easyocr.Reader
+        pamiec: Pamięć podręczna wyników OCR (opcjonalnie)
+        statystyki: Statystyki poziomów OCR (opcjonalnie)
+        
+    Returns:
+        Optional[List[WynikOCR]]: Wyniki readtext lub None w przypadku błędu
+    """
+    return odczytaj_wyniki_ocr_wsadowo([zrodlo], pobierz_czytnik, pamiec, statystyki)[0]
+
+
+def tekst_z_wynikow(wyniki: List[WynikOCR], zrodlo: ZrodloObrazu = "") -> Optional[str]:
+    """
+    Składa tekst paragonu z wyników OCR o wystarczającej pewności.
+    
+    Fragmenty są układane w wiersze według położenia ramek
+    (wiersze_z_wynikow), więc nazwa produktu i jego cena trafiają do
+    jednej linii, a linie są w kolejności od góry paragonu.
+    
+    Args:
+        wyniki: Wyniki readtext
+        zrodlo: Źródło obrazu (do komunikatów)
+        
+    Returns:
+        Optional[str]: Rozpoznany tekst lub None, jeśli OCR nic nie znalazł
+    """
+    if not wyniki:
+        print(f"⚠️ EasyOCR nie znalazł tekstu w: {opis_zrodla(zrodlo)}")
+        return None
+    
+    # Tylko fragmenty z dobrą pewnością (receipt_parser.MIN_PEWNOSC)
+    return '\n'.join(wiersze_z_wynikow(wyniki))
+
+
+def rozpoznaj_tekst_obrazu(zrodlo: ZrodloObrazu, pobierz_czytnik: Callable[[], Any],
+                           pamiec: Optional[PamiecOCR] = None,
+                           statystyki: Optional[StatystykiOCR] = None) -> Optional[str]:
+    """
+    Rozpoznaje tekst z obrazu paragonu, korzystając z pamięci podręcznej OCR.
+    
+    Args:
+        zrodlo: Ścieżka do pliku obrazu, strona PDF lub obraz w pamięci
+        pobierz_czytnik: Funkcja zwracająca czytnik easyocr.Reader
+        pamiec: Pamięć podręczna wyników OCR (opcjonalnie)
+        statystyki: Statystyki poziomów OCR (opcjonalnie)
+        
+    Returns:
+        Optional[str]: Rozpoznany tekst lub None w przypadku błędu
+    """
+    wyniki = odczytaj_wyniki_ocr(zrodlo, pobierz_czytnik, pamiec, statystyki)
+    if wyniki is None:
+        return None
+    return tekst_z_wynikow(wyniki, zrodlo)
+
+
+def rozpoznaj_teksty_obrazow(zrodla: List[ZrodloObrazu], pobierz_czytnik: Callable[[], Any],
+                             pamiec: Optional[PamiecOCR] = None,
+                             statystyki: Optional[StatystykiOCR] = None) -> List[Optional[str]]:
+    """
+    Rozpoznaje tekst z wielu obrazów paragonów wsadowo, korzystając z pamięci podręcznej OCR.
+    
+    Args:
+        zrodla: Ścieżki do plików obrazów, strony PDF lub obrazy w pamięci
+        pobierz_czytnik: Funkcja zwracająca czytnik easyocr.Reader
+        pamiec: Pamięć podręczna wyników OCR (opcjonalnie)
+        statystyki: Statystyki poziomów OCR (opcjonalnie)
+    
+    Returns:
+        List[Optional[str]]: Rozpoznane teksty w kolejności źródeł (None w przypadku błędu)
+    """
+    wyniki_ocr = odczytaj_wyniki_ocr_wsadowo(zrodla, pobierz_czytnik, pamiec, statystyki)
+    return [None if wyniki is None else tekst_z_wynikow(wyniki, zrodlo)
+            for zrodlo, wyniki in zip(zrodla, wyniki_ocr)]
+
+
+def wyodrebnij_produkty(tekst: str, wyniki: Optional[List[WynikOCR]] = None,
+                        statystyki: Optional[StatystykiOCR] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Wyodrębnia produkty z paragonu: najpierw regułami, model językowy tylko tam, gdzie reguły nie wystarczą.
+    
+    Wiersze paragonu są składane z ramek EasyOCR (bez nich - z linii
+    tekstu) i parsowane wyrażeniami regularnymi. Gdy reguły dały pewny
+    wynik (ceny sumują się do sumy z paragonu), AI nie jest pytane.
+    Gdy nie rozpoznały tylko części wierszy, do AI trafiają same te
+    wiersze; wszystkie wiersze pozycji (bez nagłówka i stopki) - dopiero
+    gdy i to nie daje zgodnej sumy.
+    
+    Args:
+        tekst: Rozpoznany tekst paragonu
+        wyniki: Wyniki OCR z ramkami (opcjonalnie)
+        statystyki: Statystyki sposobów parsowania (opcjonalnie)
+    
+    Returns:
+        Optional[List[Dict[str, Any]]]: Produkty (nazwa, cena) lub None w przypadku błędu AI
+    """
+    ustawienia = KONFIGURACJA["parsowanie"]
+    start = time.perf_counter()
+    sposob = PARSOWANIE_AI
+    produkty = None
+    try:
+        if ustawienia["reguly"]:
+            wiersze = wiersze_z_wynikow(wyniki) if wyniki else tekst.splitlines()
+            wynik = parsuj_paragon_regulami(wiersze, ustawienia["tolerancja_sumy"])
+            if wynik.pewny:
+                sposob, produkty = PARSOWANIE_REGULY, wynik.produkty
+            elif wynik.produkty and wynik.niesparsowane:
+                uzupelnienie = parsuj_paragon_ai("\n".join(wynik.niesparsowane), KONFIGURACJA["llm"])
+                # Pozycja bez nazwy lub ceny z modelu - wynik niespójny, AI dostaje wszystkie wiersze pozycji
+                if uzupelnienie is not None and produkty_poprawne(uzupelnienie):
+                    polaczone = wynik.produkty + uzupelnienie
+                    if wynik.suma is None or suma_zgodna(polaczone, wynik.suma, ustawienia["tolerancja_sumy"]):
+                        sposob, produkty = PARSOWANIE_REGULY_AI, polaczone
+        if produkty is None:
+            # Nagłówek, podsumowanie PTU, płatność i stopka tylko wydłużają prompt i mylą model
+            produkty = parsuj_paragon_ai(tekst_pozycji(tekst), KONFIGURACJA["llm"])
+    finally:
+        if statystyki is not None:
+            statystyki.dodaj(sposob, time.perf_counter() - start)
+    return produkty
+
+
+def pamiec_ocr_z_konfiguracji() -> Optional[PamiecOCR]:
+    """
+    Tworzy pamięć podręczną OCR według konfiguracji.
+    
+    Returns:
+        Optional[PamiecOCR]: Pamięć podręczna lub None, jeśli jest wyłączona
+    """
+    if not KONFIGURACJA["ocr"]["pamiec_podreczna_mb"]:
+        return None
+    return PamiecOCR(KONFIGURACJA["paths"]["ocr_cache"],
+                     KONFIGURACJA["ocr"]["pamiec_podreczna_mb"] * 1024 * 1024)
+
+
+# Czytnik i pamięć podręczna procesu roboczego puli OCR - każdy proces ma własne
+_reader_procesu = None
+_pamiec_procesu: Optional[PamiecOCR] = None
+_gpu_procesu = False
+
+
+def _inicjalizuj_proces_ocr(gpu: bool, watki: int) -> None:
+    """
+    Przygotowuje proces roboczy puli OCR: ogranicza liczbę wątków obliczeniowych.
+    
+    Bez ograniczenia każdy proces uruchamiałby tyle wątków PyTorch/OpenMP
+    i OpenCV, ile jest rdzeni, i procesy konkurowałyby ze sobą o procesor.
+    Czytnik EasyOCR powstaje dopiero przy pierwszym obrazie spoza pamięci podręcznej.
+    
+    Args:
+        gpu: Czy używać GPU
+        watki: Liczba wątków obliczeniowych na proces
+    """
+    global _pamiec_procesu, _gpu_procesu
+    # Zmienne środowiskowe muszą być ustawione przed importem torch
+    for zmienna in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[zmienna] = str(watki)
+    import cv2
+    import torch
+    cv2.setNumThreads(watki)
+    torch.set_num_threads(watki)
+    _gpu_procesu = gpu
+    _pamiec_procesu = pamiec_ocr_z_konfiguracji()
+
+
+def _czytnik_procesu():
+    global _reader_procesu
+    if _reader_procesu is None:
+        import easyocr
+        _reader_procesu = easyocr.Reader(JEZYKI_OCR, gpu=_gpu_procesu)
+    return _reader_procesu
+
+
+def _rozpoznaj_w_procesie(zrodla: List[ZrodloObrazu]) -> Tuple[List[Optional[List[WynikOCR]]], Dict[str, int],
+                                                                 Dict[str, float]]:
+    """
+    Rozpoznaje wsad obrazów w procesie roboczym puli OCR.
+    
+    Args:
+        zrodla: Ścieżki do plików obrazów lub strony PDF (rasteryzowane w procesie roboczym)
+        
+    Returns:
+        Tuple: Wyniki OCR z ramkami (None w przypadku błędu) oraz liczba obrazów
+            i czas na poziom OCR - do połączenia ze statystykami procesu głównego
+    """
+    statystyki = StatystykiOCR()
+    wyniki = odczytaj_wyniki_ocr_wsadowo(zrodla, _czytnik_procesu, _pamiec_procesu, statystyki)
+    return wyniki, statystyki.obrazy, statystyki.czas
+
+
+class ZadanieParagonu:
+    """
+    Paragon (lub strona PDF) przechodzący przez kolejne etapy przetwarzania.
+    
+    Atrybuty:
+        obraz (ZrodloObrazu): Ścieżka do pliku obrazu, strona PDF lub obraz w pamięci
+        nazwa (str): Nazwa pliku źródłowego zapisywana w danych paragonu
+        przenies_plik (bool): Czy przenieść obraz do folderu przetworzonych lub błędów
+        tekst (Optional[str]): Rozpoznany tekst
+        wyniki_ocr (Optional[List[WynikOCR]]): Fragmenty tekstu z ramkami (do parsowania regułami)
+        produkty (Optional[List[Dict]]): Produkty wyodrębnione przez AI
+        odcisk (Optional[OdciskParagonu]): Odcisk obrazu zarezerwowany w indeksie duplikatów
+        duplikat (Optional[str]): Nazwa wcześniej przetworzonego paragonu, którego to kopia
+        blad (Optional[str]): Opis błędu, który przerwał przetwarzanie
+    """
+    
+    __slots__ = ('obraz', 'nazwa', 'przenies_plik', 'tekst', 'wyniki_ocr', 'produkty', 'odcisk', 'duplikat', 'blad')
+    
+    def __init__(self, obraz: ZrodloObrazu, nazwa: Optional[str] = None, przenies_plik: bool = True,
+                 tekst: Optional[str] = None):
+        self.obraz = obraz
+        self.nazwa = nazwa or (os.path.basename(obraz) if isinstance(obraz, str) else "obraz")
+        self.przenies_plik = przenies_plik and isinstance(obraz, str)
+        self.tekst = tekst
+        self.wyniki_ocr: Optional[List[WynikOCR]] = None
+        self.produkty: Optional[List[Dict]] = None
+        self.odcisk: Optional[OdciskParagonu] = None
+        self.duplikat: Optional[str] = None
+        self.blad: Optional[str] = None
+
+
+# Paragon przekazywany do ParagonProcessor.przetworz: ścieżka do pliku (obraz lub PDF),
+# zawartość pliku w pamięci (obraz lub PDF) albo zdekodowany obraz
+WejscieParagonu = Union[str, bytes, 'np.ndarray']
+
+
+class WynikParagonu:
+    """
+    Wynik przetworzenia paragonu (lub jednej strony PDF) przez ParagonProcessor.przetworz.
+    
+    Atrybuty:
+        nazwa (str): Nazwa pliku źródłowego
+        strona (Optional[int]): Numer strony PDF (None dla obrazów)
+        status (str): STATUS_PRZETWORZONY, STATUS_DUPLIKAT lub STATUS_BLAD
+        produkty (List[Dict[str, Any]]): Wyodrębnione produkty (puste, jeśli się nie udało)
+        tekst (Optional[str]): Rozpoznany tekst paragonu
+        duplikat (Optional[str]): Nazwa paragonu, którego to kopia
+        blad (Optional[str]): Opis błędu
+    """
+    
+    __slots__ = ('nazwa', 'strona', 'status', 'produkty', 'tekst', 'duplikat', 'blad')
+    
+    def __init__(self, nazwa: str, strona: Optional[int], status: str,
+                 produkty: Optional[List[Dict[str, Any]]] = None, tekst: Optional[str] = None,
+                 duplikat: Optional[str] = None, blad: Optional[str] = None):
+        self.nazwa = nazwa
+        self.strona = strona
+        self.status = status
+        self.produkty = produkty or []
+        self.tekst = tekst
+        self.duplikat = duplikat
+        self.blad = blad
+    
+    @property
+    def udany(self) -> bool:
+        return self.status == STATUS_PRZETWORZONY
+    
+    def __repr__(self) -> str:
+        strona = f", strona {self.strona}" if self.strona is not None else ""
+        return f"WynikParagonu({self.nazwa!r}{strona}: {self.status}, {len(self.produkty)} produktów)"
+
 
 class ParagonProcessor:
     """
     Klasa do przetwarzania obrazów paragonów z pełną funkcjonalnością OCR + AI.
     """
     
-    def __init__(self):
+    def __init__(self, storage_manager: Optional[StorageManager] = None):
         """
         Inicjalizuje procesor paragonów.
+        
+        Czytnik EasyOCR (PyTorch i wagi modeli) jest tworzony dopiero przy
+        pierwszym rozpoznawaniu tekstu albo przez rozgrzej_w_tle(), więc
+        utworzenie procesora nie spowalnia startu aplikacji.
+        
+        Args:
+            storage_manager: Menedżer przechowywania danych (domyślnie nowy)
         """
-        # Inicjalizacja EasyOCR z językiem polskim i angielskim
-        self.reader = easyocr.Reader(['pl', 'en'], 
-                                   gpu=KONFIGURACJA["ocr"]["gpu"])
+        self._reader = None
+        self._blokada_readera = threading.Lock()
+        self.czas_inicjalizacji_ocr: Optional[float] = None
+        self.pamiec_ocr = pamiec_ocr_z_konfiguracji()
+        self.statystyki_ocr = StatystykiOCR()
+        self.statystyki_parsowania = StatystykiOCR()
+        self._pula = None
         
         # Foldery do przechowywania paragonów
         self.folder_nowe = KONFIGURACJA["paths"]["paragony_nowe"]
         self.folder_przetworzone = KONFIGURACJA["paths"]["paragony_przetworzone"]
         self.folder_bledy = KONFIGURACJA["paths"]["paragony_bledy"]
+        self.folder_duplikaty = KONFIGURACJA["paths"]["paragony_duplikaty"]
+        
+        # Odciski przetworzonych paragonów - kopie są pomijane przed OCR
+        ustawienia_duplikatow = KONFIGURACJA["duplikaty"]
+        self.indeks_odciskow = None
+        if ustawienia_duplikatow["wykrywaj"]:
+            self.indeks_odciskow = IndeksOdciskow(KONFIGURACJA["paths"]["indeks_paragonow"],
+                                                  ustawienia_duplikatow["maks_roznica_bitow"],
+                                                  ustawienia_duplikatow["tolerancja_proporcji"])
         
         # Menedżer przechowywania danych
-        self.storage_manager = StorageManager()
+        self.storage_manager = storage_manager or StorageManager()
         
         # Tworzenie folderów, jeśli nie istnieją
-        for folder in [self.folder_nowe, self.folder_przetworzone, self.folder_bledy]:
+        for folder in [self.folder_nowe, self.folder_przetworzone, self.folder_bledy, self.folder_duplikaty]:
             os.makedirs(folder, exist_ok=True)
     
-    def przygotuj_obraz(self, sciezka_pliku: str) -> Optional[np.ndarray]:
+    @property
+    def reader(self):
+        """
+        Czytnik EasyOCR z językiem polskim i angielskim, tworzony przy pierwszym użyciu.
+        
+        Returns:
+            easyocr.Reader: Zainicjalizowany czytnik
+        """
+        if self._reader is None:
+            with self._blokada_readera:
+                # Rozgrzewanie w tle mogło utworzyć czytnik w międzyczasie
+                if self._reader is None:
+                    start = time.perf_counter()
+                    import easyocr
+                    self._reader = easyocr.Reader(JEZYKI_OCR,
+                                                  gpu=KONFIGURACJA["ocr"]["gpu"])
+                    self.czas_inicjalizacji_ocr = time.perf_counter() - start
+        return self._reader
+    
+    @property
+    def ocr_gotowy(self) -> bool:
+        return self._reader is not None
+    
+    def rozgrzej_w_tle(self) -> threading.Thread:
+        """
+        Tworzy czytnik EasyOCR w wątku w tle, aby pierwszy paragon nie czekał na modele.
+        
+        Błąd inicjalizacji jest pomijany - zostanie zgłoszony przy pierwszym użyciu OCR.
+        
+        Returns:
+            threading.Thread: Uruchomiony wątek rozgrzewania
+        """
+        def _rozgrzej() -> None:
+            try:
+                self.reader
+            except Exception:
+                pass
+        
+        watek = threading.Thread(target=_rozgrzej, name="rozgrzewanie-ocr", daemon=True)
+        watek.start()
+        return watek
+    
+    def przygotuj_obraz(self, obraz: ZrodloObrazu) -> Optional['np.ndarray']:
         """
         Przygotowuje obraz paragonu do OCR.
         
         Args:
-            sciezka_pliku: Ścieżka do pliku obrazu
+            obraz: Ścieżka do pliku obrazu, strona PDF lub obraz w pamięci
+                (tablica w skali szarości albo BGR, jak z cv2.imread)
             
         Returns:
-            Optional[np.ndarray]: Przygotowany obraz lub None w przypadku błędu
+            Optional['np.ndarray']: Przygotowany obraz lub None w przypadku błędu
         """
-        try:
-            img = cv2.imread(sciezka_pliku)
-            if img is None:
-                print(f"❌ Nie można wczytać obrazu: {sciezka_pliku}")
-                return None
-            
-            # Konwersja do skali szarości
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # Poprawa kontrastu (CLAHE)
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            enhanced_contrast = clahe.apply(gray)
-            
-            # Rozmazanie gaussowskie + wyostrzenie
-            blurred = cv2.GaussianBlur(enhanced_contrast, (0,0), 1.0)
-            sharpened = cv2.addWeighted(enhanced_contrast, 1.5, blurred, -0.5, 0)
+        return przygotuj_obraz(obraz)
+    
+    def odczytaj_wyniki(self, obraz: ZrodloObrazu) -> Optional[List[WynikOCR]]:
+        """
+        Rozpoznaje fragmenty tekstu z ramkami na obrazie paragonu.
+        
+        Args:
+            obraz: Ścieżka do pliku obrazu, strona PDF lub obraz w pamięci
+                (tablica w skali szarości albo BGR, jak z cv2.imread)
             
-            # Binaryzacja Otsu
-            _, binary_img = cv2.threshold(sharpened, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        Returns:
+            Optional[List[WynikOCR]]: Wyniki readtext lub None w przypadku błędu
+        """
+        return odczytaj_wyniki_ocr(obraz, lambda: self.reader, self.pamiec_ocr, self.statystyki_ocr)
+    
+    def rozpoznaj_tekst(self, obraz: ZrodloObrazu) -> Optional[str]:
+        """
+        Rozpoznaje tekst z obrazu paragonu.
+        
+        Args:
+            obraz: Ścieżka do pliku obrazu, strona PDF lub obraz w pamięci
+                (tablica w skali szarości albo BGR, jak z cv2.imread)
             
-            return binary_img
+        Returns:
+            Optional[str]: Rozpoznany tekst lub None w przypadku błędu
+        """
+        wyniki = self.odczytaj_wyniki(obraz)
+        if wyniki is None:
+            return None
+        return tekst_z_wynikow(wyniki, obraz)
+    
+    def _rozpoznaj_wsad(self, obrazy: List[ZrodloObrazu]) -> List[Optional[List[WynikOCR]]]:
+        """
+        Rozpoznaje wsad obrazów w bieżącym procesie.
+        
+        Args:
+            obrazy: Ścieżki do plików obrazów, strony PDF lub obrazy w pamięci
+        
+        Returns:
+            List[Optional[List[WynikOCR]]]: Wyniki OCR z ramkami (None w przypadku błędu)
+        """
+        if len(obrazy) == 1:
+            return [self.odczytaj_wyniki(obrazy[0])]
+        return odczytaj_wyniki_ocr_wsadowo(obrazy, lambda: self.reader, self.pamiec_ocr, self.statystyki_ocr)
+    
+    def _utworz_pule_ocr(self, liczba_procesow: int):
+        """
+        Tworzy pulę procesów OCR, z których każdy ma własny czytnik EasyOCR.
+        
+        Args:
+            liczba_procesow: Liczba procesów roboczych
+        
+        Returns:
+            ProcessPoolExecutor: Nowa pula procesów
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        print(f"⚙️ OCR w {liczba_procesow} procesach...")
+        # spawn zamiast fork: proces główny może mieć już wątki PyTorch (rozgrzewanie w tle)
+        return ProcessPoolExecutor(max_workers=liczba_procesow,
+                                   mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_inicjalizuj_proces_ocr,
+                                   initargs=(KONFIGURACJA["ocr"]["gpu"],
+                                             KONFIGURACJA["ocr"]["watki_na_proces"]))
+    
+    def _rozpoznawanie_w_puli(self, pula) -> Callable[[List[ZrodloObrazu]], List[Optional[List[WynikOCR]]]]:
+        def _rozpoznaj(obrazy: List[ZrodloObrazu]) -> List[Optional[List[WynikOCR]]]:
+            try:
+                wyniki, obrazy_na_poziom, czas_na_poziom = pula.submit(_rozpoznaj_w_procesie, obrazy).result()
+                self.statystyki_ocr.polacz(obrazy_na_poziom, czas_na_poziom)
+                return wyniki
+            except Exception as e:
+                print(f"❌ Błąd OCR dla {len(obrazy)} obrazów ({opis_zrodla(obrazy[0])}...): {e}")
+                return [None] * len(obrazy)
+        return _rozpoznaj
+    
+    @contextmanager
+    def pula_ocr(self) -> Iterator[None]:
+        """
+        Utrzymuje pulę procesów OCR między kolejnymi partiami paragonów (do wyjścia z bloku with).
+        
+        Bez tego każda partia uruchamia nowe procesy, które ponownie wczytują
+        modele EasyOCR. Przy jednym procesie OCR nic nie zmienia - czytnik
+        procesora i tak pozostaje w pamięci.
+        """
+        liczba_procesow = self._liczba_procesow_ocr()
+        if liczba_procesow <= 1 or self._pula is not None:
+            yield
+            return
+        with self._utworz_pule_ocr(liczba_procesow) as pula:
+            self._pula = (pula, liczba_procesow)
+            try:
+                yield
+            finally:
+                self._pula = None
+    
+    @contextmanager
+    def _rozpoznawanie(self, liczba_wsadow: int) -> Iterator[Tuple[Callable[[List[ZrodloObrazu]],
+                                                                             List[Optional[List[WynikOCR]]]], int]]:
+        """
+        Przygotowuje funkcję rozpoznającą wsady obrazów - w puli procesów, gdy skonfigurowano kilka.
+        
+        Przy ocr.liczba_procesow > 1 wsady trafiają do puli procesów, z których
+        każdy ma własny czytnik EasyOCR i ograniczoną liczbę wątków
+        (ocr.watki_na_proces). Pula działa do wyjścia z bloku with, chyba że
+        utrzymuje ją pula_ocr().
+        
+        Args:
+            liczba_wsadow: Liczba wsadów do rozpoznania (ogranicza liczbę procesów)
+        
+        Yields:
+            Tuple: Funkcja lista obrazów → lista wyników OCR i liczba wsadów, które warto rozpoznawać jednocześnie
+        """
+        if self._pula is not None:
+            pula, liczba_procesow = self._pula
+            yield self._rozpoznawanie_w_puli(pula), min(liczba_procesow, liczba_wsadow)
+            return
+        
+        liczba_procesow = min(self._liczba_procesow_ocr(), liczba_wsadow)
+        if liczba_procesow <= 1:
+            yield self._rozpoznaj_wsad, 1
+            return
+        with self._utworz_pule_ocr(liczba_procesow) as pula:
+            yield self._rozpoznawanie_w_puli(pula), liczba_procesow
+    
+    def rozpoznaj_teksty(self, sciezki: List[str]) -> List[Optional[str]]:
+        """
+        Rozpoznaje tekst z wielu obrazów wsadami, równolegle gdy skonfigurowano kilka procesów.
+        
+        Args:
+            sciezki: Ścieżki do plików obrazów
             
+        Returns:
+            List[Optional[str]]: Rozpoznane teksty w kolejności ścieżek
+                (None dla obrazów, których nie udało się odczytać)
+        """
+        wsad = self._obrazy_na_wsad()
+        wsady = [sciezki[i:i + wsad] for i in range(0, len(sciezki), wsad)]
+        with self._rozpoznawanie(len(wsady)) as (rozpoznaj, rownolegle):
+            if rownolegle <= 1:
+                wyniki = [rozpoznaj(sciezki_wsadu) for sciezki_wsadu in wsady]
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+                with ThreadPoolExecutor(max_workers=rownolegle) as watki:
+                    wyniki = list(watki.map(rozpoznaj, wsady))
+        return [None if wyniki_ocr is None else tekst_z_wynikow(wyniki_ocr, sciezka)
+                for sciezka, wyniki_ocr in zip(sciezki, (w for wyniki_wsadu in wyniki for w in wyniki_wsadu))]
+    
+    @staticmethod
+    def _obrazy_na_wsad() -> int:
+        """
+        Zwraca maksymalną liczbę obrazów rozpoznawanych razem (ocr.obrazy_na_wsad).
+        
+        Returns:
+            int: Rozmiar wsadu obrazów (co najmniej 1)
+        """
+        return max(1, KONFIGURACJA["ocr"]["obrazy_na_wsad"])
+    
+    @staticmethod
+    def _liczba_procesow_ocr() -> int:
+        """
+        Zwraca liczbę procesów OCR z konfiguracji (0 oznacza liczbę rdzeni).
+        
+        Returns:
+            int: Liczba procesów roboczych
+        """
+        liczba = KONFIGURACJA["ocr"]["liczba_procesow"]
+        return liczba if liczba > 0 else (os.cpu_count() or 1)
+    
+    def _odrzuc(self, zadanie: ZadanieParagonu, komunikat: str) -> None:
+        """
+        Zgłasza niepowodzenie przetwarzania paragonu i przenosi go do folderu błędów.
+        
+        Args:
+            zadanie: Przetwarzany paragon
+            komunikat: Opis błędu
+        """
+        print(f"❌ {zadanie.nazwa}: {komunikat}")
+        zadanie.blad = komunikat
+        if zadanie.odcisk is not None:
+            self.indeks_odciskow.zwolnij(zadanie.odcisk)
+        if zadanie.przenies_plik:
+            self._przenies_do_folderu(zadanie.obraz, self.folder_bledy)
+    
+    def _etap_duplikatow(self, zadanie: ZadanieParagonu) -> Optional[ZadanieParagonu]:
+        """
+        Etap 0: pomija paragon, jeśli jest kopią paragonu już przetworzonego (lub przetwarzanego).
+        
+        Kopia (np. PDF z aplikacji sklepu i zdjęcie tego samego paragonu)
+        trafia do folderu duplikatów bez OCR i AI, więc produkty nie są
+        importowane dwukrotnie. Błąd liczenia odcisku nie zatrzymuje paragonu.
+        
+        Args:
+            zadanie: Przetwarzany paragon
+        
+        Returns:
+            Optional[ZadanieParagonu]: Zadanie lub None, jeśli to duplikat
+        """
+        if self.indeks_odciskow is None or zadanie.tekst is not None:
+            return zadanie
+        try:
+            odcisk = odcisk_zrodla(zadanie.obraz)
         except Exception as e:
-            print(f"❌ Błąd podczas przygotowywania obrazu '{sciezka_pliku}': {e}")
+            print(f"⚠️ {zadanie.nazwa}: nie udało się sprawdzić duplikatów: {e}")
+            return zadanie
+        if odcisk is None:
+            return zadanie
+        
+        oryginal = self.indeks_odciskow.znajdz_lub_zarezerwuj(odcisk, zadanie.nazwa)
+        if oryginal is None:
+            zadanie.odcisk = odcisk
+            return zadanie
+        zadanie.duplikat = oryginal
+        print(f"♻️ {zadanie.nazwa}: kopia paragonu {oryginal} - pomijam OCR i AI")
+        if zadanie.przenies_plik:
+            self._przenies_do_folderu(zadanie.obraz, self.folder_duplikaty)
+        return None
+    
+    def _etap_ocr(self, zadania: List[ZadanieParagonu],
+                  rozpoznaj: Callable[[List[ZrodloObrazu]], List[Optional[List[WynikOCR]]]]
+                  ) -> List[Optional[ZadanieParagonu]]:
+        """
+        Etap 1: rozpoznaje wsadem tekst paragonów (tych, które nie zostały rozpoznane wcześniej).
+        
+        Args:
+            zadania: Przetwarzane paragony
+            rozpoznaj: Funkcja zwracająca wyniki OCR dla listy obrazów
+        
+        Returns:
+            List[Optional[ZadanieParagonu]]: Zadania z tekstem (None w przypadku błędu)
+        """
+        do_rozpoznania = [zadanie for zadanie in zadania if zadanie.tekst is None]
+        if do_rozpoznania:
+            try:
+                wyniki_ocr = rozpoznaj([zadanie.obraz for zadanie in do_rozpoznania])
+            except Exception as e:
+                wyniki_ocr = [None] * len(do_rozpoznania)
+                print(f"❌ Błąd OCR dla {len(do_rozpoznania)} paragonów: {e}")
+            for zadanie, wyniki in zip(do_rozpoznania, wyniki_ocr):
+                zadanie.wyniki_ocr = wyniki
+                zadanie.tekst = None if wyniki is None else tekst_z_wynikow(wyniki, zadanie.nazwa)
+        
+        wyniki: List[Optional[ZadanieParagonu]] = []
+        for zadanie in zadania:
+            if not zadanie.tekst:
+                self._odrzuc(zadanie, "nie udało się rozpoznać tekstu")
+                wyniki.append(None)
+                continue
+            print(f"✅ {zadanie.nazwa}: tekst rozpoznany, wyodrębnianie produktów...")
+            wyniki.append(zadanie)
+        return wyniki
+    
+    def _etap_ai(self, zadanie: ZadanieParagonu) -> Optional[ZadanieParagonu]:
+        """
+        Etap 2: wyodrębnia produkty z paragonu - regułami, a w razie wątpliwości przez AI.
+        
+        Args:
+            zadanie: Paragon z rozpoznanym tekstem
+        
+        Returns:
+            Optional[ZadanieParagonu]: Zadanie z produktami lub None w przypadku błędu
+        """
+        try:
+            zadanie.produkty = wyodrebnij_produkty(zadanie.tekst, zadanie.wyniki_ocr, self.statystyki_parsowania)
+        except Exception as e:
+            self._odrzuc(zadanie, f"błąd parsowania przez AI: {e}")
+            return None
+        if not zadanie.produkty:
+            self._odrzuc(zadanie, "nie znaleziono produktów")
             return None
+        
+        print(f"🛒 {zadanie.nazwa}: znaleziono {len(zadanie.produkty)} produktów:")
+        for p in zadanie.produkty:
+            print(f"   • {p['nazwa']} - {p['cena']:.2f} zł")
+        return zadanie
     
-    def rozpoznaj_tekst(self, sciezka_pliku: str) -> Optional[str]:
+    def _etap_zapisu(self, zadanie: ZadanieParagonu) -> Optional[ZadanieParagonu]:
         """
-        Rozpoznaje tekst z obrazu paragonu.
+        Etap 3: zapisuje produkty do JSON i przenosi obraz do przetworzonych.
         
         Args:
-            sciezka_pliku: Ścieżka do pliku obrazu
-            
+            zadanie: Paragon z wyodrębnionymi produktami
+        
         Returns:
-            Optional[str]: Rozpoznany tekst lub None w przypadku błędu
+            Optional[ZadanieParagonu]: Zapisane zadanie lub None w przypadku błędu
         """
+        paragon_data = {
+            'plik_zrodlowy': zadanie.nazwa,
+            'data_przetworzenia': datetime.now().strftime("%Y%m%d_%H%M%S"),
+            'tekst_ocr': zadanie.tekst,
+            'produkty': zadanie.produkty
+        }
         try:
-            przygotowany_obraz = self.przygotuj_obraz(sciezka_pliku)
-            if przygotowany_obraz is None:
-                return None
-            
-            # OCR z EasyOCR
-            results = self.reader.readtext(przygotowany_obraz)
-            
-            if not results:
-                print(f"⚠️ EasyOCR nie znalazł tekstu w: {sciezka_pliku}")
-                return None
-            
-            # Wyciągnij tekst z wyników
-            tekst_lines = []
-            for (bbox, text, confidence) in results:
-                if confidence > 0.3:  # Tylko tekst z dobrą pewnością
-                    tekst_lines.append(text.strip())
-            
-            return '\n'.join(tekst_lines)
-            
+            zapisano = self.storage_manager.zapisz_przetworzony_paragon(paragon_data)
         except Exception as e:
-            print(f"❌ Błąd OCR dla pliku '{sciezka_pliku}': {e}")
+            print(f"❌ Błąd podczas zapisywania paragonu '{zadanie.nazwa}': {e}")
+            zapisano = False
+        if not zapisano:
+            self._odrzuc(zadanie, "błąd podczas zapisywania danych paragonu")
             return None
+        
+        print(f"✅ Paragon {zadanie.nazwa} przetworzony i zapisany")
+        if zadanie.odcisk is not None:
+            self.indeks_odciskow.zatwierdz(zadanie.odcisk)
+        if zadanie.przenies_plik:
+            self._przenies_do_folderu(zadanie.obraz, self.folder_przetworzone)
+        return zadanie
     
-    def przetworz_paragon(self, sciezka_pliku: str) -> bool:
+    def przetworz_paragon(self, obraz: ZrodloObrazu, tekst: Optional[str] = None,
+                          nazwa_zrodla: Optional[str] = None, przenies_plik: bool = True) -> bool:
         """
         Przetwarza pojedynczy paragon: OCR + AI parsing + zapis JSON.
         
         Args:
-            sciezka_pliku: Ścieżka do pliku obrazu
+            obraz: Ścieżka do pliku obrazu, strona PDF lub obraz w pamięci
+            tekst: Tekst rozpoznany wcześniej; None - rozpoznaj teraz
+            nazwa_zrodla: Nazwa pliku źródłowego zapisywana w danych paragonu
+                (domyślnie nazwa pliku obrazu)
+            przenies_plik: Czy przenieść plik obrazu do folderu przetworzonych lub błędów
+                (dotyczy tylko obrazów podanych jako ścieżka)
             
         Returns:
             bool: True jeśli przetwarzanie się powiodło, False w przeciwnym razie
         """
-        nazwa_pliku = os.path.basename(sciezka_pliku)
-        print(f"\n🔍 Przetwarzam: {nazwa_pliku}")
-        
-        try:
-            # 1. Rozpoznaj tekst (OCR)
-            tekst = self.rozpoznaj_tekst(sciezka_pliku)
-            if not tekst:
-                print("❌ Nie udało się rozpoznać tekstu")
-                self._przenies_do_folderu(sciezka_pliku, self.folder_bledy)
-                return False
-            
-            print("✅ Tekst rozpoznany, parsowanie przez AI...")
-            
-            # 2. Parsuj produkty przez AI
-            produkty = parsuj_paragon_ai(tekst, KONFIGURACJA["llm"])
-            
-            if not produkty:
-                print("❌ AI nie znalazło produktów")
-                self._przenies_do_folderu(sciezka_pliku, self.folder_bledy)
-                return False
-            
-            print(f"🛒 AI znalazło {len(produkty)} produktów:")
-            for p in produkty:
-                print(f"   • {p['nazwa']} - {p['cena']:.2f} zł")
-            
-            # 3. Zapisz produkty do JSON dla dalszego przetwarzania
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            paragon_data = {
-                'plik_zrodlowy': nazwa_pliku,
-                'data_przetworzenia': timestamp,
-                'tekst_ocr': tekst,
-                'produkty': produkty
-            }
-            
-            # Zapisz do folderu data/
-            json_filename = f"paragon_{timestamp}.json"
-            json_path = os.path.join(KONFIGURACJA["paths"]["dane_json_folder"], json_filename)
-            
-            if self.storage_manager.zapisz_przetworzony_paragon(paragon_data):
-                print(f"✅ Paragon przetworzony i zapisany jako {json_filename}")
-                
-                # 4. Przenieś obraz do folderu przetworzonych
-                self._przenies_do_folderu(sciezka_pliku, self.folder_przetworzone)
-                return True
-            else:
-                print("❌ Błąd podczas zapisywania danych paragonu")
-                self._przenies_do_folderu(sciezka_pliku, self.folder_bledy)
-                return False
-            
-        except Exception as e:
-            print(f"❌ Błąd podczas przetwarzania paragonu '{nazwa_pliku}': {e}")
-            self._przenies_do_folderu(sciezka_pliku, self.folder_bledy)
-            return False
+        zadanie = ZadanieParagonu(obraz, nazwa_zrodla, przenies_plik, tekst)
+        print(f"\n🔍 Przetwarzam: {zadanie.nazwa}")
+        zadanie = self._etap_duplikatow(zadanie)
+        if zadanie is not None:
+            zadanie = self._etap_ocr([zadanie], self._rozpoznaj_wsad)[0]
+        if zadanie is not None:
+            zadanie = self._etap_ai(zadanie)
+        if zadanie is not None:
+            zadanie = self._etap_zapisu(zadanie)
+        return zadanie is not None
     
     def przetworz_wszystkie_paragony(self) -> Tuple[int, int]:
         """
         Przetwarza wszystkie paragony z folderu nowych.
         
+        Paragony (i pojedyncze strony PDF, rasteryzowane w pamięci dopiero
+        przed rozpoznaniem) przechodzą przez potok OCR → AI → zapis:
+        gdy jeden paragon czeka na odpowiedź AI, następny jest już
+        rozpoznawany. Etap OCR rozpoznaje razem do ocr.obrazy_na_wsad
+        czekających paragonów (strony jednego PDF mają zwykle ten sam
+        rozmiar). Liczbę jednoczesnych zadań w etapach ustawiają
+        ocr.liczba_procesow, potok.watki_ai i potok.watki_zapisu, a
+        potok.rozmiar_kolejki ogranicza liczbę paragonów czekających
+        przed każdym etapem.
+        
         Returns:
             Tuple[int, int]: Liczba przetworzonych paragonów i liczba błędów
         """
         # Znajdź wszystkie pliki obrazów oraz PDF
-        extensions = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff', '*.pdf', '*.PDF']
         pliki_do_przetworzenia = []
-        for ext in extensions:
+        for ext in ROZSZERZENIA_PARAGONOW:
             pliki_do_przetworzenia.extend(glob.glob(os.path.join(self.folder_nowe, ext)))
+        # Posortowane, aby wyniki i nazwy zapisanych paragonów były powtarzalne
+        pliki_do_przetworzenia = sorted(set(pliki_do_przetworzenia))
         if not pliki_do_przetworzenia:
             print("📁 Brak nowych paragonów do przetworzenia")
             return 0, 0
         print(f"📸 Znaleziono {len(pliki_do_przetworzenia)} paragonów do przetworzenia")
-        przetworzono = 0
-        bledy = 0
-        for sciezka_pliku in pliki_do_przetworzenia:
-            if sciezka_pliku.lower().endswith('.pdf'):
-                # Konwertuj każdą stronę PDF na obraz i przetwarzaj
-                try:
-                    obrazy = convert_from_path(sciezka_pliku, dpi=300)
-                    for idx, obraz in enumerate(obrazy):
-                        with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as tmp_img:
-                            obraz.save(tmp_img.name, 'JPEG')
-                            wynik = self.przetworz_paragon(tmp_img.name)
-                            if wynik:
-                                przetworzono += 1
-                            else:
-                                bledy += 1
-                            os.unlink(tmp_img.name)
-                    # Po przetworzeniu przenieś PDF do przetworzonych lub błędów (jeśli choć jedna strona się udała)
-                    if przetworzono > 0:
-                        self._przenies_do_folderu(sciezka_pliku, self.folder_przetworzone)
-                    else:
-                        self._przenies_do_folderu(sciezka_pliku, self.folder_bledy)
-                except Exception as e:
-                    print(f"❌ Błąd podczas konwersji PDF '{sciezka_pliku}': {e}")
-                    self._przenies_do_folderu(sciezka_pliku, self.folder_bledy)
-                    bledy += 1
+        return self.przetworz_pliki(pliki_do_przetworzenia)
+    
+    def przetworz_pliki(self, pliki_do_przetworzenia: List[str]) -> Tuple[int, int]:
+        """
+        Przetwarza podane pliki paragonów (obrazy i PDF) potokiem OCR → AI → zapis.
+        
+        Args:
+            pliki_do_przetworzenia: Ścieżki do plików paragonów
+        
+        Returns:
+            Tuple[int, int]: Liczba przetworzonych paragonów i liczba błędów
+        """
+        wyniki = self.przetworz(pliki_do_przetworzenia)
+        return (sum(wynik.status == STATUS_PRZETWORZONY for wynik in wyniki),
+                sum(wynik.status == STATUS_BLAD for wynik in wyniki))
+    
+    def _zadania_paragonu(self, zrodlo: WejscieParagonu, nazwa: Optional[str],
+                          przenies_pliki: bool) -> List[ZadanieParagonu]:
+        """
+        Tworzy zadania dla jednego paragonu - po jednym na każdą stronę PDF.
+        
+        Strony są rasteryzowane dopiero w etapie OCR, a PDF w pamięci nie
+        jest zapisywany do pliku tymczasowego.
+        
+        Args:
+            zrodlo: Ścieżka do pliku, zawartość pliku w pamięci lub zdekodowany obraz
+            nazwa: Nazwa pliku źródłowego (domyślnie nazwa pliku lub "obraz")
+            przenies_pliki: Czy przenosić pliki obrazów do folderów wyników
+        
+        Returns:
+            List[ZadanieParagonu]: Zadania do przetworzenia
+        
+        Raises:
+            Exception: Gdy nie można odczytać liczby stron PDF
+        """
+        if isinstance(zrodlo, str) and zrodlo.lower().endswith('.pdf'):
+            from pdf2image import pdfinfo_from_path
+            nazwa = nazwa or os.path.basename(zrodlo)
+            strony = StronaPdf.dokument(zrodlo, pdfinfo_from_path(zrodlo)["Pages"], KONFIGURACJA["ocr"]["dpi_pdf"])
+        elif isinstance(zrodlo, bytes) and zrodlo.startswith(b'%PDF'):
+            from pdf2image import pdfinfo_from_bytes
+            nazwa = nazwa or "paragon.pdf"
+            strony = StronaPdf.dokument(nazwa, pdfinfo_from_bytes(zrodlo)["Pages"], KONFIGURACJA["ocr"]["dpi_pdf"],
+                                        zrodlo)
+        else:
+            return [ZadanieParagonu(zrodlo, nazwa, przenies_pliki)]
+        # Plik PDF jest przenoszony po przetworzeniu wszystkich stron
+        return [ZadanieParagonu(strona, nazwa, przenies_plik=False) for strona in strony]
+    
+    def przetworz(self, zrodla: List[WejscieParagonu], nazwy: Optional[List[Optional[str]]] = None,
+                  przenies_pliki: bool = True) -> List[WynikParagonu]:
+        """
+        Przetwarza paragony potokiem duplikaty → OCR → parsowanie → zapis i zwraca wyniki.
+        
+        Wspólne wejście dla menu, trybu wsadowego i demona. Paragon może być
+        ścieżką do obrazu lub PDF, zawartością takiego pliku w pamięci (np.
+        przesłaną przez sieć) albo zdekodowanym obrazem. Każda strona PDF
+        to osobny paragon; strony są rasteryzowane w pamięci dopiero przed
+        rozpoznaniem. Gdy jeden paragon czeka na AI, następny jest już
+        rozpoznawany, a etap OCR rozpoznaje razem do ocr.obrazy_na_wsad
+        czekających obrazów. Liczbę jednoczesnych zadań w etapach ustawiają
+        ocr.liczba_procesow, potok.watki_ai i potok.watki_zapisu.
+        
+        Args:
+            zrodla: Paragony do przetworzenia
+            nazwy: Nazwy plików źródłowych zapisywane w danych paragonów
+                (domyślnie nazwa pliku, dla danych w pamięci "obraz" lub "paragon.pdf")
+            przenies_pliki: Czy przenieść pliki podane jako ścieżki do folderu
+                przetworzonych, błędów lub duplikatów
+        
+        Returns:
+            List[WynikParagonu]: Wyniki w kolejności paragonów (strony PDF po kolei)
+        """
+        nazwy = nazwy or [None] * len(zrodla)
+        self.statystyki_ocr = StatystykiOCR()
+        self.statystyki_parsowania = StatystykiOCR()
+        
+        # 1. Zadania: po jednym na obraz lub stronę PDF
+        wyniki: List[WynikParagonu] = []
+        pozycje: List[Tuple[int, ZadanieParagonu]] = []  # (indeks wyniku, zadanie)
+        pliki_pdf: Dict[str, List[int]] = {}  # ścieżka PDF → indeksy wyników jego stron
+        for zrodlo, nazwa in zip(zrodla, nazwy):
+            try:
+                zadania = self._zadania_paragonu(zrodlo, nazwa, przenies_pliki)
+            except Exception as e:
+                opis = nazwa or opis_zrodla(zrodlo)
+                print(f"❌ Błąd podczas odczytu PDF '{opis}': {e}")
+                wyniki.append(WynikParagonu(nazwa or os.path.basename(opis), None, STATUS_BLAD,
+                                            blad=f"nie można odczytać PDF: {e}"))
+                if przenies_pliki and isinstance(zrodlo, str):
+                    self._przenies_do_folderu(zrodlo, self.folder_bledy)
+                continue
+            for zadanie in zadania:
+                if isinstance(zadanie.obraz, StronaPdf) and isinstance(zrodlo, str):
+                    pliki_pdf.setdefault(zrodlo, []).append(len(wyniki))
+                pozycje.append((len(wyniki), zadanie))
+                wyniki.append(None)
+        
+        # 2. Potok duplikaty → OCR → parsowanie → zapis
+        zadania = [zadanie for _, zadanie in pozycje]
+        ustawienia = KONFIGURACJA["potok"]
+        start = time.perf_counter()
+        wsad = self._obrazy_na_wsad()
+        with self._rozpoznawanie(-(-len(zadania) // wsad)) as (rozpoznaj, rownolegle):
+            potok = PotokParagonow(ustawienia["rozmiar_kolejki"])
+            # Jeden wątek: z dwóch kopii w partii zachowywana jest zawsze pierwsza
+            potok.dodaj_etap("duplikaty", self._etap_duplikatow)
+            potok.dodaj_etap("OCR", lambda wsad_zadan: self._etap_ocr(wsad_zadan, rozpoznaj), rownolegle, wsad)
+            potok.dodaj_etap("AI", self._etap_ai, ustawienia["watki_ai"])
+            potok.dodaj_etap("zapis", self._etap_zapisu, ustawienia["watki_zapisu"])
+            zapisane = potok.uruchom(zadania)
+        czas_calkowity = time.perf_counter() - start
+        
+        for (indeks, zadanie), zapisany in zip(pozycje, zapisane):
+            strona = zadanie.obraz.numer if isinstance(zadanie.obraz, StronaPdf) else None
+            if zapisany is not None:
+                status = STATUS_PRZETWORZONY
+            elif zadanie.duplikat is not None:
+                status = STATUS_DUPLIKAT
             else:
-                if self.przetworz_paragon(sciezka_pliku):
-                    przetworzono += 1
+                status = STATUS_BLAD
+            wyniki[indeks] = WynikParagonu(zadanie.nazwa, strona, status, zadanie.produkty if zapisany else None,
+                                           zadanie.tekst, zadanie.duplikat,
+                                           zadanie.blad or ("błąd przetwarzania" if status == STATUS_BLAD else None))
+        
+        # PDF trafia do przetworzonych, jeśli udała się choć jedna jego strona,
+        # a do duplikatów - jeśli wszystkie strony są kopiami
+        if przenies_pliki:
+            for sciezka_pdf, indeksy in pliki_pdf.items():
+                statusy = {wyniki[indeks].status for indeks in indeksy}
+                if STATUS_PRZETWORZONY in statusy:
+                    folder = self.folder_przetworzone
+                elif STATUS_BLAD in statusy:
+                    folder = self.folder_bledy
                 else:
-                    bledy += 1
+                    folder = self.folder_duplikaty
+                self._przenies_do_folderu(sciezka_pdf, folder)
+        
+        przetworzono = sum(wynik.status == STATUS_PRZETWORZONY for wynik in wyniki)
+        duplikaty = sum(wynik.status == STATUS_DUPLIKAT for wynik in wyniki)
         print(f"\n📊 PODSUMOWANIE:")
         print(f"✅ Przetworzono: {przetworzono}")
-        print(f"❌ Błędy: {bledy}")
+        print(f"❌ Błędy: {sum(wynik.status == STATUS_BLAD for wynik in wyniki)}")
+        if duplikaty:
+            print(f"♻️ Pominięte kopie: {duplikaty}")
+        if zadania:
+            czasy = ", ".join(f"{etap}: {czas:.1f} s" for etap, czas in potok.czasy_etapow.items())
+            print(f"⏱️ Łącznie {czas_calkowity:.1f} s (praca etapów - {czasy})")
+        if self.statystyki_ocr.obrazy:
+            print(f"🔎 Poziomy OCR - {self.statystyki_ocr}")
+        if self.statystyki_parsowania.obrazy:
+            print(f"🧾 Parsowanie - {self.statystyki_parsowania}")
         if przetworzono > 0:
             print(f"\n🔄 Użyj opcji 'Importuj przetworzone paragony' aby dodać produkty do spiżarni")
-        return przetworzono, bledy
+        return wyniki
     
     def _przenies_do_folderu(self, sciezka_pliku: str, folder_docelowy: str) -> None:
         """
@@ -0,0 +1,132 @@
+import json
+import os
+import glob
+from datetime import date, datetime
+from typing import List, Optional, Dict, Iterator
+from models import Produkt
+
+class ArchiwumProduktow:
+    """
+    Zimne archiwum produktów zużytych i dawno przeterminowanych.
+    
+    Produkty są dopisywane do segmentów JSONL podzielonych według miesiąca
+    (spizarnia_RRRR-MM.jsonl): dla produktów zużytych liczy się data zużycia,
+    dla pozostałych data ważności. Segmenty są czytane tylko na żądanie,
+    więc nie spowalniają codziennej pracy ze spiżarnią.
+    """
+    
+    PREFIKS_SEGMENTU = "spizarnia_"
+    
+    def __init__(self, katalog: str):
+        """
+        Inicjalizuje archiwum produktów.
+        
+        Args:
+            katalog: Katalog przechowujący segmenty archiwum
+        """
+        self.katalog = katalog
+    
+    @staticmethod
+    def _data_partycji(produkt: Produkt) -> datetime:
+        """
+        Zwraca datę decydującą o segmencie, do którego trafia produkt.
+        
+        Args:
+            produkt: Archiwizowany produkt
+        
+        Returns:
+            datetime: Data zużycia lub (dla niezużytych) data ważności
+        """
+        if produkt.zuzyty:
+            return produkt.data_zuzycia or datetime.now()
+        return produkt.data_waznosci
+    
+    def _sciezka_segmentu(self, miesiac: str) -> str:
+        """
+        Zwraca ścieżkę segmentu dla danego miesiąca.
+        
+        Args:
+            miesiac: Miesiąc w formacie RRRR-MM
+        
+        Returns:
+            str: Ścieżka do pliku segmentu
+        """
+        return os.path.join(self.katalog, f"{self.PREFIKS_SEGMENTU}{miesiac}.jsonl")
+    
+    def dopisz(self, produkty: List[Produkt]) -> None:
+        """
+        Dopisuje produkty do segmentów odpowiadających ich datom.
+        
+        Args:
+            produkty: Lista produktów do zarchiwizowania
+        """
+        segmenty: Dict[str, List[Produkt]] = {}
+        for produkt in produkty:
+            miesiac = self._data_partycji(produkt).strftime("%Y-%m")
+            segmenty.setdefault(miesiac, []).append(produkt)
+        
+        os.makedirs(self.katalog, exist_ok=True)
+        for miesiac, produkty_segmentu in segmenty.items():
+            sciezka = self._sciezka_segmentu(miesiac)
+            # Po przerwanym zapisie ostatnia linia może nie mieć końca - zamknij ją
+            brak_konca_linii = False
+            if os.path.exists(sciezka) and os.path.getsize(sciezka) > 0:
+                with open(sciezka, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    brak_konca_linii = f.read(1) != b"\n"
+            with open(sciezka, 'a', encoding='utf-8') as f:
+                if brak_konca_linii:
+                    f.write("\n")
+                for produkt in produkty_segmentu:
+                    f.write(json.dumps(produkt.to_dict(), ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def segmenty(self, od: Optional[date] = None, do: Optional[date] = None) -> List[str]:
+        """
+        Zwraca ścieżki segmentów obejmujących podany zakres dat.
+        
+        Args:
+            od: Pierwszy dzień zakresu (opcjonalnie)
+            do: Ostatni dzień zakresu (opcjonalnie)
+        
+        Returns:
+            List[str]: Posortowana lista ścieżek segmentów
+        """
+        wynik = []
+        wzorzec = os.path.join(self.katalog, f"{self.PREFIKS_SEGMENTU}*.jsonl")
+        for sciezka in sorted(glob.glob(wzorzec)):
+            miesiac = os.path.basename(sciezka)[len(self.PREFIKS_SEGMENTU):-len(".jsonl")]
+            if od and miesiac < od.strftime("%Y-%m"):
+                continue
+            if do and miesiac > do.strftime("%Y-%m"):
+                continue
+            wynik.append(sciezka)
+        return wynik
+    
+    def iteruj(self, od: Optional[date] = None, do: Optional[date] = None) -> Iterator[Produkt]:
+        """
+        Odczytuje zarchiwizowane produkty z segmentów z podanego zakresu.
+        
+        Produkt zarchiwizowany ponownie (np. po przerwanym przenoszeniu)
+        jest zwracany tylko raz, w najnowszej wersji.
+        
+        Args:
+            od: Pierwszy dzień zakresu (opcjonalnie)
+            do: Ostatni dzień zakresu (opcjonalnie)
+        
+        Yields:
+            Produkt: Zarchiwizowane produkty
+        """
+        for sciezka in self.segmenty(od, do):
+            rekordy: Dict[str, dict] = {}
+            with open(sciezka, 'r', encoding='utf-8') as f:
+                for linia in f:
+                    try:
+                        rekord = json.loads(linia)
+                    except ValueError:
+                        # Niedokończony zapis - pomiń
+                        continue
+                    rekordy[rekord['id']] = rekord
+            for rekord in rekordy.values():
+                yield Produkt.from_dict(rekord)
@@ -0,0 +1,185 @@
+from bisect import bisect_right
+from datetime import date
+from typing import List, Dict, Optional, Sequence, Tuple
+from models import ProduktTable, numpy_lub_none
+from aggregates import AgregatySpizarni
+from config import KONFIGURACJA
+
+
+class StatystykiSpizarni:
+    """
+    Zbiorcze statystyki aktywnych (niezużytych) produktów spiżarni.
+    
+    Atrybuty:
+        liczba_produktow (int): Liczba aktywnych produktów
+        wartosc_calkowita (float): Łączna wartość aktywnych produktów
+        liczba_w_kategoriach (Dict[str, int]): Liczba produktów w każdej kategorii
+        wartosc_w_kategoriach (Dict[str, float]): Wartość produktów w każdej kategorii
+        przedzialy (List[Tuple[str, int, float]]): Histogram terminów ważności -
+            etykieta przedziału, liczba produktów i wartość zagrożona w przedziale
+        granice (List[int]): Górne granice przedziałów w dniach do końca ważności
+    """
+    
+    def __init__(self, granice: Sequence[int]):
+        """
+        Inicjalizuje puste statystyki.
+        
+        Args:
+            granice: Rosnące górne granice przedziałów (dni do końca ważności, włącznie)
+        """
+        self.granice = list(granice)
+        self.liczba_produktow = 0
+        self.wartosc_calkowita = 0.0
+        self.liczba_w_kategoriach: Dict[str, int] = {}
+        self.wartosc_w_kategoriach: Dict[str, float] = {}
+        self.przedzialy: List[Tuple[str, int, float]] = []
+    
+    def wygasajace_w_ciagu(self, dni: int) -> Tuple[int, float]:
+        """
+        Zwraca liczbę i wartość produktów, których termin mija najpóźniej za podaną liczbę dni.
+        
+        Uwzględnia produkty już przeterminowane. Liczba dni musi być jedną z granic przedziałów.
+        
+        Args:
+            dni: Liczba dni od dzisiaj
+        
+        Returns:
+            Tuple[int, float]: Liczba produktów i ich łączna wartość
+        """
+        do_przedzialu = self.granice.index(dni) + 1
+        liczba = sum(p[1] for p in self.przedzialy[:do_przedzialu])
+        wartosc = sum(p[2] for p in self.przedzialy[:do_przedzialu])
+        return liczba, round(wartosc, 2)
+
+
+def domyslne_granice() -> List[int]:
+    """
+    Zwraca granice przedziałów histogramu na podstawie progów powiadomień.
+    
+    Returns:
+        List[int]: Granice: przeterminowane (-1), próg krytyczny, próg ostrzeżenia, 30 dni
+    """
+    powiadomienia = KONFIGURACJA["notifications"]
+    return sorted({-1, powiadomienia["expiry_warning_days_critical"],
+                   powiadomienia["expiry_warning_days_warning"], 30})
+
+
+def _etykiety(granice: List[int]) -> List[str]:
+    etykiety = []
+    poprzednia = None
+    for granica in granice:
+        if granica < 0:
+            etykiety.append("przeterminowane")
+        else:
+            od = 0 if poprzednia is None or poprzednia < 0 else poprzednia + 1
+            etykiety.append(f"{od}-{granica} dni")
+        poprzednia = granica
+    etykiety.append(f"ponad {granice[-1]} dni")
+    return etykiety
+
+
+def oblicz_statystyki(tabela: ProduktTable, dzisiaj: Optional[date] = None,
+                      granice: Optional[Sequence[int]] = None) -> StatystykiSpizarni:
+    """
+    Oblicza wszystkie statystyki spiżarni w jednym przebiegu po kolumnach tabeli.
+    
+    Args:
+        tabela: Tabela produktów
+        dzisiaj: Data odniesienia (domyślnie dzisiaj)
+        granice: Rosnące granice przedziałów w dniach do końca ważności
+            (domyślnie z progów powiadomień)
+    
+    Returns:
+        StatystykiSpizarni: Obliczone statystyki
+    """
+    granice = sorted(granice) if granice is not None else domyslne_granice()
+    statystyki = StatystykiSpizarni(granice)
+    dzien_dzisiaj = ProduktTable.dzien(dzisiaj or date.today())
+    liczba_przedzialow = len(granice) + 1
+    
+    np = numpy_lub_none()
+    if np is not None and len(tabela):
+        aktywne = np.frombuffer(tabela.zuzyty, dtype=np.uint8) == 0
+        dni = np.frombuffer(tabela.data_waznosci, dtype=np.int32)[aktywne] - dzien_dzisiaj
+        ceny = np.nan_to_num(np.frombuffer(tabela.cena, dtype=np.float32)[aktywne].astype(np.float64))
+        # Ceny w całych groszach, jak w AgregatySpizarni - suma float32 odpływa przy wielu produktach
+        grosze = np.rint(ceny * 100).astype(np.int64)
+        kody = np.frombuffer(tabela.kategoria, dtype=np.uint16)[aktywne]
+        przedzial = np.searchsorted(np.asarray(granice), dni, side='left')
+        
+        liczby_kategorii = np.bincount(kody, minlength=len(tabela.kategorie)).tolist()
+        # Sumy całkowitych groszy w float64 są dokładne (do 2^53 groszy)
+        grosze_kategorii = np.bincount(kody, weights=grosze,
+                                       minlength=len(tabela.kategorie)).astype(np.int64).tolist()
+        liczby_przedzialow = np.bincount(przedzial, minlength=liczba_przedzialow).tolist()
+        grosze_przedzialow = np.bincount(przedzial, weights=grosze,
+                                         minlength=liczba_przedzialow).astype(np.int64).tolist()
+    else:
+        liczby_kategorii = [0] * len(tabela.kategorie)
+        grosze_kategorii = [0] * len(tabela.kategorie)
+        liczby_przedzialow = [0] * liczba_przedzialow
+        grosze_przedzialow = [0] * liczba_przedzialow
+        for kod, dzien, cena, zuzyty in zip(tabela.kategoria, tabela.data_waznosci,
+                                            tabela.cena, tabela.zuzyty):
+            if zuzyty:
+                continue
+            grosze = round(cena * 100) if cena == cena else 0
+            # Przedział, którego granica jako pierwsza obejmuje liczbę dni
+            przedzial = bisect_right(granice, dzien - dzien_dzisiaj - 1)
+            liczby_kategorii[kod] += 1
+            grosze_kategorii[kod] += grosze
+            liczby_przedzialow[przedzial] += 1
+            grosze_przedzialow[przedzial] += grosze
+    
+    for kod, kategoria in enumerate(tabela.kategorie):
+        if liczby_kategorii[kod]:
+            statystyki.liczba_w_kategoriach[kategoria] = int(liczby_kategorii[kod])
+            statystyki.wartosc_w_kategoriach[kategoria] = grosze_kategorii[kod] / 100
+    statystyki.liczba_produktow = int(sum(liczby_kategorii))
+    statystyki.wartosc_calkowita = sum(grosze_kategorii) / 100
+    statystyki.przedzialy = [
+        (etykieta, int(liczba), grosze / 100)
+        for etykieta, liczba, grosze in zip(_etykiety(granice), liczby_przedzialow, grosze_przedzialow)
+    ]
+    return statystyki
+
+
+def oblicz_statystyki_z_agregatow(agregaty: AgregatySpizarni, dzisiaj: Optional[date] = None,
+                                  granice: Optional[Sequence[int]] = None) -> StatystykiSpizarni:
+    """
+    Oblicza statystyki spiżarni z bieżących agregatów, bez wczytywania produktów.
+    
+    Koszt zależy od liczby kategorii i różnych dat ważności, a nie od liczby produktów.
+    
+    Args:
+        agregaty: Agregaty aktywnych produktów
+        dzisiaj: Data odniesienia (domyślnie dzisiaj)
+        granice: Rosnące granice przedziałów w dniach do końca ważności
+            (domyślnie z progów powiadomień)
+    
+    Returns:
+        StatystykiSpizarni: Obliczone statystyki
+    """
+    granice = sorted(granice) if granice is not None else domyslne_granice()
+    statystyki = StatystykiSpizarni(granice)
+    dzien_dzisiaj = ProduktTable.dzien(dzisiaj or date.today())
+    
+    liczby_przedzialow = [0] * (len(granice) + 1)
+    grosze_przedzialow = [0] * (len(granice) + 1)
+    for dzien, liczba in agregaty.liczba_w_dniach.items():
+        przedzial = bisect_right(granice, dzien - dzien_dzisiaj - 1)
+        liczby_przedzialow[przedzial] += liczba
+        grosze_przedzialow[przedzial] += agregaty.grosze_w_dniach.get(dzien, 0)
+    
+    statystyki.liczba_w_kategoriach = dict(agregaty.liczba_w_kategoriach)
+    statystyki.wartosc_w_kategoriach = {
+        kategoria: agregaty.grosze_w_kategoriach.get(kategoria, 0) / 100
+        for kategoria in agregaty.liczba_w_kategoriach
+    }
+    statystyki.liczba_produktow = agregaty.liczba_produktow
+    statystyki.wartosc_calkowita = agregaty.wartosc_calkowita
+    statystyki.przedzialy = [
+        (etykieta, liczba, grosze / 100)
+        for etykieta, liczba, grosze in zip(_etykiety(granice), liczby_przedzialow, grosze_przedzialow)
+    ]
+    return statystyki
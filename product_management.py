@@ -143,14 +143,28 @@ class ProductManager:
                 if wybor == "99":
                     return False
                 elif wybor == "0":
-                    # Importuj wszystkie
-                    for json_file in json_files:
-                        self._importuj_pojedynczy_paragon(json_file, konfiguracja_llm)
-                    return True
+                    # Importuj wszystkie - jeden zapis dla wszystkich paragonów,
+                    # przerwanie importu (np. Ctrl+C) odrzuca całą partię
+                    zaimportowane = []
+                    liczba_produktow = 0
+                    with self.storage_manager.transakcja():
+                        for json_file in json_files:
+                            liczba = self._importuj_pojedynczy_paragon(json_file, konfiguracja_llm, archiwizuj=False)
+                            if liczba:
+                                zaimportowane.append(json_file)
+                                liczba_produktow += liczba
+                    
+                    # Partia jest już zapisana - dopiero teraz import się udał
+                    if zaimportowane:
+                        print(f"\n🎉 Zaimportowano {liczba_produktow} produktów "
+                              f"z {len(zaimportowane)} paragonów!")
+                    for json_file in zaimportowane:
+                        self._archiwizuj_paragon(json_file)
+                    return bool(zaimportowane)
                 else:
                     idx = int(wybor) - 1
                     if 0 <= idx < len(json_files):
-                        return self._importuj_pojedynczy_paragon(json_files[idx], konfiguracja_llm)
+                        return bool(self._importuj_pojedynczy_paragon(json_files[idx], konfiguracja_llm))
                     else:
                         print("❌ Nieprawidłowy wybór")
                         return False
@@ -163,16 +177,23 @@ class ProductManager:
             print(f"❌ Błąd podczas importu paragonów: {e}")
             return False
     
-    def _importuj_pojedynczy_paragon(self, json_file: str, konfiguracja_llm: Dict[str, Any]) -> bool:
+    def _importuj_pojedynczy_paragon(self, json_file: str, konfiguracja_llm: Dict[str, Any],
+                                     archiwizuj: bool = True) -> int:
         """
         Importuje produkty z pojedynczego paragonu.
         
+        Wszystkie zaakceptowane produkty paragonu są zapisywane jedną partią.
+        W większej transakcji produkty są tylko dołączane do partii, a o
+        udanym imporcie informuje wywołujący po jej zatwierdzeniu.
+        
         Args:
             json_file: Ścieżka do pliku JSON z paragonem
             konfiguracja_llm: Konfiguracja LLM
+            archiwizuj: Czy przenieść paragon do archiwum po imporcie
+                (False, gdy import jest częścią większej transakcji)
             
         Returns:
-            bool: True jeśli import się powiódł
+            int: Liczba zaimportowanych produktów (0, jeśli import się nie powiódł)
         """
         try:
             with open(json_file, 'r', encoding='utf-8') as f:
@@ -181,11 +202,11 @@ class ProductManager:
             produkty_z_paragonu = data.get('produkty', [])
             if not produkty_z_paragonu:
                 print(f"⚠️ Brak produktów w {os.path.basename(json_file)}")
-                return False
+                return 0
             
             print(f"\n📦 Import produktów z {data.get('plik_zrodlowy', 'paragonu')}:")
             
-            dodano = 0
+            nowe_produkty = []
             
             for produkt_data in produkty_z_paragonu:
                 nazwa = produkt_data.get('nazwa', '').strip()
@@ -236,29 +257,40 @@ class ProductManager:
                     id_paragonu=os.path.basename(json_file)
                 )
                 
-                if self.storage_manager.dodaj_produkt(nowy_produkt):
-                    dodano += 1
-                    print(f"✅ Dodano: {nazwa}")
-                else:
-                    print(f"❌ Błąd podczas dodawania: {nazwa}")
+                nowe_produkty.append(nowy_produkt)
+                print(f"✅ Przyjęto: {nazwa}")
             
-            if dodano > 0:
-                print(f"\n🎉 Zaimportowano {dodano} produktów!")
-                
-                # Przenieś przetworzony plik do archiwum
-                os.makedirs(KONFIGURACJA["paths"]["archiwum_json"], exist_ok=True)
-                archive_file = os.path.join(KONFIGURACJA["paths"]["archiwum_json"], os.path.basename(json_file))
-                shutil.move(json_file, archive_file)
-                print(f"📦 Przeniesiono paragon do archiwum: {os.path.basename(archive_file)}")
-                
-                return True
-            else:
+            if not nowe_produkty:
                 print("❌ Nie zaimportowano żadnych produktów")
-                return False
+                return 0
+            
+            # Cały paragon w jednym zapisie - w całości albo wcale
+            if not self.storage_manager.dodaj_produkty(nowe_produkty):
+                print("❌ Błąd podczas zapisywania produktów z paragonu")
+                return 0
+            
+            if archiwizuj:
+                print(f"\n🎉 Zaimportowano {len(nowe_produkty)} produktów!")
+                self._archiwizuj_paragon(json_file)
+            else:
+                print(f"📝 Przyjęto {len(nowe_produkty)} produktów - zapis po przejrzeniu wszystkich paragonów")
+            return len(nowe_produkty)
             
         except Exception as e:
             print(f"❌ Błąd podczas importu paragonu: {e}")
-            return False
+            return 0
+    
+    def _archiwizuj_paragon(self, json_file: str) -> None:
+        """
+        Przenosi zaimportowany paragon do archiwum.
+        
+        Args:
+            json_file: Ścieżka do pliku JSON z paragonem
+        """
+        os.makedirs(KONFIGURACJA["paths"]["archiwum_json"], exist_ok=True)
+        archive_file = os.path.join(KONFIGURACJA["paths"]["archiwum_json"], os.path.basename(json_file))
+        shutil.move(json_file, archive_file)
+        print(f"📦 Przeniesiono paragon do archiwum: {os.path.basename(archive_file)}")
     
     def szybkie_zarzadzanie_produktami(self) -> bool:
         """
@@ -268,16 +300,13 @@ class ProductManager:
             bool: True jeśli operacja się powiodła, False w przeciwnym razie
         """
         try:
-            produkty = self.storage_manager.wczytaj_produkty()
-            produkty_aktywne = [p for p in produkty if not p.zuzyty]
+            # Aktywne produkty posortowane według daty ważności
+            produkty_aktywne = self.storage_manager.wczytaj_aktywne_produkty()
             
             if not produkty_aktywne:
                 print("📦 Brak aktywnych produktów do zarządzania")
                 return False
             
-            # Sortuj według daty ważności
-            produkty_aktywne.sort(key=lambda x: x.data_waznosci)
-            
             print("\n📋 Lista produktów do zarządzania:")
             for i, p in enumerate(produkty_aktywne, 1):
                 dni_do_wygasniecia = (p.data_waznosci - datetime.now()).days
@@ -293,7 +322,7 @@ class ProductManager:
                 
                 idx = int(wybor) - 1
                 if 0 <= idx < len(produkty_aktywne):
-                    return self._zarzadzaj_produktem(produkty_aktywne[idx], produkty)
+                    return self._zarzadzaj_produktem(produkty_aktywne[idx])
                 else:
                     print("❌ Nieprawidłowy wybór")
                     return False
@@ -306,13 +335,12 @@ class ProductManager:
             print(f"❌ Błąd podczas zarządzania produktami: {e}")
             return False
     
-    def _zarzadzaj_produktem(self, produkt: Produkt, wszystkie_produkty: List[Produkt]) -> bool:
+    def _zarzadzaj_produktem(self, produkt: Produkt) -> bool:
         """
         Zarządza pojedynczym produktem.
         
         Args:
             produkt: Produkt do zarządzania
-            wszystkie_produkty: Lista wszystkich produktów
             
         Returns:
             bool: True jeśli operacja się powiodła
@@ -328,9 +356,7 @@ class ProductManager:
             if wybor == "0":
                 return False
             elif wybor == "1":
-                produkt.zuzyty = True
-                produkt.data_zuzycia = datetime.now()
-                if self.storage_manager.zapisz_produkty(wszystkie_produkty):
+                if self.storage_manager.oznacz_jako_zuzyty(produkt.id):
                     print(f"✅ Oznaczono jako zużyty: {produkt.nazwa}")
                     return True
                 else:
@@ -339,8 +365,7 @@ class ProductManager:
             elif wybor == "2":
                 potwierdz = input(f"Czy na pewno chcesz usunąć {produkt.nazwa}? (t/n): ").lower()
                 if potwierdz == 't':
-                    wszystkie_produkty.remove(produkt)
-                    if self.storage_manager.zapisz_produkty(wszystkie_produkty):
+                    if self.storage_manager.usun_produkt(produkt.id):
                         print(f"✅ Usunięto produkt: {produkt.nazwa}")
                         return True
                     else:
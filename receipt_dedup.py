@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+# cv2 i numpy są importowane dopiero przy liczeniu odcisku obrazu
+if TYPE_CHECKING:
+    import numpy as np
+
+# Odcisk paragonu: bity skrótu percepcyjnego i proporcje (wysokość / szerokość) treści
+OdciskParagonu = Tuple[int, float]
+
+# Paragon jest dzielony na pasy w pionie; każdy daje 63 bity skrótu DCT
+LICZBA_PASOW = 4
+BOK_PASA = 64
+BOK_DCT = 8
+MAKS_BOK_NORMALIZACJI = 1000
+
+
+def normalizuj_obraz(szary: 'np.ndarray', wykrywaj_paragon: bool = True) -> Optional['np.ndarray']:
+    """
+    Sprowadza zdjęcie, skan lub stronę PDF paragonu do samej treści.
+    
+    Zdjęcie jest przycinane do paragonu i prostowane, a następnie obraz jest
+    przycinany do prostokąta obejmującego tekst - zdjęcie z telefonu i PDF
+    z aplikacji sklepu dają wtedy podobny kadr niezależnie od marginesów.
+    
+    Args:
+        szary: Obraz w skali szarości
+        wykrywaj_paragon: Czy wyciąć paragon z tła przed przycięciem do tekstu
+    
+    Returns:
+        Optional[np.ndarray]: Treść paragonu w skali szarości lub None, jeśli obraz jest pusty
+    """
+    import cv2
+    skala = min(1.0, MAKS_BOK_NORMALIZACJI / max(szary.shape[:2]))
+    if skala < 1.0:
+        szary = cv2.resize(szary, None, fx=skala, fy=skala, interpolation=cv2.INTER_AREA)
+    if wykrywaj_paragon:
+        from receipt_preprocessing import wykryj_paragon, wyprostuj_paragon
+        narozniki = wykryj_paragon(szary)
+        if narozniki is not None:
+            szary = wyprostuj_paragon(szary, narozniki)
+    
+    _, tekst = cv2.threshold(szary, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    punkty = cv2.findNonZero(tekst)
+    if punkty is None:
+        return None
+    x, y, szerokosc, wysokosc = cv2.boundingRect(punkty)
+    if szerokosc < BOK_DCT or wysokosc < BOK_DCT:
+        return None
+    return szary[y:y + wysokosc, x:x + szerokosc]
+
+
+def odcisk_obrazu(szary: 'np.ndarray', wykrywaj_paragon: bool = True) -> Optional[OdciskParagonu]:
+    """
+    Wylicza skrót percepcyjny (pHash) paragonu.
+    
+    Treść paragonu jest skalowana do LICZBA_PASOW kwadratów ułożonych
+    w pionie; z każdego brane są najniższe częstotliwości DCT porównane
+    z ich medianą. Skrót nie zmienia się przy innej rozdzielczości,
+    kompresji JPEG czy niewielkich zmianach jasności.
+    
+    Args:
+        szary: Obraz w skali szarości
+        wykrywaj_paragon: Czy wyciąć paragon z tła (zdjęcia) przed liczeniem skrótu
+    
+    Returns:
+        Optional[OdciskParagonu]: Odcisk lub None, jeśli na obrazie nie ma treści
+    """
+    import cv2
+    import numpy as np
+    tresc = normalizuj_obraz(szary, wykrywaj_paragon)
+    if tresc is None:
+        return None
+    proporcje = tresc.shape[0] / float(tresc.shape[1])
+    znormalizowany = cv2.resize(tresc, (BOK_PASA, BOK_PASA * LICZBA_PASOW),
+                                interpolation=cv2.INTER_AREA).astype(np.float32)
+    bity = 0
+    for pas in range(LICZBA_PASOW):
+        dct = cv2.dct(znormalizowany[pas * BOK_PASA:(pas + 1) * BOK_PASA])
+        # Bez składowej stałej - zależy tylko od jasności
+        niskie = dct[:BOK_DCT, :BOK_DCT].flatten()[1:]
+        for bit in niskie > np.median(niskie):
+            bity = (bity << 1) | int(bit)
+    return bity, proporcje
+
+
+def roznica_bitow(a: int, b: int) -> int:
+    """
+    Zwraca odległość Hamminga dwóch skrótów.
+    """
+    return bin(a ^ b).count("1")
+
+
+class IndeksOdciskow:
+    """
+    Indeks odcisków już przetworzonych paragonów.
+    
+    Odciski są dopisywane do pliku JSON Lines po zapisaniu paragonu, więc
+    indeks przetrwa ponowne uruchomienie bez przepisywania całego pliku.
+    Paragony będące w trakcie przetwarzania są rezerwowane w pamięci - druga
+    kopia tego samego paragonu w jednej partii też zostanie rozpoznana, a
+    po niepowodzeniu rezerwacja jest zwalniana.
+    
+    Dwa odciski oznaczają ten sam paragon, gdy różnią się najwyżej
+    maks_roznica_bitow bitami, a proporcje treści - najwyżej o
+    tolerancja_proporcji (dłuższy paragon z tego samego sklepu ma
+    podobny nagłówek, ale inne proporcje).
+    """
+    
+    def __init__(self, sciezka: str, maks_roznica_bitow: int, tolerancja_proporcji: float):
+        """
+        Inicjalizuje indeks (plik jest wczytywany przy pierwszym wyszukiwaniu).
+        
+        Args:
+            sciezka: Ścieżka do pliku JSON Lines z odciskami
+            maks_roznica_bitow: Największa odległość Hamminga uznawana za duplikat
+            tolerancja_proporcji: Największa względna różnica proporcji uznawana za duplikat
+        """
+        self.sciezka = sciezka
+        self.maks_roznica_bitow = maks_roznica_bitow
+        self.tolerancja_proporcji = tolerancja_proporcji
+        self._odciski: Optional[List[Tuple[OdciskParagonu, str]]] = None
+        self._w_toku: Dict[OdciskParagonu, str] = {}
+        self._blokada = threading.Lock()
+    
+    def _wczytaj(self) -> List[Tuple[OdciskParagonu, str]]:
+        if self._odciski is None:
+            self._odciski = []
+            try:
+                with open(self.sciezka, 'r', encoding='utf-8') as f:
+                    for linia in f:
+                        try:
+                            wpis = json.loads(linia)
+                            self._odciski.append(((int(wpis['odcisk'], 16), float(wpis['proporcje'])),
+                                                  wpis['plik']))
+                        except (ValueError, KeyError, TypeError):
+                            continue  # np. urwana ostatnia linia
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️ Nie można wczytać indeksu paragonów '{self.sciezka}': {e}")
+        return self._odciski
+    
+    def _pasuje(self, a: OdciskParagonu, b: OdciskParagonu) -> bool:
+        return (abs(a[1] - b[1]) <= self.tolerancja_proporcji * max(a[1], b[1])
+                and roznica_bitow(a[0], b[0]) <= self.maks_roznica_bitow)
+    
+    def znajdz_lub_zarezerwuj(self, odcisk: OdciskParagonu, nazwa: str) -> Optional[str]:
+        """
+        Wyszukuje paragon o podobnym odcisku; jeśli go nie ma, rezerwuje odcisk.
+        
+        Args:
+            odcisk: Odcisk nowego paragonu
+            nazwa: Nazwa pliku nowego paragonu
+        
+        Returns:
+            Optional[str]: Nazwa pliku wcześniejszego paragonu lub None (paragon jest nowy)
+        """
+        with self._blokada:
+            for znany, plik in self._wczytaj() + list(self._w_toku.items()):
+                if self._pasuje(odcisk, znany):
+                    return plik
+            self._w_toku[odcisk] = nazwa
+            return None
+    
+    def zwolnij(self, odcisk: OdciskParagonu) -> None:
+        """
+        Zwalnia rezerwację paragonu, którego nie udało się przetworzyć.
+        
+        Args:
+            odcisk: Zarezerwowany odcisk
+        """
+        with self._blokada:
+            self._w_toku.pop(odcisk, None)
+    
+    def zatwierdz(self, odcisk: OdciskParagonu) -> None:
+        """
+        Dopisuje zarezerwowany odcisk do indeksu po zapisaniu paragonu.
+        
+        Args:
+            odcisk: Zarezerwowany odcisk
+        """
+        with self._blokada:
+            nazwa = self._w_toku.pop(odcisk, None)
+            if nazwa is None:
+                return
+            self._wczytaj().append((odcisk, nazwa))
+            wpis = {'odcisk': format(odcisk[0], 'x'), 'proporcje': round(odcisk[1], 4), 'plik': nazwa,
+                    'data': datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            try:
+                katalog = os.path.dirname(self.sciezka)
+                if katalog:
+                    os.makedirs(katalog, exist_ok=True)
+                with open(self.sciezka, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(wpis, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"⚠️ Nie można zapisać indeksu paragonów '{self.sciezka}': {e}")
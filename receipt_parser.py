@@ -0,0 +1,264 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from ocr_cache import WynikOCR
+
+# Fragmenty OCR o niższej pewności są pomijane (jak przy składaniu tekstu paragonu)
+MIN_PEWNOSC = 0.3
+
+# Fragmenty należą do jednego wiersza, gdy pokrywają się w pionie co najmniej w połowie niższego z nich
+MIN_POKRYCIE_WIERSZA = 0.5
+
+_KWOTA = r'-?\d+\s?[.,]\s?\d{2}'
+_ILOSC = r'\d+(?:\s?[.,]\s?\d{1,3})?'
+_PTU = r'[A-G]'
+
+# MLEKO 3,2% 1L   1 x3,49  3,49A  /  Banany 0,856 * 5,99 = 5,13 C  (nazwa może być w poprzednim wierszu)
+_WIERSZ_POZYCJI = re.compile(
+    rf'^(?P<nazwa>.*?)\s*(?P<ilosc>{_ILOSC})\s*(?:szt\.?|kg|op\.?)?\s*[x×*]\s*(?P<cena>{_KWOTA})\s*=?\s*'
+    rf'(?P<wartosc>{_KWOTA})\s*(?P<ptu>{_PTU})?$', re.IGNORECASE)
+# Chleb żytni   6,50 B - bez ilości, litera PTU jest wtedy wymagana
+_WIERSZ_BEZ_ILOSCI = re.compile(rf'^(?P<nazwa>.*[^\d\s.,-].*?)\s+(?P<wartosc>{_KWOTA})\s*(?P<ptu>[A-G])$')
+_WIERSZ_RABATU = re.compile(rf'^(?:rabat|opust|upust|obni[żz]ka|promocja)\b.*?(?P<kwota>{_KWOTA})\s*(?:{_PTU})?$',
+                            re.IGNORECASE)
+_KWOTA_W_WIERSZU = re.compile(_KWOTA)
+_PO_RABACIE = re.compile(r'po\s+(?:rabacie|opu[sś]cie|upu[sś]cie)', re.IGNORECASE)
+
+_POCZATEK_POZYCJI = re.compile(r'paragon\s*fiskalny', re.IGNORECASE)
+_KONIEC_POZYCJI = re.compile(r'^(?:suma|sprzeda[żz]|sp\.\s?op|razem|do\s+zap[łl]aty|ptu\s+[A-G]\b)', re.IGNORECASE)
+_SUMA = re.compile(rf'^(?:suma(?!\s*ptu)|do\s+zap[łl]aty)\D*(?P<kwota>{_KWOTA})', re.IGNORECASE)
+
+
+def _liczba(tekst: str) -> float:
+    return float(tekst.replace(' ', '').replace(',', '.'))
+
+
+def wiersze_z_wynikow(wyniki: List[WynikOCR], min_pewnosc: float = MIN_PEWNOSC) -> List[str]:
+    """
+    Składa fragmenty tekstu rozpoznane przez EasyOCR w wiersze paragonu.
+    
+    EasyOCR zwraca nazwę produktu i jego cenę jako osobne fragmenty,
+    niekoniecznie jeden po drugim. Fragmenty pokrywające się w pionie
+    (MIN_POKRYCIE_WIERSZA) trafiają do jednego wiersza i są w nim
+    układane od lewej do prawej.
+    
+    Args:
+        wyniki: Wyniki readtext (ramka, tekst, pewność)
+        min_pewnosc: Minimalna pewność fragmentu
+    
+    Returns:
+        List[str]: Wiersze paragonu od góry do dołu
+    """
+    fragmenty = []
+    for ramka, tekst, pewnosc in wyniki:
+        if pewnosc <= min_pewnosc or not tekst.strip():
+            continue
+        ys = [y for _, y in ramka]
+        fragmenty.append((min(ys), max(ys), min(x for x, _ in ramka), tekst.strip()))
+    fragmenty.sort(key=lambda fragment: (fragment[0] + fragment[1]) / 2)
+    
+    wiersze: List[Tuple[float, float, List[Tuple[float, str]]]] = []
+    for gora, dol, lewa, tekst in fragmenty:
+        if wiersze:
+            gora_wiersza, dol_wiersza, elementy = wiersze[-1]
+            pokrycie = min(dol, dol_wiersza) - max(gora, gora_wiersza)
+            if pokrycie >= MIN_POKRYCIE_WIERSZA * min(dol - gora, dol_wiersza - gora_wiersza):
+                elementy.append((lewa, tekst))
+                wiersze[-1] = (min(gora, gora_wiersza), max(dol, dol_wiersza), elementy)
+                continue
+        wiersze.append((gora, dol, [(lewa, tekst)]))
+    return [' '.join(tekst for _, tekst in sorted(elementy)) for _, _, elementy in wiersze]
+
+
+def sekcja_pozycji(wiersze: List[str]) -> Tuple[int, int]:
+    """
+    Wyznacza wiersze z pozycjami paragonu - między nagłówkiem a podsumowaniem.
+    
+    Nagłówek (sklep, adres, NIP, data) kończy się wierszem "PARAGON
+    FISKALNY"; pozycje kończą się na pierwszym wierszu podsumowania
+    ("SUMA", "SPRZEDAŻ OPODATKOWANA", "PTU A"). Gdy OCR nie odczytał
+    "PARAGON FISKALNY", pozycje zaczynają się wiersz przed pierwszą
+    kwotą (nazwa produktu bywa w osobnym wierszu), a bez żadnej kwoty -
+    od pierwszego wiersza.
+    
+    Args:
+        wiersze: Wiersze paragonu
+    
+    Returns:
+        Tuple[int, int]: Indeks pierwszego wiersza pozycji i indeks za ostatnim
+    """
+    poczatek = None
+    for indeks, wiersz in enumerate(wiersze):
+        if _POCZATEK_POZYCJI.search(wiersz):
+            poczatek = indeks + 1
+            break
+    if poczatek is None:
+        pierwsza_kwota = next((indeks for indeks, wiersz in enumerate(wiersze) if _KWOTA_W_WIERSZU.search(wiersz)), 0)
+        poczatek = max(0, pierwsza_kwota - 1)
+    for indeks in range(poczatek, len(wiersze)):
+        if _KONIEC_POZYCJI.match(wiersze[indeks]):
+            return poczatek, indeks
+    return poczatek, len(wiersze)
+
+
+def tekst_pozycji(tekst: str) -> str:
+    """
+    Zostawia z tekstu paragonu tylko wiersze pozycji - bez nagłówka, NIP, płatności i stopki.
+    
+    Tekst przekazywany modelowi językowemu jest wtedy kilkukrotnie krótszy,
+    a model nie myli z produktami adresu sklepu, stawek PTU czy reszty.
+    
+    Args:
+        tekst: Tekst paragonu (wiersz na linię)
+    
+    Returns:
+        str: Wiersze pozycji; cały tekst, jeśli sekcji pozycji nie udało się wyznaczyć
+    """
+    wiersze = [' '.join(wiersz.split()) for wiersz in tekst.splitlines() if wiersz.strip()]
+    poczatek, koniec = sekcja_pozycji(wiersze)
+    if poczatek >= koniec:
+        return tekst
+    return '\n'.join(wiersze[poczatek:koniec])
+
+
+class WynikParsowania:
+    """
+    Produkty wyodrębnione z paragonu regułami.
+    
+    Atrybuty:
+        produkty (List[Dict[str, Any]]): Pozycje paragonu (nazwa, cena po rabatach, ilość)
+        niesparsowane (List[str]): Wiersze sekcji pozycji, których reguły nie rozpoznały
+        suma (Optional[float]): Suma z paragonu lub None, jeśli jej nie znaleziono
+        pewny (bool): Czy wynik można przyjąć bez modelu językowego
+    """
+    
+    __slots__ = ('produkty', 'niesparsowane', 'suma', 'pewny')
+    
+    def __init__(self, produkty: List[Dict[str, Any]], niesparsowane: List[str], suma: Optional[float],
+                 pewny: bool):
+        self.produkty = produkty
+        self.niesparsowane = niesparsowane
+        self.suma = suma
+        self.pewny = pewny
+
+
+def suma_zgodna(produkty: List[Dict[str, Any]], suma: Optional[float], tolerancja: float) -> bool:
+    """
+    Sprawdza, czy ceny produktów sumują się do sumy z paragonu.
+    
+    Args:
+        produkty: Produkty z cenami
+        suma: Suma z paragonu (None - brak sumy, nie można sprawdzić)
+        tolerancja: Dopuszczalna różnica w złotych
+    
+    Returns:
+        bool: True jeśli suma jest znana i zgodna
+    """
+    if suma is None:
+        return False
+    return abs(sum(produkt['cena'] for produkt in produkty) - suma) <= tolerancja
+
+
+def produkty_poprawne(produkty: List[Any]) -> bool:
+    """
+    Sprawdza, czy każdy produkt (np. z odpowiedzi modelu językowego) ma nazwę i liczbową cenę.
+    
+    Args:
+        produkty: Produkty do sprawdzenia
+    
+    Returns:
+        bool: True jeśli wszystkie produkty można zsumować z pozycjami z reguł
+    """
+    for produkt in produkty:
+        if not isinstance(produkt, dict) or not str(produkt.get('nazwa') or '').strip():
+            return False
+        cena = produkt.get('cena')
+        if isinstance(cena, bool) or not isinstance(cena, (int, float)) or cena != cena:
+            return False
+    return True
+
+
+def _pozycja(dopasowanie: 're.Match', nazwa: str) -> Optional[Dict[str, Any]]:
+    """
+    Tworzy produkt z wiersza "ilość x cena wartość", jeśli liczby są ze sobą zgodne.
+    """
+    ilosc = _liczba(dopasowanie.group('ilosc'))
+    wartosc = _liczba(dopasowanie.group('wartosc'))
+    # Niezgodny iloczyn to zwykle błędnie odczytana cyfra - wiersz trafi do AI
+    if not nazwa or wartosc <= 0 or abs(round(ilosc * _liczba(dopasowanie.group('cena')), 2) - wartosc) > 0.011:
+        return None
+    return {"nazwa": nazwa, "cena": wartosc, "ilosc": ilosc}
+
+
+def parsuj_paragon_regulami(wiersze: List[str], tolerancja_sumy: float = 0.02) -> WynikParsowania:
+    """
+    Wyodrębnia produkty z wierszy polskiego paragonu fiskalnego wyrażeniami regularnymi.
+    
+    Rozpoznawane są wiersze "nazwa ilość x cena wartość PTU" (także
+    z nazwą w poprzednim wierszu), "nazwa wartość PTU" oraz rabaty
+    odejmowane od poprzedniej pozycji. Wynik jest pewny, gdy ceny
+    sumują się do sumy z paragonu, a bez sumy - gdy rozpoznano każdy
+    wiersz sekcji pozycji.
+    
+    Args:
+        wiersze: Wiersze paragonu (wiersze_z_wynikow lub linie tekstu)
+        tolerancja_sumy: Dopuszczalna różnica sumy cen i sumy z paragonu w złotych
+    
+    Returns:
+        WynikParsowania: Produkty, niesparsowane wiersze i ocena pewności
+    """
+    poczatek, koniec = sekcja_pozycji(wiersze)
+    suma = None
+    for wiersz in wiersze[koniec:]:
+        dopasowanie = _SUMA.match(wiersz)
+        if dopasowanie:
+            suma = _liczba(dopasowanie.group('kwota'))
+            break
+    
+    produkty: List[Dict[str, Any]] = []
+    niesparsowane: List[str] = []
+    nazwa_oczekujaca: Optional[str] = None
+    for wiersz in wiersze[poczatek:koniec]:
+        wiersz = ' '.join(wiersz.split())
+        if sum(znak.isalnum() for znak in wiersz) < 2 or _PO_RABACIE.search(wiersz):
+            continue  # separatory i wiersze informacyjne
+        
+        rabat = _WIERSZ_RABATU.match(wiersz)
+        if rabat:
+            if produkty:
+                produkty[-1]["cena"] = round(produkty[-1]["cena"] - abs(_liczba(rabat.group('kwota'))), 2)
+            else:
+                niesparsowane.append(wiersz)
+            continue
+        if not _KWOTA_W_WIERSZU.search(wiersz):
+            # Sama nazwa - ilość i cena mogą być w następnym wierszu
+            if nazwa_oczekujaca:
+                niesparsowane.append(nazwa_oczekujaca)
+            nazwa_oczekujaca = wiersz
+            continue
+        
+        produkt = None
+        pozycja = _WIERSZ_POZYCJI.match(wiersz)
+        bez_ilosci = _WIERSZ_BEZ_ILOSCI.match(wiersz)
+        if pozycja:
+            nazwa = pozycja.group('nazwa').strip()
+            if not nazwa and nazwa_oczekujaca:
+                nazwa, nazwa_oczekujaca = nazwa_oczekujaca, None
+            produkt = _pozycja(pozycja, nazwa)
+        elif bez_ilosci and _liczba(bez_ilosci.group('wartosc')) > 0:
+            produkt = {"nazwa": bez_ilosci.group('nazwa').strip(), "cena": _liczba(bez_ilosci.group('wartosc')),
+                       "ilosc": 1.0}
+        
+        if nazwa_oczekujaca:
+            niesparsowane.append(nazwa_oczekujaca)
+            nazwa_oczekujaca = None
+        if produkt is None:
+            niesparsowane.append(wiersz)
+        else:
+            produkty.append(produkt)
+    if nazwa_oczekujaca:
+        niesparsowane.append(nazwa_oczekujaca)
+    
+    pewny = bool(produkty) and (suma_zgodna(produkty, suma, tolerancja_sumy)
+                                or (suma is None and not niesparsowane))
+    return WynikParsowania(produkty, niesparsowane, suma, pewny)
@@ -0,0 +1,160 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Znacznik końca danych przekazywany przez kolejki między etapami
+_KONIEC = object()
+
+
+class PotokParagonow:
+    """
+    Potok etapów przetwarzania połączonych ograniczonymi kolejkami.
+    
+    Każdy etap ma własne wątki, więc gdy jeden paragon czeka na odpowiedź
+    modelu językowego, kolejny może być już rozpoznawany przez OCR. Kolejki
+    mają ograniczony rozmiar: szybki etap zatrzymuje się, gdy następny nie
+    nadąża, zamiast gromadzić w pamięci obrazy i wyniki całej partii.
+    
+    Funkcja etapu otrzymuje wynik poprzedniego etapu. Zwrócenie None (lub
+    wyjątek) oznacza niepowodzenie - element przechodzi dalej bez
+    przetwarzania, a na liście wyników ma wartość None.
+    
+    Atrybuty:
+        rozmiar_kolejki (int): Maksymalna liczba elementów czekających przed każdym etapem
+        czasy_etapow (Dict[str, float]): Łączny czas pracy każdego etapu (w sekundach)
+    """
+    
+    def __init__(self, rozmiar_kolejki: int = 2):
+        """
+        Inicjalizuje pusty potok.
+        
+        Args:
+            rozmiar_kolejki: Maksymalna liczba elementów czekających przed każdym etapem
+        """
+        self.rozmiar_kolejki = max(1, rozmiar_kolejki)
+        self.czasy_etapow: Dict[str, float] = {}
+        self._etapy: List[Tuple[str, Callable[[Any], Any], int, Optional[int]]] = []
+        self._blokada = threading.Lock()
+    
+    def dodaj_etap(self, nazwa: str, funkcja: Callable[[Any], Any], watki: int = 1,
+                   wsad: Optional[int] = None) -> 'PotokParagonow':
+        """
+        Dodaje etap na końcu potoku.
+        
+        Etap wsadowy (podany wsad) otrzymuje listę elementów - tyle, ile czeka
+        w kolejce, najwyżej wsad - i zwraca listę wyników tej samej długości.
+        Nie czeka na zapełnienie wsadu, więc nie opóźnia pojedynczych elementów.
+        
+        Args:
+            nazwa: Nazwa etapu (w komunikatach i czasach)
+            funkcja: Funkcja przetwarzająca pojedynczy element (w etapie wsadowym - listę)
+            watki: Liczba elementów (wsadów) przetwarzanych w etapie jednocześnie
+            wsad: Maksymalna liczba elementów przekazywanych funkcji naraz;
+                None - funkcja otrzymuje pojedyncze elementy
+        
+        Returns:
+            PotokParagonow: Ten sam potok (do łączenia wywołań)
+        """
+        self._etapy.append((nazwa, funkcja, max(1, watki), None if wsad is None else max(1, wsad)))
+        self.czasy_etapow[nazwa] = 0.0
+        return self
+    
+    def uruchom(self, elementy: Iterable[Any]) -> List[Any]:
+        """
+        Przepuszcza elementy przez wszystkie etapy.
+        
+        Args:
+            elementy: Elementy wejściowe
+        
+        Returns:
+            List[Any]: Wyniki ostatniego etapu w kolejności elementów wejściowych
+                (None dla elementów, których przetwarzanie się nie powiodło)
+        """
+        elementy = list(elementy)
+        # Przed etapem wsadowym musi się zmieścić cały wsad
+        kolejki = [queue.Queue(maxsize=max(self.rozmiar_kolejki, wsad or 1)) for _, _, _, wsad in self._etapy]
+        wyjscie: queue.Queue = queue.Queue()
+        pozostale_watki = [watki for _, _, watki, _ in self._etapy]
+        
+        def _zakoncz_etap(numer: int) -> None:
+            # Ostatni kończący wątek etapu przekazuje koniec danych dalej
+            with self._blokada:
+                pozostale_watki[numer] -= 1
+                ostatni = pozostale_watki[numer] == 0
+            if not ostatni:
+                return
+            if numer + 1 < len(self._etapy):
+                for _ in range(self._etapy[numer + 1][2]):
+                    kolejki[numer + 1].put(_KONIEC)
+            else:
+                wyjscie.put(_KONIEC)
+        
+        def _pobierz_wsad(numer: int, wsad: Optional[int]) -> Tuple[List[Tuple[int, Any]], bool]:
+            # Czeka na pierwszy element, pozostałe bierze tylko, jeśli już czekają
+            elementy_wsadu = []
+            koniec = False
+            element = kolejki[numer].get()
+            while element is not _KONIEC:
+                elementy_wsadu.append(element)
+                if len(elementy_wsadu) >= (wsad or 1):
+                    break
+                try:
+                    element = kolejki[numer].get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                koniec = True
+            return elementy_wsadu, koniec
+        
+        def _pracuj(numer: int) -> None:
+            nazwa, funkcja, _, wsad = self._etapy[numer]
+            dalej = kolejki[numer + 1] if numer + 1 < len(self._etapy) else wyjscie
+            koniec = False
+            while not koniec:
+                elementy_wsadu, koniec = _pobierz_wsad(numer, wsad)
+                # Elementy, które nie powiodły się wcześniej, przechodzą bez przetwarzania
+                do_przetworzenia = [(indeks, wartosc) for indeks, wartosc in elementy_wsadu if wartosc is not None]
+                wyniki = {}
+                if do_przetworzenia:
+                    start = time.perf_counter()
+                    try:
+                        if wsad is not None:
+                            wartosci = funkcja([wartosc for _, wartosc in do_przetworzenia])
+                        else:
+                            wartosci = [funkcja(do_przetworzenia[0][1])]
+                        wyniki = {indeks: wartosc for (indeks, _), wartosc in zip(do_przetworzenia, wartosci)}
+                    except Exception as e:
+                        print(f"❌ Błąd w etapie '{nazwa}': {e}")
+                    with self._blokada:
+                        self.czasy_etapow[nazwa] += time.perf_counter() - start
+                for indeks, _ in elementy_wsadu:
+                    dalej.put((indeks, wyniki.get(indeks)))
+            _zakoncz_etap(numer)
+        
+        def _podawaj() -> None:
+            # Blokujące put() na ograniczonej kolejce wstrzymuje podawanie (backpressure)
+            for element in enumerate(elementy):
+                kolejki[0].put(element)
+            for _ in range(self._etapy[0][2]):
+                kolejki[0].put(_KONIEC)
+        
+        if not self._etapy:
+            return elementy
+        watki = [threading.Thread(target=_podawaj, name="potok-wejscie", daemon=True)]
+        for numer, (nazwa, _, liczba, _) in enumerate(self._etapy):
+            watki.extend(threading.Thread(target=_pracuj, args=(numer,), name=f"potok-{nazwa}", daemon=True)
+                         for _ in range(liczba))
+        for watek in watki:
+            watek.start()
+        
+        wyniki: List[Any] = [None] * len(elementy)
+        while True:
+            element = wyjscie.get()
+            if element is _KONIEC:
+                break
+            indeks, wartosc = element
+            wyniki[indeks] = wartosc
+        for watek in watki:
+            watek.join()
+        return wyniki
@@ -0,0 +1,164 @@
+import cv2
+import numpy as np
+from typing import Optional
+
+# Wykrywanie konturu i szacowanie wielkości znaków działa na pomniejszonej kopii obrazu
+MAKS_BOK_WYKRYWANIA = 800
+MAKS_BOK_ANALIZY = 1600
+
+# Paragon musi zajmować rozsądną część kadru; prawie cały kadr oznacza skan - bez przycinania
+MIN_UDZIAL_PARAGONU = 0.15
+MAKS_UDZIAL_PARAGONU = 0.97
+
+# Granice skalowania i bezpieczny rozmiar, gdy nie da się oszacować wysokości znaków
+MIN_SKALA = 0.2
+MAKS_SKALA = 2.0
+MAKS_BOK_BEZ_SZACUNKU = 2560
+MIN_LICZBA_ZNAKOW = 20
+
+
+def _pomniejsz(obraz: np.ndarray, maks_bok: int):
+    skala = min(1.0, maks_bok / max(obraz.shape[:2]))
+    if skala < 1.0:
+        obraz = cv2.resize(obraz, None, fx=skala, fy=skala, interpolation=cv2.INTER_AREA)
+    return obraz, skala
+
+
+def wykryj_paragon(szary: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Wyszukuje kontur paragonu - jasnego, w przybliżeniu prostokątnego obszaru na tle.
+    
+    Args:
+        szary: Obraz w skali szarości
+    
+    Returns:
+        Optional[np.ndarray]: Cztery narożniki paragonu (4x2, w pikselach obrazu)
+            lub None, jeśli paragon wypełnia kadr albo nie został znaleziony
+    """
+    maly, skala = _pomniejsz(szary, MAKS_BOK_WYKRYWANIA)
+    rozmyty = cv2.GaussianBlur(maly, (5, 5), 0)
+    _, maska = cv2.threshold(rozmyty, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # Domknięcie zalewa ciemny tekst, aby paragon był jedną jasną plamą
+    jadro = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 15))
+    maska = cv2.morphologyEx(maska, cv2.MORPH_CLOSE, jadro)
+    
+    # [-2]: OpenCV 3 zwraca (obraz, kontury, hierarchia), OpenCV 4 - (kontury, hierarchia)
+    kontury = cv2.findContours(maska, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+    if not kontury:
+        return None
+    kontur = max(kontury, key=cv2.contourArea)
+    udzial = cv2.contourArea(kontur) / float(maly.shape[0] * maly.shape[1])
+    if not MIN_UDZIAL_PARAGONU <= udzial <= MAKS_UDZIAL_PARAGONU:
+        return None
+    
+    przyblizenie = cv2.approxPolyDP(kontur, 0.02 * cv2.arcLength(kontur, True), True)
+    if len(przyblizenie) == 4 and cv2.isContourConvex(przyblizenie):
+        narozniki = przyblizenie.reshape(4, 2).astype(np.float32)
+    else:
+        # Pognieciony lub częściowo zasłonięty paragon - najmniejszy obejmujący prostokąt
+        narozniki = cv2.boxPoints(cv2.minAreaRect(kontur)).astype(np.float32)
+    return narozniki / skala
+
+
+def _uporzadkuj_narozniki(narozniki: np.ndarray) -> np.ndarray:
+    """
+    Porządkuje narożniki: lewy górny, prawy górny, prawy dolny, lewy dolny.
+    
+    Args:
+        narozniki: Cztery punkty (x, y) w dowolnej kolejności
+    
+    Returns:
+        np.ndarray: Uporządkowane narożniki (4x2, float32)
+    """
+    suma = narozniki.sum(axis=1)
+    roznica = np.diff(narozniki, axis=1).ravel()
+    return np.array([narozniki[np.argmin(suma)], narozniki[np.argmin(roznica)],
+                     narozniki[np.argmax(suma)], narozniki[np.argmax(roznica)]], dtype=np.float32)
+
+
+def wyprostuj_paragon(szary: np.ndarray, narozniki: np.ndarray) -> np.ndarray:
+    """
+    Wycina paragon i prostuje go (usuwa obrót i perspektywę).
+    
+    Args:
+        szary: Obraz w skali szarości
+        narozniki: Narożniki paragonu zwrócone przez wykryj_paragon
+    
+    Returns:
+        np.ndarray: Prostokątny obraz samego paragonu
+    """
+    lg, pg, pd, ld = _uporzadkuj_narozniki(narozniki)
+    szerokosc = int(round(max(np.linalg.norm(pg - lg), np.linalg.norm(pd - ld))))
+    wysokosc = int(round(max(np.linalg.norm(ld - lg), np.linalg.norm(pd - pg))))
+    cel = np.array([[0, 0], [szerokosc - 1, 0], [szerokosc - 1, wysokosc - 1], [0, wysokosc - 1]],
+                   dtype=np.float32)
+    macierz = cv2.getPerspectiveTransform(np.array([lg, pg, pd, ld]), cel)
+    return cv2.warpPerspective(szary, macierz, (szerokosc, wysokosc),
+                               flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def szacuj_wysokosc_znakow(szary: np.ndarray) -> Optional[float]:
+    """
+    Szacuje typową wysokość znaków jako medianę wysokości spójnych ciemnych obszarów.
+    
+    Args:
+        szary: Obraz w skali szarości
+    
+    Returns:
+        Optional[float]: Wysokość znaków w pikselach lub None, gdy znaleziono za mało znaków
+    """
+    maly, skala = _pomniejsz(szary, MAKS_BOK_ANALIZY)
+    _, binarny = cv2.threshold(maly, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    _, _, statystyki, _ = cv2.connectedComponentsWithStats(binarny, connectivity=8)
+    wysokosci = statystyki[1:, cv2.CC_STAT_HEIGHT]
+    szerokosci = statystyki[1:, cv2.CC_STAT_WIDTH]
+    # Znaki: nie szum, nie linie ani ramki, nie długie poziome kreski
+    znaki = (wysokosci >= 4) & (wysokosci <= maly.shape[0] * 0.1) & (szerokosci <= wysokosci * 3)
+    if np.count_nonzero(znaki) < MIN_LICZBA_ZNAKOW:
+        return None
+    return float(np.median(wysokosci[znaki])) / skala
+
+
+def przeskaluj(szary: np.ndarray, skala: float) -> np.ndarray:
+    """
+    Skaluje obraz, pomijając zmiany mniejsze niż 10%.
+    
+    Args:
+        szary: Obraz w skali szarości
+        skala: Współczynnik skalowania (ograniczany do MIN_SKALA..MAKS_SKALA)
+    
+    Returns:
+        np.ndarray: Przeskalowany obraz
+    """
+    skala = min(MAKS_SKALA, max(MIN_SKALA, skala))
+    if 0.9 <= skala <= 1.1:
+        return szary
+    interpolacja = cv2.INTER_AREA if skala < 1.0 else cv2.INTER_CUBIC
+    return cv2.resize(szary, None, fx=skala, fy=skala, interpolation=interpolacja)
+
+
+def przygotuj_geometrie(szary: np.ndarray, wysokosc_znakow: int) -> np.ndarray:
+    """
+    Wycina i prostuje paragon, a następnie skaluje go do docelowej wysokości znaków.
+    
+    Zdjęcie z telefonu (12 Mpx i więcej) zawiera zwykle dużo tła, a znaki są
+    kilkukrotnie większe, niż potrzebuje OCR. Po przycięciu i przeskalowaniu
+    dalsze przygotowanie obrazu i EasyOCR przetwarzają wielokrotnie mniej pikseli.
+    
+    Args:
+        szary: Obraz w skali szarości
+        wysokosc_znakow: Docelowa wysokość znaków w pikselach
+    
+    Returns:
+        np.ndarray: Obraz paragonu gotowy do poprawy kontrastu i binaryzacji
+    """
+    narozniki = wykryj_paragon(szary)
+    if narozniki is not None:
+        szary = wyprostuj_paragon(szary, narozniki)
+    
+    wysokosc = szacuj_wysokosc_znakow(szary)
+    if wysokosc:
+        return przeskaluj(szary, wysokosc_znakow / wysokosc)
+    if max(szary.shape[:2]) > MAKS_BOK_BEZ_SZACUNKU:
+        return przeskaluj(szary, MAKS_BOK_BEZ_SZACUNKU / max(szary.shape[:2]))
+    return szary
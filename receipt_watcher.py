@@ -0,0 +1,240 @@
+import fnmatch
+import os
+import select
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import KONFIGURACJA
+from ocr_processor import ParagonProcessor, ROZSZERZENIA_PARAGONOW
+
+# Podpis pliku: rozmiar i czas modyfikacji - zmiana oznacza, że plik jest jeszcze zapisywany
+PodpisPliku = Tuple[int, int]
+
+
+class _Inotify:
+    """
+    Powiadomienia jądra Linux o nowych plikach w folderze (inotify przez ctypes, bez dodatkowych pakietów).
+    """
+    
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    
+    def __init__(self, folder: str):
+        """
+        Rozpoczyna obserwowanie folderu.
+        
+        Args:
+            folder: Obserwowany folder
+        
+        Raises:
+            OSError: Gdy inotify jest niedostępne (inny system, limit obserwacji)
+        """
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify niedostępne w tym systemie")
+        self._fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        maska = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(folder), maska) < 0:
+            blad = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(blad, f"inotify_add_watch: {folder}")
+    
+    def czekaj(self, limit_s: float) -> bool:
+        """
+        Czeka na zmianę w folderze.
+        
+        Args:
+            limit_s: Maksymalny czas oczekiwania w sekundach
+        
+        Returns:
+            bool: True jeśli w folderze coś się zmieniło
+        """
+        gotowe, _, _ = select.select([self._fd], [], [], limit_s)
+        if not gotowe:
+            return False
+        # Szczegóły zdarzeń są niepotrzebne - po każdej zmianie folder jest skanowany
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+    
+    def zamknij(self) -> None:
+        os.close(self._fd)
+
+
+class ObserwatorParagonow:
+    """
+    Tryb demona: obserwuje folder nowych paragonów i od razu je przetwarza.
+    
+    Czytnik EasyOCR (lub pula procesów OCR) i model LLM są wczytywane raz,
+    przy starcie, więc nowy paragon staje się gotowym do importu plikiem
+    JSON w ciągu kilku sekund. Zmiany w folderze zgłasza inotify, a gdy
+    jest niedostępne - folder jest skanowany co demon.interwal_skanowania_s.
+    
+    Plik jest przetwarzany, gdy jego rozmiar i czas modyfikacji nie zmieniły
+    się przez demon.czas_stabilizacji_s (zapis się zakończył). Gdy pliki
+    napływają seriami (skaner, synchronizacja z telefonu), demon czeka, aż
+    folder się uspokoi, i przetwarza całą serię razem - najdłużej jednak
+    demon.maks_opoznienie_s od pojawienia się pierwszego gotowego pliku.
+    """
+    
+    def __init__(self, procesor: ParagonProcessor, folder: Optional[str] = None):
+        """
+        Inicjalizuje obserwatora.
+        
+        Args:
+            procesor: Procesor paragonów (jego czytnik OCR pozostaje w pamięci)
+            folder: Obserwowany folder (domyślnie folder nowych paragonów procesora)
+        """
+        self.procesor = procesor
+        self.folder = folder or procesor.folder_nowe
+        self._oczekujace: Dict[str, Tuple[PodpisPliku, float]] = {}
+        self._przetworzone: Dict[str, PodpisPliku] = {}
+        self._ostatnia_zmiana = 0.0
+        self._stop = threading.Event()
+    
+    def zatrzymaj(self) -> None:
+        """
+        Kończy obserwowanie po bieżącej partii paragonów.
+        """
+        self._stop.set()
+    
+    def _skanuj(self) -> Dict[str, PodpisPliku]:
+        """
+        Zwraca podpisy wszystkich plików paragonów w obserwowanym folderze.
+        
+        Returns:
+            Dict[str, PodpisPliku]: Ścieżka → (rozmiar, czas modyfikacji w ns)
+        """
+        pliki = {}
+        try:
+            wpisy = list(os.scandir(self.folder))
+        except OSError as e:
+            print(f"❌ Nie można odczytać folderu '{self.folder}': {e}")
+            return pliki
+        for wpis in wpisy:
+            if not any(fnmatch.fnmatchcase(wpis.name, wzorzec) for wzorzec in ROZSZERZENIA_PARAGONOW):
+                continue
+            try:
+                stat = wpis.stat()
+            except OSError:
+                continue
+            if wpis.is_file():
+                pliki[wpis.path] = (stat.st_size, stat.st_mtime_ns)
+        return pliki
+    
+    def _gotowe_pliki(self, teraz: float) -> List[str]:
+        """
+        Aktualizuje stan plików w folderze i zwraca te, które można już przetworzyć.
+        
+        Args:
+            teraz: Bieżący czas (time.monotonic)
+        
+        Returns:
+            List[str]: Ścieżki plików gotowych do przetworzenia (pusta, gdy seria jeszcze napływa)
+        """
+        stan = self._skanuj()
+        for sciezka, podpis in stan.items():
+            if self._przetworzone.get(sciezka) == podpis:
+                continue  # np. nie udało się go przenieść - bez ponownego przetwarzania
+            poprzedni = self._oczekujace.get(sciezka)
+            if poprzedni is None or poprzedni[0] != podpis:
+                self._oczekujace[sciezka] = (podpis, teraz)
+                self._ostatnia_zmiana = teraz
+        # Pliki usunięte lub przeniesione przez kogoś innego
+        for slownik in (self._oczekujace, self._przetworzone):
+            for sciezka in [s for s in slownik if s not in stan]:
+                del slownik[sciezka]
+        
+        stabilizacja = KONFIGURACJA["demon"]["czas_stabilizacji_s"]
+        gotowe = {sciezka: od_kiedy for sciezka, (_, od_kiedy) in self._oczekujace.items()
+                  if teraz - od_kiedy >= stabilizacja}
+        if not gotowe:
+            return []
+        seria_trwa = teraz - self._ostatnia_zmiana < stabilizacja
+        if seria_trwa and teraz - min(gotowe.values()) < KONFIGURACJA["demon"]["maks_opoznienie_s"]:
+            return []
+        return sorted(gotowe)
+    
+    def _przetworz(self, pliki: List[str]) -> None:
+        """
+        Przetwarza partię gotowych plików i zapamiętuje je, aby nie wracały do kolejki.
+        
+        Args:
+            pliki: Ścieżki plików paragonów
+        """
+        for sciezka in pliki:
+            self._przetworzone[sciezka] = self._oczekujace.pop(sciezka)[0]
+        print(f"\n📥 Nowe paragony: {len(pliki)}")
+        try:
+            self.procesor.przetworz_pliki(pliki)
+        except Exception as e:
+            print(f"❌ Błąd podczas przetwarzania paragonów: {e}")
+    
+    def _rozgrzej(self) -> None:
+        """
+        Wczytuje modele OCR i LLM przed pierwszym paragonem.
+        """
+        start = time.perf_counter()
+        if self.procesor._liczba_procesow_ocr() <= 1:
+            try:
+                self.procesor.reader
+            except Exception as e:
+                print(f"⚠️ Nie udało się zainicjalizować EasyOCR: {e}")
+        if KONFIGURACJA["llm"]["enabled"]:
+            from llm_integration import klient_llm
+            klient_llm(KONFIGURACJA["llm"]).rozgrzej()
+        print(f"🔥 Modele gotowe w {time.perf_counter() - start:.1f} s")
+    
+    def _zrodlo_zdarzen(self) -> Optional[_Inotify]:
+        if not KONFIGURACJA["demon"]["inotify"]:
+            return None
+        try:
+            return _Inotify(self.folder)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️ inotify niedostępne ({e}) - folder będzie skanowany okresowo")
+            return None
+    
+    def uruchom(self, rozgrzej: bool = True) -> None:
+        """
+        Obserwuje folder do wywołania zatrzymaj() lub Ctrl+C.
+        
+        Args:
+            rozgrzej: Czy wczytać modele OCR i LLM przed pierwszym paragonem
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        if rozgrzej:
+            self._rozgrzej()
+        zdarzenia = self._zrodlo_zdarzen()
+        tryb = "inotify" if zdarzenia is not None else "skanowanie"
+        print(f"👀 Obserwuję folder {self.folder} ({tryb}) - Ctrl+C kończy")
+        try:
+            with self.procesor.pula_ocr():
+                while not self._stop.is_set():
+                    pliki = self._gotowe_pliki(time.monotonic())
+                    if pliki:
+                        self._przetworz(pliki)
+                        continue
+                    # Gdy pliki czekają na zakończenie zapisu, folder jest sprawdzany częściej
+                    limit = KONFIGURACJA["demon"]["interwal_skanowania_s"]
+                    if self._oczekujace:
+                        limit = min(limit, KONFIGURACJA["demon"]["czas_stabilizacji_s"] / 2)
+                    if zdarzenia is not None:
+                        zdarzenia.czekaj(limit)
+                    else:
+                        self._stop.wait(limit)
+        except KeyboardInterrupt:
+            print("\n👋 Zakończono obserwowanie folderu")
+        finally:
+            if zdarzenia is not None:
+                zdarzenia.zamknij()
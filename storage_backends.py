@@ -0,0 +1,919 @@
+import json
+import os
+import hashlib
+import sqlite3
+from typing import List, Optional, Dict, Any
+from datetime import date, datetime, timedelta
+from models import Produkt, ProduktTable
+from binary_snapshot import MigawkaBinarna, zakoduj_migawke, czy_migawka_binarna
+
+def filtruj_aktywne(produkty: List[Produkt]) -> List[Produkt]:
+    """
+    Wybiera niezużyte produkty i sortuje je według daty ważności.
+    
+    Args:
+        produkty: Lista produktów
+        
+    Returns:
+        List[Produkt]: Lista aktywnych produktów
+    """
+    aktywne = [p for p in produkty if not p.zuzyty]
+    aktywne.sort(key=lambda p: p.data_waznosci)
+    return aktywne
+
+def filtruj_wygasajace(produkty: List[Produkt], do_dnia: date) -> List[Produkt]:
+    """
+    Wybiera niezużyte produkty z datą ważności nie późniejszą niż podany dzień.
+    
+    Args:
+        produkty: Lista produktów
+        do_dnia: Ostatni dzień (włącznie) uwzględniany w wyniku
+        
+    Returns:
+        List[Produkt]: Lista produktów posortowana według daty ważności
+    """
+    return [p for p in filtruj_aktywne(produkty) if p.data_waznosci.date() <= do_dnia]
+
+def policz_kategorie(produkty: List[Produkt]) -> Dict[str, int]:
+    """
+    Zlicza niezużyte produkty w poszczególnych kategoriach.
+    
+    Args:
+        produkty: Lista produktów
+        
+    Returns:
+        Dict[str, int]: Liczba produktów dla każdej kategorii
+    """
+    kategorie = {}
+    for p in produkty:
+        if not p.zuzyty:
+            kategorie[p.kategoria] = kategorie.get(p.kategoria, 0) + 1
+    return kategorie
+
+def wartosc_aktywnych(produkty: List[Produkt]) -> float:
+    """
+    Sumuje ceny niezużytych produktów.
+    
+    Args:
+        produkty: Lista produktów
+        
+    Returns:
+        float: Łączna wartość aktywnych produktów
+    """
+    return sum(p.cena for p in produkty if not p.zuzyty and p.cena)
+
+class BackendPrzechowywania:
+    """
+    Interfejs backendu przechowywania produktów używany przez StorageManager.
+    
+    Metody zapytań mają domyślne implementacje filtrujące pełną listę
+    w Pythonie. Backendy z własnym silnikiem zapytań (np. SQLite)
+    nadpisują je wersjami korzystającymi z indeksów i ustawiają
+    indeksowane_zapytania na True.
+    """
+    
+    indeksowane_zapytania = False
+    
+    def skan_kolumnowy(self) -> bool:
+        """
+        Informuje, czy zapytania zbiorcze (wygasające, kategorie, wartość)
+        można obsłużyć bez dekodowania wszystkich produktów.
+        
+        Returns:
+            bool: True jeśli backend odczyta tylko potrzebne kolumny
+        """
+        return self.indeksowane_zapytania
+    
+    def sygnatura(self) -> Any:
+        """
+        Zwraca wartość zmieniającą się przy każdej zmianie danych na dysku.
+        
+        StorageManager porównuje sygnatury, aby wiedzieć, czy jego pamięć
+        podręczna produktów jest nadal aktualna.
+        
+        Returns:
+            Any: Porównywalna sygnatura stanu danych
+        """
+        raise NotImplementedError
+    
+    def sygnatura_trwala(self) -> Any:
+        """
+        Zwraca sygnaturę stanu danych porównywalną między uruchomieniami programu.
+        
+        Służy do sprawdzania, czy zapisane obok danych agregaty są aktualne.
+        
+        Returns:
+            Any: Sygnatura dająca się zapisać jako JSON
+        """
+        return self.sygnatura()
+    
+    def wczytaj(self) -> List[Produkt]:
+        """
+        Wczytuje wszystkie produkty.
+        
+        Returns:
+            List[Produkt]: Lista obiektów Produkt w kolejności dodania
+        """
+        raise NotImplementedError
+    
+    def zapisz_wszystkie(self, produkty: List[Produkt]) -> None:
+        """
+        Zastępuje zawartość magazynu podaną listą produktów.
+        
+        Args:
+            produkty: Lista obiektów Produkt do zapisania
+        """
+        raise NotImplementedError
+    
+    def dodaj(self, produkt: Produkt) -> None:
+        """
+        Dodaje pojedynczy produkt.
+        
+        Args:
+            produkt: Obiekt Produkt do dodania
+        """
+        self.dodaj_wiele([produkt])
+    
+    def dodaj_wiele(self, produkty: List[Produkt]) -> None:
+        """
+        Dodaje partię produktów jednym, niepodzielnym zapisem.
+        
+        Args:
+            produkty: Lista obiektów Produkt do dodania
+        """
+        wszystkie = self.wczytaj()
+        wszystkie.extend(produkty)
+        self.zapisz_wszystkie(wszystkie)
+    
+    def usun(self, id_produktu: str) -> bool:
+        """
+        Usuwa produkt o podanym identyfikatorze.
+        
+        Args:
+            id_produktu: Identyfikator produktu do usunięcia
+            
+        Returns:
+            bool: True jeśli operacja została zapisana
+        """
+        produkty = self.wczytaj()
+        pozostale = [p for p in produkty if p.id != id_produktu]
+        if len(pozostale) == len(produkty):
+            return False
+        self.zapisz_wszystkie(pozostale)
+        return True
+    
+    def usun_wiele(self, id_produktow: List[str]) -> None:
+        """
+        Usuwa wiele produktów jednym zapisem.
+        
+        Args:
+            id_produktow: Identyfikatory produktów do usunięcia
+        """
+        do_usuniecia = set(id_produktow)
+        self.zapisz_wszystkie([p for p in self.wczytaj() if p.id not in do_usuniecia])
+    
+    def oznacz_zuzyty(self, id_produktu: str, data_zuzycia: datetime) -> bool:
+        """
+        Oznacza produkt o podanym identyfikatorze jako zużyty.
+        
+        Args:
+            id_produktu: Identyfikator produktu do oznaczenia
+            data_zuzycia: Data zużycia produktu
+            
+        Returns:
+            bool: True jeśli operacja została zapisana
+        """
+        produkty = self.wczytaj()
+        for p in produkty:
+            if p.id == id_produktu:
+                p.zuzyty = True
+                p.data_zuzycia = data_zuzycia
+                self.zapisz_wszystkie(produkty)
+                return True
+        return False
+    
+    def zaktualizuj(self, produkt: Produkt) -> bool:
+        """
+        Zastępuje zapisany produkt o tym samym identyfikatorze.
+        
+        Args:
+            produkt: Zmieniony obiekt Produkt
+            
+        Returns:
+            bool: True jeśli operacja została zapisana
+        """
+        produkty = self.wczytaj()
+        for i, p in enumerate(produkty):
+            if p.id == produkt.id:
+                produkty[i] = produkt
+                self.zapisz_wszystkie(produkty)
+                return True
+        return False
+    
+    def kompaktuj(self) -> None:
+        """
+        Porządkuje dane na dysku (domyślnie nic nie robi).
+        """
+        pass
+    
+    def wczytaj_tabele(self) -> ProduktTable:
+        """
+        Wczytuje produkty jako tabelę kolumnową.
+        
+        Returns:
+            ProduktTable: Tabela wszystkich produktów
+        """
+        return ProduktTable.z_produktow(self.wczytaj())
+    
+    def wczytaj_aktywne(self) -> List[Produkt]:
+        """
+        Wczytuje niezużyte produkty posortowane według daty ważności.
+        
+        Returns:
+            List[Produkt]: Lista aktywnych produktów
+        """
+        return filtruj_aktywne(self.wczytaj())
+    
+    def wczytaj_zuzyte(self) -> List[Produkt]:
+        """
+        Wczytuje produkty oznaczone jako zużyte.
+        
+        Returns:
+            List[Produkt]: Lista zużytych produktów
+        """
+        return [p for p in self.wczytaj() if p.zuzyty]
+    
+    def pobierz(self, id_produktow: List[str]) -> List[Produkt]:
+        """
+        Wczytuje produkty o podanych identyfikatorach.
+        
+        Args:
+            id_produktow: Identyfikatory produktów
+            
+        Returns:
+            List[Produkt]: Znalezione produkty
+        """
+        szukane = set(id_produktow)
+        return [p for p in self.wczytaj() if p.id in szukane]
+    
+    def wczytaj_wygasajace(self, do_dnia: date) -> List[Produkt]:
+        """
+        Wczytuje niezużyte produkty z datą ważności nie późniejszą niż podany dzień.
+        
+        Args:
+            do_dnia: Ostatni dzień (włącznie) uwzględniany w wyniku
+        
+        Returns:
+            List[Produkt]: Lista produktów posortowana według daty ważności
+        """
+        return filtruj_wygasajace(self.wczytaj(), do_dnia)
+    
+    def policz_kategorie(self) -> Dict[str, int]:
+        """
+        Zlicza niezużyte produkty w poszczególnych kategoriach.
+        
+        Returns:
+            Dict[str, int]: Liczba produktów dla każdej kategorii
+        """
+        return policz_kategorie(self.wczytaj())
+    
+    def wartosc_aktywnych(self) -> float:
+        """
+        Sumuje ceny niezużytych produktów.
+        
+        Returns:
+            float: Łączna wartość aktywnych produktów
+        """
+        return wartosc_aktywnych(self.wczytaj())
+
+
+class JsonBackend(BackendPrzechowywania):
+    """
+    Backend przechowujący produkty w jednym pliku JSON przepisywanym przy każdej zmianie.
+    """
+    
+    def __init__(self, sciezka_pliku: str):
+        """
+        Inicjalizuje backend JSON.
+        
+        Args:
+            sciezka_pliku: Ścieżka do pliku JSON z produktami
+        """
+        self.sciezka_pliku = sciezka_pliku
+        if not os.path.exists(self.sciezka_pliku):
+            os.makedirs(os.path.dirname(self.sciezka_pliku) or ".", exist_ok=True)
+            with open(self.sciezka_pliku, 'w', encoding='utf-8') as f:
+                json.dump([], f, ensure_ascii=False)
+    
+    @staticmethod
+    def _stat_pliku(sciezka: str) -> Optional[tuple]:
+        """
+        Zwraca identyfikację wersji pliku (i-węzeł, rozmiar, czas modyfikacji).
+        
+        Args:
+            sciezka: Ścieżka do pliku
+            
+        Returns:
+            Optional[tuple]: Krotka identyfikująca wersję pliku lub None, jeśli plik nie istnieje
+        """
+        try:
+            st = os.stat(sciezka)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    
+    def sygnatura(self) -> Any:
+        return self._stat_pliku(self.sciezka_pliku)
+    
+    def wczytaj(self) -> List[Produkt]:
+        with open(self.sciezka_pliku, 'r', encoding='utf-8') as f:
+            dane = json.load(f)
+        produkty = [Produkt.from_dict(p) for p in dane]
+        if any('id' not in p for p in dane):
+            # Dane sprzed wprowadzenia identyfikatorów - utrwal nadane id
+            self.zapisz_wszystkie(produkty)
+        return produkty
+    
+    def zapisz_wszystkie(self, produkty: List[Produkt]) -> None:
+        dane = [p.to_dict() for p in produkty]
+        with open(self.sciezka_pliku, 'w', encoding='utf-8') as f:
+            json.dump(dane, f, indent=4, ensure_ascii=False)
+
+
+class DziennikBackend(JsonBackend):
+    """
+    Backend z migawką i dziennikiem zmian dopisywanym na końcu pliku.
+    
+    Plik produktów jest migawką, a zmiany są dopisywane do dziennika
+    (jeden wpis JSON na linię). Odczyt odtwarza migawkę i dziennik,
+    a kompaktowanie zapisuje nową migawkę i czyści dziennik.
+    
+    Migawka jest zapisywana jako JSON albo w zwartym formacie binarnym
+    (plik .bin, zob. binary_snapshot). Przy zmianie formatu bieżąca
+    migawka wraz z dziennikiem jest przepisywana do nowego formatu.
+    """
+    
+    FORMATY_MIGAWKI = ("json", "binarny")
+    
+    def __init__(self, sciezka_pliku: str, kompaktuj_po_wpisach: int = 1000,
+                 format_migawki: str = "json"):
+        """
+        Inicjalizuje backend z dziennikiem.
+        
+        Args:
+            sciezka_pliku: Ścieżka do pliku migawki JSON
+            kompaktuj_po_wpisach: Liczba wpisów dziennika wyzwalająca kompaktowanie
+            format_migawki: Format migawki ("json" lub "binarny")
+        """
+        if format_migawki not in self.FORMATY_MIGAWKI:
+            raise ValueError(f"Nieznany format migawki: {format_migawki}")
+        self.sciezka_pliku = sciezka_pliku
+        self.sciezka_dziennika = os.path.splitext(sciezka_pliku)[0] + ".journal"
+        self.kompaktuj_po_wpisach = kompaktuj_po_wpisach
+        self.format_migawki = format_migawki
+        self._wpisy_w_dzienniku: Optional[int] = None
+        
+        sciezka_binarna = os.path.splitext(sciezka_pliku)[0] + ".bin"
+        if format_migawki == "binarny":
+            self.sciezka_migawki, inna_migawka = sciezka_binarna, sciezka_pliku
+        else:
+            self.sciezka_migawki, inna_migawka = sciezka_pliku, sciezka_binarna
+        
+        if os.path.exists(inna_migawka) and (
+                not os.path.exists(self.sciezka_migawki) or self._dziennik_dotyczy(inna_migawka)):
+            self._przejmij_migawke(inna_migawka)
+        elif not os.path.exists(self.sciezka_migawki):
+            os.makedirs(os.path.dirname(self.sciezka_migawki) or ".", exist_ok=True)
+            self._zapisz_atomowo(self.sciezka_migawki, self._zakoduj_migawke([]))
+    
+    def sygnatura(self) -> Any:
+        return (self._stat_pliku(self.sciezka_migawki), self._stat_pliku(self.sciezka_dziennika))
+    
+    def wczytaj(self) -> List[Produkt]:
+        with open(self.sciezka_migawki, 'rb') as f:
+            surowe = f.read()
+        sha1 = hashlib.sha1(surowe).hexdigest()
+        if czy_migawka_binarna(surowe) and not self._linie_dziennika(sha1):
+            # Brak zmian w dzienniku - produkty prosto z kolumn migawki
+            return MigawkaBinarna(surowe).produkty()
+        
+        dane = self._odtworz_dziennik(self._dekoduj_migawke(surowe), sha1)
+        produkty = [Produkt.from_dict(p) for p in dane]
+        if any('id' not in p for p in dane):
+            # Migawka sprzed wprowadzenia identyfikatorów - utrwal nadane id
+            self.zapisz_wszystkie(produkty)
+        return produkty
+    
+    def zapisz_wszystkie(self, produkty: List[Produkt]) -> None:
+        self._zapisz_migawke([p.to_dict() for p in produkty])
+    
+    def dodaj(self, produkt: Produkt) -> None:
+        self._dopisz_do_dziennika([{'op': 'dodaj', 'produkt': produkt.to_dict()}])
+    
+    def dodaj_wiele(self, produkty: List[Produkt]) -> None:
+        # Cała partia w jednej linii - przerwany zapis odrzuca ją w całości
+        self._dopisz_do_dziennika([{'op': 'partia', 'produkty': [p.to_dict() for p in produkty]}])
+    
+    # Operacje na identyfikatorach są dopisywane bez sprawdzania istnienia
+    # produktu - odtwarzanie pomija identyfikatory, których już nie ma.
+    
+    def usun(self, id_produktu: str) -> bool:
+        self._dopisz_do_dziennika([{'op': 'usun', 'id': id_produktu}])
+        return True
+    
+    def usun_wiele(self, id_produktow: List[str]) -> None:
+        self._dopisz_do_dziennika([{'op': 'usun_wiele', 'id': list(id_produktow)}])
+    
+    def oznacz_zuzyty(self, id_produktu: str, data_zuzycia: datetime) -> bool:
+        self._dopisz_do_dziennika([{'op': 'zuzyj', 'id': id_produktu, 'data': data_zuzycia.isoformat()}])
+        return True
+    
+    def zaktualizuj(self, produkt: Produkt) -> bool:
+        self._dopisz_do_dziennika([{'op': 'zmien', 'produkt': produkt.to_dict()}])
+        return True
+    
+    def kompaktuj(self) -> None:
+        """
+        Składa dziennik zmian z migawką w nową migawkę i czyści dziennik.
+        """
+        self.zapisz_wszystkie(self.wczytaj())
+    
+    def skan_kolumnowy(self) -> bool:
+        if self.format_migawki != "binarny":
+            return False
+        if self._wpisy_w_dzienniku is None and os.path.exists(self.sciezka_dziennika):
+            self._wpisy_w_dzienniku = self._policz_wpisy_dziennika()
+        return not self._wpisy_w_dzienniku
+    
+    def wczytaj_tabele(self) -> ProduktTable:
+        migawka = self._migawka_bez_zmian()
+        if migawka is None:
+            return super().wczytaj_tabele()
+        return migawka.tabela()
+    
+    def wczytaj_wygasajace(self, do_dnia: date) -> List[Produkt]:
+        migawka = self._migawka_bez_zmian()
+        if migawka is None:
+            return super().wczytaj_wygasajace(do_dnia)
+        return migawka.produkty(migawka.pozycje_wygasajacych(do_dnia))
+    
+    def policz_kategorie(self) -> Dict[str, int]:
+        migawka = self._migawka_bez_zmian()
+        if migawka is None:
+            return super().policz_kategorie()
+        return migawka.policz_kategorie()
+    
+    def wartosc_aktywnych(self) -> float:
+        migawka = self._migawka_bez_zmian()
+        if migawka is None:
+            return super().wartosc_aktywnych()
+        return migawka.wartosc_aktywnych()
+    
+    def _migawka_bez_zmian(self) -> Optional[MigawkaBinarna]:
+        """
+        Otwiera migawkę binarną, jeśli dziennik nie zawiera do niej zmian.
+        
+        Returns:
+            Optional[MigawkaBinarna]: Migawka do odczytu kolumnowego lub None
+        """
+        if self.format_migawki != "binarny":
+            return None
+        with open(self.sciezka_migawki, 'rb') as f:
+            surowe = f.read()
+        if self._linie_dziennika(hashlib.sha1(surowe).hexdigest()):
+            return None
+        return MigawkaBinarna(surowe)
+    
+    def _zakoduj_migawke(self, dane: List[Dict[str, Any]]) -> bytes:
+        """
+        Koduje słowniki produktów w formacie migawki tego backendu.
+        
+        Args:
+            dane: Lista słowników produktów
+            
+        Returns:
+            bytes: Zawartość pliku migawki
+        """
+        if self.format_migawki == "binarny":
+            return zakoduj_migawke(dane)
+        return json.dumps(dane, indent=4, ensure_ascii=False).encode('utf-8')
+    
+    @staticmethod
+    def _dekoduj_migawke(surowe: bytes) -> List[Dict[str, Any]]:
+        """
+        Dekoduje migawkę JSON lub binarną do listy słowników produktów.
+        
+        Args:
+            surowe: Zawartość pliku migawki
+            
+        Returns:
+            List[Dict[str, Any]]: Lista słowników produktów
+        """
+        if czy_migawka_binarna(surowe):
+            return MigawkaBinarna(surowe).slowniki()
+        return json.loads(surowe.decode('utf-8'))
+    
+    def _dziennik_dotyczy(self, sciezka: str) -> bool:
+        """
+        Sprawdza, czy dziennik został założony dla podanego pliku migawki.
+        
+        Args:
+            sciezka: Ścieżka do pliku migawki
+            
+        Returns:
+            bool: True jeśli nagłówek dziennika zawiera skrót tego pliku
+        """
+        if not os.path.exists(self.sciezka_dziennika):
+            return False
+        with open(self.sciezka_dziennika, 'r', encoding='utf-8') as f:
+            try:
+                naglowek = json.loads(f.readline())
+            except ValueError:
+                return False
+        with open(sciezka, 'rb') as f:
+            return naglowek.get('migawka_sha1') == hashlib.sha1(f.read()).hexdigest()
+    
+    def _przejmij_migawke(self, sciezka: str) -> None:
+        """
+        Przepisuje migawkę zapisaną w innym formacie (wraz z dziennikiem) do bieżącego formatu.
+        
+        Args:
+            sciezka: Ścieżka do migawki w poprzednim formacie
+        """
+        with open(sciezka, 'rb') as f:
+            surowe = f.read()
+        dane = self._odtworz_dziennik(self._dekoduj_migawke(surowe), hashlib.sha1(surowe).hexdigest())
+        self._zapisz_migawke(dane)
+        os.remove(sciezka)
+    
+    def _zapisz_migawke(self, dane: List[Dict[str, Any]]) -> None:
+        """
+        Atomowo zapisuje migawkę produktów i zakłada nowy, pusty dziennik.
+        
+        Nagłówek dziennika zawiera skrót migawki, na której bazuje. Dziennik
+        niepasujący do migawki (np. po przerwaniu kompaktowania) jest pomijany,
+        więc jego wpisy nie zostaną zastosowane dwukrotnie.
+        
+        Args:
+            dane: Lista słowników produktów
+        """
+        surowe = self._zakoduj_migawke(dane)
+        self._zapisz_atomowo(self.sciezka_migawki, surowe)
+        naglowek = json.dumps({'migawka_sha1': hashlib.sha1(surowe).hexdigest()}) + "\n"
+        self._zapisz_atomowo(self.sciezka_dziennika, naglowek.encode('utf-8'))
+        self._wpisy_w_dzienniku = 0
+    
+    def _zapisz_atomowo(self, sciezka: str, surowe: bytes) -> None:
+        """
+        Zapisuje plik przez plik tymczasowy i os.replace.
+        
+        Args:
+            sciezka: Ścieżka pliku docelowego
+            surowe: Zawartość pliku
+        """
+        sciezka_tymczasowa = sciezka + ".tmp"
+        with open(sciezka_tymczasowa, 'wb') as f:
+            f.write(surowe)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(sciezka_tymczasowa, sciezka)
+    
+    def _dopisz_do_dziennika(self, wpisy: List[Dict[str, Any]]) -> None:
+        """
+        Dopisuje wpisy na koniec dziennika bez odczytu migawki.
+        
+        Args:
+            wpisy: Lista operacji do dopisania
+        """
+        if not os.path.exists(self.sciezka_dziennika):
+            # Brak dziennika - załóż go dla bieżącej migawki
+            with open(self.sciezka_migawki, 'rb') as f:
+                dane = self._dekoduj_migawke(f.read())
+            self._zapisz_migawke(dane)
+        
+        # Po przerwanym zapisie ostatnia linia może nie mieć końca - zamknij ją
+        with open(self.sciezka_dziennika, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            brak_konca_linii = f.read(1) != b"\n"
+        
+        with open(self.sciezka_dziennika, 'a', encoding='utf-8') as f:
+            if brak_konca_linii:
+                f.write("\n")
+            for wpis in wpisy:
+                f.write(json.dumps(wpis, ensure_ascii=False) + "\n")
+            f.flush()
+        
+        if self._wpisy_w_dzienniku is None:
+            self._wpisy_w_dzienniku = self._policz_wpisy_dziennika()
+        else:
+            self._wpisy_w_dzienniku += len(wpisy)
+        
+        if self._wpisy_w_dzienniku >= self.kompaktuj_po_wpisach:
+            self.kompaktuj()
+    
+    def _policz_wpisy_dziennika(self) -> int:
+        """
+        Zlicza wpisy w dzienniku (bez nagłówka).
+        
+        Returns:
+            int: Liczba wpisów w dzienniku
+        """
+        with open(self.sciezka_dziennika, 'r', encoding='utf-8') as f:
+            return max(sum(1 for _ in f) - 1, 0)
+    
+    def _linie_dziennika(self, sha1_migawki: str) -> Optional[List[str]]:
+        """
+        Wczytuje wpisy dziennika należącego do migawki o podanym skrócie.
+        
+        Args:
+            sha1_migawki: Skrót SHA-1 zawartości migawki
+            
+        Returns:
+            Optional[List[str]]: Linie wpisów (bez nagłówka) lub None, jeśli dziennika
+            nie ma albo należy do innej migawki
+        """
+        if not os.path.exists(self.sciezka_dziennika):
+            return None
+        
+        with open(self.sciezka_dziennika, 'r', encoding='utf-8') as f:
+            linie = f.read().splitlines()
+        
+        if not linie:
+            return None
+        try:
+            naglowek = json.loads(linie[0])
+        except ValueError:
+            naglowek = {}
+        if naglowek.get('migawka_sha1') != sha1_migawki:
+            # Dziennik należy do innej migawki - został już złożony
+            self._wpisy_w_dzienniku = None
+            return None
+        return linie[1:]
+    
+    def _odtworz_dziennik(self, dane: List[Dict[str, Any]], sha1_migawki: str) -> List[Dict[str, Any]]:
+        """
+        Stosuje wpisy dziennika do danych wczytanych z migawki.
+        
+        Args:
+            dane: Lista słowników produktów z migawki
+            sha1_migawki: Skrót SHA-1 zawartości migawki
+            
+        Returns:
+            List[Dict[str, Any]]: Lista słowników produktów po zastosowaniu dziennika
+        """
+        linie = self._linie_dziennika(sha1_migawki)
+        if linie is None:
+            return dane
+        
+        # Słownik zachowuje kolejność dodania i daje dostęp po id w O(1)
+        rekordy = {p.get('id') or f"#{i}": p for i, p in enumerate(dane)}
+        wpisy = 0
+        for numer, linia in enumerate(linie):
+            try:
+                wpis = json.loads(linia)
+            except ValueError:
+                # Niedokończony zapis (np. przerwany proces) - pomiń
+                continue
+            wpisy += 1
+            if 'indeks' in wpis:
+                # Wpis z adresowaniem po pozycji (starszy format dziennika)
+                klucze = list(rekordy)
+                if not 0 <= wpis['indeks'] < len(klucze):
+                    continue
+                wpis['id'] = klucze[wpis['indeks']]
+            if wpis['op'] == 'dodaj':
+                rekordy[wpis['produkt'].get('id') or f"+{numer}"] = wpis['produkt']
+            elif wpis['op'] == 'partia':
+                for produkt in wpis['produkty']:
+                    rekordy[produkt['id']] = produkt
+            elif wpis['op'] == 'zmien' and wpis['produkt']['id'] in rekordy:
+                rekordy[wpis['produkt']['id']] = wpis['produkt']
+            elif wpis['op'] == 'usun':
+                rekordy.pop(wpis['id'], None)
+            elif wpis['op'] == 'usun_wiele':
+                for id_produktu in wpis['id']:
+                    rekordy.pop(id_produktu, None)
+            elif wpis['op'] == 'zuzyj' and wpis['id'] in rekordy:
+                rekordy[wpis['id']]['zuzyty'] = True
+                rekordy[wpis['id']]['data_zuzycia'] = wpis.get('data')
+        self._wpisy_w_dzienniku = wpisy
+        return list(rekordy.values())
+
+
+class SqliteBackend(BackendPrzechowywania):
+    """
+    Backend przechowujący produkty w bazie SQLite.
+    
+    Indeksy złożone (zuzyty, data_waznosci) i (zuzyty, kategoria) obsługują
+    zapytania o aktywne produkty wygasające w danym terminie oraz
+    liczniki kategorii bez wczytywania całej spiżarni.
+    """
+    
+    _KOLUMNY = "id, nazwa, kategoria, data_waznosci, cena, data_dodania, zuzyty, id_paragonu, data_zuzycia"
+    _WSTAW = f"INSERT INTO produkty ({_KOLUMNY}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    indeksowane_zapytania = True
+    
+    def __init__(self, sciezka_bazy: str):
+        """
+        Inicjalizuje backend SQLite i tworzy schemat, jeśli nie istnieje.
+        
+        Args:
+            sciezka_bazy: Ścieżka do pliku bazy danych
+        """
+        self.sciezka_bazy = sciezka_bazy
+        os.makedirs(os.path.dirname(sciezka_bazy) or ".", exist_ok=True)
+        self.polaczenie = sqlite3.connect(sciezka_bazy)
+        self.polaczenie.execute("PRAGMA journal_mode=WAL")
+        with self.polaczenie:
+            self.polaczenie.execute("""
+                CREATE TABLE IF NOT EXISTS produkty (
+                    id TEXT,
+                    nazwa TEXT NOT NULL,
+                    kategoria TEXT NOT NULL,
+                    data_waznosci TEXT NOT NULL,
+                    cena REAL,
+                    data_dodania TEXT NOT NULL,
+                    zuzyty INTEGER NOT NULL DEFAULT 0,
+                    id_paragonu TEXT,
+                    data_zuzycia TEXT
+                )""")
+            # Kolumny dodane w późniejszych wersjach - uzupełnij starsze bazy
+            kolumny = [w[1] for w in self.polaczenie.execute("PRAGMA table_info(produkty)")]
+            for kolumna in ('id', 'data_zuzycia'):
+                if kolumna not in kolumny:
+                    self.polaczenie.execute(f"ALTER TABLE produkty ADD COLUMN {kolumna} TEXT")
+            self.polaczenie.execute(
+                "UPDATE produkty SET id = lower(hex(randomblob(16))) WHERE id IS NULL")
+            self.polaczenie.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_produkty_id ON produkty (id)")
+            self.polaczenie.execute(
+                "CREATE INDEX IF NOT EXISTS idx_produkty_waznosc ON produkty (zuzyty, data_waznosci)")
+            self.polaczenie.execute(
+                "CREATE INDEX IF NOT EXISTS idx_produkty_kategoria ON produkty (zuzyty, kategoria)")
+    
+    def sygnatura(self) -> Any:
+        # data_version zmienia się po zatwierdzeniu zmian przez inne połączenie
+        return self.polaczenie.execute("PRAGMA data_version").fetchone()[0]
+    
+    def sygnatura_trwala(self) -> Any:
+        # data_version jest ważne tylko w obrębie połączenia - użyj stanu plików bazy
+        return (JsonBackend._stat_pliku(self.sciezka_bazy),
+                JsonBackend._stat_pliku(self.sciezka_bazy + "-wal"))
+    
+    @staticmethod
+    def _do_wiersza(produkt: Produkt) -> tuple:
+        """
+        Konwertuje produkt do krotki wartości kolumn.
+        
+        Args:
+            produkt: Obiekt Produkt
+        
+        Returns:
+            tuple: Wartości kolumn w kolejności _KOLUMNY
+        """
+        d = produkt.to_dict()
+        return (d['id'], d['nazwa'], d['kategoria'], d['data_waznosci'], d['cena'],
+                d['data_dodania'], int(d['zuzyty']), d['id_paragonu'], d['data_zuzycia'])
+    
+    @staticmethod
+    def _z_wiersza(wiersz: tuple) -> Produkt:
+        """
+        Tworzy produkt z wiersza zapytania.
+        
+        Args:
+            wiersz: Wartości kolumn w kolejności _KOLUMNY
+        
+        Returns:
+            Produkt: Nowy obiekt Produkt
+        """
+        return Produkt(
+            id=wiersz[0],
+            nazwa=wiersz[1],
+            kategoria=wiersz[2],
+            data_waznosci=datetime.fromisoformat(wiersz[3]),
+            cena=wiersz[4],
+            data_dodania=datetime.fromisoformat(wiersz[5]),
+            zuzyty=bool(wiersz[6]),
+            id_paragonu=wiersz[7],
+            data_zuzycia=datetime.fromisoformat(wiersz[8]) if wiersz[8] else None
+        )
+    
+    def _zapytaj(self, zapytanie: str, parametry: tuple = ()) -> List[Produkt]:
+        """
+        Wykonuje zapytanie SELECT i konwertuje wiersze na produkty.
+        
+        Args:
+            zapytanie: Zapytanie SQL zwracające kolumny _KOLUMNY
+            parametry: Parametry zapytania
+        
+        Returns:
+            List[Produkt]: Lista obiektów Produkt
+        """
+        return [self._z_wiersza(w) for w in self.polaczenie.execute(zapytanie, parametry)]
+    
+    def wczytaj(self) -> List[Produkt]:
+        return self._zapytaj(f"SELECT {self._KOLUMNY} FROM produkty ORDER BY rowid")
+    
+    def zapisz_wszystkie(self, produkty: List[Produkt]) -> None:
+        with self.polaczenie:
+            self.polaczenie.execute("DELETE FROM produkty")
+            self.polaczenie.executemany(self._WSTAW, [self._do_wiersza(p) for p in produkty])
+    
+    def dodaj_wiele(self, produkty: List[Produkt]) -> None:
+        with self.polaczenie:
+            self.polaczenie.executemany(self._WSTAW, [self._do_wiersza(p) for p in produkty])
+    
+    def usun(self, id_produktu: str) -> bool:
+        with self.polaczenie:
+            kursor = self.polaczenie.execute("DELETE FROM produkty WHERE id = ?", (id_produktu,))
+        return kursor.rowcount > 0
+    
+    def usun_wiele(self, id_produktow: List[str]) -> None:
+        with self.polaczenie:
+            self.polaczenie.executemany(
+                "DELETE FROM produkty WHERE id = ?", [(i,) for i in id_produktow])
+    
+    def oznacz_zuzyty(self, id_produktu: str, data_zuzycia: datetime) -> bool:
+        with self.polaczenie:
+            kursor = self.polaczenie.execute(
+                "UPDATE produkty SET zuzyty = 1, data_zuzycia = ? WHERE id = ?",
+                (data_zuzycia.isoformat(), id_produktu))
+        return kursor.rowcount > 0
+    
+    def zaktualizuj(self, produkt: Produkt) -> bool:
+        wiersz = self._do_wiersza(produkt)
+        with self.polaczenie:
+            kursor = self.polaczenie.execute(
+                "UPDATE produkty SET nazwa = ?, kategoria = ?, data_waznosci = ?, cena = ?, "
+                "data_dodania = ?, zuzyty = ?, id_paragonu = ?, data_zuzycia = ? WHERE id = ?",
+                wiersz[1:] + wiersz[:1])
+        return kursor.rowcount > 0
+    
+    def kompaktuj(self) -> None:
+        self.polaczenie.execute("VACUUM")
+    
+    def wczytaj_aktywne(self) -> List[Produkt]:
+        return self._zapytaj(
+            f"SELECT {self._KOLUMNY} FROM produkty WHERE zuzyty = 0 ORDER BY data_waznosci")
+    
+    def wczytaj_zuzyte(self) -> List[Produkt]:
+        return self._zapytaj(f"SELECT {self._KOLUMNY} FROM produkty WHERE zuzyty = 1")
+    
+    def wczytaj_tabele(self) -> ProduktTable:
+        tabela = ProduktTable()
+        wiersze = self.polaczenie.execute(
+            "SELECT id, nazwa, kategoria, data_waznosci, cena, zuzyty FROM produkty ORDER BY rowid")
+        for id_produktu, nazwa, kategoria, data_waznosci, cena, zuzyty in wiersze:
+            tabela.dodaj(id_produktu, nazwa, kategoria,
+                         ProduktTable.dzien(date.fromisoformat(data_waznosci[:10])), cena, zuzyty)
+        return tabela
+    
+    def pobierz(self, id_produktow: List[str]) -> List[Produkt]:
+        znaczniki = ", ".join("?" * len(id_produktow))
+        return self._zapytaj(
+            f"SELECT {self._KOLUMNY} FROM produkty WHERE id IN ({znaczniki})", tuple(id_produktow))
+    
+    def wczytaj_wygasajace(self, do_dnia: date) -> List[Produkt]:
+        # Daty są zapisane w ISO 8601, więc porównanie tekstowe zachowuje kolejność
+        granica = datetime.combine(do_dnia + timedelta(days=1), datetime.min.time()).isoformat()
+        return self._zapytaj(
+            f"SELECT {self._KOLUMNY} FROM produkty WHERE zuzyty = 0 AND data_waznosci < ? "
+            "ORDER BY data_waznosci", (granica,))
+    
+    def policz_kategorie(self) -> Dict[str, int]:
+        return dict(self.polaczenie.execute(
+            "SELECT kategoria, COUNT(*) FROM produkty WHERE zuzyty = 0 GROUP BY kategoria"))
+    
+    def wartosc_aktywnych(self) -> float:
+        wiersz = self.polaczenie.execute(
+            "SELECT TOTAL(cena) FROM produkty WHERE zuzyty = 0").fetchone()
+        return wiersz[0]
+
+
+def migruj_json_do_sqlite(sciezka_json: str, sciezka_bazy: str) -> int:
+    """
+    Jednorazowo przenosi produkty z pliku JSON (wraz z dziennikiem) do bazy SQLite.
+    
+    Migawka binarna (produkty.bin) jest odczytywana bez zmiany jej formatu.
+    
+    Args:
+        sciezka_json: Ścieżka do pliku produkty.json
+        sciezka_bazy: Ścieżka do docelowej bazy SQLite
+    
+    Returns:
+        int: Liczba przeniesionych produktów
+    
+    Raises:
+        ValueError: Jeśli docelowa baza zawiera już produkty
+    """
+    # Backend w formacie migawki leżącej na dysku - migracja nie może jej przepisać
+    format_migawki = "binarny" if os.path.exists(os.path.splitext(sciezka_json)[0] + ".bin") else "json"
+    produkty = DziennikBackend(sciezka_json, format_migawki=format_migawki).wczytaj()
+    sqlite_backend = SqliteBackend(sciezka_bazy)
+    try:
+        if sqlite_backend.polaczenie.execute("SELECT COUNT(*) FROM produkty").fetchone()[0]:
+            raise ValueError(f"Baza {sciezka_bazy} zawiera już produkty - migracja przerwana")
+        sqlite_backend.zapisz_wszystkie(produkty)
+    finally:
+        sqlite_backend.polaczenie.close()
+    return len(produkty)
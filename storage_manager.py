@@ -1,52 +1,432 @@
 import json
 import os
-from typing import List, Optional
-from datetime import datetime
-from models import Produkt
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Callable, Iterator
+from datetime import date, datetime, timedelta
+from models import Produkt, ProduktTable
+from aggregates import AgregatySpizarni, zapisz_agregaty, wczytaj_agregaty
+from expiry_index import IndeksWaznosci, PlikIndeksuWaznosci
 from config import KONFIGURACJA
+from pantry_archive import ArchiwumProduktow
+from storage_backends import BackendPrzechowywania, JsonBackend, DziennikBackend, SqliteBackend
 
 class StorageManager:
     """
     Klasa zarządzająca przechowywaniem i wczytywaniem danych aplikacji.
+    
+    Produkty są przechowywane przez wymienny backend wybierany trybem:
+    "json" (jeden plik przepisywany przy każdej zmianie), "dziennik"
+    (migawka JSON + dziennik zmian) lub "sqlite" (baza z indeksami).
+    
+    Wczytane produkty są trzymane w pamięci podręcznej ważnej tak długo,
+    jak sygnatura backendu (stan plików lub wersja bazy) się nie zmienia.
+    Zapisy wykonane przez ten obiekt aktualizują pamięć podręczną od razu.
+    Zwracane obiekty Produkt są współdzielone z pamięcią podręczną, więc
+    zmiany należy zapisywać przez metody StorageManager.
+    
+    Agregaty aktywnych produktów (kategorie, wartość, liczba produktów na
+    dzień ważności) oraz indeks ważności są aktualizowane przy każdym
+    zapisie i zapisywane obok danych, więc statystyki i zapytania
+    o wygasające produkty nie wymagają przeglądania spiżarni.
+    
+    Produkty zużyte i dawno przeterminowane są przenoszone do zimnego
+    archiwum (ArchiwumProduktow), dzięki czemu główny magazyn zawiera
+    tylko bieżące zapasy.
     """
     
-    def __init__(self, sciezka_pliku: Optional[str] = None):
+    def __init__(self, sciezka_pliku: Optional[str] = None, tryb: Optional[str] = None):
         """
         Inicjalizuje menedżer przechowywania danych.
         
         Args:
             sciezka_pliku: Opcjonalna ścieżka do pliku JSON z produktami
+            tryb: Opcjonalny tryb przechowywania ("json", "dziennik" lub "sqlite")
         """
         self.sciezka_pliku = sciezka_pliku or KONFIGURACJA["paths"]["produkty_json_file"]
-        self._zapewnij_istnienie_pliku()
+        self.tryb = tryb or KONFIGURACJA["storage"]["tryb"]
+        self.backend = self._utworz_backend()
+        if sciezka_pliku is None:
+            katalog_archiwum = KONFIGURACJA["paths"]["archiwum_json"]
+        else:
+            katalog_archiwum = os.path.join(os.path.dirname(self.sciezka_pliku), "archive")
+        self.archiwum = ArchiwumProduktow(katalog_archiwum)
+        self.archiwizacja = KONFIGURACJA["storage"]["archiwizacja"]
+        self.generacja = 0
+        self._cache: Optional[Dict[str, Produkt]] = None
+        self._cache_sygnatura = None
+        self._tabela: Optional[ProduktTable] = None
+        self.sciezka_agregatow = os.path.splitext(self.sciezka_pliku)[0] + ".aggregates.json"
+        self._agregaty: Optional[AgregatySpizarni] = None
+        self._agregaty_sygnatura = None
+        self.plik_indeksu = PlikIndeksuWaznosci(os.path.splitext(self.sciezka_pliku)[0] + ".expiry.jsonl")
+        self._indeks_waznosci: Optional[IndeksWaznosci] = None
+        self._indeks_waznosci_sygnatura = None
+        self._transakcja: Optional[List[Produkt]] = None
+    
+    def _utworz_backend(self) -> BackendPrzechowywania:
+        """
+        Tworzy backend przechowywania odpowiedni dla wybranego trybu.
+        
+        Returns:
+            BackendPrzechowywania: Backend przechowywania produktów
+        """
+        if self.tryb == "sqlite":
+            return SqliteBackend(os.path.splitext(self.sciezka_pliku)[0] + ".db")
+        if self.tryb == "dziennik":
+            return DziennikBackend(self.sciezka_pliku, KONFIGURACJA["storage"]["kompaktuj_po_wpisach"],
+                                   KONFIGURACJA["storage"]["format_migawki"])
+        if self.tryb == "json":
+            return JsonBackend(self.sciezka_pliku)
+        raise ValueError(f"Nieznany tryb przechowywania: {self.tryb}")
+    
+    def _cache_aktualny(self) -> bool:
+        """
+        Sprawdza, czy pamięć podręczna odpowiada danym na dysku.
+        
+        Returns:
+            bool: True jeśli można użyć produktów z pamięci podręcznej
+        """
+        return self._cache is not None and self.backend.sygnatura() == self._cache_sygnatura
+    
+    def _indeks(self) -> Dict[str, Produkt]:
+        """
+        Zwraca indeks id → produkt z pamięci podręcznej, wczytując dane ponownie po ich zmianie.
+        
+        Returns:
+            Dict[str, Produkt]: Produkty w kolejności dodania, dostępne po identyfikatorze
+        """
+        if not self._cache_aktualny():
+            sygnatura = self.backend.sygnatura()
+            self._cache = {p.id: p for p in self.backend.wczytaj()}
+            self._cache_sygnatura = sygnatura
+            self._tabela = None
+        return self._cache
+    
+    def _produkty(self) -> List[Produkt]:
+        """
+        Zwraca listę produktów z pamięci podręcznej.
+        
+        Returns:
+            List[Produkt]: Lista produktów w kolejności dodania
+        """
+        return list(self._indeks().values())
     
-    def _zapewnij_istnienie_pliku(self) -> None:
+    def _tabela_produktow(self) -> ProduktTable:
         """
-        Tworzy plik JSON z produktami, jeśli nie istnieje.
+        Zwraca tabelę kolumnową zbudowaną z pamięci podręcznej.
+        
+        Pozycje tabeli odpowiadają kolejności listy zwracanej przez _produkty().
+        Tabela jest budowana ponownie dopiero po zmianie danych.
+        
+        Returns:
+            ProduktTable: Tabela produktów z pamięci podręcznej
+        """
+        produkty = self._indeks()
+        if self._tabela is None:
+            self._tabela = ProduktTable.z_produktow(produkty.values())
+        return self._tabela
+    
+    def _po_zapisie(self) -> None:
+        """
+        Zapamiętuje sygnaturę danych po zapisie wykonanym przez ten obiekt.
         """
-        if not os.path.exists(self.sciezka_pliku):
-            os.makedirs(os.path.dirname(self.sciezka_pliku), exist_ok=True)
-            with open(self.sciezka_pliku, 'w', encoding='utf-8') as f:
-                json.dump([], f, ensure_ascii=False)
+        self.generacja += 1
+        self._tabela = None
+        if self._cache is not None:
+            self._cache_sygnatura = self.backend.sygnatura()
+    
+    def _uniewaznij_cache(self) -> None:
+        """
+        Usuwa pamięć podręczną, wymuszając ponowne wczytanie danych.
+        """
+        self.generacja += 1
+        self._cache = None
+        self._cache_sygnatura = None
+        self._tabela = None
     
     def wczytaj_produkty(self) -> List[Produkt]:
         """
-        Wczytuje listę produktów z pliku JSON.
+        Wczytuje listę wszystkich produktów.
         
         Returns:
             List[Produkt]: Lista obiektów Produkt
         """
         try:
-            with open(self.sciezka_pliku, 'r', encoding='utf-8') as f:
-                dane = json.load(f)
-            return [Produkt.from_dict(p) for p in dane]
+            return self._produkty()
         except Exception as e:
             print(f"Błąd podczas wczytywania produktów: {e}")
             return []
     
+    def pobierz_produkt(self, id_produktu: str) -> Optional[Produkt]:
+        """
+        Zwraca produkt o podanym identyfikatorze.
+        
+        Args:
+            id_produktu: Identyfikator produktu
+            
+        Returns:
+            Optional[Produkt]: Produkt lub None, jeśli nie istnieje
+        """
+        try:
+            return self._indeks().get(id_produktu)
+        except Exception as e:
+            print(f"Błąd podczas wczytywania produktów: {e}")
+            return None
+    
+    def _uzyj_cache(self, skan: bool = False) -> bool:
+        """
+        Decyduje, czy zapytanie obsłużyć z pamięci podręcznej czy przez backend.
+        
+        Backend z indeksami obsługuje zapytania sam, dopóki pamięć podręczna
+        nie została wypełniona. Zapytania zbiorcze (skan) trafiają do backendu
+        także wtedy, gdy potrafi on odczytać tylko potrzebne kolumny.
+        Pozostałe zapytania korzystają z pamięci podręcznej.
+        
+        Args:
+            skan: Czy zapytanie jest zapytaniem zbiorczym
+            
+        Returns:
+            bool: True jeśli zapytanie należy obsłużyć z pamięci podręcznej
+        """
+        if self._cache_aktualny():
+            return True
+        if skan:
+            return not self.backend.skan_kolumnowy()
+        return not self.backend.indeksowane_zapytania
+    
+    def wczytaj_aktywne_produkty(self) -> List[Produkt]:
+        """
+        Wczytuje niezużyte produkty posortowane według daty ważności.
+        
+        Returns:
+            List[Produkt]: Lista aktywnych produktów
+        """
+        try:
+            if self._uzyj_cache():
+                return list(self.iteruj_aktywne())
+            return self.backend.wczytaj_aktywne()
+        except Exception as e:
+            print(f"Błąd podczas wczytywania produktów: {e}")
+            return []
+    
+    def iteruj_aktywne(self) -> Iterator[Produkt]:
+        """
+        Przegląda niezużyte produkty w kolejności dat ważności bez sortowania listy.
+        
+        Yields:
+            Produkt: Kolejne aktywne produkty
+        """
+        produkty = self._indeks()
+        for id_produktu in self.indeks_waznosci().iteruj():
+            yield produkty[id_produktu]
+    
+    def wczytaj_wygasajace(self, dni: int) -> List[Produkt]:
+        """
+        Wczytuje niezużyte produkty, których termin mija w ciągu podanej liczby dni.
+        
+        Uwzględnia również produkty już przeterminowane.
+        
+        Args:
+            dni: Liczba dni od dzisiaj (0 = tylko dzisiaj i wcześniej)
+            
+        Returns:
+            List[Produkt]: Lista produktów posortowana według daty ważności
+        """
+        try:
+            do_dnia = date.today() + timedelta(days=dni)
+            if self._uzyj_cache(skan=True):
+                produkty = self._indeks()
+                return [produkty[i] for i in self.indeks_waznosci().do_dnia(do_dnia)]
+            return self.backend.wczytaj_wygasajace(do_dnia)
+        except Exception as e:
+            print(f"Błąd podczas wczytywania produktów: {e}")
+            return []
+    
+    def policz_kategorie(self) -> Dict[str, int]:
+        """
+        Zlicza niezużyte produkty w poszczególnych kategoriach.
+        
+        Returns:
+            Dict[str, int]: Liczba produktów dla każdej kategorii
+        """
+        try:
+            if self._uzyj_cache(skan=True):
+                return self._tabela_produktow().policz_kategorie()
+            return self.backend.policz_kategorie()
+        except Exception as e:
+            print(f"Błąd podczas liczenia kategorii: {e}")
+            return {}
+    
+    def wartosc_aktywnych(self) -> float:
+        """
+        Sumuje ceny niezużytych produktów.
+        
+        Returns:
+            float: Łączna wartość aktywnych produktów
+        """
+        try:
+            if self._uzyj_cache(skan=True):
+                return self._tabela_produktow().wartosc_aktywnych()
+            return self.backend.wartosc_aktywnych()
+        except Exception as e:
+            print(f"Błąd podczas liczenia wartości produktów: {e}")
+            return 0.0
+    
+    def wczytaj_tabele(self) -> ProduktTable:
+        """
+        Wczytuje produkty jako zwartą tabelę kolumnową (do statystyk i zapytań).
+        
+        Returns:
+            ProduktTable: Tabela wszystkich produktów
+        """
+        try:
+            if self._uzyj_cache(skan=True):
+                return self._tabela_produktow()
+            return self.backend.wczytaj_tabele()
+        except Exception as e:
+            print(f"Błąd podczas wczytywania produktów: {e}")
+            return ProduktTable()
+    
+    def agregaty(self) -> AgregatySpizarni:
+        """
+        Zwraca bieżące agregaty aktywnych produktów.
+        
+        Agregaty są wczytywane z pliku zapisanego obok danych. Przeliczenie
+        od zera następuje tylko wtedy, gdy dane zmieniono poza tym programem
+        (sygnatura danych nie zgadza się z zapisaną).
+        
+        Returns:
+            AgregatySpizarni: Agregaty aktywnych produktów
+        """
+        sygnatura = self.backend.sygnatura_trwala()
+        if self._agregaty is None or self._agregaty_sygnatura != sygnatura:
+            agregaty = wczytaj_agregaty(self.sciezka_agregatow, sygnatura)
+            if agregaty is None:
+                agregaty = AgregatySpizarni.z_tabeli(self.wczytaj_tabele())
+                self._zapisz_agregaty(agregaty, sygnatura)
+            self._agregaty, self._agregaty_sygnatura = agregaty, sygnatura
+        return self._agregaty
+    
+    def indeks_waznosci(self) -> IndeksWaznosci:
+        """
+        Zwraca indeks aktywnych produktów według dnia ważności.
+        
+        Indeks jest wczytywany z pliku zapisanego obok danych i budowany
+        od zera tylko wtedy, gdy dane zmieniono poza tym programem.
+        
+        Returns:
+            IndeksWaznosci: Indeks ważności aktywnych produktów
+        """
+        sygnatura = self.backend.sygnatura_trwala()
+        if self._indeks_waznosci is None or self._indeks_waznosci_sygnatura != sygnatura:
+            indeks = self.plik_indeksu.wczytaj(sygnatura)
+            if indeks is None:
+                indeks = IndeksWaznosci.z_tabeli(self.wczytaj_tabele())
+                self._zapisz_indeks_waznosci(indeks, sygnatura)
+            self._indeks_waznosci, self._indeks_waznosci_sygnatura = indeks, sygnatura
+        return self._indeks_waznosci
+    
+    def weryfikuj_agregaty(self) -> bool:
+        """
+        Porównuje agregaty i indeks ważności z przeliczonymi od zera i zastępuje je w razie rozbieżności.
+        
+        Returns:
+            bool: True jeśli agregaty i indeks były zgodne z danymi
+        """
+        sygnatura = self.backend.sygnatura_trwala()
+        tabela = self.wczytaj_tabele()
+        przeliczone = AgregatySpizarni.z_tabeli(tabela)
+        przeliczony_indeks = IndeksWaznosci.z_tabeli(tabela)
+        zgodne = self.agregaty() == przeliczone
+        if not zgodne:
+            self._agregaty, self._agregaty_sygnatura = przeliczone, sygnatura
+            self._zapisz_agregaty(przeliczone, sygnatura)
+        if self.indeks_waznosci() != przeliczony_indeks:
+            zgodne = False
+            self._indeks_waznosci, self._indeks_waznosci_sygnatura = przeliczony_indeks, sygnatura
+            self._zapisz_indeks_waznosci(przeliczony_indeks, sygnatura)
+        return zgodne
+    
+    def _zmien_pochodne(self, sygnatura_przed, dodane: List[Produkt] = (),
+                        usuniete: List[Produkt] = (), poprzednia_znana: bool = True) -> None:
+        """
+        Nanosi zapisane zmiany na agregaty i indeks ważności oraz utrwala je.
+        
+        Zapis utrzymuje je na bieżąco także w krótkich uruchomieniach (np.
+        szybkie dodanie produktu): nieobecne w pamięci agregaty są wczytywane
+        z pliku, a do pliku indeksu ważności zmiana jest tylko dopisywana,
+        bez wczytywania całego indeksu. Struktury, które nie odpowiadały
+        danym przed zapisem, są porzucane i zostaną zbudowane od nowa przy
+        następnym użyciu.
+        
+        Args:
+            sygnatura_przed: Trwała sygnatura danych sprzed zapisu
+            dodane: Produkty dodane lub w nowej wersji
+            usuniete: Produkty (w stanie sprzed zmiany) usunięte, zużyte lub zastąpione
+            poprzednia_znana: False, jeśli poprzednia wersja produktu została zmieniona w miejscu
+        """
+        if self._agregaty_sygnatura != sygnatura_przed:
+            agregaty = wczytaj_agregaty(self.sciezka_agregatow, sygnatura_przed)
+            if agregaty is not None:
+                self._agregaty, self._agregaty_sygnatura = agregaty, sygnatura_przed
+        sygnatura_po = self.backend.sygnatura_trwala()
+        
+        if self._agregaty is not None and self._agregaty_sygnatura == sygnatura_przed and poprzednia_znana:
+            for produkt in usuniete:
+                self._agregaty.odejmij(produkt)
+            for produkt in dodane:
+                self._agregaty.dodaj(produkt)
+            self._agregaty_sygnatura = sygnatura_po
+            self._zapisz_agregaty(self._agregaty, sygnatura_po)
+        else:
+            self._agregaty = None
+        
+        dodane_do_indeksu = [(p.id, ProduktTable.dzien(p.data_waznosci.date())) for p in dodane if not p.zuzyty]
+        usuniete_z_indeksu = [p.id for p in usuniete] + [p.id for p in dodane if p.zuzyty]
+        try:
+            if self._indeks_waznosci is not None and self._indeks_waznosci_sygnatura == sygnatura_przed:
+                for produkt in usuniete:
+                    self._indeks_waznosci.usun(produkt.id)
+                for produkt in dodane:
+                    self._indeks_waznosci.dodaj(produkt)
+                self._indeks_waznosci_sygnatura = sygnatura_po
+                self.plik_indeksu.dopisz(self._indeks_waznosci, dodane_do_indeksu, usuniete_z_indeksu, sygnatura_po)
+            else:
+                self._indeks_waznosci = None
+                self.plik_indeksu.dopisz_bez_indeksu(dodane_do_indeksu, usuniete_z_indeksu,
+                                                     sygnatura_przed, sygnatura_po)
+        except OSError as e:
+            print(f"Błąd podczas zapisywania indeksu ważności: {e}")
+    
+    def _zapisz_agregaty(self, agregaty: AgregatySpizarni, sygnatura) -> None:
+        """
+        Zapisuje agregaty obok danych - błąd zapisu oznacza tylko przeliczenie przy kolejnym starcie.
+        
+        Args:
+            agregaty: Agregaty do zapisania
+            sygnatura: Trwała sygnatura danych, których dotyczą
+        """
+        try:
+            zapisz_agregaty(self.sciezka_agregatow, agregaty, sygnatura)
+        except OSError as e:
+            print(f"Błąd podczas zapisywania agregatów: {e}")
+    
+    def _zapisz_indeks_waznosci(self, indeks: IndeksWaznosci, sygnatura) -> None:
+        """
+        Zapisuje pełny indeks ważności - błąd zapisu oznacza tylko przebudowę przy kolejnym starcie.
+        
+        Args:
+            indeks: Indeks do zapisania
+            sygnatura: Trwała sygnatura danych, których dotyczy
+        """
+        try:
+            self.plik_indeksu.zapisz(indeks, sygnatura)
+        except OSError as e:
+            print(f"Błąd podczas zapisywania indeksu ważności: {e}")
+    
     def zapisz_produkty(self, produkty: List[Produkt]) -> bool:
         """
-        Zapisuje listę produktów do pliku JSON.
+        Zapisuje pełną listę produktów, zastępując dotychczasową zawartość.
         
         Args:
             produkty: Lista obiektów Produkt do zapisania
@@ -55,17 +435,20 @@ class StorageManager:
             bool: True jeśli zapis się powiódł, False w przeciwnym razie
         """
         try:
-            dane = [p.to_dict() for p in produkty]
-            with open(self.sciezka_pliku, 'w', encoding='utf-8') as f:
-                json.dump(dane, f, indent=4, ensure_ascii=False)
+            self.backend.zapisz_wszystkie(produkty)
+            self._cache = {p.id: p for p in produkty}
+            self._po_zapisie()
             return True
         except Exception as e:
             print(f"Błąd podczas zapisywania produktów: {e}")
+            self._uniewaznij_cache()
             return False
     
     def dodaj_produkt(self, produkt: Produkt) -> bool:
         """
-        Dodaje pojedynczy produkt do pliku JSON.
+        Dodaje pojedynczy produkt.
+        
+        Wewnątrz transakcji produkt jest tylko buforowany do jej zatwierdzenia.
         
         Args:
             produkt: Obiekt Produkt do dodania
@@ -73,52 +456,336 @@ class StorageManager:
         Returns:
             bool: True jeśli dodanie się powiodło, False w przeciwnym razie
         """
+        return self.dodaj_produkty([produkt])
+    
+    def dodaj_produkty(self, produkty: List[Produkt]) -> bool:
+        """
+        Dodaje partię produktów jednym zapisem - w całości albo wcale.
+        
+        Wewnątrz transakcji produkty są tylko buforowane do jej zatwierdzenia.
+        
+        Args:
+            produkty: Lista obiektów Produkt do dodania
+            
+        Returns:
+            bool: True jeśli dodanie się powiodło, False w przeciwnym razie
+        """
+        if self._transakcja is not None:
+            self._transakcja.extend(produkty)
+            return True
+        if not produkty:
+            return True
         try:
-            produkty = self.wczytaj_produkty()
-            produkty.append(produkt)
-            return self.zapisz_produkty(produkty)
+            self._zapisz_partie(produkty)
+            return True
         except Exception as e:
-            print(f"Błąd podczas dodawania produktu: {e}")
+            print(f"Błąd podczas dodawania produktów: {e}")
+            return False
+    
+    def _zapisz_partie(self, produkty: List[Produkt]) -> None:
+        """
+        Zapisuje partię produktów w backendzie i nanosi ją na pamięć podręczną.
+        
+        Args:
+            produkty: Lista obiektów Produkt do dodania
+        """
+        try:
+            aktualny = self._cache_aktualny()
+            sygnatura_przed = self.backend.sygnatura_trwala()
+            if len(produkty) == 1:
+                self.backend.dodaj(produkty[0])
+            else:
+                self.backend.dodaj_wiele(produkty)
+        except Exception:
+            self._uniewaznij_cache()
+            raise
+        self._zmien_pochodne(sygnatura_przed, dodane=produkty)
+        if aktualny:
+            for produkt in produkty:
+                self._cache[produkt.id] = produkt
+            self._po_zapisie()
+        else:
+            self._uniewaznij_cache()
+    
+    @contextmanager
+    def transakcja(self) -> Iterator['StorageManager']:
+        """
+        Grupuje dodawanie produktów w jeden zapis zatwierdzany na końcu bloku.
+        
+        Produkty dodane w bloku `with` przez dodaj_produkt/dodaj_produkty są
+        zapisywane razem po wyjściu z bloku. Wyjątek w bloku odrzuca całą
+        partię. Zagnieżdżone transakcje dołączają do zewnętrznej.
+        
+        Yields:
+            StorageManager: Ten menedżer przechowywania danych
+            
+        Raises:
+            Exception: Błąd zapisu partii przy zatwierdzaniu transakcji
+        """
+        if self._transakcja is not None:
+            yield self
+            return
+        
+        self._transakcja = []
+        try:
+            yield self
+            partia = self._transakcja
+        finally:
+            self._transakcja = None
+        if partia:
+            self._zapisz_partie(partia)
+    
+    def _zmien_produkt(self, id_produktu: str, operacja: Callable[[], bool],
+                       zmiana_cache: Callable[[Dict[str, Produkt]], None],
+                       nowy: Optional[Produkt] = None) -> bool:
+        """
+        Wykonuje zmianę pojedynczego produktu w backendzie i w pamięci podręcznej.
+        
+        Przy aktualnej pamięci podręcznej istnienie produktu jest sprawdzane
+        w indeksie id → produkt, a sama zmiana jest nanoszona bez ponownego
+        wczytywania danych. Poprzednia wersja produktu jest odejmowana
+        od agregatów, a nowa (jeśli podana) dodawana.
+        
+        Args:
+            id_produktu: Identyfikator zmienianego produktu
+            operacja: Zapis zmiany w backendzie
+            zmiana_cache: Naniesienie zmiany na indeks pamięci podręcznej
+            nowy: Nowa wersja produktu (dla aktualizacji)
+            
+        Returns:
+            bool: True jeśli produkt istniał i zmiana została zapisana
+        """
+        sygnatura_przed = self.backend.sygnatura_trwala()
+        dodane = [nowy] if nowy else []
+        if self.backend.indeksowane_zapytania and not self._cache_aktualny():
+            # Baza sama sprawdzi istnienie produktu - nie wczytuj całej spiżarni
+            przed = self.backend.pobierz([id_produktu])
+            wynik = operacja()
+            self._uniewaznij_cache()
+            if wynik:
+                self._zmien_pochodne(sygnatura_przed, dodane, przed)
+            return wynik
+        
+        produkty = self._indeks()
+        if id_produktu not in produkty:
+            return False
+        przed = produkty[id_produktu]
+        if not operacja():
+            # Produktu nie ma już w danych (np. zmienił je inny proces) - pamięć podręczna jest nieaktualna
+            self._uniewaznij_cache()
             return False
+        # Produkt zmieniony w miejscu - poprzedniej wersji nie da się odjąć od agregatów
+        self._zmien_pochodne(sygnatura_przed, dodane, [przed], poprzednia_znana=przed is not nowy)
+        zmiana_cache(produkty)
+        self._po_zapisie()
+        return True
     
-    def usun_produkt(self, indeks: int) -> bool:
+    def usun_produkt(self, id_produktu: str) -> bool:
         """
-        Usuwa produkt o podanym indeksie z pliku JSON.
+        Usuwa produkt o podanym identyfikatorze.
         
         Args:
-            indeks: Indeks produktu do usunięcia
+            id_produktu: Identyfikator produktu do usunięcia
             
         Returns:
             bool: True jeśli usunięcie się powiodło, False w przeciwnym razie
         """
         try:
-            produkty = self.wczytaj_produkty()
-            if 0 <= indeks < len(produkty):
-                produkty.pop(indeks)
-                return self.zapisz_produkty(produkty)
-            return False
+            return self._zmien_produkt(
+                id_produktu,
+                lambda: self.backend.usun(id_produktu),
+                lambda produkty: produkty.pop(id_produktu)
+            )
         except Exception as e:
             print(f"Błąd podczas usuwania produktu: {e}")
+            self._uniewaznij_cache()
             return False
     
-    def oznacz_jako_zuzyty(self, indeks: int) -> bool:
+    def oznacz_jako_zuzyty(self, id_produktu: str) -> bool:
         """
-        Oznacza produkt o podanym indeksie jako zużyty.
+        Oznacza produkt o podanym identyfikatorze jako zużyty.
         
         Args:
-            indeks: Indeks produktu do oznaczenia
+            id_produktu: Identyfikator produktu do oznaczenia
             
         Returns:
             bool: True jeśli operacja się powiodła, False w przeciwnym razie
         """
+        def oznacz_w_cache(produkty: Dict[str, Produkt]) -> None:
+            produkty[id_produktu].zuzyty = True
+            produkty[id_produktu].data_zuzycia = data_zuzycia
+        
         try:
-            produkty = self.wczytaj_produkty()
-            if 0 <= indeks < len(produkty):
-                produkty[indeks].zuzyty = True
-                return self.zapisz_produkty(produkty)
-            return False
+            data_zuzycia = datetime.now()
+            if not self._zmien_produkt(
+                id_produktu,
+                lambda: self.backend.oznacz_zuzyty(id_produktu, data_zuzycia),
+                oznacz_w_cache
+            ):
+                return False
         except Exception as e:
             print(f"Błąd podczas oznaczania produktu jako zużytego: {e}")
+            self._uniewaznij_cache()
+            return False
+        
+        if self.archiwizacja["wlaczona"]:
+            try:
+                self._przenies_do_archiwum(self._pobierz_wiele([id_produktu]))
+            except Exception as e:
+                # Produkt pozostaje oznaczony - trafi do archiwum przy kolejnym archiwizuj()
+                print(f"Błąd podczas archiwizacji produktu: {e}")
+                self._uniewaznij_cache()
+        return True
+    
+    def zaktualizuj_produkt(self, produkt: Produkt) -> bool:
+        """
+        Zapisuje zmiany produktu o istniejącym identyfikatorze.
+        
+        Args:
+            produkt: Zmieniony obiekt Produkt
+            
+        Returns:
+            bool: True jeśli operacja się powiodła, False w przeciwnym razie
+        """
+        try:
+            return self._zmien_produkt(
+                produkt.id,
+                lambda: self.backend.zaktualizuj(produkt),
+                lambda produkty: produkty.__setitem__(produkt.id, produkt),
+                nowy=produkt
+            )
+        except Exception as e:
+            print(f"Błąd podczas aktualizacji produktu: {e}")
+            self._uniewaznij_cache()
+            return False
+    
+    def _pobierz_wiele(self, id_produktow: List[str]) -> List[Produkt]:
+        """
+        Zwraca produkty o podanych identyfikatorach z pamięci podręcznej lub z backendu.
+        
+        Args:
+            id_produktow: Identyfikatory produktów
+            
+        Returns:
+            List[Produkt]: Znalezione produkty
+        """
+        if self.backend.indeksowane_zapytania and not self._cache_aktualny():
+            return self.backend.pobierz(id_produktow)
+        produkty = self._indeks()
+        return [produkty[i] for i in id_produktow if i in produkty]
+    
+    def _przenies_do_archiwum(self, produkty: List[Produkt]) -> None:
+        """
+        Dopisuje produkty do zimnego archiwum i usuwa je z głównego magazynu.
+        
+        Kolejność (najpierw archiwum, potem usunięcie) sprawia, że przerwana
+        operacja może co najwyżej zostawić kopię w obu miejscach - archiwum
+        zwraca wtedy produkt tylko raz.
+        
+        Args:
+            produkty: Produkty do przeniesienia
+        """
+        if not produkty:
+            return
+        self.archiwum.dopisz(produkty)
+        aktualny = self._cache_aktualny()
+        sygnatura_przed = self.backend.sygnatura_trwala()
+        id_produktow = [p.id for p in produkty]
+        self.backend.usun_wiele(id_produktow)
+        self._zmien_pochodne(sygnatura_przed, usuniete=produkty)
+        if aktualny:
+            for id_produktu in id_produktow:
+                self._cache.pop(id_produktu, None)
+            self._po_zapisie()
+        else:
+            self._uniewaznij_cache()
+    
+    def archiwizuj(self, dzisiaj: Optional[date] = None) -> int:
+        """
+        Przenosi do archiwum produkty zużyte i przeterminowane dawniej niż ustawiony próg.
+        
+        Args:
+            dzisiaj: Data odniesienia (domyślnie dzisiaj)
+            
+        Returns:
+            int: Liczba przeniesionych produktów
+        """
+        if not self.archiwizacja["wlaczona"]:
+            return 0
+        
+        dzisiaj = dzisiaj or date.today()
+        granica = dzisiaj - timedelta(days=self.archiwizacja["przeterminowane_po_dniach"] + 1)
+        try:
+            if self._uzyj_cache():
+                produkty = self._indeks()
+                kandydaci = [p for p in produkty.values() if p.zuzyty]
+                kandydaci += [produkty[i] for i in self.indeks_waznosci().do_dnia(granica)]
+            else:
+                kandydaci = self.backend.wczytaj_zuzyte() + self.backend.wczytaj_wygasajace(granica)
+            self._przenies_do_archiwum(kandydaci)
+            return len(kandydaci)
+        except Exception as e:
+            print(f"Błąd podczas archiwizacji produktów: {e}")
+            self._uniewaznij_cache()
+            return 0
+    
+    def wczytaj_archiwum(self, od: Optional[date] = None, do: Optional[date] = None) -> List[Produkt]:
+        """
+        Wczytuje zarchiwizowane produkty z segmentów obejmujących podany zakres.
+        
+        Zakres dotyczy miesiąca zużycia (lub daty ważności dla produktów
+        przeniesionych jako przeterminowane).
+        
+        Args:
+            od: Pierwszy dzień zakresu (opcjonalnie)
+            do: Ostatni dzień zakresu (opcjonalnie)
+            
+        Returns:
+            List[Produkt]: Lista zarchiwizowanych produktów
+        """
+        try:
+            return list(self.archiwum.iteruj(od, do))
+        except Exception as e:
+            print(f"Błąd podczas wczytywania archiwum: {e}")
+            return []
+    
+    def eksportuj_json(self, sciezka: str) -> bool:
+        """
+        Zapisuje wszystkie produkty do pliku JSON niezależnie od trybu przechowywania.
+        
+        Args:
+            sciezka: Ścieżka do docelowego pliku JSON
+            
+        Returns:
+            bool: True jeśli eksport się powiódł, False w przeciwnym razie
+        """
+        try:
+            dane = [p.to_dict() for p in self._produkty()]
+            with open(sciezka, 'w', encoding='utf-8') as f:
+                json.dump(dane, f, indent=4, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"Błąd podczas eksportu produktów: {e}")
+            return False
+    
+    def kompaktuj(self) -> bool:
+        """
+        Porządkuje dane backendu na dysku (np. składa dziennik w migawkę).
+        
+        Returns:
+            bool: True jeśli kompaktowanie się powiodło, False w przeciwnym razie
+        """
+        try:
+            aktualny = self._cache_aktualny()
+            self.backend.kompaktuj()
+            if aktualny:
+                self._po_zapisie()
+            else:
+                self._uniewaznij_cache()
+            return True
+        except Exception as e:
+            print(f"Błąd podczas kompaktowania danych: {e}")
+            self._uniewaznij_cache()
             return False
     
     def zapisz_przetworzony_paragon(self, dane_paragonu: dict) -> bool:
@@ -133,11 +800,20 @@ class StorageManager:
         """
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            sciezka_pliku = os.path.join(
-                KONFIGURACJA["paths"]["dane_json_folder"],
-                f"paragon_{timestamp}.json"
-            )
-            with open(sciezka_pliku, 'w', encoding='utf-8') as f:
+            # Kilka paragonów w tej samej sekundzie (np. strony PDF, równoległe wątki zapisu) -
+            # plik jest tworzony atomowo ('x'), więc zajętą nazwę pomija się zamiast nadpisywać
+            numer = 1
+            while True:
+                sciezka_pliku = os.path.join(
+                    KONFIGURACJA["paths"]["dane_json_folder"],
+                    f"paragon_{timestamp}.json" if numer == 1 else f"paragon_{timestamp}_{numer}.json"
+                )
+                try:
+                    f = open(sciezka_pliku, 'x', encoding='utf-8')
+                    break
+                except FileExistsError:
+                    numer += 1
+            with f:
                 json.dump(dane_paragonu, f, indent=4, ensure_ascii=False)
             return True
         except Exception as e:
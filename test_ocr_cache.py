@@ -0,0 +1,58 @@
+import os
+
+from ocr_cache import PamiecOCR, normalizuj_wyniki
+
+PARAMETRY = {'jezyki': ['pl', 'en'], 'przygotowanie': 'v1'}
+WYNIKI = [([[0.0, 0.0], [10.0, 0.0], [10.0, 5.0], [0.0, 5.0]], "MLEKO 3,49", 0.93)]
+
+
+def test_klucz_zalezy_od_zawartosci_i_parametrow():
+    klucz = PamiecOCR.klucz(b"obraz", PARAMETRY)
+    assert klucz == PamiecOCR.klucz(b"obraz", dict(reversed(list(PARAMETRY.items()))))
+    assert klucz != PamiecOCR.klucz(b"obraz2", PARAMETRY)
+    assert klucz != PamiecOCR.klucz(b"obraz", dict(PARAMETRY, przygotowanie='v2'))
+
+
+def test_zapis_i_odczyt(tmp_path):
+    pamiec = PamiecOCR(str(tmp_path), 1024 * 1024)
+    klucz = PamiecOCR.klucz(b"obraz", PARAMETRY)
+    assert pamiec.pobierz(klucz) is None
+    pamiec.zapisz(klucz, WYNIKI)
+    assert PamiecOCR(str(tmp_path), 1024 * 1024).pobierz(klucz) == WYNIKI
+
+
+def test_normalizacja_typow():
+    class Liczba(float):
+        pass
+
+    wyniki = normalizuj_wyniki([([(Liczba(1), 2)], "Ser", Liczba(0.5))])
+    assert wyniki == [([[1.0, 2.0]], "Ser", 0.5)]
+    assert type(wyniki[0][2]) is float
+
+
+def test_uszkodzony_wpis_to_brak_trafienia(tmp_path):
+    pamiec = PamiecOCR(str(tmp_path), 1024 * 1024)
+    klucz = PamiecOCR.klucz(b"obraz", PARAMETRY)
+    pamiec.zapisz(klucz, WYNIKI)
+    with open(os.path.join(str(tmp_path), f"{klucz}.json"), 'w') as f:
+        f.write('[[[0, 0]], "MLE')
+    assert pamiec.pobierz(klucz) is None
+
+
+def test_usuwanie_najdawniej_uzywanych(tmp_path):
+    pamiec = PamiecOCR(str(tmp_path), 10 ** 9)
+    klucze = [PamiecOCR.klucz(bytes([i]), PARAMETRY) for i in range(3)]
+    for i, klucz in enumerate(klucze):
+        pamiec.zapisz(klucz, WYNIKI)
+        # Jawne czasy użycia - rozdzielczość zegara systemu plików bywa zbyt mała
+        os.utime(os.path.join(str(tmp_path), f"{klucz}.json"), (1000 + i, 1000 + i))
+    rozmiar_wpisu = os.path.getsize(os.path.join(str(tmp_path), f"{klucze[0]}.json"))
+
+    # Pierwszy wpis użyty ponownie - najdawniej używany jest teraz drugi
+    assert pamiec.pobierz(klucze[0]) == WYNIKI
+    pamiec.max_bajtow = 3 * rozmiar_wpisu
+    pamiec.zapisz(PamiecOCR.klucz(b"nowy", PARAMETRY), WYNIKI)
+
+    assert pamiec.pobierz(klucze[1]) is None
+    assert pamiec.pobierz(klucze[0]) == WYNIKI
+    assert pamiec.pobierz(klucze[2]) == WYNIKI
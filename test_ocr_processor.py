@@ -0,0 +1,416 @@
+import json
+import os
+import sys
+import types
+
+import pytest
+
+import ocr_processor
+from config import KONFIGURACJA
+from ocr_processor import ParagonProcessor
+from storage_manager import StorageManager
+
+
+def _wyniki_ocr(tekst):
+    # Każda linia tekstu jako osobny fragment w kolejnym wierszu paragonu
+    if not tekst:
+        return None
+    return [([[0, 20 * i], [100, 20 * i], [100, 20 * i + 10], [0, 20 * i + 10]], linia, 0.9)
+            for i, linia in enumerate(tekst.splitlines())]
+
+
+@pytest.fixture
+def procesor(tmp_path, monkeypatch):
+    for klucz, folder in [("paragony_nowe", "nowe"), ("paragony_przetworzone", "przetworzone"),
+                          ("paragony_bledy", "bledy"), ("paragony_duplikaty", "duplikaty"),
+                          ("dane_json_folder", "data")]:
+        os.makedirs(tmp_path / folder, exist_ok=True)
+        monkeypatch.setitem(KONFIGURACJA["paths"], klucz, str(tmp_path / folder))
+    monkeypatch.setitem(KONFIGURACJA["paths"], "indeks_paragonow", str(tmp_path / "data" / "odciski.jsonl"))
+    monkeypatch.setitem(KONFIGURACJA["duplikaty"], "maks_roznica_bitow", 0)
+    # Odcisk z treści pliku - testowe "obrazy" to pliki tekstowe
+    monkeypatch.setattr(ocr_processor, "odcisk_zrodla",
+                        lambda zrodlo: (hash(open(zrodlo, encoding="utf-8").read()) & 0xFFFF, 1.0)
+                        if isinstance(zrodlo, str) else None)
+    storage = StorageManager(str(tmp_path / "data" / "produkty.json"), tryb="json")
+    procesor = ParagonProcessor(storage)
+    monkeypatch.setitem(KONFIGURACJA["ocr"], "obrazy_na_wsad", 1)
+    # OCR i AI zastąpione prostymi funkcjami - testowany jest przepływ plików i danych
+    monkeypatch.setattr(procesor, "odczytaj_wyniki",
+                        lambda sciezka: _wyniki_ocr(open(sciezka, encoding="utf-8").read()))
+    monkeypatch.setattr(ocr_processor, "parsuj_paragon_ai",
+                        lambda tekst, konfiguracja: [{"nazwa": linia, "cena": 1.0}
+                                                     for linia in tekst.splitlines() if linia != "BRAK"])
+    return procesor
+
+
+def _paragon(procesor, nazwa, tekst):
+    with open(os.path.join(procesor.folder_nowe, nazwa), "w", encoding="utf-8") as f:
+        f.write(tekst)
+
+
+def _zapisane_paragony(tmp_path):
+    dane = []
+    for sciezka in sorted((tmp_path / "data").glob("paragon_*.json")):
+        with open(sciezka, encoding="utf-8") as f:
+            dane.append(json.load(f))
+    return dane
+
+
+def test_przetwarzanie_wszystkich_paragonow(procesor, tmp_path):
+    _paragon(procesor, "a.jpg", "Mleko\nSer")
+    _paragon(procesor, "b.png", "")
+    _paragon(procesor, "c.jpg", "BRAK")
+    _paragon(procesor, "d.jpg", "Chleb")
+
+    assert procesor.przetworz_wszystkie_paragony() == (2, 2)
+
+    assert sorted(os.listdir(procesor.folder_przetworzone)) == ["a.jpg", "d.jpg"]
+    assert sorted(os.listdir(procesor.folder_bledy)) == ["b.png", "c.jpg"]
+    assert os.listdir(procesor.folder_nowe) == []
+    zapisane = {p['plik_zrodlowy']: [x['nazwa'] for x in p['produkty']] for p in _zapisane_paragony(tmp_path)}
+    assert zapisane == {"a.jpg": ["Mleko", "Ser"], "d.jpg": ["Chleb"]}
+
+
+class _CzytnikTestowy:
+    def __init__(self):
+        self.wywolania = 0
+
+    def readtext(self, obraz, batch_size=1):
+        self.wywolania += 1
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], "MLEKO", 0.9), ([[0, 2], [1, 2], [1, 3], [0, 3]], "szum", 0.1)]
+
+
+def test_pamiec_podreczna_ocr_pomija_ponowne_rozpoznawanie(tmp_path, monkeypatch):
+    monkeypatch.setitem(KONFIGURACJA["paths"], "ocr_cache", str(tmp_path / "ocr_cache"))
+    monkeypatch.setattr(ocr_processor, "przygotuj_obraz", lambda sciezka: "obraz")
+    procesor = ParagonProcessor(StorageManager(str(tmp_path / "produkty.json"), tryb="json"))
+    czytnik = _CzytnikTestowy()
+    procesor._reader = czytnik
+    sciezka = tmp_path / "paragon.jpg"
+    sciezka.write_bytes(b"zawartosc obrazu")
+
+    assert procesor.rozpoznaj_tekst(str(sciezka)) == "MLEKO"
+    # Ten sam plik w innym miejscu (np. przeniesiony z folderu błędów) - bez OCR i bez czytnika
+    kopia = tmp_path / "kopia.jpg"
+    kopia.write_bytes(b"zawartosc obrazu")
+    procesor._reader = None
+    monkeypatch.setattr(ParagonProcessor, "reader", property(lambda self: pytest.fail("utworzono czytnik")))
+    assert procesor.rozpoznaj_tekst(str(kopia)) == "MLEKO"
+    assert czytnik.wywolania == 1
+
+
+def test_strony_pdf_jako_osobne_zadania_bez_plikow_tymczasowych(procesor, tmp_path, monkeypatch):
+    pdf2image = types.ModuleType("pdf2image")
+    pdf2image.pdfinfo_from_path = lambda sciezka: {"Pages": 3}
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image)
+    rozpoznane = []
+
+    def _rozpoznaj(obraz):
+        assert isinstance(obraz, ocr_processor.StronaPdf)
+        rozpoznane.append(obraz.numer)
+        return None if obraz.numer == 2 else _wyniki_ocr(f"Produkt {obraz.numer}")
+
+    monkeypatch.setattr(procesor, "odczytaj_wyniki", _rozpoznaj)
+    _paragon(procesor, "zakupy.pdf", "")
+
+    assert procesor.przetworz_wszystkie_paragony() == (2, 1)
+    assert rozpoznane == [1, 2, 3]
+    assert os.listdir(procesor.folder_przetworzone) == ["zakupy.pdf"]
+    assert os.listdir(procesor.folder_bledy) == []
+    assert [p['plik_zrodlowy'] for p in _zapisane_paragony(tmp_path)] == ["zakupy.pdf", "zakupy.pdf"]
+
+
+def test_pdf_haszowany_raz_dla_kluczy_stron(tmp_path, monkeypatch):
+    pdf = tmp_path / "zakupy.pdf"
+    pdf.write_bytes(b"%PDF-1.4 zawartosc")
+    otwarcia = []
+    oryginalny_open = open
+
+    def _open(sciezka, *args, **kwargs):
+        if str(sciezka) == str(pdf):
+            otwarcia.append(sciezka)
+        return oryginalny_open(sciezka, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", _open)
+    strony = ocr_processor.StronaPdf.dokument(str(pdf), 3, 200)
+    klucze = [ocr_processor._klucz_pamieci(strona) for strona in strony]
+
+    assert len(otwarcia) == 1
+    assert [strona.numer for strona in strony] == [1, 2, 3]
+    assert len(set(klucze)) == 3
+    pdf.write_bytes(b"%PDF-1.4 inna zawartosc")
+    assert ocr_processor._klucz_pamieci(ocr_processor.StronaPdf(str(pdf), 1, 200)) != klucze[0]
+
+
+def test_grupowanie_obrazow_wedlug_rozmiaru():
+    rozmiary = [(1000, 500), (300, 300), (1050, 520), (1100, 500), (1040, 700), (310, 290)]
+    # (1040, 700) jest za szeroki dla grupy (1000-1100, 500-520)
+    assert ocr_processor.grupuj_wedlug_rozmiaru(rozmiary, maks_grupa=4) == [[1, 5], [0, 2, 3], [4]]
+    # Limit liczby obrazów w grupie
+    assert ocr_processor.grupuj_wedlug_rozmiaru([(100, 100)] * 5, maks_grupa=2) == [[0, 1], [2, 3], [4]]
+
+
+class _CzytnikWsadowy:
+    def __init__(self):
+        self.wsady = []
+
+    def readtext(self, obraz, batch_size=1):
+        self.wsady.append([obraz.shape])
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], f"{obraz.shape[0]}x{obraz.shape[1]}", 0.9)]
+
+    def readtext_batched(self, obrazy, batch_size=1):
+        assert len({obraz.shape for obraz in obrazy}) == 1, "wsad musi mieć jednakowy rozmiar"
+        self.wsady.append([obraz.shape for obraz in obrazy])
+        return [[([[0, 0], [1, 0], [1, 1], [0, 1]], f"wsad {numer}", 0.9)] for numer in range(len(obrazy))]
+
+
+def test_wsadowe_rozpoznawanie_zwraca_wyniki_dla_kazdego_obrazu(tmp_path, monkeypatch):
+    np = pytest.importorskip("numpy")
+    monkeypatch.setitem(KONFIGURACJA["ocr"], "obrazy_na_wsad", 4)
+    rozmiary = {"a": (1000, 500), "b": (300, 300), "c": (1050, 520)}
+    monkeypatch.setattr(ocr_processor, "przygotuj_obraz",
+                        lambda zrodlo: None if zrodlo == "zly" else np.zeros(rozmiary[zrodlo], dtype=np.uint8))
+    czytnik = _CzytnikWsadowy()
+
+    teksty = ocr_processor.rozpoznaj_teksty_obrazow(["a", "b", "zly", "c"], lambda: czytnik)
+
+    # a i c mają podobny rozmiar - jeden wsad dopełniony do 1050x520; b osobno
+    assert sorted(czytnik.wsady) == [[(300, 300)], [(1050, 520), (1050, 520)]]
+    assert teksty == ["wsad 0", "300x300", None, "wsad 1"]
+
+
+def test_wsadowe_rozpoznawanie_korzysta_z_pamieci_podrecznej(tmp_path, monkeypatch):
+    monkeypatch.setitem(KONFIGURACJA["ocr"], "obrazy_na_wsad", 4)
+    monkeypatch.setattr(ocr_processor, "przygotuj_obraz",
+                        lambda sciezka: types.SimpleNamespace(shape=(100 * len(open(sciezka).read()), 50)))
+    pamiec = ocr_processor.PamiecOCR(str(tmp_path / "ocr_cache"), 1024 * 1024)
+    sciezki = []
+    for nazwa, zawartosc in [("a.jpg", "x"), ("b.jpg", "xxxx"), ("c.jpg", "xx")]:
+        (tmp_path / nazwa).write_text(zawartosc)
+        sciezki.append(str(tmp_path / nazwa))
+    czytnik = _CzytnikWsadowy()
+
+    assert ocr_processor.rozpoznaj_teksty_obrazow(sciezki[:2], lambda: czytnik, pamiec) == ["100x50", "400x50"]
+    # Tylko c.jpg nie ma w pamięci podręcznej
+    assert ocr_processor.rozpoznaj_teksty_obrazow(sciezki, lambda: czytnik, pamiec) == ["100x50", "400x50", "200x50"]
+    assert len(czytnik.wsady) == 3
+
+
+def test_etap_ocr_rozpoznaje_czekajace_paragony_wsadem(procesor, tmp_path, monkeypatch):
+    monkeypatch.setitem(KONFIGURACJA["ocr"], "obrazy_na_wsad", 3)
+    wsady = []
+
+    def _rozpoznaj_wsad(obrazy):
+        wsady.append(len(obrazy))
+        return [_wyniki_ocr(open(obraz, encoding="utf-8").read()) for obraz in obrazy]
+
+    monkeypatch.setattr(procesor, "_rozpoznaj_wsad", _rozpoznaj_wsad)
+    for numer in range(7):
+        _paragon(procesor, f"{numer}.jpg", "" if numer == 4 else f"Produkt {numer}")
+
+    assert procesor.przetworz_wszystkie_paragony() == (6, 1)
+    assert sum(wsady) == 7 and max(wsady) <= 3
+    assert os.listdir(procesor.folder_bledy) == ["4.jpg"]
+
+
+def test_kopie_paragonu_pomijane_przed_ocr(procesor, tmp_path, monkeypatch):
+    rozpoznane = []
+    monkeypatch.setattr(procesor, "odczytaj_wyniki",
+                        lambda sciezka: rozpoznane.append(os.path.basename(sciezka)) or _wyniki_ocr(open(sciezka).read()))
+    _paragon(procesor, "a.jpg", "Mleko")
+    _paragon(procesor, "b.jpg", "Mleko")
+    _paragon(procesor, "c.jpg", "Chleb")
+
+    assert procesor.przetworz_wszystkie_paragony() == (2, 0)
+    assert rozpoznane == ["a.jpg", "c.jpg"]
+    assert os.listdir(procesor.folder_duplikaty) == ["b.jpg"]
+
+    # Kolejna partia - indeks przetrwał w pliku
+    _paragon(procesor, "d.jpg", "Chleb")
+    procesor = ParagonProcessor(procesor.storage_manager)
+    monkeypatch.setattr(procesor, "odczytaj_wyniki", lambda sciezka: pytest.fail("OCR duplikatu"))
+    assert procesor.przetworz_wszystkie_paragony() == (0, 0)
+    assert sorted(os.listdir(procesor.folder_duplikaty)) == ["b.jpg", "d.jpg"]
+
+
+def test_nieudany_paragon_nie_blokuje_kopii(procesor, monkeypatch):
+    monkeypatch.setattr(ocr_processor, "parsuj_paragon_ai", lambda tekst, konfiguracja: None)
+    _paragon(procesor, "a.jpg", "Mleko")
+    assert procesor.przetworz_wszystkie_paragony() == (0, 1)
+
+    monkeypatch.setattr(ocr_processor, "parsuj_paragon_ai",
+                        lambda tekst, konfiguracja: [{"nazwa": tekst, "cena": 1.0}])
+    _paragon(procesor, "a2.jpg", "Mleko")
+    assert procesor.przetworz_wszystkie_paragony() == (1, 0)
+    assert os.listdir(procesor.folder_duplikaty) == []
+
+
+class _CzytnikKaskady:
+    def __init__(self, szybkie):
+        self.szybkie = szybkie
+        self.wywolania = []
+
+    def readtext(self, obraz, batch_size=1, canvas_size=None):
+        if canvas_size is None:
+            self.wywolania.append(("pełny", obraz.nazwa))
+            return [([[0, 0], [40, 0], [40, 16], [0, 16]], "PELNY", 0.99)]
+        self.wywolania.append(("szybki", obraz.nazwa))
+        return [([[0, 10 * i], [20, 10 * i], [20, 10 * i + 8], [0, 10 * i + 8]], tekst, pewnosc)
+                for i, (tekst, pewnosc) in enumerate(self.szybkie[obraz.nazwa])]
+
+    def recognize(self, obraz, horizontal_list, free_list, batch_size=1):
+        self.wywolania.append(("fragmenty", obraz.nazwa, len(horizontal_list)))
+        # Kolejność wyników inna niż kolejność fragmentów
+        return [([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], f"POPRAWIONY {y0}", 0.95)
+                for x0, x1, y0, y1 in reversed(horizontal_list)]
+
+
+def test_kaskada_ocr_pelny_przebieg_tylko_przy_niskiej_pewnosci(monkeypatch):
+    monkeypatch.setitem(KONFIGURACJA["ocr"], "obrazy_na_wsad", 1)
+    monkeypatch.setitem(KONFIGURACJA["ocr"], "kaskada", {"wlaczona": True, "skala_szybka": 0.5,
+                                                          "plotno_szybkie": 1280, "prog_pewnosci": 0.6,
+                                                          "maks_udzial_niepewnych": 0.4})
+    monkeypatch.setattr(ocr_processor, "przygotuj_obraz",
+                        lambda nazwa: types.SimpleNamespace(nazwa=nazwa, shape=(400, 200)))
+    monkeypatch.setattr(ocr_processor, "_pomniejsz_obraz", lambda obraz, skala: obraz)
+    czytnik = _CzytnikKaskady({
+        "pewny": [("MLEKO", 0.9), ("SER", 0.8)],
+        "dwie_niepewne": [("MLEKO", 0.9), ("5ER", 0.2), ("CHLEB", 0.95), ("MASLO", 0.9), ("JAJ4", 0.5)],
+        "niepewny": [("M1EK0", 0.3), ("5ER", 0.2), ("CHLEB", 0.95)],
+        "pusty": [],
+    })
+    statystyki = ocr_processor.StatystykiOCR()
+
+    wyniki = ocr_processor.odczytaj_wyniki_ocr_wsadowo(["pewny", "dwie_niepewne", "niepewny", "pusty"],
+                                                       lambda: czytnik, statystyki=statystyki)
+
+    assert [tekst for _, tekst, _ in wyniki[0]] == ["MLEKO", "SER"]
+    # Niepewne linie rozpoznane ponownie w pełnej rozdzielczości (z marginesem); ramki w skali pełnego obrazu
+    assert [tekst for _, tekst, _ in wyniki[1]] == ["MLEKO", "POPRAWIONY 15", "CHLEB", "MASLO", "POPRAWIONY 75"]
+    assert wyniki[1][1][0] == [[0.0, 20.0], [40.0, 20.0], [40.0, 36.0], [0.0, 36.0]]
+    assert [tekst for _, tekst, _ in wyniki[2]] == ["PELNY"]
+    assert [tekst for _, tekst, _ in wyniki[3]] == ["PELNY"]
+    assert ("fragmenty", "dwie_niepewne", 2) in czytnik.wywolania
+    assert statystyki.obrazy == {ocr_processor.POZIOM_SZYBKI: 1, ocr_processor.POZIOM_FRAGMENTY: 1,
+                                 ocr_processor.POZIOM_PELNY: 2}
+    assert "szybki: 1" in str(statystyki)
+
+
+def test_paragon_fiskalny_parsowany_regulami_bez_ai(procesor, tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr_processor, "parsuj_paragon_ai", lambda tekst, konfiguracja: pytest.fail("zapytanie AI"))
+    _paragon(procesor, "a.jpg", "PARAGON FISKALNY\nMleko 2 x3,49 6,98C\nChleb 1 x4,50 4,50B\nSUMA PLN 11,48")
+
+    assert procesor.przetworz_wszystkie_paragony() == (1, 0)
+    assert [(p["nazwa"], p["cena"]) for p in _zapisane_paragony(tmp_path)[0]["produkty"]] == [("Mleko", 6.98),
+                                                                                            ("Chleb", 4.5)]
+    assert procesor.statystyki_parsowania.obrazy == {ocr_processor.PARSOWANIE_REGULY: 1}
+
+
+def test_do_ai_trafiaja_tylko_nierozpoznane_wiersze(procesor, tmp_path, monkeypatch):
+    zapytania = []
+
+    def _parsuj_ai(tekst, konfiguracja):
+        zapytania.append(tekst)
+        return [{"nazwa": "Ser", "cena": 7.99}]
+
+    monkeypatch.setattr(ocr_processor, "parsuj_paragon_ai", _parsuj_ai)
+    _paragon(procesor, "a.jpg", "PARAGON FISKALNY\nMleko 2 x3,49 6,98C\nSer g0uda 7,9?\nSUMA PLN 14,97")
+
+    assert procesor.przetworz_wszystkie_paragony() == (1, 0)
+    assert zapytania == ["Ser g0uda 7,9?"]
+    assert [p["nazwa"] for p in _zapisane_paragony(tmp_path)[0]["produkty"]] == ["Mleko", "Ser"]
+    assert procesor.statystyki_parsowania.obrazy == {ocr_processor.PARSOWANIE_REGULY_AI: 1}
+
+
+def test_pozycja_ai_bez_ceny_uruchamia_pelne_parsowanie(procesor, tmp_path, monkeypatch):
+    zapytania = []
+
+    def _parsuj_ai(tekst, konfiguracja):
+        zapytania.append(tekst)
+        if len(zapytania) == 1:
+            return [{"nazwa": "Ser", "cena": None}]
+        return [{"nazwa": "Mleko", "cena": 6.98}, {"nazwa": "Ser", "cena": 7.99}]
+
+    monkeypatch.setattr(ocr_processor, "parsuj_paragon_ai", _parsuj_ai)
+    _paragon(procesor, "a.jpg", "PARAGON FISKALNY\nMleko 2 x3,49 6,98C\nSer g0uda 7,9?\nSUMA PLN 14,97")
+
+    assert procesor.przetworz_wszystkie_paragony() == (1, 0)
+    assert zapytania == ["Ser g0uda 7,9?", "Mleko 2 x3,49 6,98C\nSer g0uda 7,9?"]
+    assert [p["cena"] for p in _zapisane_paragony(tmp_path)[0]["produkty"]] == [6.98, 7.99]
+    assert procesor.statystyki_parsowania.obrazy == {ocr_processor.PARSOWANIE_AI: 1}
+
+
+def test_tekst_ocr_skladany_w_wiersze_wedlug_ramek():
+    wyniki = [
+        ([[200, 31], [260, 31], [260, 41], [200, 41]], "3,49C", 0.9),
+        ([[0, 0], [150, 0], [150, 10], [0, 10]], "PARAGON FISKALNY", 0.9),
+        ([[0, 30], [80, 30], [80, 40], [0, 40]], "MLEKO 1L", 0.9),
+        ([[100, 29], [160, 29], [160, 39], [100, 39]], "1 x3,49", 0.9),
+    ]
+
+    assert ocr_processor.tekst_z_wynikow(wyniki) == "PARAGON FISKALNY\nMLEKO 1L 1 x3,49 3,49C"
+
+
+def test_do_ai_trafiaja_tylko_wiersze_pozycji(procesor, monkeypatch):
+    zapytania = []
+
+    def _parsuj_ai(tekst, konfiguracja):
+        zapytania.append(tekst)
+        return [{"nazwa": "Mleko", "cena": 3.49}]
+
+    monkeypatch.setattr(ocr_processor, "parsuj_paragon_ai", _parsuj_ai)
+    _paragon(procesor, "a.jpg", "SKLEP SPOŻYWCZY\nul. Długa 5\nNIP 779-10-11-327\nPARAGON FISKALNY\n"
+                                "Mleko 1 x3,49 3,4?\nSUMA PLN 3,49\nGotówka 10,00\nReszta 6,51")
+
+    assert procesor.przetworz_wszystkie_paragony() == (1, 0)
+    assert zapytania == ["Mleko 1 x3,49 3,4?"]
+
+
+def test_paragony_z_pamieci_zwracaja_wyniki(procesor, tmp_path, monkeypatch):
+    pdf2image = types.ModuleType("pdf2image")
+    pdf2image.pdfinfo_from_bytes = lambda dane: {"Pages": 2}
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image)
+
+    def _rozpoznaj(obraz):
+        if isinstance(obraz, ocr_processor.StronaPdf):
+            assert obraz.dane.startswith(b"%PDF")
+            return _wyniki_ocr(f"Strona {obraz.numer}")
+        return _wyniki_ocr(obraz.decode("utf-8") if isinstance(obraz, bytes) else open(obraz).read())
+
+    monkeypatch.setattr(procesor, "odczytaj_wyniki", _rozpoznaj)
+    _paragon(procesor, "c.jpg", "")
+    wyniki = procesor.przetworz([b"Mleko\nSer", b"%PDF-1.4", os.path.join(procesor.folder_nowe, "c.jpg")],
+                                ["telefon.jpg", "sklep.pdf", None])
+
+    assert [(w.nazwa, w.strona, w.status) for w in wyniki] == [
+        ("telefon.jpg", None, ocr_processor.STATUS_PRZETWORZONY),
+        ("sklep.pdf", 1, ocr_processor.STATUS_PRZETWORZONY),
+        ("sklep.pdf", 2, ocr_processor.STATUS_PRZETWORZONY),
+        ("c.jpg", None, ocr_processor.STATUS_BLAD),
+    ]
+    assert [p["nazwa"] for p in wyniki[0].produkty] == ["Mleko", "Ser"]
+    assert wyniki[2].tekst == "Strona 2"
+    assert wyniki[3].blad and not wyniki[3].udany
+    assert os.listdir(procesor.folder_bledy) == ["c.jpg"]
+    assert sorted(p['plik_zrodlowy'] for p in _zapisane_paragony(tmp_path)) == ["sklep.pdf", "sklep.pdf",
+                                                                                 "telefon.jpg"]
+
+
+def test_nieczytelny_pdf_to_wynik_z_bledem(procesor, monkeypatch):
+    pdf2image = types.ModuleType("pdf2image")
+
+    def _pdfinfo(sciezka):
+        raise ValueError("uszkodzony plik")
+
+    pdf2image.pdfinfo_from_path = _pdfinfo
+    monkeypatch.setitem(sys.modules, "pdf2image", pdf2image)
+    _paragon(procesor, "zly.pdf", "")
+    _paragon(procesor, "a.jpg", "Mleko")
+
+    wyniki = procesor.przetworz(sorted(os.path.join(procesor.folder_nowe, n) for n in os.listdir(procesor.folder_nowe)))
+
+    assert [(w.nazwa, w.status) for w in wyniki] == [("a.jpg", ocr_processor.STATUS_PRZETWORZONY),
+                                                     ("zly.pdf", ocr_processor.STATUS_BLAD)]
+    assert "uszkodzony plik" in wyniki[1].blad
+    assert os.listdir(procesor.folder_bledy) == ["zly.pdf"]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testy statystyk spiżarni
+"""
+
+from datetime import date, datetime, timedelta
+
+from models import Produkt, ProduktTable
+from aggregates import AgregatySpizarni
+from pantry_stats import oblicz_statystyki, oblicz_statystyki_z_agregatow
+
+DZISIAJ = date(2030, 1, 1)
+
+
+def _produkt(nazwa: str, kategoria: str, dni: int, cena=None, zuzyty: bool = False) -> Produkt:
+    return Produkt(
+        nazwa=nazwa,
+        kategoria=kategoria,
+        data_waznosci=datetime(2030, 1, 1) + timedelta(days=dni),
+        cena=cena,
+        zuzyty=zuzyty
+    )
+
+
+def _tabela() -> ProduktTable:
+    return ProduktTable.z_produktow([
+        _produkt("Mleko", "Nabiał", -2, 3.5),
+        _produkt("Ser", "Nabiał", 3, 12.0),
+        _produkt("Chleb", "Pieczywo", 4, 5.0),
+        _produkt("Ryż", "Sypkie", 200),
+        _produkt("Jogurt", "Nabiał", 1, 2.0, zuzyty=True),
+    ])
+
+
+def test_statystyki_kategorii_i_terminow():
+    statystyki = oblicz_statystyki(_tabela(), DZISIAJ, granice=[-1, 3, 7, 30])
+
+    assert statystyki.liczba_produktow == 4
+    assert statystyki.wartosc_calkowita == 20.5
+    assert statystyki.liczba_w_kategoriach == {"Nabiał": 2, "Pieczywo": 1, "Sypkie": 1}
+    assert statystyki.wartosc_w_kategoriach["Nabiał"] == 15.5
+    assert statystyki.przedzialy == [
+        ("przeterminowane", 1, 3.5),
+        ("0-3 dni", 1, 12.0),
+        ("4-7 dni", 1, 5.0),
+        ("8-30 dni", 0, 0.0),
+        ("ponad 30 dni", 1, 0.0),
+    ]
+    assert statystyki.wygasajace_w_ciagu(3) == (2, 15.5)
+
+
+def test_statystyki_pustej_spizarni():
+    statystyki = oblicz_statystyki(ProduktTable(), DZISIAJ)
+    assert statystyki.liczba_produktow == 0
+    assert statystyki.wartosc_calkowita == 0
+    assert all(liczba == 0 for _, liczba, _ in statystyki.przedzialy)
+
+
+def test_statystyki_z_agregatow_zgodne_z_tabela():
+    tabela = _tabela()
+    z_tabeli = oblicz_statystyki(tabela, DZISIAJ)
+    z_agregatow = oblicz_statystyki_z_agregatow(AgregatySpizarni.z_tabeli(tabela), DZISIAJ)
+
+    assert z_agregatow.liczba_produktow == z_tabeli.liczba_produktow
+    assert z_agregatow.wartosc_calkowita == z_tabeli.wartosc_calkowita
+    assert z_agregatow.liczba_w_kategoriach == z_tabeli.liczba_w_kategoriach
+    assert z_agregatow.wartosc_w_kategoriach == z_tabeli.wartosc_w_kategoriach
+    assert z_agregatow.przedzialy == z_tabeli.przedzialy
+
+
+def test_statystyki_w_groszach_przy_powtarzanych_cenach():
+    tabela = ProduktTable.z_produktow(
+        _produkt("Bułka" if i % 2 else "Ser", "Pieczywo", 2, 0.10 if i % 2 else 12.99)
+        for i in range(100000))
+    statystyki = oblicz_statystyki(tabela, DZISIAJ, granice=[-1, 3, 7, 30])
+
+    # Ceny float32 sumowane wprost dają 654499.99
+    assert statystyki.wartosc_calkowita == 654500.00
+    assert statystyki.wartosc_w_kategoriach == {"Pieczywo": 654500.00}
+    assert statystyki.przedzialy[1] == ("0-3 dni", 100000, 654500.00)
+    z_agregatow = oblicz_statystyki_z_agregatow(AgregatySpizarni.z_tabeli(tabela), DZISIAJ, granice=[-1, 3, 7, 30])
+    assert z_agregatow.wartosc_w_kategoriach == statystyki.wartosc_w_kategoriach
+    assert z_agregatow.przedzialy == statystyki.przedzialy
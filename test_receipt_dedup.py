@@ -0,0 +1,68 @@
+import pytest
+
+from receipt_dedup import IndeksOdciskow, roznica_bitow
+
+
+def _indeks(tmp_path):
+    return IndeksOdciskow(str(tmp_path / "odciski.jsonl"), maks_roznica_bitow=3, tolerancja_proporcji=0.1)
+
+
+def test_rezerwacja_wykrywa_kopie_w_jednej_partii(tmp_path):
+    indeks = _indeks(tmp_path)
+    assert indeks.znajdz_lub_zarezerwuj((0b1111_0000, 3.0), "a.jpg") is None
+    # Różnica 2 bitów i 5% proporcji - ten sam paragon
+    assert indeks.znajdz_lub_zarezerwuj((0b1111_0011, 3.15), "a.pdf") == "a.jpg"
+    # Te same bity, ale paragon wyraźnie dłuższy
+    assert indeks.znajdz_lub_zarezerwuj((0b1111_0000, 4.0), "b.jpg") is None
+    # Zbyt wiele różnych bitów
+    assert indeks.znajdz_lub_zarezerwuj((0b0000_1111, 3.0), "c.jpg") is None
+
+
+def test_zwolniona_rezerwacja_nie_blokuje_kopii(tmp_path):
+    indeks = _indeks(tmp_path)
+    indeks.znajdz_lub_zarezerwuj((0xABC, 2.0), "a.jpg")
+    indeks.zwolnij((0xABC, 2.0))
+    assert indeks.znajdz_lub_zarezerwuj((0xABC, 2.0), "a2.jpg") is None
+
+
+def test_zatwierdzone_odciski_przetrwaja_ponowne_wczytanie(tmp_path):
+    indeks = _indeks(tmp_path)
+    indeks.znajdz_lub_zarezerwuj((0xABC, 2.0), "a.jpg")
+    indeks.zatwierdz((0xABC, 2.0))
+    indeks.znajdz_lub_zarezerwuj((0x123, 2.0), "b.jpg")  # niezatwierdzony
+    with open(tmp_path / "odciski.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"odcisk": "ff", "propor')  # urwany zapis
+
+    nowy = _indeks(tmp_path)
+    assert nowy.znajdz_lub_zarezerwuj((0xABD, 2.0), "kopia.jpg") == "a.jpg"
+    assert nowy.znajdz_lub_zarezerwuj((0x123, 2.0), "b2.jpg") is None
+
+
+def _paragon(cv2, np, linie, szerokosc=600):
+    obraz = np.full((80 + 40 * len(linie), szerokosc), 255, dtype=np.uint8)
+    for numer, linia in enumerate(linie):
+        cv2.putText(obraz, linia, (30, 60 + 40 * numer), cv2.FONT_HERSHEY_SIMPLEX, 0.9, 0, 2)
+    return obraz
+
+
+def test_odcisk_odporny_na_skale_i_kompresje():
+    cv2 = pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+    from receipt_dedup import odcisk_obrazu
+
+    linie = ["SKLEP SPOZYWCZY", "MLEKO 3,2% 1 x 4,99", "CHLEB ZYTNI 1 x 6,50", "MASLO 1 x 7,49",
+             "JAJKA 10 SZT 1 x 12,99", "SER GOUDA 0,3 x 39,90", "SUMA PLN 43,94"]
+    paragon = _paragon(cv2, np, linie)
+    # Ten sam paragon: inna rozdzielczość, szersze marginesy, kompresja JPEG
+    kopia = cv2.resize(paragon, None, fx=1.7, fy=1.7, interpolation=cv2.INTER_CUBIC)
+    kopia = cv2.copyMakeBorder(kopia, 90, 120, 60, 60, cv2.BORDER_CONSTANT, value=255)
+    kopia = cv2.imdecode(cv2.imencode(".jpg", kopia, [cv2.IMWRITE_JPEG_QUALITY, 60])[1], cv2.IMREAD_GRAYSCALE)
+    inny = _paragon(cv2, np, ["SKLEP SPOZYWCZY", "WODA 6 x 2,19", "BANANY 1,2 x 5,99", "KAWA 1 x 24,99",
+                              "CUKIER 1 x 3,79", "HERBATA 1 x 9,99", "SUMA PLN 58,10"])
+
+    bity, proporcje = odcisk_obrazu(paragon, wykrywaj_paragon=False)
+    bity_kopii, proporcje_kopii = odcisk_obrazu(kopia, wykrywaj_paragon=False)
+    bity_innego, _ = odcisk_obrazu(inny, wykrywaj_paragon=False)
+    assert abs(proporcje - proporcje_kopii) / proporcje < 0.05
+    assert roznica_bitow(bity, bity_kopii) <= 24
+    assert roznica_bitow(bity, bity_innego) > 24
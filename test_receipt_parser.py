@@ -0,0 +1,96 @@
+import pytest
+
+from receipt_parser import (parsuj_paragon_regulami, produkty_poprawne, sekcja_pozycji, tekst_pozycji,
+                            wiersze_z_wynikow)
+
+PARAGON = """BIEDRONKA Sklep 1234
+ul. Długa 5, Warszawa
+NIP 779-10-11-327
+2026-10-10 nr wydr. 123
+PARAGON FISKALNY
+MLEKO 3,2% 1L 2 x3,49 6,98C
+Banany luz
+0,856 x5,99 5,13 C
+Chleb żytni 6,50 B
+Rabat -1,00
+----------
+SPRZEDAŻ OPODATKOWANA B 6,50
+PTU B 8% 0,48
+SUMA PTU 1,20
+SUMA PLN 17,61""".splitlines()
+
+
+def _fragment(tekst, lewa, gora, wysokosc=10, szerokosc=80, pewnosc=0.9):
+    return ([[lewa, gora], [lewa + szerokosc, gora], [lewa + szerokosc, gora + wysokosc], [lewa, gora + wysokosc]],
+            tekst, pewnosc)
+
+
+def test_pozycje_paragonu_fiskalnego():
+    wynik = parsuj_paragon_regulami(PARAGON)
+
+    assert wynik.produkty == [{"nazwa": "MLEKO 3,2% 1L", "cena": 6.98, "ilosc": 2.0},
+                              {"nazwa": "Banany luz", "cena": 5.13, "ilosc": 0.856},
+                              {"nazwa": "Chleb żytni", "cena": 5.5, "ilosc": 1.0}]
+    assert wynik.suma == pytest.approx(17.61)
+    assert wynik.niesparsowane == []
+    assert wynik.pewny
+
+
+def test_niezgodna_suma_to_wynik_niepewny():
+    # Błędnie odczytana cena (8 zamiast 6) - iloczyn się nie zgadza, wiersz trafia do AI
+    wiersze = [w.replace("6,98C", "8,98C") for w in PARAGON]
+    wynik = parsuj_paragon_regulami(wiersze)
+
+    assert [p["nazwa"] for p in wynik.produkty] == ["Banany luz", "Chleb żytni"]
+    assert wynik.niesparsowane == ["MLEKO 3,2% 1L 2 x3,49 8,98C"]
+    assert not wynik.pewny
+
+
+def test_bez_sumy_pewny_tylko_gdy_rozpoznano_wszystkie_wiersze():
+    assert parsuj_paragon_regulami(["Ser gouda 1 x7,99 7,99A"]).pewny
+    wynik = parsuj_paragon_regulami(["Ser gouda 1 x7,99 7,99A", "J0GURT NAT 2,4?"])
+    assert not wynik.pewny
+    assert wynik.niesparsowane == ["J0GURT NAT 2,4?"]
+    # Same nazwy bez cen (np. tekst bez układu) - nic nie rozpoznano
+    assert not parsuj_paragon_regulami(["Mleko", "Ser"]).pewny
+
+
+def test_sekcja_pozycji_miedzy_naglowkiem_a_suma():
+    assert sekcja_pozycji(PARAGON) == (5, 11)
+    assert sekcja_pozycji(["Mleko 1 x2,00 2,00A", "SUMA 2,00"]) == (0, 1)
+    # Bez "PARAGON FISKALNY" - od wiersza przed pierwszą kwotą (nazwa w osobnym wierszu)
+    wiersze = ["LIDL sp. z o.o.", "NIP 781-18-97-358", "Banany", "0,856 x5,99 5,13 C", "SUMA 5,13"]
+    assert sekcja_pozycji(wiersze) == (2, 4)
+
+
+def test_tekst_pozycji_bez_naglowka_i_stopki():
+    tekst = "\n".join(PARAGON + ["Karta płatnicza 17,61", "Dziękujemy za zakupy", "#123 KASA 2"])
+
+    assert tekst_pozycji(tekst) == "\n".join(PARAGON[5:11])
+    assert len(tekst_pozycji(tekst)) < len(tekst) / 2
+    # Bez rozpoznanej sekcji pozycji tekst pozostaje bez zmian
+    assert tekst_pozycji("Mleko\nSer") == "Mleko\nSer"
+
+
+def test_wiersze_skladane_z_ramek_ocr():
+    wyniki = [
+        _fragment("3,49C", 200, 31),
+        _fragment("MLEKO 1L", 0, 30),
+        _fragment("1 x3,49", 100, 29),
+        _fragment("PARAGON FISKALNY", 50, 0),
+        _fragment("szum", 0, 60, pewnosc=0.1),
+        _fragment("SUMA PLN", 0, 60),
+        _fragment("3,49", 200, 61),
+    ]
+    wiersze = wiersze_z_wynikow(wyniki)
+
+    assert wiersze == ["PARAGON FISKALNY", "MLEKO 1L 1 x3,49 3,49C", "SUMA PLN 3,49"]
+    assert parsuj_paragon_regulami(wiersze).pewny
+
+
+def test_produkty_poprawne_wymagaja_nazwy_i_liczbowej_ceny():
+    assert produkty_poprawne([{"nazwa": "Ser", "cena": 7.99}, {"nazwa": "Bułka", "cena": 1}])
+    assert not produkty_poprawne([{"nazwa": "Ser", "cena": None}])
+    assert not produkty_poprawne([{"nazwa": "Ser"}])
+    assert not produkty_poprawne([{"nazwa": "", "cena": 1.0}])
+    assert not produkty_poprawne(["Ser 7,99"])
@@ -0,0 +1,104 @@
+import sys
+import threading
+import time
+import types
+
+from llm_integration import klient_llm
+from receipt_pipeline import PotokParagonow
+
+
+def test_wyniki_w_kolejnosci_wejscia():
+    potok = PotokParagonow(rozmiar_kolejki=1)
+    # Losowe opóźnienia i kilka wątków mieszają kolejność przetwarzania
+    potok.dodaj_etap("A", lambda x: time.sleep(0.001 * (x % 3)) or x * 2, watki=3)
+    potok.dodaj_etap("B", lambda x: x + 1, watki=2)
+    assert potok.uruchom(range(20)) == [x * 2 + 1 for x in range(20)]
+
+
+def test_etapy_dzialaja_jednoczesnie():
+    potok = PotokParagonow(rozmiar_kolejki=2)
+    potok.dodaj_etap("OCR", lambda x: time.sleep(0.05) or x)
+    potok.dodaj_etap("AI", lambda x: time.sleep(0.05) or x)
+
+    start = time.perf_counter()
+    potok.uruchom(range(6))
+    czas = time.perf_counter() - start
+
+    # Kolejno: 6 * (0.05 + 0.05) = 0.6 s; potokiem ok. 7 * 0.05 = 0.35 s
+    assert czas < 0.5
+    assert potok.czasy_etapow["OCR"] >= 0.3 and potok.czasy_etapow["AI"] >= 0.3
+
+
+def test_ograniczona_kolejka_wstrzymuje_szybki_etap():
+    wolny_start = threading.Event()
+    przyjete = []
+    potok = PotokParagonow(rozmiar_kolejki=1)
+    potok.dodaj_etap("szybki", lambda x: przyjete.append(x) or x)
+    potok.dodaj_etap("wolny", lambda x: wolny_start.wait() and x)
+
+    wynik = []
+    watek = threading.Thread(target=lambda: wynik.extend(potok.uruchom(range(50))))
+    watek.start()
+    time.sleep(0.1)
+    # Wolny etap trzyma 1 element, kolejka przed nim 1, szybki etap 1 w ręku
+    assert len(przyjete) <= 3
+    wolny_start.set()
+    watek.join(timeout=5)
+    assert wynik == list(range(50))
+
+
+def test_bledy_nie_zatrzymuja_potoku():
+    wywolania = []
+
+    def _etap(x):
+        if x == 2:
+            raise ValueError("uszkodzony paragon")
+        return None if x == 3 else x
+
+    potok = PotokParagonow()
+    potok.dodaj_etap("pierwszy", _etap, watki=2)
+    potok.dodaj_etap("drugi", lambda x: wywolania.append(x) or x)
+    assert potok.uruchom(range(5)) == [0, 1, None, None, 4]
+    assert sorted(wywolania) == [0, 1, 4]
+
+
+def test_etap_wsadowy_otrzymuje_czekajace_elementy():
+    wolny_start = threading.Event()
+    wsady = []
+
+    def _wsad(elementy):
+        wolny_start.wait()
+        wsady.append(list(elementy))
+        return [None if x == 5 else x * 10 for x in elementy]
+
+    potok = PotokParagonow(rozmiar_kolejki=1)
+    potok.dodaj_etap("pierwszy", lambda x: None if x == 2 else x)
+    potok.dodaj_etap("wsadowy", _wsad, wsad=3)
+
+    wynik = []
+    watek = threading.Thread(target=lambda: wynik.extend(potok.uruchom(range(8))))
+    watek.start()
+    # Pierwszy wsad ma jeden element; kolejne zbierają to, co zdążyło się nagromadzić
+    time.sleep(0.1)
+    wolny_start.set()
+    watek.join(timeout=5)
+    assert wynik == [0, 10, None, 30, 40, None, 60, 70]
+    assert all(1 <= len(wsad) <= 3 for wsad in wsady)
+    assert len(wsady) < 7
+    # Element odrzucony wcześniej nie trafia do wsadu
+    assert sorted(x for wsad in wsady for x in wsad) == [0, 1, 3, 4, 5, 6, 7]
+
+
+def test_watki_ai_nie_wspoldziela_sesji_http(monkeypatch):
+    requests = types.ModuleType("requests")
+    requests.Session = object
+    monkeypatch.setitem(sys.modules, "requests", requests)
+    klient = klient_llm({"model": "test-sesji", "base_url": "http://test"})
+
+    potok = PotokParagonow(rozmiar_kolejki=1)
+    potok.dodaj_etap("AI", lambda x: time.sleep(0.01) or (threading.get_ident(), klient.sesja), watki=3)
+    sesje = dict(potok.uruchom(range(9)))
+
+    assert len(sesje) > 1
+    assert len({id(sesja) for sesja in sesje.values()}) == len(sesje)
+    assert klient_llm({"model": "test-sesji", "base_url": "http://test"}).sesja is klient.sesja
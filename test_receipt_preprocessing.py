@@ -0,0 +1,54 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from receipt_preprocessing import (przygotuj_geometrie, szacuj_wysokosc_znakow, wykryj_paragon,
+                                   wyprostuj_paragon)
+
+
+def _paragon_na_tle(wysokosc_znakow: int = 40, kat: float = 0.0):
+    """
+    Rysuje jasny paragon z rzędami "znaków" na ciemnym tle, opcjonalnie obrócony.
+    """
+    paragon = np.full((1600, 600), 235, dtype=np.uint8)
+    for wiersz in range(60, 1540, wysokosc_znakow * 2):
+        for kolumna in range(40, 540, wysokosc_znakow):
+            cv2.rectangle(paragon, (kolumna, wiersz), (kolumna + wysokosc_znakow // 2, wiersz + wysokosc_znakow),
+                          20, -1)
+    tlo = np.full((2400, 1800), 60, dtype=np.uint8)
+    tlo[400:2000, 600:1200] = paragon
+    if kat:
+        macierz = cv2.getRotationMatrix2D((900, 1200), kat, 1.0)
+        tlo = cv2.warpAffine(tlo, macierz, (1800, 2400), borderValue=60)
+    return tlo
+
+
+def test_wykrywa_i_wycina_paragon():
+    obraz = _paragon_na_tle(kat=7)
+    narozniki = wykryj_paragon(obraz)
+    assert narozniki is not None
+
+    wyciety = wyprostuj_paragon(obraz, narozniki)
+    wysokosc, szerokosc = wyciety.shape
+    assert abs(wysokosc - 1600) < 80 and abs(szerokosc - 600) < 50
+    # Wycięty obszar to sam paragon - bez ciemnego tła
+    assert wyciety.mean() > 150
+
+
+def test_paragon_na_calym_kadrze_nie_jest_przycinany():
+    skan = np.full((1000, 400), 235, dtype=np.uint8)
+    cv2.putText(skan, "MLEKO 3,49", (20, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, 0, 2)
+    assert wykryj_paragon(skan) is None
+
+
+def test_szacowanie_wysokosci_znakow():
+    obraz = _paragon_na_tle(wysokosc_znakow=40)[400:2000, 600:1200]
+    assert szacuj_wysokosc_znakow(obraz) == pytest.approx(41, abs=3)
+
+
+def test_geometria_zmniejsza_liczbe_pikseli():
+    obraz = _paragon_na_tle(wysokosc_znakow=60)
+    wynik = przygotuj_geometrie(obraz, wysokosc_znakow=24)
+    assert wynik.size < obraz.size / 10
+    assert szacuj_wysokosc_znakow(wynik) == pytest.approx(24, abs=4)
@@ -0,0 +1,118 @@
+import contextlib
+import os
+import threading
+import time
+
+import pytest
+
+import receipt_watcher
+from config import KONFIGURACJA
+from receipt_watcher import ObserwatorParagonow
+
+
+class _ProcesorTestowy:
+    def __init__(self, folder_nowe, folder_przetworzone):
+        self.folder_nowe = folder_nowe
+        self.folder_przetworzone = folder_przetworzone
+        self.partie = []
+        self.przetworzono = threading.Event()
+
+    def przetworz_pliki(self, pliki):
+        self.partie.append([os.path.basename(sciezka) for sciezka in pliki])
+        for sciezka in pliki:
+            os.replace(sciezka, os.path.join(self.folder_przetworzone, os.path.basename(sciezka)))
+        self.przetworzono.set()
+        return len(pliki), 0
+
+    def pula_ocr(self):
+        return contextlib.nullcontext()
+
+
+@pytest.fixture
+def obserwator(tmp_path, monkeypatch):
+    monkeypatch.setitem(KONFIGURACJA["demon"], "czas_stabilizacji_s", 1.0)
+    monkeypatch.setitem(KONFIGURACJA["demon"], "maks_opoznienie_s", 3.0)
+    for folder in ("nowe", "przetworzone"):
+        os.makedirs(tmp_path / folder)
+    return ObserwatorParagonow(_ProcesorTestowy(str(tmp_path / "nowe"), str(tmp_path / "przetworzone")))
+
+
+def _zapisz(obserwator, nazwa, dane=b"x"):
+    with open(os.path.join(obserwator.folder, nazwa), "ab") as f:
+        f.write(dane)
+
+
+def _gotowe(obserwator, teraz):
+    return [os.path.basename(sciezka) for sciezka in obserwator._gotowe_pliki(teraz)]
+
+
+def test_plik_przetwarzany_dopiero_po_zakonczeniu_zapisu(obserwator):
+    _zapisz(obserwator, "a.jpg")
+    _zapisz(obserwator, "notatka.txt")
+    assert _gotowe(obserwator, 0.0) == []
+    _zapisz(obserwator, "a.jpg", b"dalsza czesc obrazu")
+    assert _gotowe(obserwator, 0.8) == []
+    # Od ostatniej zmiany minęło mniej niż czas stabilizacji
+    assert _gotowe(obserwator, 1.5) == []
+    assert _gotowe(obserwator, 1.9) == ["a.jpg"]
+
+
+def test_seria_plikow_przetwarzana_razem(obserwator):
+    _zapisz(obserwator, "b.jpg")
+    assert _gotowe(obserwator, 0.0) == []
+    _zapisz(obserwator, "c.pdf")
+    # b.jpg jest już stabilny, ale seria wciąż napływa
+    assert _gotowe(obserwator, 0.8) == []
+    assert _gotowe(obserwator, 1.1) == []
+    assert _gotowe(obserwator, 1.9) == ["b.jpg", "c.pdf"]
+
+
+def test_ciagly_naplyw_nie_wstrzymuje_przetwarzania_w_nieskonczonosc(obserwator):
+    teraz = 0.0
+    gotowe = []
+    for numer in range(20):
+        _zapisz(obserwator, f"{numer:02d}.jpg")
+        gotowe = _gotowe(obserwator, teraz)
+        if gotowe:
+            break
+        teraz += 0.5
+    # Pierwszy plik był gotowy po 1 s - najpóźniej po 3 s czekania serią
+    assert gotowe and teraz <= 4.0
+
+
+def test_przetworzony_plik_nie_wraca_do_kolejki(obserwator):
+    _zapisz(obserwator, "d.jpg")
+    _gotowe(obserwator, 0.0)
+    pliki = obserwator._gotowe_pliki(1.0)
+    obserwator._przetworzone.update({sciezka: obserwator._oczekujace.pop(sciezka)[0] for sciezka in pliki})
+    # Plik pozostał w folderze (np. nie udało się go przenieść)
+    assert _gotowe(obserwator, 5.0) == []
+    # Nowa wersja pliku jest przetwarzana ponownie
+    _zapisz(obserwator, "d.jpg", b"nowy skan")
+    assert _gotowe(obserwator, 6.0) == []
+    assert _gotowe(obserwator, 7.0) == ["d.jpg"]
+
+
+@pytest.mark.parametrize("inotify", [True, False])
+def test_demon_przetwarza_nowe_paragony(obserwator, monkeypatch, inotify):
+    if inotify:
+        try:
+            receipt_watcher._Inotify(obserwator.folder).zamknij()
+        except OSError:
+            pytest.skip("inotify niedostępne")
+    monkeypatch.setitem(KONFIGURACJA["demon"], "inotify", inotify)
+    monkeypatch.setitem(KONFIGURACJA["demon"], "interwal_skanowania_s", 0.05)
+    monkeypatch.setitem(KONFIGURACJA["demon"], "czas_stabilizacji_s", 0.2)
+    watek = threading.Thread(target=obserwator.uruchom, kwargs={"rozgrzej": False})
+    watek.start()
+    try:
+        time.sleep(0.1)
+        _zapisz(obserwator, "e.jpg")
+        _zapisz(obserwator, "f.png")
+        assert obserwator.procesor.przetworzono.wait(timeout=5)
+    finally:
+        obserwator.zatrzymaj()
+        watek.join(timeout=5)
+    assert not watek.is_alive()
+    assert obserwator.procesor.partie == [["e.jpg", "f.png"]]
+    assert os.listdir(obserwator.folder) == []
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+KATALOG_REPO = os.path.dirname(os.path.abspath(__file__))
+
+# Zmierzony łączny czas importu main.py to ok. 80 ms - budżet zostawia zapas na wolniejsze maszyny
+BUDZET_IMPORTU_MAIN_MS = 500
+
+# Moduły ładowane wyłącznie w ścieżkach OCR, LLM i wyświetlania tabel
+CIEZKIE_MODULY = {"torch", "easyocr", "cv2", "numpy", "pdf2image", "requests", "tabulate", "colorama"}
+
+
+def _uruchom(kod: str, katalog, *opcje: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=KATALOG_REPO)
+    return subprocess.run([sys.executable, *opcje, "-c", kod], cwd=katalog, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def _czas_importu_ms(wynik_importtime: str, modul: str) -> float:
+    for linia in wynik_importtime.splitlines():
+        if not linia.startswith("import time:"):
+            continue
+        _, _, laczny, nazwa = (pole.strip() for pole in linia.replace("import time:", "|").split("|"))
+        if nazwa == modul:
+            return int(laczny) / 1000
+    raise AssertionError(f"brak modułu {modul} w wyniku -X importtime")
+
+
+def test_import_main_miesci_sie_w_budzecie(tmp_path):
+    wynik = _uruchom("import main", tmp_path, "-X", "importtime")
+    assert _czas_importu_ms(wynik.stderr, "main") < BUDZET_IMPORTU_MAIN_MS
+
+
+def test_start_i_przegladanie_nie_laduja_ciezkich_modulow(tmp_path):
+    kod = (
+        "import sys\n"
+        "import main\n"
+        "from datetime import datetime, timedelta\n"
+        "from models import Produkt\n"
+        "app = main.AsystentZakupow()\n"
+        "app.storage_manager.dodaj_produkt(Produkt('Jogurt', 'Nabiał', datetime.now() + timedelta(days=1)))\n"
+        "app.storage_manager.wczytaj_aktywne_produkty()\n"
+        "app._sprawdz_wygasajace_produkty()\n"
+        "print(','.join(sorted({m.split('.')[0] for m in sys.modules})))\n"
+    )
+    wynik = _uruchom(kod, tmp_path)
+    zaladowane = set(wynik.stdout.strip().splitlines()[-1].split(","))
+    assert not zaladowane & CIEZKIE_MODULY
@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Testy menedżera przechowywania danych (tryby json, dziennik i sqlite)
+"""
+
+import os
+import json
+import threading
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from models import Produkt, ProduktTable
+from config import KONFIGURACJA
+from binary_snapshot import MigawkaBinarna, zakoduj_migawke
+from aggregates import AgregatySpizarni
+from storage_manager import StorageManager
+from storage_backends import DziennikBackend, migruj_json_do_sqlite
+
+
+def _produkt(nazwa: str, dni: int = 5) -> Produkt:
+    return Produkt(
+        nazwa=nazwa,
+        kategoria="Nabiał",
+        data_waznosci=datetime(2030, 1, 1) + timedelta(days=dni),
+        cena=3.5
+    )
+
+
+@pytest.fixture(params=["json", "dziennik", "dziennik_binarny", "sqlite"])
+def storage(request, tmp_path, monkeypatch):
+    tryb = request.param
+    if tryb == "dziennik_binarny":
+        monkeypatch.setitem(KONFIGURACJA["storage"], "format_migawki", "binarny")
+        tryb = "dziennik"
+    # Zużyte produkty zostają w magazynie - archiwizację sprawdzają osobne testy
+    storage = StorageManager(str(tmp_path / "produkty.json"), tryb=tryb)
+    storage.archiwizacja = {"wlaczona": False, "przeterminowane_po_dniach": 30}
+    return storage
+
+
+@pytest.fixture(params=["json", "dziennik", "sqlite"])
+def storage_z_archiwum(request, tmp_path):
+    storage = StorageManager(str(tmp_path / "produkty.json"), tryb=request.param)
+    storage.archiwizacja = {"wlaczona": True, "przeterminowane_po_dniach": 30}
+    return storage
+
+
+def test_dodawanie_i_wczytywanie(storage):
+    assert storage.dodaj_produkt(_produkt("Mleko"))
+    assert storage.dodaj_produkt(_produkt("Ser"))
+    assert [p.nazwa for p in storage.wczytaj_produkty()] == ["Mleko", "Ser"]
+
+
+def test_usuwanie_i_zuzycie(storage):
+    produkty = [_produkt(nazwa) for nazwa in ["Mleko", "Ser", "Jogurt"]]
+    for p in produkty:
+        storage.dodaj_produkt(p)
+    assert storage.usun_produkt(produkty[0].id)
+    assert storage.oznacz_jako_zuzyty(produkty[2].id)
+    assert not storage.usun_produkt("nieistniejacy")
+    assert not storage.usun_produkt(produkty[0].id)
+    wczytane = storage.wczytaj_produkty()
+    assert [(p.nazwa, p.zuzyty) for p in wczytane] == [("Ser", False), ("Jogurt", True)]
+    assert [p.id for p in wczytane] == [produkty[1].id, produkty[2].id]
+
+
+def test_aktualizacja_produktu(storage):
+    produkt = _produkt("Mleko")
+    storage.dodaj_produkt(produkt)
+    storage.dodaj_produkt(_produkt("Ser"))
+    zmieniony = Produkt.from_dict(dict(produkt.to_dict(), nazwa="Mleko 2%"))
+    assert storage.zaktualizuj_produkt(zmieniony)
+    inny = StorageManager(storage.sciezka_pliku, tryb=storage.tryb)
+    assert [p.nazwa for p in inny.wczytaj_produkty()] == ["Mleko 2%", "Ser"]
+    assert inny.pobierz_produkt(produkt.id).nazwa == "Mleko 2%"
+
+
+def test_operacje_po_id_po_zmianie_kolejnosci(storage):
+    produkty = [_produkt(nazwa) for nazwa in ["Mleko", "Ser", "Jogurt"]]
+    for p in produkty:
+        storage.dodaj_produkt(p)
+    # Inny proces zapisuje produkty w odwrotnej kolejności
+    inny = StorageManager(storage.sciezka_pliku, tryb=storage.tryb)
+    inny.zapisz_produkty(list(reversed(inny.wczytaj_produkty())))
+    assert storage.oznacz_jako_zuzyty(produkty[1].id)
+    zuzyte = [p.nazwa for p in inny.wczytaj_produkty() if p.zuzyty]
+    assert zuzyte == ["Ser"]
+
+
+def test_nadawanie_id_starym_danym(tmp_path):
+    sciezka = tmp_path / "produkty.json"
+    dane = _produkt("Mleko").to_dict()
+    del dane['id']
+    sciezka.write_text(json.dumps([dane]), encoding='utf-8')
+    id_produktu = StorageManager(str(sciezka), tryb="dziennik").wczytaj_produkty()[0].id
+    assert StorageManager(str(sciezka), tryb="json").wczytaj_produkty()[0].id == id_produktu
+
+
+def test_dziennik_nie_przepisuje_migawki(tmp_path):
+    storage = StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik")
+    storage.dodaj_produkt(_produkt("Mleko"))
+    migawka = (tmp_path / "produkty.json").read_bytes()
+    storage.dodaj_produkt(_produkt("Ser"))
+    assert (tmp_path / "produkty.json").read_bytes() == migawka
+    assert len(storage.wczytaj_produkty()) == 2
+
+
+def test_kompaktowanie(tmp_path):
+    storage = StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik")
+    storage.dodaj_produkt(_produkt("Mleko"))
+    storage.dodaj_produkt(_produkt("Ser"))
+    assert storage.kompaktuj()
+    with open(tmp_path / "produkty.json", encoding='utf-8') as f:
+        assert [p['nazwa'] for p in json.load(f)] == ["Mleko", "Ser"]
+    with open(tmp_path / "produkty.journal", encoding='utf-8') as f:
+        assert len(f.read().splitlines()) == 1
+    assert [p.nazwa for p in storage.wczytaj_produkty()] == ["Mleko", "Ser"]
+
+
+def test_automatyczne_kompaktowanie(tmp_path):
+    storage = StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik")
+    storage.backend.kompaktuj_po_wpisach = 3
+    for i in range(4):
+        storage.dodaj_produkt(_produkt(f"Produkt {i}"))
+    with open(tmp_path / "produkty.json", encoding='utf-8') as f:
+        assert len(json.load(f)) == 3
+    assert len(storage.wczytaj_produkty()) == 4
+
+
+def test_przerwany_zapis_dziennika(tmp_path):
+    storage = StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik")
+    storage.dodaj_produkt(_produkt("Mleko"))
+    with open(tmp_path / "produkty.journal", 'a', encoding='utf-8') as f:
+        f.write('{"op": "dodaj", "produkt": {"naz')
+    storage.dodaj_produkt(_produkt("Ser"))
+    assert [p.nazwa for p in storage.wczytaj_produkty()] == ["Mleko", "Ser"]
+
+
+def test_nieaktualny_dziennik_jest_pomijany(tmp_path):
+    storage = StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik")
+    storage.dodaj_produkt(_produkt("Mleko"))
+    dziennik = (tmp_path / "produkty.journal").read_bytes()
+    storage.kompaktuj()
+    # Symulacja awarii między zapisem migawki a wyczyszczeniem dziennika
+    (tmp_path / "produkty.journal").write_bytes(dziennik)
+    assert [p.nazwa for p in storage.wczytaj_produkty()] == ["Mleko"]
+
+
+def test_zapytania(storage):
+    storage.dodaj_produkt(_produkt("Ser", dni=10))
+    storage.dodaj_produkt(_produkt("Mleko", dni=1))
+    jogurt = _produkt("Jogurt", dni=2)
+    storage.dodaj_produkt(jogurt)
+    storage.oznacz_jako_zuzyty(jogurt.id)
+    assert [p.nazwa for p in storage.wczytaj_aktywne_produkty()] == ["Mleko", "Ser"]
+    dni = (datetime(2030, 1, 1).date() - datetime.now().date()).days + 2
+    assert [p.nazwa for p in storage.wczytaj_wygasajace(dni)] == ["Mleko"]
+    assert storage.policz_kategorie() == {"Nabiał": 2}
+    assert storage.wartosc_aktywnych() == pytest.approx(7.0)
+
+
+def test_migracja_do_sqlite(tmp_path):
+    zrodlo = StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik")
+    zrodlo.dodaj_produkt(_produkt("Mleko"))
+    zrodlo.dodaj_produkt(_produkt("Ser"))
+    assert migruj_json_do_sqlite(str(tmp_path / "produkty.json"), str(tmp_path / "produkty.db")) == 2
+    cel = StorageManager(str(tmp_path / "produkty.json"), tryb="sqlite")
+    assert [p.nazwa for p in cel.wczytaj_produkty()] == ["Mleko", "Ser"]
+    with pytest.raises(ValueError):
+        migruj_json_do_sqlite(str(tmp_path / "produkty.json"), str(tmp_path / "produkty.db"))
+
+
+def test_migracja_do_sqlite_nie_zmienia_migawki_binarnej(tmp_path, monkeypatch):
+    monkeypatch.setitem(KONFIGURACJA["storage"], "format_migawki", "binarny")
+    zrodlo = StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik")
+    zrodlo.dodaj_produkt(_produkt("Mleko"))
+    zrodlo.kompaktuj()
+    zrodlo.dodaj_produkt(_produkt("Ser"))
+    przed = {nazwa: (tmp_path / nazwa).read_bytes() for nazwa in ("produkty.bin", "produkty.journal")}
+
+    assert migruj_json_do_sqlite(str(tmp_path / "produkty.json"), str(tmp_path / "produkty.db")) == 2
+    assert not (tmp_path / "produkty.json").exists()
+    assert {nazwa: (tmp_path / nazwa).read_bytes() for nazwa in przed} == przed
+
+
+def test_cache_bez_ponownego_dekodowania(storage, monkeypatch):
+    mleko = _produkt("Mleko")
+    storage.dodaj_produkt(mleko)
+    storage.wczytaj_produkty()
+    wywolania = []
+    oryginal = storage.backend.wczytaj
+    monkeypatch.setattr(storage.backend, "wczytaj", lambda: wywolania.append(1) or oryginal())
+    storage.dodaj_produkt(_produkt("Ser"))
+    storage.oznacz_jako_zuzyty(mleko.id)
+    storage.wczytaj_produkty()
+    storage.policz_kategorie()
+    assert [(p.nazwa, p.zuzyty) for p in storage.wczytaj_produkty()] == [("Mleko", True), ("Ser", False)]
+    if storage.tryb != "json":
+        assert wywolania == []
+
+
+def test_cache_wykrywa_zmiany_innego_procesu(storage):
+    storage.dodaj_produkt(_produkt("Mleko"))
+    assert len(storage.wczytaj_produkty()) == 1
+    inny = StorageManager(storage.sciezka_pliku, tryb=storage.tryb)
+    inny.dodaj_produkt(_produkt("Ser"))
+    assert [p.nazwa for p in storage.wczytaj_produkty()] == ["Mleko", "Ser"]
+
+
+def test_nieudana_zmiana_w_backendzie_nie_zmienia_pamieci(tmp_path, monkeypatch):
+    storage = StorageManager(str(tmp_path / "produkty.json"), tryb="json")
+    mleko = _produkt("Mleko")
+    storage.dodaj_produkt(mleko)
+    storage.dodaj_produkt(_produkt("Ser"))
+    storage.wczytaj_produkty()
+    storage.agregaty()
+    oryginal = storage.backend.usun
+
+    def _usun_po_innym_procesie(id_produktu):
+        # Inny proces usuwa produkt między sprawdzeniem pamięci podręcznej a zapisem
+        StorageManager(storage.sciezka_pliku, tryb="json").usun_produkt(id_produktu)
+        return oryginal(id_produktu)
+
+    monkeypatch.setattr(storage.backend, "usun", _usun_po_innym_procesie)
+    assert not storage.usun_produkt(mleko.id)
+    assert [p.nazwa for p in storage.wczytaj_produkty()] == ["Ser"]
+    assert storage.agregaty().liczba_produktow == 1
+    assert storage.weryfikuj_agregaty()
+
+
+def test_dodawanie_partii(storage, monkeypatch):
+    zapisy = []
+    oryginal = storage.backend.dodaj_wiele
+    monkeypatch.setattr(storage.backend, "dodaj_wiele", lambda p: zapisy.append(len(p)) or oryginal(p))
+    assert storage.dodaj_produkty([_produkt(f"Produkt {i}") for i in range(40)])
+    assert zapisy == [40]
+    assert len(StorageManager(storage.sciezka_pliku, tryb=storage.tryb).wczytaj_produkty()) == 40
+
+
+def test_transakcja_zatwierdzenie(storage):
+    storage.dodaj_produkt(_produkt("Mleko"))
+    with storage.transakcja():
+        storage.dodaj_produkty([_produkt("Ser"), _produkt("Jogurt")])
+        with storage.transakcja():
+            storage.dodaj_produkt(_produkt("Kefir"))
+        assert len(StorageManager(storage.sciezka_pliku, tryb=storage.tryb).wczytaj_produkty()) == 1
+    nazwy = [p.nazwa for p in StorageManager(storage.sciezka_pliku, tryb=storage.tryb).wczytaj_produkty()]
+    assert nazwy == ["Mleko", "Ser", "Jogurt", "Kefir"]
+    assert [p.nazwa for p in storage.wczytaj_produkty()] == nazwy
+
+
+def test_transakcja_wycofanie(storage):
+    storage.dodaj_produkt(_produkt("Mleko"))
+    with pytest.raises(RuntimeError):
+        with storage.transakcja():
+            storage.dodaj_produkt(_produkt("Ser"))
+            raise RuntimeError("przerwany import")
+    assert [p.nazwa for p in storage.wczytaj_produkty()] == ["Mleko"]
+    storage.dodaj_produkt(_produkt("Jogurt"))
+    assert [p.nazwa for p in storage.wczytaj_produkty()] == ["Mleko", "Jogurt"]
+
+
+def test_przerwany_zapis_partii_w_dzienniku(tmp_path):
+    storage = StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik")
+    storage.dodaj_produkt(_produkt("Mleko"))
+    storage.dodaj_produkty([_produkt("Ser"), _produkt("Jogurt")])
+    dziennik = (tmp_path / "produkty.journal").read_bytes()
+    (tmp_path / "produkty.journal").write_bytes(dziennik[:-20])
+    nazwy = [p.nazwa for p in StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik").wczytaj_produkty()]
+    assert nazwy == ["Mleko"]
+
+
+def test_zuzyty_produkt_trafia_do_archiwum(storage_z_archiwum):
+    mleko, ser = _produkt("Mleko"), _produkt("Ser")
+    storage_z_archiwum.dodaj_produkty([mleko, ser])
+    assert storage_z_archiwum.oznacz_jako_zuzyty(mleko.id)
+
+    assert [p.nazwa for p in storage_z_archiwum.wczytaj_produkty()] == ["Ser"]
+    inny = StorageManager(storage_z_archiwum.sciezka_pliku, tryb=storage_z_archiwum.tryb)
+    assert [p.nazwa for p in inny.wczytaj_produkty()] == ["Ser"]
+
+    archiwum = storage_z_archiwum.wczytaj_archiwum()
+    assert [(p.nazwa, p.zuzyty) for p in archiwum] == [("Mleko", True)]
+    assert archiwum[0].data_zuzycia is not None
+    dzis = date.today()
+    assert storage_z_archiwum.wczytaj_archiwum(od=dzis, do=dzis)[0].id == mleko.id
+    assert storage_z_archiwum.wczytaj_archiwum(do=dzis - timedelta(days=40)) == []
+
+
+def test_archiwizacja_dawno_przeterminowanych(storage_z_archiwum):
+    stary = Produkt(nazwa="Stary", kategoria="Inne",
+                    data_waznosci=datetime(2030, 1, 1) - timedelta(days=31), cena=1.0)
+    swiezy = Produkt(nazwa="Swiezy", kategoria="Inne",
+                     data_waznosci=datetime(2030, 1, 1) - timedelta(days=10), cena=1.0)
+    storage_z_archiwum.dodaj_produkty([stary, swiezy])
+
+    assert storage_z_archiwum.archiwizuj(dzisiaj=date(2030, 1, 1)) == 1
+    assert [p.nazwa for p in storage_z_archiwum.wczytaj_produkty()] == ["Swiezy"]
+    assert [p.nazwa for p in storage_z_archiwum.wczytaj_archiwum()] == ["Stary"]
+    assert storage_z_archiwum.archiwizuj(dzisiaj=date(2030, 1, 1)) == 0
+
+
+def test_archiwum_pomija_powtorzenia_i_urwane_linie(tmp_path):
+    storage = StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik")
+    storage.archiwizacja = {"wlaczona": True, "przeterminowane_po_dniach": 30}
+    mleko = _produkt("Mleko")
+    mleko.zuzyty = True
+    mleko.data_zuzycia = datetime(2030, 1, 2)
+    storage.archiwum.dopisz([mleko])
+    segment = storage.archiwum.segmenty()[0]
+    with open(segment, 'a', encoding='utf-8') as f:
+        f.write('{"id": "urwany", "naz')
+    storage.archiwum.dopisz([mleko])
+
+    assert [p.nazwa for p in storage.wczytaj_archiwum()] == ["Mleko"]
+
+
+def test_migawka_binarna_zachowuje_produkty():
+    mleko = _produkt("Mleko")
+    mleko.zuzyty = True
+    mleko.data_zuzycia = datetime(2030, 1, 3, 12, 30, 15, 250)
+    bez_ceny = Produkt(nazwa="Sól", kategoria="Przyprawy", data_waznosci=datetime(2031, 5, 1),
+                       id_paragonu="paragon-1")
+    dane = [mleko.to_dict(), bez_ceny.to_dict()]
+
+    migawka = MigawkaBinarna(zakoduj_migawke(dane))
+
+    assert len(migawka) == 2
+    assert [p.to_dict() for p in migawka.produkty()] == dane
+    assert migawka.policz_kategorie() == {"Przyprawy": 1}
+    assert migawka.wartosc_aktywnych() == 0
+
+
+def test_skan_migawki_binarnej_bez_dekodowania_produktow(tmp_path, monkeypatch):
+    monkeypatch.setitem(KONFIGURACJA["storage"], "format_migawki", "binarny")
+    zapis = StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik")
+    zapis.zapisz_produkty([_produkt("Mleko", dni=1), _produkt("Ser", dni=30)])
+
+    dekodowane = []
+    oryginal = MigawkaBinarna.produkt
+    monkeypatch.setattr(MigawkaBinarna, "produkt",
+                        lambda self, i: dekodowane.append(i) or oryginal(self, i))
+    storage = StorageManager(str(tmp_path / "produkty.json"), tryb="dziennik")
+    assert storage.policz_kategorie() == {"Nabiał": 2}
+    assert storage.wartosc_aktywnych() == 7.0
+    assert dekodowane == []
+    assert [p.nazwa for p in storage.backend.wczytaj_wygasajace(datetime(2030, 1, 5).date())] == ["Mleko"]
+    assert dekodowane == [0]
+
+
+def test_zmiana_formatu_migawki_przenosi_dziennik(tmp_path):
+    sciezka = str(tmp_path / "produkty.json")
+    json_backend = DziennikBackend(sciezka)
+    mleko, ser = _produkt("Mleko"), _produkt("Ser")
+    json_backend.zapisz_wszystkie([mleko])
+    json_backend.dodaj(ser)
+
+    binarny = DziennikBackend(sciezka, format_migawki="binarny")
+    assert not os.path.exists(sciezka)
+    assert [p.nazwa for p in binarny.wczytaj()] == ["Mleko", "Ser"]
+    binarny.usun(mleko.id)
+
+    powrot = DziennikBackend(sciezka)
+    assert not os.path.exists(str(tmp_path / "produkty.bin"))
+    assert [p.nazwa for p in powrot.wczytaj()] == ["Ser"]
+
+
+def test_eksport_json(storage, tmp_path):
+    storage.dodaj_produkty([_produkt("Mleko"), _produkt("Ser")])
+    assert storage.eksportuj_json(str(tmp_path / "eksport.json"))
+    with open(tmp_path / "eksport.json", encoding="utf-8") as f:
+        assert [p["nazwa"] for p in json.load(f)] == ["Mleko", "Ser"]
+
+
+def test_produkt_bez_slownika_atrybutow():
+    produkt = _produkt("Mleko")
+    assert not hasattr(produkt, "__dict__")
+    with pytest.raises(AttributeError):
+        produkt.nieistniejace_pole = 1
+
+
+def test_tabela_produktow_filtry():
+    produkty = [_produkt("Ser", dni=10), _produkt("Mleko", dni=1), _produkt("Jogurt", dni=3)]
+    produkty[2].zuzyty = True
+    produkty.append(Produkt(nazwa="Sól", kategoria="Przyprawy", data_waznosci=datetime(2030, 1, 2)))
+    tabela = ProduktTable.z_produktow(produkty)
+
+    assert len(tabela) == 4
+    assert tabela.pozycje_wygasajacych(date(2030, 1, 4)) == [1, 3]
+    assert tabela.pozycje_aktywnych() == [1, 3, 0]
+    assert tabela.policz_kategorie() == {"Nabiał": 2, "Przyprawy": 1}
+    assert tabela.wartosc_aktywnych() == 7.0
+
+
+def test_wartosc_tabeli_w_groszach():
+    tabela = ProduktTable.z_produktow(
+        Produkt(nazwa="Bułka" if i % 2 else "Ser", kategoria="Pieczywo", data_waznosci=datetime(2030, 1, 2),
+                cena=0.10 if i % 2 else 12.99)
+        for i in range(100000))
+
+    # Ceny float32 sumowane wprost dają 654499.99
+    assert tabela.wartosc_aktywnych() == 654500.00
+    assert tabela.wartosc_aktywnych() == AgregatySpizarni.z_tabeli(tabela).wartosc_calkowita
+
+
+def test_wczytywanie_tabeli(storage):
+    mleko, ser = _produkt("Mleko", dni=1), _produkt("Ser", dni=10)
+    storage.dodaj_produkty([ser, mleko])
+    inny = StorageManager(storage.sciezka_pliku, tryb=storage.tryb)
+    inny.archiwizacja = storage.archiwizacja
+
+    for tabela in (storage.wczytaj_tabele(), inny.wczytaj_tabele()):
+        assert tabela.id == [ser.id, mleko.id]
+        assert tabela.kategorie == ["Nabiał"]
+        assert tabela.pozycje_aktywnych() == [1, 0]
+    storage.oznacz_jako_zuzyty(mleko.id)
+    assert storage.wczytaj_tabele().pozycje_aktywnych() == [0]
+
+
+def test_agregaty_aktualizowane_przy_zapisach(storage):
+    mleko, ser, jogurt = _produkt("Mleko", dni=1), _produkt("Ser", dni=10), _produkt("Jogurt", dni=1)
+    storage.dodaj_produkt(mleko)
+    assert storage.agregaty().liczba_produktow == 1
+    storage.dodaj_produkty([ser, jogurt])
+    storage.oznacz_jako_zuzyty(jogurt.id)
+    storage.usun_produkt(mleko.id)
+    zmieniony = Produkt(nazwa="Ser", kategoria="Sery", data_waznosci=ser.data_waznosci, cena=20.0, id=ser.id)
+    storage.zaktualizuj_produkt(zmieniony)
+
+    agregaty = storage.agregaty()
+    assert agregaty == AgregatySpizarni.z_tabeli(storage.wczytaj_tabele())
+    assert agregaty.liczba_w_kategoriach == {"Sery": 1}
+    assert agregaty.wartosc_calkowita == 20.0
+    assert storage.weryfikuj_agregaty()
+
+
+def test_agregaty_wczytywane_bez_przegladania_spizarni(storage, monkeypatch):
+    storage.dodaj_produkty([_produkt("Mleko", dni=1), _produkt("Ser", dni=10)])
+    storage.agregaty()
+
+    inny = StorageManager(storage.sciezka_pliku, tryb=storage.tryb)
+    monkeypatch.setattr(inny, "wczytaj_tabele", lambda: pytest.fail("agregaty przeliczone od zera"))
+    agregaty = inny.agregaty()
+    assert agregaty.liczba_produktow == 2
+    assert agregaty.liczba_do_dnia(date(2030, 1, 6)) == 1
+
+
+def test_agregaty_po_zmianie_z_zewnatrz_i_weryfikacja(storage):
+    storage.dodaj_produkt(_produkt("Mleko"))
+    storage.agregaty()
+    inny = StorageManager(storage.sciezka_pliku, tryb=storage.tryb)
+    inny.dodaj_produkt(_produkt("Ser"))
+    assert storage.agregaty().liczba_produktow == 2
+
+    storage._agregaty.dodaj(_produkt("Widmo"))
+    assert not storage.weryfikuj_agregaty()
+    assert storage.agregaty().liczba_produktow == 2
+    assert storage.weryfikuj_agregaty()
+
+
+def test_indeks_waznosci_zapytania_i_kolejnosc(storage):
+    ser, mleko, jogurt = _produkt("Ser", dni=10), _produkt("Mleko", dni=1), _produkt("Jogurt", dni=3)
+    storage.dodaj_produkty([ser, mleko, jogurt])
+    storage.oznacz_jako_zuzyty(jogurt.id)
+    kefir = _produkt("Kefir", dni=2)
+    storage.dodaj_produkt(kefir)
+
+    assert storage.indeks_waznosci().do_dnia(date(2030, 1, 3)) == [mleko.id, kefir.id]
+    assert [p.nazwa for p in storage.iteruj_aktywne()] == ["Mleko", "Kefir", "Ser"]
+    assert [p.nazwa for p in storage.wczytaj_aktywne_produkty()] == ["Mleko", "Kefir", "Ser"]
+    assert storage.weryfikuj_agregaty()
+
+
+def test_indeks_waznosci_utrzymywany_przez_krotkie_uruchomienia(storage, monkeypatch):
+    storage.dodaj_produkt(_produkt("Mleko", dni=1))
+    storage.indeks_waznosci()
+    storage.agregaty()
+
+    # Szybkie dodanie w osobnym uruchomieniu - zmiana tylko dopisywana, bez wczytywania indeksu
+    szybki = StorageManager(storage.sciezka_pliku, tryb=storage.tryb)
+    monkeypatch.setattr(szybki.plik_indeksu, "wczytaj", lambda sygnatura: pytest.fail("wczytano cały indeks"))
+    szybki.dodaj_produkt(_produkt("Ser", dni=0))
+
+    kolejny = StorageManager(storage.sciezka_pliku, tryb=storage.tryb)
+    monkeypatch.setattr(kolejny, "wczytaj_tabele", lambda: pytest.fail("indeks przebudowany od zera"))
+    assert len(kolejny.indeks_waznosci()) == 2
+    assert kolejny.agregaty().liczba_produktow == 2
+
+
+def test_szybkie_dodanie_przy_kompaktowaniu_uniewaznia_indeks(storage, monkeypatch):
+    mleko = _produkt("Mleko", dni=1)
+    storage.dodaj_produkt(mleko)
+    storage.indeks_waznosci()
+    storage.dodaj_produkt(_produkt("Kefir", dni=2))
+
+    # Plik wymaga zapisu pełnego stanu, a indeksu nie ma w pamięci - plik jest usuwany
+    szybki = StorageManager(storage.sciezka_pliku, tryb=storage.tryb)
+    szybki.plik_indeksu.kompaktuj_po_wpisach = 2
+    monkeypatch.setattr(szybki.plik_indeksu, "wczytaj", lambda sygnatura: pytest.fail("wczytano cały indeks"))
+    ser = _produkt("Ser", dni=0)
+    szybki.dodaj_produkt(ser)
+    assert not os.path.exists(storage.plik_indeksu.sciezka)
+
+    inny = StorageManager(storage.sciezka_pliku, tryb=storage.tryb)
+    assert inny.indeks_waznosci().do_dnia(date(2030, 1, 2)) == [ser.id, mleko.id]
+    assert len(inny.indeks_waznosci()) == 3
+
+
+def test_uszkodzony_plik_indeksu_jest_przebudowywany(storage):
+    mleko = _produkt("Mleko", dni=1)
+    storage.dodaj_produkt(mleko)
+    storage.indeks_waznosci()
+    storage.dodaj_produkt(_produkt("Ser", dni=5))
+    with open(storage.plik_indeksu.sciezka, 'a', encoding='utf-8') as f:
+        f.write('{"dodaj": [["widmo", 1')
+
+    inny = StorageManager(storage.sciezka_pliku, tryb=storage.tryb)
+    assert inny.indeks_waznosci().do_dnia(date(2030, 1, 2)) == [mleko.id]
+    assert len(inny.indeks_waznosci()) == 2
+
+
+def test_przetworzone_paragony_w_tej_samej_sekundzie_nie_nadpisuja_sie(storage, tmp_path, monkeypatch):
+    monkeypatch.setitem(KONFIGURACJA["paths"], "dane_json_folder", str(tmp_path))
+    assert storage.zapisz_przetworzony_paragon({'produkty': [{'nazwa': 'Mleko'}]})
+    assert storage.zapisz_przetworzony_paragon({'produkty': [{'nazwa': 'Ser'}]})
+    assert len(list(tmp_path.glob("paragon_*.json"))) == 2
+
+
+def test_rownolegle_zapisy_paragonow_nie_nadpisuja_sie(storage, tmp_path, monkeypatch):
+    monkeypatch.setitem(KONFIGURACJA["paths"], "dane_json_folder", str(tmp_path))
+
+    class _StalyCzas(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2030, 1, 1, 12, 0, 0)
+
+    # Wszystkie wątki w tej samej sekundzie - jak wątki etapu zapisu potoku paragonów
+    monkeypatch.setattr("storage_manager.datetime", _StalyCzas)
+    start = threading.Barrier(8)
+
+    def _zapisz(watek):
+        start.wait()
+        for i in range(10):
+            assert storage.zapisz_przetworzony_paragon({'produkty': [{'nazwa': f"{watek}-{i}"}]})
+
+    watki = [threading.Thread(target=_zapisz, args=(n,)) for n in range(8)]
+    for watek in watki:
+        watek.start()
+    for watek in watki:
+        watek.join()
+
+    nazwy = set()
+    for sciezka in tmp_path.glob("paragon_*.json"):
+        with open(sciezka, encoding='utf-8') as f:
+            nazwy.add(json.load(f)['produkty'][0]['nazwa'])
+    assert len(nazwy) == 80
@@ -1,12 +1,28 @@
 from datetime import datetime
-from typing import List, Dict, Any
-from tabulate import tabulate
-from colorama import init, Fore, Style
+from typing import List, Dict, Any, Optional
 from models import Produkt
+from pantry_stats import StatystykiSpizarni
 from config import KONFIGURACJA
 
-# Inicjalizacja colorama
-init()
+_colorama_zainicjalizowana = False
+
+def _kolory():
+    """
+    Importuje i inicjalizuje colorama przy pierwszym kolorowym komunikacie.
+    
+    Returns:
+        Tuple: Obiekty Fore i Style z colorama
+    """
+    global _colorama_zainicjalizowana
+    from colorama import init, Fore, Style
+    if not _colorama_zainicjalizowana:
+        init()
+        _colorama_zainicjalizowana = True
+    return Fore, Style
+
+def _tabulate(*args, **kwargs) -> str:
+    from tabulate import tabulate
+    return tabulate(*args, **kwargs)
 
 class UIDisplay:
     """
@@ -53,6 +69,8 @@ class UIDisplay:
         naglowki = ["Nr", "Nazwa Produktu", "Kategoria", "Data ważności", "Dni do końca", "Cena (zł)"]
         dane = []
         
+        if self.kolory_wlaczone:
+            Fore, Style = _kolory()
         for i, produkt in enumerate(produkty, 1):
             dni_do_konca = (produkt.data_waznosci - datetime.now()).days
             
@@ -79,52 +97,54 @@ class UIDisplay:
             dane.append(wiersz)
         
         # Wyświetl tabelę
-        print("\n" + tabulate(dane, headers=naglowki, tablefmt=self.format_tabeli))
+        print("\n" + _tabulate(dane, headers=naglowki, tablefmt=self.format_tabeli))
     
-    def wyswietl_statystyki(self, produkty: List[Produkt]) -> None:
+    def wyswietl_statystyki(self, statystyki: StatystykiSpizarni,
+                            wygasajace: Optional[List[Produkt]] = None) -> None:
         """
         Wyświetla statystyki spiżarni.
         
         Args:
-            produkty: Lista wszystkich produktów
+            statystyki: Statystyki obliczone przez pantry_stats (z tabeli lub z agregatów)
+            wygasajace: Produkty wygasające w ciągu krytycznej liczby dni
+                (expiry_warning_days_critical) do wypisania z nazwy
         """
-        if not produkty:
+        if not statystyki.liczba_produktow:
             print("\n❌ Brak produktów w spiżarni!")
             return
         
-        # Filtruj tylko aktywne produkty
-        produkty_aktywne = [p for p in produkty if not p.zuzyty]
-        
-        # Oblicz statystyki
-        liczba_produktow = len(produkty_aktywne)
-        produkty_wygasajace = [
-            p for p in produkty_aktywne
-            if (p.data_waznosci - datetime.now()).days <= KONFIGURACJA["notifications"]["expiry_warning_days_critical"]
-        ]
-        liczba_wygasajacych = len(produkty_wygasajace)
-        
-        # Oblicz wartość produktów
-        wartosc_produktow = sum(p.cena for p in produkty_aktywne if p.cena is not None)
-        
-        # Oblicz najczęstsze kategorie
-        kategorie = {}
-        for p in produkty_aktywne:
-            kategorie[p.kategoria] = kategorie.get(p.kategoria, 0) + 1
-        najczestsze_kategorie = sorted(
-            kategorie.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
+        dni_krytyczne = KONFIGURACJA["notifications"]["expiry_warning_days_critical"]
+        liczba_wygasajacych, wartosc_zagrozona = statystyki.wygasajace_w_ciagu(dni_krytyczne)
+        kategorie = sorted(
+            statystyki.liczba_w_kategoriach.items(),
+            key=lambda x: (-x[1], x[0])
+        )
         
         # Wyświetl statystyki
         print("\n=== STATYSTYKI SPIŻARNI ===")
-        print(f"\nLiczba produktów: {liczba_produktow}")
-        print(f"Produkty wygasające w ciągu {KONFIGURACJA['notifications']['expiry_warning_days_critical']} dni: {liczba_wygasajacych}")
-        print(f"Szacunkowa wartość produktów: {wartosc_produktow:.2f} zł")
+        print(f"\nLiczba produktów: {statystyki.liczba_produktow}")
+        print(f"Produkty wygasające w ciągu {dni_krytyczne} dni: {liczba_wygasajacych}")
+        print(f"Wartość zagrożona przeterminowaniem: {wartosc_zagrozona:.2f} zł")
+        print(f"Szacunkowa wartość produktów: {statystyki.wartosc_calkowita:.2f} zł")
+        
+        print("\nProdukty według kategorii:")
+        for kategoria, liczba in kategorie:
+            wartosc = statystyki.wartosc_w_kategoriach.get(kategoria, 0)
+            print(f"- {kategoria}: {liczba} produktów" + (f" ({wartosc:.2f} zł)" if wartosc > 0 else ""))
+        
+        print("\nTerminy ważności:")
+        print(_tabulate(
+            [[etykieta, liczba, f"{wartosc:.2f} zł"] for etykieta, liczba, wartosc in statystyki.przedzialy],
+            headers=["Przedział", "Produkty", "Wartość"],
+            tablefmt=self.format_tabeli
+        ))
         
-        print("\nNajczęstsze kategorie:")
-        for kategoria, liczba in najczestsze_kategorie:
-            print(f"- {kategoria}: {liczba} produktów")
+        if wygasajace:
+            dzisiaj = datetime.now().date()
+            print(f"\n⚠️ Produkty wygasające w ciągu {dni_krytyczne} dni:")
+            for produkt in wygasajace:
+                dni = (produkt.data_waznosci.date() - dzisiaj).days
+                print(f"- {produkt.nazwa} ({produkt.kategoria}) - {dni} dni")
     
     def wyswietl_sugestie_przepisow(self, sugestie: List[Dict[str, Any]]) -> None:
         """
@@ -156,6 +176,7 @@ class UIDisplay:
             typ: Typ komunikatu (info, sukces, blad, ostrzezenie)
         """
         if self.kolory_wlaczone:
+            Fore, Style = _kolory()
             if typ == "sukces":
                 print(f"\n{Fore.GREEN}✓ {komunikat}{Style.RESET_ALL}")
             elif typ == "blad":